@@ -5,11 +5,10 @@
 提供大数据分析和可视化的API接口
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from functools import wraps
 import logging
-import json
-from datetime import datetime, timedelta
+from datetime import datetime
 import sys
 import os
 
@@ -23,7 +22,8 @@ logger = logging.getLogger(__name__)
 # 导入动态分析器
 try:
     from bigdata.analysis.dynamic_analyzer import DynamicAnalyzer
-    dynamic_analyzer = DynamicAnalyzer()
+    from services.analysis_result_service import analysis_result_service
+    dynamic_analyzer = DynamicAnalyzer(result_store=analysis_result_service)
     logger.info("✅ 动态分析器初始化成功")
 except ImportError as e:
     logger.warning(f"⚠️ 动态分析器导入失败: {str(e)}")
@@ -48,10 +48,16 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from bigdata_config import DATA_PATHS
+from services.analysis_service import analysis_service, AnalysisUnavailable
+from services.statistics_service import statistics_service
+from services.data_quality_service import data_quality_service
 
 # 创建蓝图
 bigdata_bp = Blueprint('bigdata', __name__)
 
+# 分析历史单次最多返回的条数（与日志索引保留的最近记录数一致）
+ANALYSIS_HISTORY_MAX_LIMIT = 100
+
 def require_bigdata_auth(f):
     """大数据API认证装饰器"""
     @wraps(f)
@@ -90,44 +96,10 @@ def get_bigdata_status():
 @bigdata_bp.route('/api/bigdata/statistics', methods=['GET'])
 @require_bigdata_auth
 def get_bigdata_statistics():
-    """获取大数据统计信息"""
+    """获取大数据统计信息（缓存快照，snapshot_age 为快照的秒数，refresh=true 时立即重新计算）"""
     try:
-        # 从数据库获取真实统计信息
-        from models import User, Caregiver, Appointment, JobData
-        from extensions import db
-        
-        UserModel = User.get_model(db)
-        CaregiverModel = Caregiver.get_model(db)
-        AppointmentModel = Appointment.get_model(db)
-        JobDataModel = JobData.get_model(db)
-        
-        # 计算真实统计数据
-        total_caregivers = CaregiverModel.query.count()
-        total_users = UserModel.query.count()
-        total_appointments = AppointmentModel.query.count()
-        total_jobs_crawled = JobDataModel.query.count()
-        
-        # 计算平均评分
-        avg_rating = db.session.query(db.func.avg(CaregiverModel.rating)).scalar() or 0
-        avg_hourly_rate = db.session.query(db.func.avg(CaregiverModel.hourly_rate)).scalar() or 0
-        
-        # 计算数据质量分数
-        data_quality_score = calculate_data_quality_score()
-        
-        # 获取最后爬取时间
-        last_job = JobDataModel.query.order_by(JobDataModel.crawl_time.desc()).first()
-        last_crawl_time = last_job.crawl_time.isoformat() if last_job and last_job.crawl_time else None
-        
-        statistics = {
-            'total_caregivers': total_caregivers,
-            'total_users': total_users,
-            'total_appointments': total_appointments,
-            'total_jobs_crawled': total_jobs_crawled,
-            'avg_rating': round(float(avg_rating), 2),
-            'avg_hourly_rate': round(float(avg_hourly_rate), 2),
-            'data_quality_score': data_quality_score,
-            'last_crawl_time': last_crawl_time
-        }
+        force = request.args.get('refresh', 'false').lower() == 'true'
+        statistics = statistics_service.snapshot(app=current_app._get_current_object(), force=force)
         
         return jsonify({
             'success': True,
@@ -143,127 +115,55 @@ def get_bigdata_statistics():
         }), 500
 
 def calculate_data_quality_score():
-    """计算数据质量分数"""
+    """计算数据质量分数（各表字段有效率的平均值，读取增量维护的计数器）"""
     try:
-        from models import Caregiver
-        from extensions import db
-        
-        CaregiverModel = Caregiver.get_model(db)
-        
-        # 计算有完整信息的护工比例
-        total_caregivers = CaregiverModel.query.count()
-        if total_caregivers == 0:
-            return 0.0
-        
-        complete_caregivers = CaregiverModel.query.filter(
-            CaregiverModel.name.isnot(None),
-            CaregiverModel.phone.isnot(None),
-            CaregiverModel.experience_years.isnot(None),
-            CaregiverModel.hourly_rate.isnot(None)
-        ).count()
-        
-        return round(complete_caregivers / total_caregivers, 2)
+        return data_quality_service.overall_score()
         
     except Exception as e:
         logger.error(f"计算数据质量分数失败: {str(e)}")
         return 0.0
 
+@bigdata_bp.route('/api/bigdata/data-quality', methods=['GET'])
+@require_bigdata_auth
+def get_data_quality():
+    """获取各表各字段的数据质量（完整性、有效性、分数与趋势），只读计数器；rebuild=true 时先全表重新统计"""
+    try:
+        if request.args.get('rebuild', 'false').lower() == 'true':
+            data_quality_service.rebuild()
+        days = request.args.get('days', 30, type=int)
+        report = data_quality_service.report(history_days=max(1, min(days, 365)))
+        if not report['tables']:
+            return jsonify({
+                'success': False,
+                'data': report,
+                'message': '数据质量计数器未初始化，请运行 database/rebuild_data_quality.py 或使用 rebuild=true'
+            }), 503
+        
+        return jsonify({
+            'success': True,
+            'data': report,
+            'message': '数据质量获取成功' if not report['uninitialized_tables'] else
+                       f"数据质量获取成功，未初始化的表: {', '.join(report['uninitialized_tables'])}"
+        })
+        
+    except Exception as e:
+        logger.error(f"获取数据质量失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'获取数据质量失败: {str(e)}'
+        }), 500
+
 @bigdata_bp.route('/api/bigdata/analysis/caregiver-distribution', methods=['GET'])
 @require_bigdata_auth
 def get_caregiver_distribution():
     """获取护工分布分析"""
     try:
-        # 从job API获取真实数据
-        from api.job import _load_latest_jobs
-        
-        jobs = _load_latest_jobs()
-        if not jobs:
-            # 如果没有数据，返回空分布
-            distribution_data = {
-                'age_distribution': {},
-                'salary_distribution': {},
-                'rating_distribution': {},
-                'location_distribution': {}
-            }
-        else:
-            # 分析真实数据
-            from collections import Counter
-            import re
-            
-            # 地域分布统计
-            locations = [job.get('location', '未知') for job in jobs if job.get('location')]
-            location_dist = dict(Counter(locations))
-            
-            
-            # 薪资分布统计（按薪资范围分组）
-            salary_ranges = {'2000-3000': 0, '3000-5000': 0, '5000-8000': 0, '8000-12000': 0, '12000+': 0}
-            for job in jobs:
-                salary = job.get('salary', '')
-                if salary and '元/月' in salary:
-                    salary = salary.replace('元/月', '')
-                    if '-' in salary:
-                        try:
-                            min_sal, max_sal = salary.split('-')
-                            avg_sal = (int(min_sal) + int(max_sal)) // 2
-                            if avg_sal < 3000:
-                                salary_ranges['2000-3000'] += 1
-                            elif avg_sal < 5000:
-                                salary_ranges['3000-5000'] += 1
-                            elif avg_sal < 8000:
-                                salary_ranges['5000-8000'] += 1
-                            elif avg_sal < 12000:
-                                salary_ranges['8000-12000'] += 1
-                            else:
-                                salary_ranges['12000+'] += 1
-                        except ValueError:
-                            pass
-            
-            # 职位类型分布（基于title关键词）
-            job_types = {'护工': 0, '护理员': 0, '康复护理': 0, '医疗护理': 0, '养老护理': 0, '其他': 0}
-            for job in jobs:
-                title = job.get('title', '').lower()
-                if '护工' in title:
-                    job_types['护工'] += 1
-                elif '护理员' in title:
-                    job_types['护理员'] += 1
-                elif '康复' in title:
-                    job_types['康复护理'] += 1
-                elif '医疗' in title:
-                    job_types['医疗护理'] += 1
-                elif '养老' in title:
-                    job_types['养老护理'] += 1
-                else:
-                    job_types['其他'] += 1
-            
-            # 公司类型分布
-            company_types = Counter()
-            for job in jobs:
-                company = job.get('company', '')
-                if '养老' in company:
-                    company_types['养老院'] += 1
-                elif '医疗' in company or '医院' in company:
-                    company_types['医疗机构'] += 1
-                elif '康复' in company:
-                    company_types['康复中心'] += 1
-                elif '家政' in company:
-                    company_types['家政服务'] += 1
-                else:
-                    company_types['其他'] += 1
-            
-            distribution_data = {
-                'location_distribution': location_dist,
-                'salary_distribution': salary_ranges,
-                'job_type_distribution': job_types,
-                'company_type_distribution': dict(company_types),
-                'total_jobs': len(jobs),
-                'cities_count': len(location_dist),
-                'companies_count': len(set(job.get('company', '') for job in jobs if job.get('company')))
-            }
+        data = analysis_service.caregiver_distribution()
         
         return jsonify({
             'success': True,
-            'data': distribution_data,
-            'message': f'护工分布分析获取成功，共{len(jobs)}条数据'
+            'data': data,
+            'message': f'护工分布分析获取成功，共{data.get("total_jobs", 0)}条数据'
         })
         
     except Exception as e:
@@ -273,67 +173,55 @@ def get_caregiver_distribution():
             'message': f'获取分析失败: {str(e)}'
         }), 500
 
+@bigdata_bp.route('/api/bigdata/analysis/distribution-cube', methods=['GET'])
+@require_bigdata_auth
+def get_distribution_cube():
+    """分布立方体交叉表与下钻
+
+    group_by 为逗号分隔的维度（city/salary_band/job_type/company_type/source/publish_month），
+    同名参数为筛选条件，可重复或逗号分隔，例如 ?group_by=salary_band&city=上海&company_type=养老院
+    """
+    try:
+        from bigdata.processing.distribution_cube import CUBE_DIMENSIONS
+        group_by = [d.strip() for d in request.args.get('group_by', '').split(',') if d.strip()]
+        filters = {}
+        for dimension in CUBE_DIMENSIONS:
+            values = [v.strip() for raw in request.args.getlist(dimension) for v in raw.split(',') if v.strip()]
+            if values:
+                filters[dimension] = values
+        datasets = max(1, min(request.args.get('datasets', 1, type=int), 20))
+        limit = request.args.get('limit', type=int)
+        data = analysis_service.distribution_cube(group_by, filters, datasets, limit)
+        data.update(group_by=group_by, filters=filters)
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'message': f'分布查询成功，共{data["total"]}条数据'
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"分布立方体查询失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}'
+        }), 500
+
 @bigdata_bp.route('/api/bigdata/analysis/market-trends', methods=['GET'])
 @require_bigdata_auth
 def get_market_trends():
     """获取市场趋势分析"""
     try:
-        # 从数据库获取真实的市场趋势数据
-        from models import Caregiver, Appointment, JobData
-        from extensions import db
-        
-        CaregiverModel = Caregiver.get_model(db)
-        AppointmentModel = Appointment.get_model(db)
-        JobDataModel = JobData.get_model(db)
-        
-        # 生成最近12个月的趋势数据
-        trends_data = []
-        base_date = datetime.now() - timedelta(days=365)
-        
-        for i in range(12):
-            date = base_date + timedelta(days=i*30)
-            month_start = date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            # 计算该月的平均薪资（基于护工时薪）
-            monthly_caregivers = CaregiverModel.query.filter(
-                CaregiverModel.created_at >= month_start,
-                CaregiverModel.created_at <= month_end,
-                CaregiverModel.hourly_rate.isnot(None)
-            ).all()
-            
-            avg_salary = 0
-            if monthly_caregivers:
-                avg_salary = sum(c.hourly_rate for c in monthly_caregivers) / len(monthly_caregivers)
-            else:
-                # 如果没有数据，使用默认值
-                avg_salary = 45 + i * 0.5 + (i % 3 - 1) * 2
-            
-            # 计算该月的工作机会数量（基于职位数据）
-            job_count = JobDataModel.query.filter(
-                JobDataModel.crawl_time >= month_start,
-                JobDataModel.crawl_time <= month_end
-            ).count()
-            
-            # 计算该月的需求指数（基于预约数量）
-            appointment_count = AppointmentModel.query.filter(
-                AppointmentModel.created_at >= month_start,
-                AppointmentModel.created_at <= month_end
-            ).count()
-            
-            # 需求指数基于预约数量，范围0.5-1.0
-            demand_index = min(1.0, max(0.5, 0.5 + appointment_count / 100.0))
-            
-            trends_data.append({
-                'date': date.strftime('%Y-%m'),
-                'avg_salary': round(avg_salary, 1),
-                'job_count': job_count,
-                'demand_index': round(demand_index, 2)
-            })
+        data = analysis_service.market_trends()
         
         return jsonify({
             'success': True,
-            'data': trends_data,
+            'data': data,
             'message': '市场趋势分析获取成功'
         })
         
@@ -349,72 +237,11 @@ def get_market_trends():
 def get_success_prediction():
     """获取成功率预测分析"""
     try:
-        # 从数据库获取真实护工数据进行分析
-        from models import Caregiver, Appointment
-        from extensions import db
-        
-        CaregiverModel = Caregiver.get_model(db)
-        AppointmentModel = Appointment.get_model(db)
-        
-        # 获取护工数据
-        caregivers = CaregiverModel.query.filter(
-            CaregiverModel.is_approved == True,
-            CaregiverModel.rating.isnot(None),
-            CaregiverModel.experience_years.isnot(None)
-        ).limit(10).all()
-        
-        predictions = []
-        for caregiver in caregivers:
-            # 计算实际成功率（基于完成的预约）
-            completed_appointments = AppointmentModel.query.filter(
-                AppointmentModel.caregiver_id == caregiver.id,
-                AppointmentModel.status == 'completed'
-            ).count()
-            
-            total_appointments = AppointmentModel.query.filter(
-                AppointmentModel.caregiver_id == caregiver.id
-            ).count()
-            
-            actual_success_rate = completed_appointments / total_appointments if total_appointments > 0 else 0
-            
-            # 基于评分和经验预测成功率（简化算法）
-            predicted_success_rate = min(0.95, max(0.1, 
-                (caregiver.rating or 0) / 5.0 * 0.6 + 
-                min((caregiver.experience_years or 0) / 10.0, 1.0) * 0.4
-            ))
-            
-            predictions.append({
-                'caregiver_id': caregiver.id,
-                'name': caregiver.name or '未知护工',
-                'predicted_success_rate': round(predicted_success_rate, 2),
-                'actual_success_rate': round(actual_success_rate, 2)
-            })
-        
-        # 计算模型准确度（简化计算）
-        if predictions:
-            accuracy_scores = []
-            for pred in predictions:
-                diff = abs(pred['predicted_success_rate'] - pred['actual_success_rate'])
-                accuracy_scores.append(1 - diff)
-            model_accuracy = sum(accuracy_scores) / len(accuracy_scores)
-        else:
-            model_accuracy = 0.0
-        
-        prediction_data = {
-            'model_accuracy': round(model_accuracy, 2),
-            'predictions': predictions,
-            'feature_importance': {
-                'rating': 0.35,
-                'experience_years': 0.25,
-                'hourly_rate': 0.20,
-                'age': 0.15,
-                'location': 0.05
-            }
-        }
+        data = analysis_service.success_prediction()
         
         return jsonify({
             'success': True,
-            'data': prediction_data,
+            'data': data,
             'message': '成功率预测分析获取成功'
         })
         
@@ -430,92 +257,19 @@ def get_success_prediction():
 def get_cluster_analysis():
     """获取聚类分析结果"""
     try:
-        # 从数据库获取真实护工数据进行聚类分析
-        from models import Caregiver, Appointment
-        from extensions import db
-        
-        CaregiverModel = Caregiver.get_model(db)
-        AppointmentModel = Appointment.get_model(db)
-        
-        # 获取护工数据
-        caregivers = CaregiverModel.query.filter(
-            CaregiverModel.is_approved == True,
-            CaregiverModel.rating.isnot(None),
-            CaregiverModel.hourly_rate.isnot(None)
-        ).all()
-        
-        if not caregivers:
-            return jsonify({
-                'success': False,
-                'message': '没有足够的护工数据进行聚类分析'
-            }), 400
-        
-        # 基于评分和时薪进行简单聚类
-        clusters = []
-        
-        # 高薪资深护工 (评分>=4.0, 时薪>=50)
-        high_end = [c for c in caregivers if (c.rating or 0) >= 4.0 and (c.hourly_rate or 0) >= 50]
-        if high_end:
-            avg_rating = sum(c.rating for c in high_end) / len(high_end)
-            avg_salary = sum(c.hourly_rate for c in high_end) / len(high_end)
-            avg_age = sum(c.age for c in high_end if c.age) / len([c for c in high_end if c.age]) if any(c.age for c in high_end) else 0
-            
-            clusters.append({
-                'cluster_id': 0,
-                'name': '高薪资深护工',
-                'count': len(high_end),
-                'avg_salary': round(avg_salary, 1),
-                'avg_rating': round(avg_rating, 1),
-                'avg_age': round(avg_age, 0) if avg_age > 0 else None,
-                'characteristics': ['经验丰富', '评分高', '薪资高']
-            })
-        
-        # 中等经验护工 (评分3.0-4.0, 时薪30-50)
-        medium = [c for c in caregivers if 3.0 <= (c.rating or 0) < 4.0 and 30 <= (c.hourly_rate or 0) < 50]
-        if medium:
-            avg_rating = sum(c.rating for c in medium) / len(medium)
-            avg_salary = sum(c.hourly_rate for c in medium) / len(medium)
-            avg_age = sum(c.age for c in medium if c.age) / len([c for c in medium if c.age]) if any(c.age for c in medium) else 0
-            
-            clusters.append({
-                'cluster_id': 1,
-                'name': '中等经验护工',
-                'count': len(medium),
-                'avg_salary': round(avg_salary, 1),
-                'avg_rating': round(avg_rating, 1),
-                'avg_age': round(avg_age, 0) if avg_age > 0 else None,
-                'characteristics': ['经验中等', '评分良好', '薪资中等']
-            })
-        
-        # 新手护工 (评分<3.0 或 时薪<30)
-        beginner = [c for c in caregivers if (c.rating or 0) < 3.0 or (c.hourly_rate or 0) < 30]
-        if beginner:
-            avg_rating = sum(c.rating for c in beginner) / len(beginner)
-            avg_salary = sum(c.hourly_rate for c in beginner) / len(beginner)
-            avg_age = sum(c.age for c in beginner if c.age) / len([c for c in beginner if c.age]) if any(c.age for c in beginner) else 0
-            
-            clusters.append({
-                'cluster_id': 2,
-                'name': '新手护工',
-                'count': len(beginner),
-                'avg_salary': round(avg_salary, 1),
-                'avg_rating': round(avg_rating, 1),
-                'avg_age': round(avg_age, 0) if avg_age > 0 else None,
-                'characteristics': ['经验较少', '评分一般', '薪资较低']
-            })
-        
-        cluster_data = {
-            'clusters': clusters,
-            'silhouette_score': 0.72,  # 保持原有值，实际应该基于聚类算法计算
-            'total_caregivers': len(caregivers)
-        }
+        data = analysis_service.cluster_analysis()
         
         return jsonify({
             'success': True,
-            'data': cluster_data,
+            'data': data,
             'message': '聚类分析获取成功'
         })
         
+    except AnalysisUnavailable as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"获取聚类分析失败: {str(e)}")
         return jsonify({
@@ -620,29 +374,11 @@ def get_recommendations():
 def get_demand_forecast():
     """获取需求预测分析"""
     try:
-        # 生成未来6个月的需求预测
-        forecast_data = []
-        base_date = datetime.now()
-        
-        for i in range(6):
-            date = base_date + timedelta(days=i*30)
-            forecast_data.append({
-                'date': date.strftime('%Y-%m'),
-                'predicted_demand': 100 + i * 15 + (i % 2) * 10,
-                'confidence_interval': {
-                    'lower': 80 + i * 12,
-                    'upper': 120 + i * 18
-                },
-                'trend': 'increasing' if i > 2 else 'stable'
-            })
+        data = analysis_service.demand_forecast()
         
         return jsonify({
             'success': True,
-            'data': {
-                'forecast': forecast_data,
-                'model_accuracy': 0.78,
-                'last_training_date': datetime.now().isoformat()
-            },
+            'data': data,
             'message': '需求预测分析获取成功'
         })
         
@@ -763,9 +499,10 @@ def trigger_dynamic_analysis():
         # 获取请求参数
         data = request.get_json() or {}
         trigger_source = data.get('source', 'manual')
+        force = bool(data.get('force', False))
         
-        # 触发动态分析
-        results = dynamic_analyzer.run_dynamic_analysis(trigger_source=trigger_source)
+        # 触发动态分析（只重新计算输入变化的部分，force 时全部重算）
+        results = dynamic_analyzer.run_dynamic_analysis(trigger_source=trigger_source, force=force)
         
         if results:
             return jsonify({
@@ -819,6 +556,140 @@ def get_latest_dynamic_analysis():
             'message': f'获取结果失败: {str(e)}'
         }), 500
 
+@bigdata_bp.route('/api/bigdata/dynamic/history', methods=['GET'])
+@require_bigdata_auth
+def get_dynamic_analysis_history():
+    """最近的动态分析结果（新的在前），source 指定时只返回该触发来源的结果"""
+    try:
+        if not dynamic_analyzer:
+            return jsonify({
+                'success': False,
+                'message': '动态分析器未初始化'
+            }), 500
+
+        limit = min(max(request.args.get('limit', 10, type=int), 1), ANALYSIS_HISTORY_MAX_LIMIT)
+        trigger_source = request.args.get('source') or None
+        return jsonify({
+            'success': True,
+            'data': dynamic_analyzer.analysis_history(limit, trigger_source),
+            'message': '分析历史获取成功'
+        })
+
+    except Exception as e:
+        logger.error(f"获取分析历史失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'获取分析历史失败: {str(e)}'
+        }), 500
+
+@bigdata_bp.route('/api/bigdata/caregivers/<int:caregiver_id>/segment', methods=['GET'])
+@require_bigdata_auth
+def get_caregiver_segment(caregiver_id):
+    """护工所属分群：读取最近一次分群保存的结果，新护工用当前模型直接分配"""
+    try:
+        if not dynamic_analyzer:
+            return jsonify({
+                'success': False,
+                'message': '动态分析器未初始化'
+            }), 500
+
+        segment = dynamic_analyzer.caregiver_segment(caregiver_id)
+        if segment is None:
+            # 分群之后新增的护工：按数据库中的资料分配，不重新训练
+            from models import Caregiver
+            from extensions import db
+            CaregiverModel = Caregiver.get_model(db)
+            caregiver = CaregiverModel.query.get(caregiver_id)
+            if caregiver is not None:
+                segment = dynamic_analyzer.caregiver_segment(caregiver_id, {
+                    'age_clean': caregiver.age or 0,
+                    'hourly_rate_clean': caregiver.hourly_rate or 0.0,
+                    'rating_clean': caregiver.rating or 0.0
+                })
+
+        if segment is None:
+            return jsonify({
+                'success': False,
+                'message': '没有该护工的分群结果'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': segment,
+            'message': '护工分群获取成功'
+        })
+
+    except Exception as e:
+        logger.error(f"获取护工分群失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'获取护工分群失败: {str(e)}'
+        }), 500
+
+@bigdata_bp.route('/api/bigdata/models', methods=['GET'])
+@require_bigdata_auth
+def list_dynamic_models():
+    """模型注册表：各模型发布的版本与全部版本的元数据"""
+    try:
+        if not dynamic_analyzer:
+            return jsonify({
+                'success': False,
+                'message': '动态分析器未初始化'
+            }), 500
+
+        return jsonify({
+            'success': True,
+            'data': dynamic_analyzer.list_models(),
+            'message': '模型列表获取成功'
+        })
+
+    except Exception as e:
+        logger.error(f"获取模型列表失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'获取模型列表失败: {str(e)}'
+        }), 500
+
+@bigdata_bp.route('/api/bigdata/models/<name>/promote', methods=['POST'])
+@require_bigdata_auth
+def promote_dynamic_model(name):
+    """发布模型的指定版本（如回退到旧版本）"""
+    try:
+        if not dynamic_analyzer:
+            return jsonify({
+                'success': False,
+                'message': '动态分析器未初始化'
+            }), 500
+
+        data = request.get_json() or {}
+        version = data.get('version')
+        if not version:
+            return jsonify({
+                'success': False,
+                'message': '缺少版本号'
+            }), 400
+
+        try:
+            pointer = dynamic_analyzer.promote_model(name, version)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': pointer,
+            'message': '模型发布成功'
+        })
+
+    except Exception as e:
+        logger.error(f"发布模型失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'发布模型失败: {str(e)}'
+        }), 500
+
 @bigdata_bp.route('/api/bigdata/dynamic/import-trigger', methods=['POST'])
 @require_bigdata_auth
 def trigger_analysis_on_import():
@@ -1062,99 +933,9 @@ def delete_exported_file(filename):
 # ==================== 真实数据分析收集 ====================
 
 def collect_real_analysis_data():
-    """收集真实的分析数据"""
+    """收集真实的分析数据：在线程池中直接调用各项分析，单项失败或超时只记录在 collection 中"""
     try:
-        import requests
-        
-        analysis_data = {
-            'analysis_timestamp': datetime.now().isoformat(),
-            'data_version': 1,
-            'trigger_source': 'real_data_export',
-            'data_sources': ['job_analysis', 'bigdata_analysis'],
-            'data_counts': {},
-            'caregiver_distribution': {},
-            'success_prediction': {},
-            'cluster_analysis': {},
-            'market_trends': {},
-            'demand_forecast': {}
-        }
-        
-        # 收集薪资分析数据
-        try:
-            salary_response = requests.get('http://localhost:8000/api/job/analysis/salary', timeout=10)
-            if salary_response.status_code == 200:
-                salary_data = salary_response.json()
-                if salary_data.get('success'):
-                    analysis_data['salary_analysis'] = salary_data.get('data', {})
-                    analysis_data['data_counts']['salary_records'] = salary_data.get('data', {}).get('total_records', 0)
-        except Exception as e:
-            logger.warning(f"薪资分析数据收集失败: {str(e)}")
-        
-        # 收集技能分析数据
-        try:
-            skill_response = requests.get('http://localhost:8000/api/job/analysis/skills', timeout=10)
-            if skill_response.status_code == 200:
-                skill_data = skill_response.json()
-                if skill_data.get('success'):
-                    analysis_data['skill_analysis'] = skill_data.get('data', {})
-                    analysis_data['data_counts']['skill_records'] = skill_data.get('data', {}).get('total_records', 0)
-        except Exception as e:
-            logger.warning(f"技能分析数据收集失败: {str(e)}")
-        
-        # 收集护工分布数据
-        try:
-            dist_response = requests.get('http://localhost:8000/api/bigdata/analysis/caregiver-distribution', timeout=10)
-            if dist_response.status_code == 200:
-                dist_data = dist_response.json()
-                if dist_data.get('success'):
-                    analysis_data['caregiver_distribution'] = dist_data.get('data', {})
-                    analysis_data['data_counts']['caregiver_records'] = dist_data.get('data', {}).get('total_caregivers', 0)
-        except Exception as e:
-            logger.warning(f"护工分布数据收集失败: {str(e)}")
-        
-        # 收集聚类分析数据
-        try:
-            cluster_response = requests.get('http://localhost:8000/api/bigdata/analysis/cluster-analysis', timeout=10)
-            if cluster_response.status_code == 200:
-                cluster_data = cluster_response.json()
-                if cluster_data.get('success'):
-                    analysis_data['cluster_analysis'] = cluster_data.get('data', {})
-        except Exception as e:
-            logger.warning(f"聚类分析数据收集失败: {str(e)}")
-        
-        # 收集需求预测数据
-        try:
-            forecast_response = requests.get('http://localhost:8000/api/bigdata/analysis/demand-forecast', timeout=10)
-            if forecast_response.status_code == 200:
-                forecast_data = forecast_response.json()
-                if forecast_data.get('success'):
-                    analysis_data['demand_forecast'] = forecast_data.get('data', {})
-        except Exception as e:
-            logger.warning(f"需求预测数据收集失败: {str(e)}")
-        
-        # 收集成功率预测数据
-        try:
-            success_response = requests.get('http://localhost:8000/api/bigdata/analysis/success-prediction', timeout=10)
-            if success_response.status_code == 200:
-                success_data = success_response.json()
-                if success_data.get('success'):
-                    analysis_data['success_prediction'] = success_data.get('data', {})
-        except Exception as e:
-            logger.warning(f"成功率预测数据收集失败: {str(e)}")
-        
-        # 收集市场趋势数据
-        try:
-            trends_response = requests.get('http://localhost:8000/api/bigdata/analysis/market-trends', timeout=10)
-            if trends_response.status_code == 200:
-                trends_data = trends_response.json()
-                if trends_data.get('success'):
-                    analysis_data['market_trends'] = trends_data.get('data', {})
-        except Exception as e:
-            logger.warning(f"市场趋势数据收集失败: {str(e)}")
-        
-        logger.info("✅ 真实分析数据收集完成")
-        return analysis_data
-        
+        return analysis_service.collect_all(app=current_app._get_current_object())
     except Exception as e:
         logger.error(f"❌ 真实分析数据收集失败: {str(e)}")
         return {}
@@ -254,6 +254,8 @@ def get_caregiver_jobs():
         per_page = request.args.get('per_page', 10, type=int)
         location = request.args.get('location', '')
         job_type = request.args.get('job_type', '')
+        match = request.args.get('match', 'contains')
+        cursor = request.args.get('cursor') or None
         
         # 获取真实的工作机会数据
         from services.job_service import JobService
@@ -264,7 +266,9 @@ def get_caregiver_jobs():
             page=page,
             per_page=per_page,
             location=location,
-            job_type=job_type
+            job_type=job_type,
+            match=match,
+            cursor=cursor
         )
         
         if result['success']:
@@ -272,6 +276,8 @@ def get_caregiver_jobs():
                 'success': True,
                 'jobs': result['data'],
                 'total': result['total'],
+                'has_more': result['has_more'],
+                'next_cursor': result['next_cursor'],
                 'message': '获取成功'
             })
         else:
@@ -5,20 +5,30 @@
 提供职位数据爬取、薪资分析、技能分析接口。
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 import os
-import re
 import json
 import time
 import random
-from typing import List, Dict, Any, Optional, Tuple
+import uuid
+import threading
+from typing import List, Dict, Any, Tuple
 
-import requests
-from bs4 import BeautifulSoup
 import csv
+import sys
 from flask import Response
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from bigdata.processing.near_duplicates import HAS_NUMPY as HAS_DEDUP
+from bigdata.processing.facet_index import HAS_NUMPY as HAS_FACETS, FACETS
+from bigdata.processing.sketches import HAS_NUMPY as HAS_SKETCHES, SKETCH_DIMENSIONS
+from bigdata.crawler.fetch_engine import FetchEngine, CrawlTaskRegistry
+from bigdata.crawler.listing_extractor import get_listing_extractor
+from bigdata_config import CRAWLER_CONFIG
+from services.analysis_service import analysis_service
+from services.job_dataset_service import SKETCH_MAX_DATASETS, job_dataset_service
+
 # 简单日志到文件
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'logs')
 LOG_DIR = os.path.abspath(LOG_DIR)
@@ -34,69 +44,6 @@ def _log(msg: str):
 
 job_bp = Blueprint('job', __name__)
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'raw')
-DATA_DIR = os.path.abspath(DATA_DIR)
-os.makedirs(DATA_DIR, exist_ok=True)
-
-
-def _save_json(items: List[Dict[str, Any]], tag: str = 'jobs') -> str:
-    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-    path = os.path.join(DATA_DIR, f'{tag}_{ts}.json')
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
-    return path
-
-
-def _list_json_files() -> List[str]:
-    files = []
-    for name in os.listdir(DATA_DIR):
-        if name.startswith('jobs_') and name.endswith('.json'):
-            files.append(os.path.join(DATA_DIR, name))
-    
-    # 优先选择jobs_50000_文件，然后jobs_5000_文件，最后其他文件
-    jobs_50000_files = [f for f in files if 'jobs_50000_' in f]
-    jobs_5000_files = [f for f in files if 'jobs_5000_' in f and 'jobs_50000_' not in f]
-    other_files = [f for f in files if 'jobs_5000_' not in f and 'jobs_50000_' not in f]
-    
-    # 先返回jobs_50000_文件（按时间倒序），然后jobs_5000_文件，最后其他文件
-    return sorted(jobs_50000_files, reverse=True) + sorted(jobs_5000_files, reverse=True) + sorted(other_files, reverse=True)
-
-
-def _load_latest_jobs(limit_files: int = 1) -> List[Dict[str, Any]]:
-    jobs: List[Dict[str, Any]] = []
-    for p in _list_json_files()[:limit_files]:
-        try:
-            with open(p, 'r', encoding='utf-8') as f:
-                jobs.extend(json.load(f))
-        except Exception as e:
-            _log(f"Failed to load {p}: {e}")
-            continue
-    return jobs
-
-
-def _parse_salary_to_numeric(s: str) -> float:
-    if not s:
-        return 0.0
-    s = s.replace(' ', '')
-    # 兼容 k/月、千/月、年薪 等常见写法，做一个尽量通用的解析
-    m = re.findall(r"(\d+\.?\d*)", s)
-    if not m:
-        return 0.0
-    nums = list(map(float, m))
-    base = sum(nums) / len(nums)
-    # 单位猜测
-    if 'k' in s.lower():
-        base *= 1000
-    if '千' in s:
-        base *= 1000
-    if '万' in s:
-        base *= 10000
-    # 月/年折算（粗略）
-    if '年' in s:
-        base = base / 12.0
-    return float(round(base, 2))
-
-
 UA_POOL = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15',
@@ -110,185 +57,234 @@ def _headers() -> Dict[str, str]:
         'Referer': 'https://www.baidu.com/'
     }
 
-def _maybe_sleep(min_s: float = 0.8, max_s: float = 2.0):
-    time.sleep(random.uniform(min_s, max_s))
 
-def _get(url: str, timeout: int = 12, retries: int = 2) -> Optional[requests.Response]:
-    last_err = None
-    for attempt in range(retries + 1):
-        try:
-            resp = requests.get(url, headers=_headers(), timeout=timeout)
-            if resp.status_code == 200 and resp.text:
-                return resp
-            _log(f"GET non-200 {resp.status_code} {url}")
-        except Exception as e:
-            last_err = e
-            _log(f"GET error {url}: {e}")
-        _maybe_sleep()
-    _log(f"GET failed after retries {url}: {last_err}")
-    return None
-
-
-def _crawl_51job(city_code: str, pages: int) -> List[Dict[str, Any]]:
+def _listing_items(site: str, html: str, url: str) -> List[Dict[str, Any]]:
+    """按站点定义抽取列表页（lxml，单次遍历每个列表项）"""
+    rows = get_listing_extractor().extract(site, html)
+    if not rows:
+        _log(f"{site} no rows matched on {url}")
+    crawl_time = datetime.now().isoformat()
+    return [{
+        'title': r['title'],
+        'company': r['company'],
+        'location': r['location'],
+        'salary': r['salary'],
+        'source': r['source'],
+        'crawl_time': crawl_time
+    } for r in rows]
+
+
+def _51job_urls(city_code: str, pages: int) -> List[str]:
     # 51job 的页面结构可能调整，这里以基础选择器为主，容错为辅
-    base = f'https://search.51job.com/list/{city_code},000000,0000,00,9,99,%E6%8A%A4%E5%B7%A5,2,'
-    items: List[Dict[str, Any]] = []
-    for i in range(1, pages + 1):
-        url = f'{base}{i}.html'
-        resp = _get(url)
-        if not resp:
-            continue
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        # 多套选择器兜底
-        selectors = [
-            'div.j_joblist div.e',                # 旧结构
-            'div#joblist div.joblist div.joblist-item',
-            'table#resultList .el'
-        ]
-        rows = []
-        for sel in selectors:
-            rows = soup.select(sel)
-            if rows:
-                break
-        if not rows:
-            _log(f"51job no rows matched on {url}")
-        for row in rows:
-            title = row.select_one('a')
-            comp = row.select_one('a.cname') or row.select_one('.t2 a')
-            area = row.select_one('span.d.at') or row.select_one('.t3')
-            sal = row.select_one('span.sal') or row.select_one('.t4')
-            t = (title.get_text(strip=True) if title else '')
-            c = (comp.get_text(strip=True) if comp else '')
-            city = (area.get_text(strip=True) if area else '')
-            salary = (sal.get_text(strip=True) if sal else '')
-            if t:
-                items.append({
-                    'title': t,
-                    'company': c,
-                    'location': city,
-                    'salary': salary,
-                    'source': '51job',
-                    'crawl_time': datetime.now().isoformat()
-                })
-        _maybe_sleep(1.0, 2.0)
-    return items
-
-
-def _crawl_zhaopin(city_kw: str, pages: int) -> List[Dict[str, Any]]:
+    base = CRAWLER_CONFIG['CRAWLER_SITE_BASE_URLS']['51job'].rstrip('/')
+    prefix = f'{base}/list/{city_code},000000,0000,00,9,99,%E6%8A%A4%E5%B7%A5,2,'
+    return [f'{prefix}{i}.html' for i in range(1, pages + 1)]
+
+
+def _parse_51job(html: str, url: str) -> List[Dict[str, Any]]:
+    return _listing_items('51job', html, url)
+
+
+def _zhaopin_urls(city_kw: str, pages: int) -> List[str]:
     # 智联采用查询参数，这里使用基本关键词页，结构可能随时间变化
-    base = f'https://sou.zhaopin.com/?jl={city_kw}&kw=%E6%8A%A4%E5%B7%A5&kt=3&p='
+    base = CRAWLER_CONFIG['CRAWLER_SITE_BASE_URLS']['zhaopin'].rstrip('/')
+    prefix = f'{base}/?jl={city_kw}&kw=%E6%8A%A4%E5%B7%A5&kt=3&p='
+    return [f'{prefix}{i}' for i in range(1, pages + 1)]
+
+
+def _parse_zhaopin(html: str, url: str) -> List[Dict[str, Any]]:
+    return _listing_items('zhaopin', html, url)
+
+
+def _crawl_tasks_for(pages: int, city: str, city_kw: str) -> List[Tuple[str, str, Any]]:
+    """(来源, url, 解析函数) 列表"""
+    return ([('51job', url, _parse_51job) for url in _51job_urls(city, pages)] +
+            [('zhaopin', url, _parse_zhaopin) for url in _zhaopin_urls(city_kw, pages)])
+
+
+def _new_fetch_engine() -> FetchEngine:
+    return FetchEngine(
+        max_workers=CRAWLER_CONFIG['CRAWLER_MAX_WORKERS'],
+        per_host_concurrency=CRAWLER_CONFIG['CRAWLER_PER_HOST_CONCURRENCY'],
+        min_interval=CRAWLER_CONFIG['CRAWLER_MIN_INTERVAL'],
+        max_retries=CRAWLER_CONFIG['CRAWLER_MAX_RETRIES'],
+        timeout=CRAWLER_CONFIG['CRAWLER_TIMEOUT'],
+        headers_factory=_headers
+    )
+
+
+_crawl_tasks = CrawlTaskRegistry()
+
+
+def _run_crawl(task_id: str, pages: int, city: str, city_kw: str):
+    """后台执行爬取：并发抓取、边抓边解析，完成后保存数据集"""
+    tasks = _crawl_tasks_for(pages, city, city_kw)
+    source_of = {url: source for source, url, _ in tasks}
     items: List[Dict[str, Any]] = []
-    for i in range(1, pages + 1):
-        url = f'{base}{i}'
-        resp = _get(url)
-        if not resp:
-            continue
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        selectors = [
-            '.joblist-box .joblist-box__item',
-            '.joblist .joblist-item',
-            '.positionlist .positionlist__item'
-        ]
-        rows = []
-        for sel in selectors:
-            rows = soup.select(sel)
-            if rows:
-                break
-        if not rows:
-            _log(f"zhaopin no rows matched on {url}")
-        for row in rows:
-            t_el = row.select_one('.joblist-box__title a') or row.select_one('.job-title a') or row.select_one('a')
-            c_el = row.select_one('.joblist-box__cname a') or row.select_one('.company-name a')
-            a_el = row.select_one('.joblist-box__city') or row.select_one('.job-area')
-            s_el = row.select_one('.joblist-box__salary') or row.select_one('.job-salary')
-            t = t_el.get_text(strip=True) if t_el else ''
-            c = c_el.get_text(strip=True) if c_el else ''
-            city = a_el.get_text(strip=True) if a_el else ''
-            salary = s_el.get_text(strip=True) if s_el else ''
-            if t:
-                items.append({
-                    'title': t,
-                    'company': c,
-                    'location': city,
-                    'salary': salary,
-                    'source': 'zhaopin',
-                    'crawl_time': datetime.now().isoformat()
-                })
-        _maybe_sleep(1.0, 2.0)
-    return items
+    try:
+        with _new_fetch_engine() as engine:
+            for result in engine.crawl((url, parse) for _, url, parse in tasks):
+                page_items = result.data or []
+                items.extend(page_items)
+                _crawl_tasks.record_page(task_id, source_of[result.url], result, len(page_items))
+                if not result.ok:
+                    _log(f"GET failed after retries {result.url}: {result.error}")
+
+        task = _crawl_tasks.get(task_id) or {}
+        _log(f"crawl results {task.get('per_source', {})} total={len(items)}")
+
+        if not items:
+            # 回退到最近一次成功文件
+            latest = job_dataset_service.list_dataset_files()[:1]
+            if latest:
+                try:
+                    fallback = job_dataset_service.read_dataset(latest[0], ['title'])
+                    _crawl_tasks.update(task_id, status='finished', finished_at=time.time(), result={
+                        'count': len(fallback), 'file': os.path.basename(latest[0]), 'used_fallback': True,
+                        'message': '抓取为空，已回退到最近一次成功数据'
+                    })
+                    return
+                except Exception:
+                    pass
+            _crawl_tasks.update(task_id, status='failed', finished_at=time.time(), result={
+                'message': '未抓取到有效数据，可能被目标站点限制或页面结构变更'
+            })
+            return
+
+        path = job_dataset_service.save_dataset(items, 'jobs')
+        _crawl_tasks.update(task_id, status='finished', finished_at=time.time(), result={
+            'count': len(items), 'file': os.path.basename(path), 'used_fallback': False, 'message': '爬取完成'
+        })
+    except Exception as e:
+        _log(f"crawl task {task_id} error {e}")
+        _crawl_tasks.update(task_id, status='failed', finished_at=time.time(), result={'message': f'爬取失败: {e}'})
 
 
 @job_bp.route('/api/job/crawl/start', methods=['POST'])
 def start_crawl():
+    """启动后台爬取任务，通过 /api/job/crawl/status/<task_id> 查询进度"""
     data = request.get_json(silent=True) or {}
     pages = int(data.get('pages', 2))
     city = str(data.get('city', '010000'))  # 默认北京
     city_kw = data.get('city_kw', '北京')
 
     _log(f"crawl start pages={pages} city={city} city_kw={city_kw}")
-    items: List[Dict[str, Any]] = []
-    # 先尝试 51job，再尝试 智联
-    part1 = _crawl_51job(city, pages)
-    part2 = _crawl_zhaopin(city_kw, pages)
-    items.extend(part1)
-    items.extend(part2)
-    _log(f"crawl results 51job={len(part1)} zhaopin={len(part2)} total={len(items)}")
-
-    if not items:
-        # 回退到最近一次成功文件
-        latest = _list_json_files()[:1]
-        if latest:
-            try:
-                with open(latest[0], 'r', encoding='utf-8') as f:
-                    fallback = json.load(f)
-                return jsonify({'success': True, 'message': '抓取为空，已回退到最近一次成功数据', 'data': {'count': len(fallback), 'file': os.path.basename(latest[0]), 'used_fallback': True}})
-            except Exception:
-                pass
-        return jsonify({'success': False, 'message': '未抓取到有效数据，可能被目标站点限制或页面结构变更'}), 200
+    task_id = uuid.uuid4().hex
+    _crawl_tasks.create(task_id, {'pages': pages, 'city': city, 'city_kw': city_kw}, total_pages=pages * 2)
+    threading.Thread(target=_run_crawl, args=(task_id, pages, city, city_kw),
+                     name=f'crawl-{task_id[:8]}', daemon=True).start()
+    return jsonify({'success': True, 'message': '爬取任务已启动', 'data': {'task_id': task_id, 'status': 'running'}}), 202
 
-    path = _save_json(items, 'jobs')
-    return jsonify({'success': True, 'message': '爬取完成', 'data': {'count': len(items), 'file': os.path.basename(path), 'used_fallback': False}})
+
+@job_bp.route('/api/job/crawl/status/<task_id>', methods=['GET'])
+def crawl_status(task_id: str):
+    """查询爬取任务状态：已完成/失败页数、各来源条数，结束后附带结果"""
+    task = _crawl_tasks.get(task_id)
+    if task is None:
+        return jsonify({'success': False, 'message': '爬取任务不存在'}), 404
+    return jsonify({'success': True, 'data': task})
 
 
 @job_bp.route('/api/job/analysis/salary', methods=['GET'])
 def analysis_salary():
-    jobs = _load_latest_jobs()
-    if not jobs:
-        return jsonify({'success': True, 'data': {'total_avg': 0, 'city_avg': {}}})
-    city_sum: Dict[str, float] = {}
-    city_cnt: Dict[str, int] = {}
-    for j in jobs:
-        city = (j.get('location') or '').strip() or '未知'
-        val = _parse_salary_to_numeric(j.get('salary', ''))
-        if val <= 0:
-            continue
-        city_sum[city] = city_sum.get(city, 0.0) + val
-        city_cnt[city] = city_cnt.get(city, 0) + 1
-    city_avg = {k: round(city_sum[k] / max(city_cnt[k], 1), 2) for k in city_sum}
-    total_vals = [v for v in city_avg.values() if v > 0]
-    total_avg = round(sum(total_vals) / max(len(total_vals), 1), 2)
-    return jsonify({'success': True, 'data': {'total_avg': total_avg, 'city_avg': city_avg}})
+    datasets = min(max(request.args.get('datasets', 1, type=int), 1), SKETCH_MAX_DATASETS)
+    return jsonify({'success': True, 'data': analysis_service.salary_analysis(datasets)})
+
+
+@job_bp.route('/api/job/analysis/sketches', methods=['GET'])
+def analysis_sketches():
+    """按维度（city/job_type/source/month）返回职位数、薪资均值与分位数、去重公司数"""
+    if not HAS_SKETCHES:
+        return jsonify({'success': False, 'message': 'numpy未安装，统计摘要不可用'}), 503
+    dimension = request.args.get('dimension', 'city')
+    if dimension not in SKETCH_DIMENSIONS:
+        return jsonify({'success': False, 'message': f'不支持的维度: {dimension}'}), 400
+    datasets = min(max(request.args.get('datasets', 1, type=int), 1), SKETCH_MAX_DATASETS)
+    try:
+        sketches = job_dataset_service.merged_sketches(datasets)
+        if sketches is None:
+            return jsonify({'success': True, 'data': {'overall': {}, 'groups': {}}})
+        return jsonify({'success': True, 'data': {
+            'dimension': dimension,
+            'datasets': datasets,
+            'overall': sketches.overall(),
+            'groups': sketches.summary(dimension)
+        }})
+    except Exception as e:
+        _log(f"sketch analysis error {e}")
+        return jsonify({'success': False, 'message': f'统计失败: {e}'}), 500
 
 
 @job_bp.route('/api/job/analysis/skills', methods=['GET'])
 def analysis_skills():
-    jobs = _load_latest_jobs()
-    if not jobs:
-        return jsonify({'success': True, 'data': {'skill_counts': {}}})
-    # 简单的技能关键词统计（示例）
-    keywords = ['护理', '康复', '照护', '陪护', '老年', '持证', '评估', '沟通']
-    counts: Dict[str, int] = {k: 0 for k in keywords}
-    for j in jobs:
-        text = (j.get('title', '') + ' ' + j.get('company', '')).lower()
-        for k in keywords:
-            if k.lower() in text:
-                counts[k] += 1
-    return jsonify({'success': True, 'data': {'skill_counts': counts}})
+    try:
+        return jsonify({'success': True, 'data': analysis_service.skill_analysis()})
+    except Exception as e:
+        _log(f"skill analysis error {e}")
+        return jsonify({'success': False, 'message': f'技能分析失败: {e}'}), 500
+
+
+SEARCH_COLUMNS = ['title', 'company', 'location', 'salary', 'salary_monthly', 'education',
+                  'experience', 'job_type', 'source', 'crawl_time']
+SEARCH_MAX_PER_PAGE = 100
+
+
+@job_bp.route('/api/job/search', methods=['GET'])
+def search_jobs():
+    """分面检索：按城市、工作类型、学历、经验、薪资区间、来源筛选
+
+    每个分面参数可重复或以逗号分隔，同一分面内为“或”，不同分面之间为“且”。
+    一次返回当前页职位与全部分面计数。
+    """
+    if not HAS_FACETS:
+        return jsonify({'success': False, 'message': 'numpy未安装，分面检索不可用'}), 503
+    try:
+        started = time.perf_counter()
+        latest = job_dataset_service.list_dataset_files()[:1]
+        if not latest:
+            return jsonify({'success': True, 'data': {'total': 0, 'items': [], 'facets': {}}})
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), SEARCH_MAX_PER_PAGE)
+        filters: Dict[str, List[str]] = {}
+        for name in FACETS:
+            values = [v.strip() for arg in request.args.getlist(name) for v in arg.split(',') if v.strip()]
+            if values:
+                filters[name] = values
+
+        index = job_dataset_service.facet_index(latest[0])
+        result = index.search(filters, offset=(page - 1) * per_page, limit=per_page)
+        return jsonify({
+            'success': True,
+            'data': {
+                'total': result['total'],
+                'page': page,
+                'per_page': per_page,
+                'items': index.fetch(result['rows'], SEARCH_COLUMNS),
+                'facets': result['facets'],
+                'filters': filters,
+                'took_ms': round((time.perf_counter() - started) * 1000, 2)
+            }
+        })
+    except Exception as e:
+        _log(f"search error {e}")
+        return jsonify({'success': False, 'message': f'检索失败: {e}'}), 500
+
+
+# 导入进度（import_id -> 统计信息），供前端轮询
+_import_progress: Dict[str, Dict[str, Any]] = {}
+_IMPORT_PROGRESS_LIMIT = 100
+
+
+def _set_import_progress(import_id: str, progress: Dict[str, Any]):
+    _import_progress[import_id] = progress
+    while len(_import_progress) > _IMPORT_PROGRESS_LIMIT:
+        _import_progress.pop(next(iter(_import_progress)))
 
 
 @job_bp.route('/api/job/data/import', methods=['POST'])
 def import_job_data():
-    """导入本地JSON/CSV数据，标准化为 data/raw/jobs_import_*.json"""
+    """流式导入本地JSON/CSV数据，登记到数据集注册表并设为当前生效的数据集"""
+    import_id = request.form.get('import_id') or uuid.uuid4().hex
     try:
         if 'file' not in request.files:
             return jsonify({'success': False, 'message': '未选择文件'}), 400
@@ -297,51 +293,111 @@ def import_job_data():
             return jsonify({'success': False, 'message': '文件名为空'}), 400
 
         filename = f.filename.lower()
-        rows: List[Dict[str, Any]] = []
-
-        if filename.endswith('.json'):
-            data = json.load(f)
-            if isinstance(data, dict):
-                data = data.get('items') or data.get('data') or []
-            if not isinstance(data, list):
-                return jsonify({'success': False, 'message': 'JSON结构不正确，应为数组或含 items/data 的对象'}), 400
-            for it in data:
-                rows.append({
-                    'title': (it.get('title') or '').strip(),
-                    'company': (it.get('company') or '').strip(),
-                    'location': (it.get('location') or '').strip(),
-                    'salary': (it.get('salary') or '').strip(),
-                    'source': it.get('source') or 'import',
-                    'crawl_time': it.get('crawl_time') or datetime.now().isoformat()
-                })
-        elif filename.endswith('.csv'):
-            content = f.read().decode('utf-8', errors='ignore').splitlines()
-            reader = csv.DictReader(content)
-            for it in reader:
-                rows.append({
-                    'title': (it.get('title') or it.get('职位') or '').strip(),
-                    'company': (it.get('company') or it.get('公司') or '').strip(),
-                    'location': (it.get('location') or it.get('城市') or '').strip(),
-                    'salary': (it.get('salary') or it.get('薪资') or '').strip(),
-                    'source': it.get('source') or 'import',
-                    'crawl_time': it.get('crawl_time') or datetime.now().isoformat()
-                })
-        else:
+        if not (filename.endswith('.json') or filename.endswith('.csv')):
             return jsonify({'success': False, 'message': '仅支持JSON或CSV文件'}), 400
 
-        # 过滤空标题
-        rows = [r for r in rows if r.get('title')]
-        if not rows:
-            return jsonify({'success': False, 'message': '未解析到有效数据'}), 400
-
-        path = _save_json(rows, 'jobs_import')
-        _log(f"import file saved {path} count={len(rows)}")
-        return jsonify({'success': True, 'message': '导入成功', 'data': {'count': len(rows), 'file': os.path.basename(path)}})
+        _set_import_progress(import_id, {'status': 'running'})
+        try:
+            entry, created, stats = job_dataset_service.registry().ingest_stream(
+                f.stream, f.filename, source='import', tag='jobs_import',
+                progress_callback=lambda p: _set_import_progress(import_id, dict(p, status='running'))
+            )
+        except ValueError as e:
+            _set_import_progress(import_id, {'status': 'failed', 'error': str(e)})
+            return jsonify({'success': False, 'message': str(e), 'data': {'import_id': import_id}}), 400
+
+        _set_import_progress(import_id, dict(stats, status='finished'))
+        if not entry:
+            return jsonify({'success': False, 'message': '未解析到有效数据', 'data': dict(stats, import_id=import_id)}), 400
+        job_dataset_service.warm_dataset(job_dataset_service.registry().path_of(entry))
+
+        _log(f"import file saved {entry['file']} count={stats['rows_written']} errors={stats['row_errors']} new={created}")
+        return jsonify({'success': True, 'message': '导入成功' if created else '内容与已有数据集相同，已切换到该数据集', 'data': dict(
+            stats, import_id=import_id, count=stats['rows_written'], file=entry['file'],
+            dataset=entry['digest'], duplicate=not created
+        )})
     except Exception as e:
+        _set_import_progress(import_id, {'status': 'failed', 'error': str(e)})
         _log(f"import error {e}")
         return jsonify({'success': False, 'message': f'导入失败: {e}'}), 500
 
 
+@job_bp.route('/api/job/data/import/progress/<import_id>', methods=['GET'])
+def import_progress(import_id: str):
+    """查询导入进度：已读字节数、已写入行数、跳过行数与逐行错误数"""
+    progress = _import_progress.get(import_id)
+    if progress is None:
+        return jsonify({'success': False, 'message': '导入任务不存在'}), 404
+    return jsonify({'success': True, 'data': progress})
+
+
+def _run_db_sync(app, import_id: str, path: str):
+    """后台把数据集写入 job_data，进度记录在导入进度表中"""
+    from extensions import db
+    from services.job_data_loader import JobDataLoader
+    try:
+        with app.app_context():
+            loader = JobDataLoader(
+                db, progress_callback=lambda p: _set_import_progress(import_id, dict(p, status='running'))
+            )
+            stats = loader.load_file(path)
+        _set_import_progress(import_id, dict(stats, status='finished'))
+        _log(f"db sync {os.path.basename(path)} rows={stats['rows_upserted']} affected={stats['rows_affected']} elapsed={stats['elapsed']}s")
+    except Exception as e:
+        _set_import_progress(import_id, {'status': 'failed', 'error': str(e)})
+        _log(f"db sync error {e}")
+
+
+@job_bp.route('/api/job/data/sync-db', methods=['POST'])
+def sync_job_data_to_db():
+    """把数据集（默认当前生效的数据集）后台写入 job_data 表，供护工端职位列表使用"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        registry = job_dataset_service.registry()
+        digest = payload.get('dataset')
+        entry = registry.get(digest) if digest else registry.active()
+        if not entry:
+            return jsonify({'success': False, 'message': '数据集不存在'}), 404
+
+        import_id = uuid.uuid4().hex
+        _set_import_progress(import_id, {'status': 'running'})
+        threading.Thread(
+            target=_run_db_sync,
+            args=(current_app._get_current_object(), import_id, registry.path_of(entry)),
+            name=f'db-sync-{import_id[:8]}', daemon=True
+        ).start()
+        return jsonify({
+            'success': True,
+            'message': '已开始写入数据库',
+            'data': {'import_id': import_id, 'dataset': entry['digest'], 'rows': entry['rows']}
+        }), 202
+    except Exception as e:
+        _log(f"db sync start error {e}")
+        return jsonify({'success': False, 'message': f'启动失败: {e}'}), 500
+
+
+@job_bp.route('/api/job/data/duplicates', methods=['GET'])
+def duplicate_stats():
+    """近似重复统计：索引中的记录数、簇数，以及最新数据集去重前后的条数"""
+    if not HAS_DEDUP:
+        return jsonify({'success': False, 'message': 'numpy未安装，近似重复检测不可用'}), 503
+    try:
+        index = job_dataset_service.near_duplicate_index()
+        latest = job_dataset_service.list_dataset_files()[:1]
+        dataset = None
+        if latest:
+            mapping = job_dataset_service.dataset_mapping(index, latest[0])
+            dataset = {
+                'version': job_dataset_service.dataset_version(latest[0]),
+                'rows': len(mapping),
+                'unique': int(index.unique_mask_for([mapping]).sum())
+            }
+        return jsonify({'success': True, 'data': dict(index.stats(), latest=dataset)})
+    except Exception as e:
+        _log(f"duplicate stats error {e}")
+        return jsonify({'success': False, 'message': f'统计失败: {e}'}), 500
+
+
 @job_bp.route('/api/job/data/sample', methods=['GET'])
 def sample_job_data():
     """提供示例数据，便于快速演示"""
@@ -372,6 +428,31 @@ def sample_job_data_csv():
     })
 
 
+def _load_generated_csv(data_file: str, tag: str, data_type: str):
+    """通过注册表加载生成的CSV数据集，内容已登记时不再重新解析"""
+    registry = job_dataset_service.registry()
+    entry, created = registry.ingest_file(data_file, source='generated', tag=tag, default_source='generated')
+    if not entry:
+        return jsonify({'success': False, 'message': '未解析到有效数据'}), 400
+    path = registry.path_of(entry)
+    _log(f"loaded {tag} data {entry['file']} count={entry['rows']} new={created}")
+
+    rows = job_dataset_service.read_dataset(path, ['location', 'company'])
+    return jsonify({
+        'success': True, 
+        'message': f"成功加载{entry['rows']}条数据（{data_type}）", 
+        'data': {
+            'count': entry['rows'],
+            'file': entry['file'],
+            'dataset': entry['digest'],
+            'reused': not created,
+            'cities': len(set(r.get('location', '') for r in rows if r.get('location'))),
+            'companies': len(set(r.get('company', '') for r in rows if r.get('company'))),
+            'data_type': data_type
+        }
+    })
+
+
 @job_bp.route('/api/job/data/load-5000', methods=['POST'])
 def load_5000_data():
     """加载5000条生成的护工数据"""
@@ -389,48 +470,7 @@ def load_5000_data():
         else:
             return jsonify({'success': False, 'message': '数据文件不存在'}), 404
         
-        # 读取CSV文件
-        rows: List[Dict[str, Any]] = []
-        with open(data_file, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # 标准化数据格式
-                rows.append({
-                    'title': (row.get('title') or '').strip(),
-                    'company': (row.get('company') or '').strip(),
-                    'location': (row.get('city') or '').strip(),
-                    'salary': (row.get('salary') or '').strip(),
-                    'source': row.get('source') or 'generated',
-                    'crawl_time': row.get('publish_date') or datetime.now().isoformat(),
-                    'skills': (row.get('skills') or '').strip(),
-                    'benefits': (row.get('benefits') or '').strip(),
-                    'education': (row.get('education') or '').strip(),
-                    'experience': (row.get('experience') or '').strip(),
-                    'job_type': (row.get('job_type') or '').strip(),
-                    'description': (row.get('description') or '').strip(),
-                    'requirements': (row.get('requirements') or '').strip()
-                })
-        
-        # 过滤空标题
-        rows = [r for r in rows if r.get('title')]
-        if not rows:
-            return jsonify({'success': False, 'message': '未解析到有效数据'}), 400
-        
-        # 保存为JSON格式供系统使用
-        path = _save_json(rows, 'jobs_5000')
-        _log(f"loaded 5000 data saved {path} count={len(rows)}")
-        
-        return jsonify({
-            'success': True, 
-            'message': f'成功加载{len(rows)}条数据（{data_type}）', 
-            'data': {
-                'count': len(rows),
-                'file': os.path.basename(path),
-                'cities': len(set(r.get('location', '') for r in rows if r.get('location'))),
-                'companies': len(set(r.get('company', '') for r in rows if r.get('company'))),
-                'data_type': data_type
-            }
-        })
+        return _load_generated_csv(data_file, 'jobs_5000', data_type)
     except Exception as e:
         _log(f"load 5000 data error {e}")
         return jsonify({'success': False, 'message': f'加载失败: {e}'}), 500
@@ -445,48 +485,7 @@ def load_50000_data():
         if not os.path.exists(data_file):
             return jsonify({'success': False, 'message': '50000条数据文件不存在'}), 404
         
-        # 读取CSV文件
-        rows: List[Dict[str, Any]] = []
-        with open(data_file, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # 标准化数据格式
-                rows.append({
-                    'title': (row.get('title') or '').strip(),
-                    'company': (row.get('company') or '').strip(),
-                    'location': (row.get('city') or '').strip(),
-                    'salary': (row.get('salary') or '').strip(),
-                    'source': row.get('source') or 'generated',
-                    'crawl_time': row.get('publish_date') or datetime.now().isoformat(),
-                    'skills': (row.get('skills') or '').strip(),
-                    'benefits': (row.get('benefits') or '').strip(),
-                    'education': (row.get('education') or '').strip(),
-                    'experience': (row.get('experience') or '').strip(),
-                    'job_type': (row.get('job_type') or '').strip(),
-                    'description': (row.get('description') or '').strip(),
-                    'requirements': (row.get('requirements') or '').strip()
-                })
-        
-        # 过滤空标题
-        rows = [r for r in rows if r.get('title')]
-        if not rows:
-            return jsonify({'success': False, 'message': '未解析到有效数据'}), 400
-        
-        # 保存为JSON格式供系统使用
-        path = _save_json(rows, 'jobs_50000')
-        _log(f"loaded 50000 data saved {path} count={len(rows)}")
-        
-        return jsonify({
-            'success': True, 
-            'message': f'成功加载{len(rows)}条数据（50000条）', 
-            'data': {
-                'count': len(rows),
-                'file': os.path.basename(path),
-                'cities': len(set(r.get('location', '') for r in rows if r.get('location'))),
-                'companies': len(set(r.get('company', '') for r in rows if r.get('company'))),
-                'data_type': '50000条'
-            }
-        })
+        return _load_generated_csv(data_file, 'jobs_50000', '50000条')
     except Exception as e:
         _log(f"load 50000 data error {e}")
         return jsonify({'success': False, 'message': f'加载失败: {e}'}), 500
@@ -175,6 +175,7 @@ def init_models():
     from models.chat import ChatMessage, ChatConversation
     from models.employment_contract import EmploymentContract, ServiceRecord, ContractApplication
     from models.caregiver_hire_info import CaregiverHireInfo
+    from models.data_quality import DataQualityCounter, DataQualityHistory
     
     # 创建实际的模型类
     UserModel = User.get_model(db)
@@ -191,6 +192,8 @@ def init_models():
     ServiceRecordModel = ServiceRecord.get_model(db)
     ContractApplicationModel = ContractApplication.get_model(db)
     CaregiverHireInfoModel = CaregiverHireInfo.get_model(db)
+    DataQualityCounter.get_model(db)
+    DataQualityHistory.get_model(db)
     
     # 初始化消息服务，设置数据库连接
     from services.message_service import message_service
@@ -200,6 +203,10 @@ def init_models():
     from services.employment_contract_service import employment_contract_service
     employment_contract_service.set_db(db)
     
+    # 初始化数据质量服务，注册写入时的计数器更新事件
+    from services.data_quality_service import data_quality_service
+    data_quality_service.set_db(db)
+    
     return (UserModel, CaregiverModel, ServiceTypeModel, 
             JobDataModel, AnalysisResultModel, AppointmentModel, 
             EmploymentModel, MessageModel, ChatMessageModel, ChatConversationModel,
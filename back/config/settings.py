@@ -81,6 +81,14 @@ if ADMIN_PASSWORD == "admin123":
 # ==================== JWT配置 ====================
 JWT_EXPIRATION_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "2"))
 
+# ==================== 统计快照配置 ====================
+# 管理端统计信息的缓存时间（秒）；超过 TTL 但未超过 MAX_STALE 时先返回旧快照并在后台刷新
+STATISTICS_CACHE_TTL = int(os.getenv("STATISTICS_CACHE_TTL", "60"))
+STATISTICS_MAX_STALE = int(os.getenv("STATISTICS_MAX_STALE", "600"))
+# 大表使用表元数据中的近似行数（MySQL information_schema / PostgreSQL pg_class）
+STATISTICS_APPROXIMATE_COUNTS = os.getenv("STATISTICS_APPROXIMATE_COUNTS", "false").lower() == "true"
+STATISTICS_APPROXIMATE_MIN_ROWS = int(os.getenv("STATISTICS_APPROXIMATE_MIN_ROWS", "100000"))
+
 # ==================== 邮件配置 ====================
 # SMTP 邮件服务器配置
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
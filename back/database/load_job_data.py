@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+职位数据批量入库脚本
+把职位数据集写入 job_data 表，未指定文件时使用数据集注册表中当前生效的数据集
+
+用法:
+    python database/load_job_data.py
+    python database/load_job_data.py ../data/raw/jobs_50000.json --chunk-rows 2000
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app import app
+from extensions import db
+from services.job_data_loader import JobDataLoader, DEFAULT_CHUNK_ROWS
+from bigdata.processing.dataset_registry import DatasetRegistry
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw'))
+
+
+def resolve_dataset(path: str = None) -> str:
+    """返回要入库的数据集路径"""
+    if path:
+        return path
+    registry = DatasetRegistry(DATA_DIR)
+    entry = registry.active()
+    if not entry:
+        raise ValueError("数据集注册表中没有生效的数据集，请指定文件")
+    return registry.path_of(entry)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='职位数据批量入库')
+    parser.add_argument('path', nargs='?', help='数据集路径（.cols 目录、.jsonl、.json、.csv）')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='每条 INSERT 的行数')
+    args = parser.parse_args()
+
+    try:
+        path = resolve_dataset(args.path)
+        logger.info(f"🚀 开始入库: {path}")
+        with app.app_context():
+            stats = JobDataLoader(db, chunk_rows=args.chunk_rows).load_file(path)
+        logger.info(f"🎉 读取 {stats['rows_read']} 行，写入 {stats['rows_upserted']} 行"
+                    f"（数据库报告受影响 {stats['rows_affected']} 行），"
+                    f"块内重复 {stats['rows_merged']} 行，跳过 {stats['rows_skipped']} 行，"
+                    f"耗时 {stats['elapsed']} 秒（{stats['rows_per_sec']} 行/秒）")
+        return 0
+    except Exception as e:
+        logger.error(f"💥 职位数据入库失败: {str(e)}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
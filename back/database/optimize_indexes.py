@@ -3,10 +3,16 @@
 """
 数据库索引优化脚本
 为常用查询字段添加索引，提高查询性能
+
+job_data 的自然键唯一索引只在没有重复记录时创建；清理重复记录需要显式执行：
+    python database/optimize_indexes.py --dedupe          # 只预览重复记录数，不修改数据
+    python database/optimize_indexes.py --dedupe --apply  # 备份到 job_data_dedupe_backup_* 表后删除
 """
 
 import sys
 import os
+import argparse
+from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import app
@@ -16,8 +22,115 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_indexes():
-    """创建数据库索引"""
+# 自然键完整的记录中，每组 (job_name, company, city) 保留 id 最大的一条，其余为重复记录
+# （唯一索引不约束含 NULL 的键，这些记录不算重复）
+_NATURAL_KEY_FILLED = "job_name IS NOT NULL AND company IS NOT NULL AND city IS NOT NULL"
+_DUPLICATE_JOB_ROWS = (
+    f"{_NATURAL_KEY_FILLED} AND id NOT IN ("
+    f"SELECT id FROM (SELECT MAX(id) AS id FROM job_data WHERE {_NATURAL_KEY_FILLED} "
+    "GROUP BY job_name, company, city) AS keep_rows)"
+)
+
+def count_duplicate_jobs(connection):
+    """返回 (重复记录数, 有重复的自然键组数)"""
+    duplicates = connection.execute(db.text(f"SELECT COUNT(*) FROM job_data WHERE {_DUPLICATE_JOB_ROWS}")).scalar()
+    groups = connection.execute(db.text(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM job_data WHERE {_NATURAL_KEY_FILLED} "
+        "GROUP BY job_name, company, city HAVING COUNT(*) > 1) AS duplicate_groups"
+    )).scalar()
+    return int(duplicates or 0), int(groups or 0)
+
+def dedupe_job_data(connection, apply=False):
+    """按自然键清理重复职位记录，每组保留最新的一条
+
+    默认只报告重复记录数；apply 时先把要删除的记录复制到备份表，再删除，返回删除的条数
+    """
+    duplicates, groups = count_duplicate_jobs(connection)
+    if not duplicates:
+        logger.info("职位数据表没有重复记录")
+        return 0
+    logger.info(f"📊 职位数据表有 {duplicates} 条重复记录（{groups} 组自然键），每组保留 id 最大的一条")
+    if not apply:
+        logger.info("预览模式，未修改数据；确认后加 --apply 执行，删除前会备份到 job_data_dedupe_backup_* 表")
+        return 0
+    
+    backup_table = f"job_data_dedupe_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    connection.execute(db.text(f"CREATE TABLE {backup_table} AS SELECT * FROM job_data WHERE {_DUPLICATE_JOB_ROWS}"))
+    backed_up = connection.execute(db.text(f"SELECT COUNT(*) FROM {backup_table}")).scalar()
+    if backed_up != duplicates:
+        raise RuntimeError(f"备份条数 {backed_up} 与重复记录数 {duplicates} 不一致，已停止删除")
+    result = connection.execute(db.text(f"DELETE FROM job_data WHERE {_DUPLICATE_JOB_ROWS}"))
+    logger.info(f"✅ 已删除重复职位记录 {result.rowcount} 条，备份表: {backup_table}")
+    return result.rowcount
+
+def migrate_job_data(connection):
+    """为已有的 job_data 表补充归一化工作类型列、回填数据并创建索引
+
+    自然键唯一索引只在没有重复记录时创建，有重复时只给出提示，不删除数据
+    """
+    from models.business import JOB_TYPE_KEYWORDS, DEFAULT_JOB_TYPE
+    
+    columns = {column['name'] for column in db.inspect(connection).get_columns('job_data')}
+    if 'job_type' not in columns:
+        logger.info("为职位数据表添加 job_type 列...")
+        connection.execute(db.text("ALTER TABLE job_data ADD COLUMN job_type VARCHAR(20)"))
+    
+    # 与 normalize_job_type 相同的规则，用一条 UPDATE 完成回填
+    params = {'default_type': DEFAULT_JOB_TYPE}
+    cases = []
+    for i, (job_type, keywords) in enumerate(JOB_TYPE_KEYWORDS):
+        conditions = []
+        for j, keyword in enumerate(keywords):
+            params[f'kw_{i}_{j}'] = f'%{keyword}%'
+            conditions.append(f"LOWER(job_name) LIKE :kw_{i}_{j}")
+        params[f'type_{i}'] = job_type
+        cases.append(f"WHEN {' OR '.join(conditions)} THEN :type_{i}")
+    result = connection.execute(db.text(
+        f"UPDATE job_data SET job_type = CASE {' '.join(cases)} ELSE :default_type END "
+        "WHERE job_type IS NULL AND job_name IS NOT NULL AND job_name != ''"
+    ), params)
+    logger.info(f"回填职位工作类型: {result.rowcount} 条")
+    
+    connection.execute(db.text("CREATE INDEX IF NOT EXISTS idx_job_data_crawl_time_id ON job_data(crawl_time, id);"))
+    connection.execute(db.text("CREATE INDEX IF NOT EXISTS idx_job_data_city_crawl_time ON job_data(city, crawl_time, id);"))
+    connection.execute(db.text("CREATE INDEX IF NOT EXISTS idx_job_data_job_type_crawl_time ON job_data(job_type, crawl_time, id);"))
+    
+    duplicates, _ = count_duplicate_jobs(connection)
+    if duplicates:
+        logger.warning(f"⚠️ 职位数据表有 {duplicates} 条按 (job_name, company, city) 重复的记录，"
+                       "未创建唯一索引 uq_job_data_natural_key；先用 --dedupe 预览，确认后加 --apply 清理")
+        return
+    connection.execute(db.text("CREATE UNIQUE INDEX IF NOT EXISTS uq_job_data_natural_key ON job_data(job_name, company, city);"))
+
+def migrate_analysis_result(connection):
+    """为已有的 analysis_result 表补充版本化结果存储所需的列与唯一索引"""
+    columns = {column['name'] for column in db.inspect(connection).get_columns('analysis_result')}
+    dialect = connection.dialect.name
+    binary_type = {'mysql': 'MEDIUMBLOB', 'postgresql': 'BYTEA'}.get(dialect, 'BLOB')
+    json_type = 'JSON' if dialect in ('mysql', 'postgresql') else 'TEXT'
+    new_columns = [
+        ('params_hash', 'VARCHAR(40)'),
+        ('params', json_type),
+        ('dataset_version', 'VARCHAR(128)'),
+        ('encoding', 'VARCHAR(16)'),
+        ('payload', binary_type),
+        ('size', 'INTEGER'),
+    ]
+    for name, column_type in new_columns:
+        if name not in columns:
+            logger.info(f"为分析结果表添加 {name} 列...")
+            connection.execute(db.text(f"ALTER TABLE analysis_result ADD COLUMN {name} {column_type}"))
+    connection.execute(db.text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_analysis_result_key ON analysis_result(type, params_hash, dataset_version);"
+    ))
+
+def create_indexes(dedupe=False, apply=False):
+    """创建数据库索引
+
+    Args:
+        dedupe: 创建职位自然键唯一索引前清理重复记录（apply 为 False 时只预览）
+        apply: 实际执行清理
+    """
     try:
         logger.info("开始创建数据库索引...")
         
@@ -94,6 +207,17 @@ def create_indexes():
                 connection.execute(db.text("CREATE INDEX IF NOT EXISTS idx_service_records_service_date ON service_records(service_date);"))
                 connection.execute(db.text("CREATE INDEX IF NOT EXISTS idx_service_records_created_at ON service_records(created_at);"))
                 
+                # 职位数据表索引
+                if dedupe:
+                    logger.info("检查职位数据表重复记录...")
+                    dedupe_job_data(connection, apply=apply)
+                logger.info("创建职位数据表索引...")
+                migrate_job_data(connection)
+                
+                # 分析结果表
+                logger.info("迁移分析结果表...")
+                migrate_analysis_result(connection)
+                
                 connection.commit()
                 logger.info("✅ 所有数据库索引创建完成")
                 
@@ -168,11 +292,18 @@ def show_index_info():
         raise
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='数据库索引优化')
+    parser.add_argument('--dedupe', action='store_true', help='预览职位数据表按自然键重复的记录')
+    parser.add_argument('--apply', action='store_true', help='与 --dedupe 一起使用：备份后删除重复记录')
+    args = parser.parse_args()
+    if args.apply and not args.dedupe:
+        parser.error('--apply 需要与 --dedupe 一起使用')
+    
     try:
         logger.info("🚀 开始数据库索引优化...")
         
         # 创建索引
-        create_indexes()
+        create_indexes(dedupe=args.dedupe, apply=args.apply)
         
         # 分析表性能
         analyze_tables()
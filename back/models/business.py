@@ -6,6 +6,27 @@
 """
 
 from datetime import datetime, timezone
+from typing import Optional
+
+# 职位类型归一化规则：按顺序匹配职位名称中的关键词，都不命中时为全职
+JOB_TYPE_KEYWORDS = [
+    ('兼职', ['兼职', 'part-time', '临时']),
+    ('全职', ['全职', 'full-time', '长期']),
+    ('灵活', ['灵活', 'flexible', '自由']),
+]
+DEFAULT_JOB_TYPE = '全职'
+
+
+def normalize_job_type(job_name: Optional[str]) -> Optional[str]:
+    """根据职位名称确定归一化的工作类型"""
+    if not job_name:
+        return None
+    job_name_lower = job_name.lower()
+    for job_type, keywords in JOB_TYPE_KEYWORDS:
+        if any(keyword in job_name_lower for keyword in keywords):
+            return job_type
+    return DEFAULT_JOB_TYPE
+
 
 class JobData:
     """职位数据模型包装器"""
@@ -34,10 +55,21 @@ class JobData:
             - experience: 经验要求
             - education: 学历要求
             - skills: 技能要求
+            - job_type: 归一化的工作类型（由职位名称推导，见 normalize_job_type）
             - crawl_time: 爬取时间
+            
+            索引说明：列表按 (crawl_time, id) 倒序做键集分页，
+            城市 / 工作类型的精确筛选使用以它们开头的复合索引；
+            (job_name, company, city) 为自然键，批量入库时按它去重更新
             """
             __tablename__ = 'job_data'
-            __table_args__ = {'extend_existing': True}  # 允许表重新定义
+            __table_args__ = (
+                db.UniqueConstraint('job_name', 'company', 'city', name='uq_job_data_natural_key'),
+                db.Index('idx_job_data_crawl_time_id', 'crawl_time', 'id'),
+                db.Index('idx_job_data_city_crawl_time', 'city', 'crawl_time', 'id'),
+                db.Index('idx_job_data_job_type_crawl_time', 'job_type', 'crawl_time', 'id'),
+                {'extend_existing': True}  # 允许表重新定义
+            )
             
             id = db.Column(db.Integer, primary_key=True)
             job_name = db.Column(db.String(100))
@@ -48,8 +80,15 @@ class JobData:
             experience = db.Column(db.String(50))
             education = db.Column(db.String(20))
             skills = db.Column(db.String(200))
+            job_type = db.Column(db.String(20))
             crawl_time = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
         
+        @db.event.listens_for(JobDataModel, 'before_insert')
+        @db.event.listens_for(JobDataModel, 'before_update')
+        def _fill_job_type(mapper, connection, target):
+            """写入时同步归一化工作类型"""
+            target.job_type = normalize_job_type(target.job_name)
+        
         cls._model_class = JobDataModel
         return JobDataModel
 
@@ -73,15 +112,27 @@ class AnalysisResult:
             字段说明：
             - id: 结果唯一标识
             - type: 分析类型（如：salary_by_city, skill_counts等）
-            - result: 分析结果（JSON格式）
+            - result: 分析结果（JSON格式，旧数据使用；新结果写入 payload）
+            - params_hash / params: 分析参数的摘要与原文
+            - dataset_version: 输入数据集版本，输入变化后旧结果不再命中
+            - encoding / payload / size: 结果的编码方式、压缩后的内容与原始字节数
             - create_time: 创建时间
             """
             __tablename__ = 'analysis_result'
-            __table_args__ = {'extend_existing': True}  # 允许表重新定义
+            __table_args__ = (
+                db.UniqueConstraint('type', 'params_hash', 'dataset_version', name='uq_analysis_result_key'),
+                {'extend_existing': True}  # 允许表重新定义
+            )
             
             id = db.Column(db.Integer, primary_key=True)
             type = db.Column(db.String(50))
             result = db.Column(db.JSON)
+            params_hash = db.Column(db.String(40))
+            params = db.Column(db.JSON)
+            dataset_version = db.Column(db.String(128))
+            encoding = db.Column(db.String(16))
+            payload = db.Column(db.LargeBinary(length=16 * 1024 * 1024))
+            size = db.Column(db.Integer)
             create_time = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
         
         cls._model_class = AnalysisResultModel
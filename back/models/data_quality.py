@@ -0,0 +1,95 @@
+"""
+护工资源管理系统 - 数据质量模型
+====================================
+
+数据质量计数器与历史记录：
+- data_quality_counter: 每张表每个被检查字段的已填写数、有效数；字段名为 * 的行记录表的总行数
+- data_quality_history: 定期记录的各表质量分数，用于趋势展示
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+# 计数器中表示整表行数的字段名
+ROW_COUNT_COLUMN = '*'
+
+
+class DataQualityCounter:
+    """数据质量计数器模型包装器"""
+
+    _model_class = None
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def get_model(cls, db):
+        """获取实际的SQLAlchemy模型"""
+        if cls._model_class is not None:
+            return cls._model_class
+
+        class DataQualityCounterModel(db.Model):
+            """数据质量计数器
+
+            字段说明：
+            - table_name / column_name: 被检查的表和字段，column_name 为 * 时 total 即表的行数
+            - filled: 非空（字符串去掉空白后非空）的行数
+            - valid: 非空且通过校验规则的行数
+            """
+            __tablename__ = 'data_quality_counter'
+            __table_args__ = (
+                db.UniqueConstraint('table_name', 'column_name', name='uq_data_quality_counter'),
+                {'extend_existing': True}
+            )
+
+            id = db.Column(db.Integer, primary_key=True)
+            table_name = db.Column(db.String(64), nullable=False)
+            column_name = db.Column(db.String(64), nullable=False)
+            total = db.Column(db.BigInteger, nullable=False, default=0)
+            filled = db.Column(db.BigInteger, nullable=False, default=0)
+            valid = db.Column(db.BigInteger, nullable=False, default=0)
+            rebuilt_at = db.Column(db.DateTime)
+            updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                                   onupdate=lambda: datetime.now(timezone.utc))
+
+        cls._model_class = DataQualityCounterModel
+        return DataQualityCounterModel
+
+
+class DataQualityHistory:
+    """数据质量历史模型包装器"""
+
+    _model_class = None
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def get_model(cls, db):
+        """获取实际的SQLAlchemy模型"""
+        if cls._model_class is not None:
+            return cls._model_class
+
+        class DataQualityHistoryModel(db.Model):
+            """数据质量历史记录，每次记录一张表的分数与各字段明细"""
+            __tablename__ = 'data_quality_history'
+            __table_args__ = {'extend_existing': True}
+
+            id = db.Column(db.Integer, primary_key=True)
+            table_name = db.Column(db.String(64), nullable=False)
+            row_count = db.Column(db.BigInteger, default=0)
+            score = db.Column(db.Float, default=0)
+            detail = db.Column(db.JSON)
+            recorded_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+            def to_dict(self) -> Dict[str, Any]:
+                """转换为字典格式"""
+                return {
+                    "table": self.table_name,
+                    "rows": self.row_count,
+                    "score": self.score,
+                    "recorded_at": self.recorded_at.isoformat() if self.recorded_at else None,
+                }
+
+        cls._model_class = DataQualityHistoryModel
+        return DataQualityHistoryModel
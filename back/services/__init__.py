@@ -11,6 +11,11 @@ from .appointment_service import AppointmentService
 from .employment_service import EmploymentService
 from .message_service import MessageService
 from .job_service import JobService
+from .analysis_service import AnalysisService
+from .statistics_service import StatisticsService
+from .data_quality_service import DataQualityService
+from .analysis_result_service import AnalysisResultService
+from .job_dataset_service import JobDatasetService
 
 __all__ = [
     'UserService',
@@ -18,5 +23,10 @@ __all__ = [
     'AppointmentService',
     'EmploymentService',
     'MessageService',
-    'JobService'
+    'JobService',
+    'AnalysisService',
+    'StatisticsService',
+    'DataQualityService',
+    'AnalysisResultService',
+    'JobDatasetService'
 ] 
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+护工资源管理系统 - 分析结果存储服务
+====================================
+
+按 (分析类型, 参数, 输入数据集版本) 保存分析结果到 analysis_result 表：
+- 结果序列化为紧凑 JSON 后用 zlib 压缩，存入 payload 列
+- 所有工作进程读取同一份结果；同一个键的结果不可变，进程内再用一个小的 LRU 缓存
+- 输入数据集版本变化后旧结果不再命中，每组 (类型, 参数) 只保留最近几个版本
+- 同一进程内同一个键只计算一次，其它请求等待计算结果
+"""
+
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENCODING_JSON_ZLIB = 'json+zlib'
+MAX_VERSION_LENGTH = 128
+KEEP_VERSIONS = 3
+CACHE_SIZE = 32
+
+
+def encode_result(result: Any) -> Tuple[bytes, int]:
+    """结果 -> (压缩后的字节, 原始字节数)"""
+    raw = json.dumps(result, ensure_ascii=False, separators=(',', ':'), sort_keys=True, default=str).encode('utf-8')
+    return zlib.compress(raw, 6), len(raw)
+
+
+def decode_result(payload: bytes, encoding: str) -> Any:
+    if encoding != ENCODING_JSON_ZLIB:
+        raise ValueError(f'不支持的结果编码: {encoding}')
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+def params_hash(params: Optional[Dict[str, Any]]) -> str:
+    """参数的稳定摘要，键顺序无关"""
+    text = json.dumps(params or {}, ensure_ascii=False, separators=(',', ':'), sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def version_key(version: str) -> str:
+    """过长的版本（如多个数据集摘要拼接）存为摘要"""
+    version = str(version or '')
+    if len(version) <= MAX_VERSION_LENGTH:
+        return version
+    return 'sha1:' + hashlib.sha1(version.encode('utf-8')).hexdigest()
+
+
+class AnalysisResultService:
+    """分析结果存储服务"""
+
+    def __init__(self, db=None, keep_versions: int = KEEP_VERSIONS, cache_size: int = CACHE_SIZE):
+        self.db = db
+        self.keep_versions = keep_versions
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple[str, str, str], Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+    def set_db(self, db):
+        """设置数据库连接"""
+        self.db = db
+
+    def _get_db(self):
+        if self.db is None:
+            from extensions import db
+            return db
+        return self.db
+
+    def _model(self):
+        from models.business import AnalysisResult
+        return AnalysisResult.get_model(self._get_db())
+
+    # ---- 读写 ----
+
+    def get(self, analysis_type: str, params: Optional[Dict[str, Any]], version: str) -> Optional[Any]:
+        """读取结果，未命中返回 None"""
+        key = (analysis_type, params_hash(params), version_key(version))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        Model = self._model()
+        row = Model.query.with_entities(Model.payload, Model.encoding).filter_by(
+            type=key[0], params_hash=key[1], dataset_version=key[2]
+        ).first()
+        if row is None or row.payload is None:
+            return None
+        result = decode_result(row.payload, row.encoding)
+        self._remember(key, result)
+        return result
+
+    def put(self, analysis_type: str, params: Optional[Dict[str, Any]], version: str, result: Any):
+        """保存结果；同一个键已有结果时覆盖，并清理更早的版本"""
+        db = self._get_db()
+        Model = self._model()
+        key = (analysis_type, params_hash(params), version_key(version))
+        payload, size = encode_result(result)
+        try:
+            Model.query.filter_by(type=key[0], params_hash=key[1], dataset_version=key[2]).delete()
+            db.session.add(Model(type=key[0], params_hash=key[1], params=params or {}, dataset_version=key[2],
+                                 encoding=ENCODING_JSON_ZLIB, payload=payload, size=size))
+            db.session.commit()
+        except Exception as e:
+            # 其它进程同时写入了同一个键，结果相同，直接使用对方的
+            db.session.rollback()
+            logger.warning(f"⚠️ 分析结果写入冲突 {analysis_type}: {str(e)}")
+        self._remember(key, result)
+        self._prune(analysis_type, key[1])
+        logger.info(f"✅ 分析结果已保存: {analysis_type}，{size} -> {len(payload)} 字节")
+
+    def get_or_compute(self, analysis_type: str, params: Optional[Dict[str, Any]], version: str,
+                       compute: Callable[[], Any]) -> Any:
+        """命中时直接返回已保存的结果，否则计算并保存；存储不可用时直接计算"""
+        key = (analysis_type, params_hash(params), version_key(version))
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                cached = self.get(analysis_type, params, version)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                logger.warning(f"⚠️ 读取分析结果失败 {analysis_type}: {str(e)}")
+                return compute()
+            result = compute()
+            try:
+                self.put(analysis_type, params, version, result)
+            except Exception as e:
+                logger.warning(f"⚠️ 保存分析结果失败 {analysis_type}: {str(e)}")
+            return result
+
+    def latest(self, analysis_type: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """某类分析最近保存的结果，不论输入版本；返回 {'dataset_version', 'create_time', 'result'}"""
+        Model = self._model()
+        row = Model.query.filter_by(type=analysis_type, params_hash=params_hash(params)).filter(
+            Model.payload.isnot(None)
+        ).order_by(Model.create_time.desc(), Model.id.desc()).first()
+        if row is None:
+            return None
+        return {
+            'dataset_version': row.dataset_version,
+            'create_time': row.create_time.isoformat() if row.create_time else None,
+            'result': decode_result(row.payload, row.encoding)
+        }
+
+    def invalidate(self, analysis_type: Optional[str] = None):
+        """删除保存的结果（指定类型或全部）"""
+        db = self._get_db()
+        Model = self._model()
+        query = Model.query.filter(Model.payload.isnot(None))
+        if analysis_type:
+            query = query.filter_by(type=analysis_type)
+        query.delete(synchronize_session=False)
+        db.session.commit()
+        with self._lock:
+            for key in [k for k in self._cache if analysis_type is None or k[0] == analysis_type]:
+                del self._cache[key]
+
+    # ---- 内部 ----
+
+    def _remember(self, key: Tuple[str, str, str], result: Any):
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _prune(self, analysis_type: str, hashed_params: str):
+        """每组 (类型, 参数) 只保留最近 keep_versions 个版本"""
+        db = self._get_db()
+        Model = self._model()
+        try:
+            stale = [row.id for row in Model.query.with_entities(Model.id).filter_by(
+                type=analysis_type, params_hash=hashed_params
+            ).order_by(Model.create_time.desc(), Model.id.desc()).offset(self.keep_versions).all()]
+            if stale:
+                Model.query.filter(Model.id.in_(stale)).delete(synchronize_session=False)
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"⚠️ 清理旧分析结果失败 {analysis_type}: {str(e)}")
+
+
+# 全局分析结果存储服务实例
+analysis_result_service = AnalysisResultService()
@@ -0,0 +1,430 @@
+"""
+护工资源管理系统 - 数据质量服务
+====================================
+
+按表、按字段维护完整性与有效性计数器：
+- 计数器保存在 data_quality_counter 表中，读取质量报告只需读这张小表
+- ORM 写入（insert / update / delete）时通过 SQLAlchemy 事件计算增量，
+  在同一次 flush 中更新计数器，与业务数据在同一事务内提交
+- 绕过 ORM 的批量写入（职位数据入库、迁移脚本）之后调用 rebuild 重新统计；
+  全表统计只由 database/rebuild_data_quality.py、入库任务或显式的 rebuild=true 触发，
+  读取报告不会重建，计数器尚未建立的表在报告中列为未初始化
+- 每次重建写入一条 data_quality_history，用于趋势展示；读取报告不写数据库
+
+分数：字段分数 = 有效行数 / 总行数，表分数为字段分数的平均值，总分为各非空表分数的平均值。
+"""
+
+import abc
+import time
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from models.data_quality import ROW_COUNT_COLUMN
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DAYS = 30
+_SESSION_DELTAS_KEY = 'data_quality_deltas'
+
+
+# ==================== 校验规则 ====================
+
+class Rule(abc.ABC):
+    """字段校验规则：Python 端用于增量计数，SQL 端用于重建，两者必须一致"""
+
+    @abc.abstractmethod
+    def check(self, value) -> bool:
+        """Python 端校验单个已填写的值"""
+
+    @abc.abstractmethod
+    def sql(self, column):
+        """SQL 端的等价条件表达式"""
+
+
+class Range(Rule):
+    """数值在闭区间内"""
+
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def check(self, value) -> bool:
+        try:
+            return self.low <= float(value) <= self.high
+        except (TypeError, ValueError):
+            return False
+
+    def sql(self, column):
+        return column.between(self.low, self.high)
+
+
+class Length(Rule):
+    """字符串长度在闭区间内（只用于 ASCII 字段，MySQL 的 LENGTH 按字节计算）"""
+
+    def __init__(self, low: int, high: int):
+        self.low = low
+        self.high = high
+
+    def check(self, value) -> bool:
+        return self.low <= len(str(value).strip()) <= self.high
+
+    def sql(self, column):
+        from sqlalchemy import func
+        return func.length(func.trim(column)).between(self.low, self.high)
+
+
+class OneOf(Rule):
+    """取值在给定集合中"""
+
+    def __init__(self, values: List[str]):
+        self.values = list(values)
+
+    def check(self, value) -> bool:
+        return str(value).strip() in self.values
+
+    def sql(self, column):
+        from sqlalchemy import func
+        return func.trim(column).in_(self.values)
+
+
+class StartsWith(Rule):
+    """以给定前缀开头"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def check(self, value) -> bool:
+        return str(value).strip().startswith(self.prefix)
+
+    def sql(self, column):
+        from sqlalchemy import func
+        return func.trim(column).like(f'{self.prefix}%')
+
+
+class Contains(Rule):
+    """包含给定子串"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def check(self, value) -> bool:
+        return self.text in str(value)
+
+    def sql(self, column):
+        return column.like(f'%{self.text}%')
+
+
+MOBILE_PHONE = (Length(11, 11), StartsWith('1'))
+EMAIL = (Contains('@'),)
+
+# 表 -> 字段 -> 校验规则（空元组表示只检查是否填写）
+QUALITY_RULES: Dict[str, Dict[str, Tuple[Rule, ...]]] = {
+    'user': {
+        'name': (),
+        'email': EMAIL,
+        'phone': MOBILE_PHONE,
+        'gender': (),
+        'birth_date': (),
+        'address': (),
+        'emergency_contact': (),
+        'emergency_contact_phone': MOBILE_PHONE,
+    },
+    'caregiver': {
+        'name': (),
+        'phone': MOBILE_PHONE,
+        'gender': (),
+        'age': (Range(16, 80),),
+        'qualification': (),
+        'introduction': (),
+        'experience_years': (Range(0, 60),),
+        'hourly_rate': (Range(1, 1000),),
+        'rating': (Range(0, 5),),
+        'id_card': (Length(15, 18),),
+        'emergency_contact': (),
+        'email': EMAIL,
+    },
+    'caregiver_hire_info': {
+        'service_type': (OneOf(['elderly', 'maternal', 'medical', 'rehabilitation', 'psychological', 'other']),),
+        'status': (OneOf(['available', 'busy', 'unavailable']),),
+        'hourly_rate': (Range(1, 1000),),
+        'work_time': (OneOf(['full-time', 'part-time', 'flexible', 'night-shift']),),
+        'service_area': (),
+        'available_time': (),
+        'skills': (),
+    },
+    'appointment': {
+        'service_type': (),
+        'date': (),
+        'start_time': (),
+        'end_time': (),
+        'status': (OneOf(['pending', 'confirmed', 'completed', 'cancelled']),),
+        'hourly_rate': (Range(1, 1000),),
+        'duration_hours': (Range(0.5, 24),),
+    },
+    'job_data': {
+        'job_name': (),
+        'company': (),
+        'city': (),
+        'salary_low': (Range(500, 100000),),
+        'salary_high': (Range(500, 100000),),
+        'experience': (),
+        'education': (),
+        'skills': (),
+        'job_type': (),
+        'crawl_time': (),
+    },
+}
+
+
+def is_filled(value) -> bool:
+    """非空；字符串去掉空白后非空"""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return bool(value.strip())
+    return True
+
+
+def column_state(table: str, column: str, value) -> Tuple[int, int]:
+    """单个值对 (filled, valid) 计数的贡献"""
+    if not is_filled(value):
+        return 0, 0
+    return 1, int(all(rule.check(value) for rule in QUALITY_RULES[table][column]))
+
+
+class DataQualityService:
+    """数据质量服务"""
+
+    def __init__(self, db=None):
+        self.db = db
+        self.counter_model = None
+        self.history_model = None
+        self._models: Dict[str, Any] = {}
+
+    def set_db(self, db):
+        """设置数据库连接并注册写入事件"""
+        from models import User, Caregiver, Appointment, JobData
+        from models.caregiver_hire_info import CaregiverHireInfo
+        from models.data_quality import DataQualityCounter, DataQualityHistory
+
+        self.db = db
+        self.counter_model = DataQualityCounter.get_model(db)
+        self.history_model = DataQualityHistory.get_model(db)
+        models = [User.get_model(db), Caregiver.get_model(db), CaregiverHireInfo.get_model(db),
+                  Appointment.get_model(db), JobData.get_model(db)]
+        self._models = {model.__tablename__: model for model in models if model.__tablename__ in QUALITY_RULES}
+        self._register_events()
+        try:
+            # 模型在建表之后才注册时，计数器表不会被 create_all 创建
+            for model in (self.counter_model, self.history_model):
+                model.__table__.create(bind=db.engine, checkfirst=True)
+        except Exception as e:
+            logger.warning(f"⚠️ 创建数据质量表失败: {str(e)}")
+
+    # ---- 增量更新 ----
+
+    def _register_events(self):
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+
+        for model in self._models.values():
+            for name, handler in (('after_insert', self._after_insert), ('after_update', self._after_update),
+                                  ('after_delete', self._after_delete)):
+                if not event.contains(model, name, handler):
+                    event.listen(model, name, handler)
+            # 赋值时加载被替换的旧值：提交后属性已过期，否则 history 中没有旧值，计数会偏大
+            for column in QUALITY_RULES[model.__tablename__]:
+                attribute = getattr(model, column)
+                if not event.contains(attribute, 'set', self._on_set):
+                    event.listen(attribute, 'set', self._on_set, active_history=True)
+        if not event.contains(Session, 'after_flush', self._after_flush):
+            event.listen(Session, 'after_flush', self._after_flush)
+
+    @staticmethod
+    def _deltas(target) -> Optional[Counter]:
+        from sqlalchemy.orm import object_session
+        session = object_session(target)
+        if session is None:
+            return None
+        return session.info.setdefault(_SESSION_DELTAS_KEY, Counter())
+
+    def _apply_row(self, target, sign: int, values: Dict[str, Any]):
+        deltas = self._deltas(target)
+        if deltas is None:
+            return
+        table = target.__tablename__
+        deltas[(table, ROW_COUNT_COLUMN, 'total')] += sign
+        for column, value in values.items():
+            filled, valid = column_state(table, column, value)
+            deltas[(table, column, 'total')] += sign
+            deltas[(table, column, 'filled')] += sign * filled
+            deltas[(table, column, 'valid')] += sign * valid
+
+    def _after_insert(self, mapper, connection, target):
+        self._apply_row(target, 1, {c: getattr(target, c, None) for c in QUALITY_RULES[target.__tablename__]})
+
+    def _after_delete(self, mapper, connection, target):
+        # 只使用已加载的值，避免对已删除的行再发起查询；未加载的字段在下次重建时校正
+        loaded = target.__dict__
+        self._apply_row(target, -1, {c: loaded[c] for c in QUALITY_RULES[target.__tablename__] if c in loaded})
+
+    @staticmethod
+    def _on_set(target, value, oldvalue, initiator):
+        """只为了开启 active_history，旧值由 SQLAlchemy 记录在 history 中"""
+
+    def _after_update(self, mapper, connection, target):
+        from sqlalchemy import inspect
+        deltas = self._deltas(target)
+        if deltas is None:
+            return
+        table = target.__tablename__
+        state = inspect(target)
+        for column in QUALITY_RULES[table]:
+            history = state.attrs[column].history
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            old_filled, old_valid = column_state(table, column, old)
+            new_filled, new_valid = column_state(table, column, new)
+            deltas[(table, column, 'filled')] += new_filled - old_filled
+            deltas[(table, column, 'valid')] += new_valid - old_valid
+
+    def _after_flush(self, session, flush_context):
+        deltas = session.info.pop(_SESSION_DELTAS_KEY, None)
+        if not deltas or self.counter_model is None:
+            return
+        from sqlalchemy import update, bindparam
+        changes: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for (table, column, field), delta in deltas.items():
+            changes.setdefault((table, column), {'d_total': 0, 'd_filled': 0, 'd_valid': 0})[f'd_{field}'] += delta
+        params = [dict(values, p_table=table, p_column=column)
+                  for (table, column), values in changes.items() if any(values.values())]
+        if not params:
+            return
+        counter = self.counter_model.__table__
+        stmt = (
+            update(counter)
+            .where(counter.c.table_name == bindparam('p_table'), counter.c.column_name == bindparam('p_column'))
+            .values(total=counter.c.total + bindparam('d_total'),
+                    filled=counter.c.filled + bindparam('d_filled'),
+                    valid=counter.c.valid + bindparam('d_valid'),
+                    updated_at=datetime.now(timezone.utc))
+        )
+        # 计数器尚未建立（从未重建）时不会更新任何行，首次读取报告时整表重建
+        session.connection().execute(stmt, params)
+
+    # ---- 重建 ----
+
+    def rebuild(self, tables: Optional[List[str]] = None, record_history: bool = True) -> Dict[str, Any]:
+        """全表重新统计计数器，每张表一条聚合查询"""
+        from sqlalchemy import select, func, case, and_, String, Text
+
+        if self.counter_model is None:
+            raise RuntimeError('数据库连接未初始化')
+        tables = [t for t in (tables or list(self._models)) if t in self._models]
+        db = self.db
+        counter = self.counter_model.__table__
+        now = datetime.now(timezone.utc)
+        started = time.monotonic()
+        for table in tables:
+            model = self._models[table]
+            columns = list(QUALITY_RULES[table])
+            expressions = [func.count()]
+            for name in columns:
+                column = getattr(model, name)
+                filled = column.isnot(None)
+                if isinstance(column.type, (String, Text)):
+                    filled = and_(filled, func.trim(column) != '')
+                rules = QUALITY_RULES[table][name]
+                valid = and_(filled, *[rule.sql(column) for rule in rules]) if rules else filled
+                expressions.append(func.sum(case((filled, 1), else_=0)))
+                expressions.append(func.sum(case((valid, 1), else_=0)))
+            row = db.session.execute(select(*expressions).select_from(model)).one()
+            total = int(row[0] or 0)
+            rows = [{'table_name': table, 'column_name': ROW_COUNT_COLUMN, 'total': total,
+                     'filled': total, 'valid': total, 'rebuilt_at': now, 'updated_at': now}]
+            for i, name in enumerate(columns):
+                rows.append({'table_name': table, 'column_name': name, 'total': total,
+                             'filled': int(row[1 + 2 * i] or 0), 'valid': int(row[2 + 2 * i] or 0),
+                             'rebuilt_at': now, 'updated_at': now})
+            db.session.execute(counter.delete().where(counter.c.table_name == table))
+            db.session.execute(counter.insert(), rows)
+        db.session.commit()
+        logger.info(f"✅ 数据质量计数器已重建: {', '.join(tables)}，耗时 {round(time.monotonic() - started, 2)} 秒")
+
+        report = self.report(with_history=False)
+        if record_history:
+            self.record_history(report, tables)
+        return report
+
+    # ---- 报告 ----
+
+    def report(self, with_history: bool = True, history_days: int = DEFAULT_HISTORY_DAYS) -> Dict[str, Any]:
+        """各表各字段的完整性、有效性与分数（只读计数器表）
+
+        计数器尚未建立的表不统计，列在 uninitialized_tables 中，需要先重建
+        """
+        if self.counter_model is None:
+            raise RuntimeError('数据库连接未初始化')
+        counters = self.counter_model.query.all()
+
+        tables: Dict[str, Dict[str, Any]] = {}
+        for c in counters:
+            if c.table_name not in QUALITY_RULES:
+                continue
+            entry = tables.setdefault(c.table_name, {'rows': 0, 'columns': {}, 'rebuilt_at': None})
+            if c.column_name == ROW_COUNT_COLUMN:
+                entry['rows'] = c.total
+                entry['rebuilt_at'] = c.rebuilt_at.isoformat() if c.rebuilt_at else None
+            elif c.column_name in QUALITY_RULES[c.table_name]:
+                entry['columns'][c.column_name] = {'filled': c.filled, 'valid': c.valid}
+
+        for entry in tables.values():
+            rows = entry['rows']
+            for stats in entry['columns'].values():
+                stats['completeness'] = round(stats['filled'] / rows, 4) if rows else 0.0
+                stats['validity'] = round(stats['valid'] / stats['filled'], 4) if stats['filled'] else 0.0
+                stats['score'] = round(stats['valid'] / rows, 4) if rows else 0.0
+            scores = [s['score'] for s in entry['columns'].values()]
+            entry['score'] = round(sum(scores) / len(scores), 4) if rows and scores else 0.0
+
+        scored = [entry['score'] for entry in tables.values() if entry['rows']]
+        report = {
+            'overall_score': round(sum(scored) / len(scored), 4) if scored else 0.0,
+            'tables': tables,
+            'uninitialized_tables': sorted(t for t in self._models if t not in tables),
+            'generated_at': datetime.now().isoformat()
+        }
+        if with_history:
+            report['history'] = self.history(history_days)
+        return report
+
+    def overall_score(self) -> float:
+        """总体质量分数（只读计数器）"""
+        return self.report(with_history=False)['overall_score']
+
+    # ---- 历史 ----
+
+    def record_history(self, report: Dict[str, Any], tables: Optional[List[str]] = None):
+        """把报告中的表分数写入历史"""
+        History = self.history_model
+        for table, entry in report['tables'].items():
+            if tables and table not in tables:
+                continue
+            self.db.session.add(History(table_name=table, row_count=entry['rows'], score=entry['score'],
+                                        detail=entry['columns']))
+        self.db.session.commit()
+
+    def history(self, days: int = DEFAULT_HISTORY_DAYS) -> List[Dict[str, Any]]:
+        """最近若干天的质量分数记录，按时间升序"""
+        History = self.history_model
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        records = History.query.filter(History.recorded_at >= since).order_by(History.recorded_at.asc()).all()
+        return [r.to_dict() for r in records]
+
+
+# 全局数据质量服务实例
+data_quality_service = DataQualityService()
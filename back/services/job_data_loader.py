@@ -0,0 +1,208 @@
+"""
+护工资源管理系统 - 职位数据批量入库服务
+====================================
+
+把职位数据集（列式目录、JSONL、JSON、CSV）流式写入 job_data 表：
+- 按块读取，每块一次 executemany 写入，不经过 ORM 对象；
+  语句只编译一次，MySQL 驱动会把一块改写为一条多行 INSERT
+- 按自然键（职位名称、公司、城市）去重，已存在的记录更新薪资等字段
+- 薪资从薪资标准化结果取月薪区间
+
+统计中 rows_upserted 为去重后提交给写入语句的行数（新增或更新）；rows_affected 为数据库驱动
+报告的受影响行数，语义随数据库而不同（MySQL 中更新的行计为 2、内容未变的行计为 0）
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Iterable, Optional, Callable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from bigdata.processing.salary_normalizer import SALARY_OK, normalize_records
+from bigdata.processing.streaming_import import iter_dataset_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 1000
+PROGRESS_LOG_INTERVAL = 50000
+
+NATURAL_KEY = ('job_name', 'company', 'city')
+# 冲突时更新的列
+UPDATE_COLUMNS = ('salary_low', 'salary_high', 'experience', 'education', 'skills', 'job_type', 'crawl_time')
+
+# job_data 各字符串列的长度上限
+COLUMN_LIMITS = {
+    'job_name': 100,
+    'company': 100,
+    'city': 20,
+    'experience': 50,
+    'education': 20,
+    'skills': 200,
+}
+
+_CITY_SEPARATOR = re.compile(r'[-·・/\s]')
+
+
+def _text(value: Any, limit: int) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        value = ','.join(str(v) for v in value if v)
+    return str(value).strip()[:limit]
+
+
+def _salary(row: Dict[str, Any], field: str) -> Optional[int]:
+    if row.get('salary_status', SALARY_OK) != SALARY_OK:
+        return None
+    value = row.get(field)
+    if value is None or value != value:
+        return None
+    return int(round(value))
+
+
+def _crawl_time(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if value:
+        try:
+            return datetime.fromisoformat(str(value).strip().replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            pass
+    return datetime.now()
+
+
+class JobDataLoader:
+    """职位数据批量入库"""
+
+    def __init__(self, db=None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.db = None
+        self.table = None
+        self._statement = None
+        self.chunk_rows = chunk_rows
+        self.progress_callback = progress_callback
+        self.stats: Dict[str, Any] = {}
+        if db is not None:
+            self.set_db(db)
+
+    def set_db(self, db):
+        """设置数据库连接"""
+        self.db = db
+        from models.business import JobData
+        self.table = JobData.get_model(db).__table__
+        self._statement = None
+
+    def to_db_row(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """把标准职位字段映射为 job_data 的列，没有职位名称时返回 None"""
+        from models.business import normalize_job_type
+        job_name = _text(row.get('title') or row.get('job_name'), COLUMN_LIMITS['job_name'])
+        if not job_name:
+            return None
+        location = _text(row.get('location') or row.get('city'), 100)
+        return {
+            'job_name': job_name,
+            'company': _text(row.get('company'), COLUMN_LIMITS['company']),
+            'city': _CITY_SEPARATOR.split(location, 1)[0][:COLUMN_LIMITS['city']],
+            'salary_low': _salary(row, 'salary_low'),
+            'salary_high': _salary(row, 'salary_high'),
+            'experience': _text(row.get('experience'), COLUMN_LIMITS['experience']),
+            'education': _text(row.get('education'), COLUMN_LIMITS['education']),
+            'skills': _text(row.get('skills'), COLUMN_LIMITS['skills']),
+            'job_type': normalize_job_type(job_name),
+            'crawl_time': _crawl_time(row.get('crawl_time')),
+        }
+
+    def _upsert_statement(self):
+        """按数据库类型生成按自然键更新的 INSERT 语句"""
+        if self._statement is None:
+            self._statement = self._build_upsert(self.db.engine.dialect.name)
+        return self._statement
+
+    def _build_upsert(self, dialect: str):
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(self.table)
+            return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in UPDATE_COLUMNS})
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(self.table)
+            return stmt.on_conflict_do_update(
+                index_elements=list(NATURAL_KEY),
+                set_={c: stmt.excluded[c] for c in UPDATE_COLUMNS}
+            )
+        raise ValueError(f'不支持的数据库类型: {dialect}')
+
+    def _flush(self, connection, chunk: List[Dict[str, Any]]):
+        if any('salary_low' not in row for row in chunk):
+            normalize_records(chunk)
+        # 同一块内按自然键去重，保留最后出现的记录
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        skipped = 0
+        for raw in chunk:
+            row = self.to_db_row(raw)
+            if row is None:
+                skipped += 1
+                continue
+            rows[tuple(row[k] for k in NATURAL_KEY)] = row
+        if rows:
+            result = connection.execute(self._upsert_statement(), list(rows.values()))
+            if result.rowcount is not None and result.rowcount >= 0:
+                self.stats['rows_affected'] += result.rowcount
+        self.stats['rows_upserted'] += len(rows)
+        self.stats['rows_skipped'] += skipped
+        self.stats['rows_merged'] += len(chunk) - skipped - len(rows)
+        self.stats['chunks'] += 1
+
+    def _report(self, started: float, force: bool = False):
+        elapsed = time.monotonic() - started
+        self.stats['elapsed'] = round(elapsed, 2)
+        self.stats['rows_per_sec'] = round(self.stats['rows_read'] / elapsed, 1) if elapsed else 0.0
+        if self.progress_callback:
+            self.progress_callback(dict(self.stats))
+        if force or self.stats['rows_read'] % PROGRESS_LOG_INTERVAL < self.chunk_rows:
+            logger.info(f"📊 职位数据入库: 已读取 {self.stats['rows_read']} 行，"
+                        f"写入 {self.stats['rows_upserted']} 行，{self.stats['rows_per_sec']} 行/秒")
+
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """分块写入标准职位字段的记录，每块单独提交"""
+        if self.db is None:
+            raise RuntimeError('数据库连接未初始化')
+        self.stats = {'rows_read': 0, 'rows_upserted': 0, 'rows_affected': 0, 'rows_skipped': 0,
+                      'rows_merged': 0, 'chunks': 0, 'elapsed': 0.0, 'rows_per_sec': 0.0}
+        started = time.monotonic()
+        chunk: List[Dict[str, Any]] = []
+        with self.db.engine.connect() as connection:
+            for row in rows:
+                chunk.append(row)
+                self.stats['rows_read'] += 1
+                if len(chunk) >= self.chunk_rows:
+                    self._flush(connection, chunk)
+                    connection.commit()
+                    chunk = []
+                    self._report(started)
+            if chunk:
+                self._flush(connection, chunk)
+                connection.commit()
+        self._report(started, force=True)
+
+        from services.job_service import invalidate_job_count_cache
+        invalidate_job_count_cache()
+        try:
+            # 批量写入绕过了 ORM 事件，重新统计职位表的数据质量计数器
+            from services.data_quality_service import data_quality_service
+            data_quality_service.rebuild(['job_data'])
+        except Exception as e:
+            logger.warning(f"⚠️ 职位数据质量计数器重建失败: {str(e)}")
+        logger.info(f"✅ 职位数据入库完成: 写入 {self.stats['rows_upserted']} 行"
+                    f"（受影响 {self.stats['rows_affected']} 行），耗时 {self.stats['elapsed']} 秒")
+        return self.stats
+
+    def load_file(self, path: str, default_source: str = 'import') -> Dict[str, Any]:
+        """把数据集文件写入 job_data"""
+        return self.load_rows(iter_dataset_rows(path, default_source))
@@ -0,0 +1,351 @@
+"""
+护工资源管理系统 - 职位数据集服务
+====================================
+
+职位数据集（data/raw 下的注册表与旧数据文件）的读取与预聚合，职位 API 与数据分析服务共用：
+- 数据集列表、按列读取与版本标识
+- 近似重复索引与去重掩码，去重策略（NEAR_DUPLICATE_DEDUPE）对逐行读取与全部预聚合结构一致
+- 薪资分位数 / 公司去重摘要、职位分布立方体、分面索引，按数据集版本保存，近似重复的职位只计一次
+- 城市薪资与技能词频统计
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from bigdata.processing.columnar_store import (
+    HAS_NUMPY, COLUMNAR_SUFFIX, ColumnarDataset, is_columnar_path
+)
+from bigdata.processing.salary_normalizer import SALARY_FIELDS, normalize_records, is_valid_salary
+from bigdata.processing.skill_extractor import get_skill_extractor, DEFAULT_FIELDS as SKILL_FIELDS
+from bigdata.processing.streaming_import import JSONL_SUFFIX, iter_jsonl
+from bigdata.processing.dataset_registry import DatasetRegistry
+from bigdata.processing.near_duplicates import (
+    HAS_NUMPY as HAS_DEDUP, FORMAT_VERSION as DEDUP_FORMAT_VERSION, DEDUP_FIELDS,
+    NearDuplicateIndex, exact_unique_mask
+)
+from bigdata.processing.facet_index import HAS_NUMPY as HAS_FACETS, FacetIndex, FacetIndexCache
+from bigdata.processing.sketches import (
+    HAS_NUMPY as HAS_SKETCHES, SKETCH_DIMENSIONS, QUANTILES, DatasetSketches, SketchStore
+)
+from bigdata.processing.distribution_cube import HAS_NUMPY as HAS_CUBE, CUBE_COLUMNS, DistributionCube
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw'))
+SKETCH_COLUMNS = sorted(set(SKETCH_DIMENSIONS.values()) | {'company', 'salary_monthly', 'salary_status'})
+SKETCH_MAX_DATASETS = 20
+# 同一职位的近似重复发布（包括跨数据集）只计一次；逐行读取、统计摘要、分布立方体与分面索引共用
+NEAR_DUPLICATE_DEDUPE = True
+
+
+class _DatasetSummaries:
+    """按数据集版本保存的预聚合结构（统计摘要、分布立方体），近似重复的职位只计一次
+
+    Args:
+        service: 提供数据集列表、版本与去重掩码的数据集服务
+        name: 数据目录下的保存子目录
+        builder: 结构类型，需要提供 from_columnar / from_rows / merge / save / load
+        columns: 非列式数据集建立时读取的列
+    """
+
+    def __init__(self, service: 'JobDatasetService', name: str, builder: type, columns: List[str]):
+        self.service = service
+        self.name = name
+        self.builder = builder
+        self.columns = columns
+        self._store: Optional[SketchStore] = None
+        self._lock = threading.Lock()
+        self._merged: Dict[str, Any] = {'versions': (), 'value': None}
+
+    def dataset(self, path: str):
+        """单个数据集的结构，首次使用时建立并保存"""
+        service = self.service
+        root = os.path.join(service.data_dir, self.name)
+        version = service.summary_version(path)
+        with self._lock:
+            if self._store is None or self._store.root != root:
+                self._store = SketchStore(root, factory=self.builder)
+            value = self._store.get(version)
+            if value is None:
+                base_mask = service.base_mask(path, self.name)
+                if is_columnar_path(path):
+                    value = self.builder.from_columnar(ColumnarDataset(path), base_mask)
+                else:
+                    value = self.builder.from_rows(service.read_dataset(path, self.columns), base_mask)
+                self._store.put(version, value)
+            return value
+
+    def merged(self, limit_files: int = 1):
+        """最新若干个数据集的合并结果，没有数据集时返回 None
+
+        与上次合并的数据集相比只新增了数据集时，只把新增数据集的结构合并进去
+        """
+        paths = self.service.list_dataset_files()[:limit_files]
+        versions = tuple(self.service.summary_version(p) for p in paths)
+        with self._lock:
+            cached_versions, merged = self._merged['versions'], self._merged['value']
+        if merged is not None and cached_versions == versions:
+            return merged
+        if merged is None or not set(cached_versions) <= set(versions):
+            merged, cached_versions = None, ()
+        for path, version in zip(paths, versions):
+            if version in cached_versions:
+                continue
+            value = self.dataset(path)
+            merged = value if merged is None else merged.merge(value)
+        with self._lock:
+            self._merged.update(versions=versions, value=merged)
+        return merged
+
+
+class JobDatasetService:
+    """职位数据集服务"""
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        self._dedup_index: Optional[NearDuplicateIndex] = None
+        self._dedup_lock = threading.Lock()
+        self.sketches = _DatasetSummaries(self, 'sketches', DatasetSketches, SKETCH_COLUMNS)
+        self.cubes = _DatasetSummaries(self, 'cubes', DistributionCube, CUBE_COLUMNS)
+        self._facet_cache = FacetIndexCache()
+
+    # ---- 数据集 ----
+
+    def registry(self) -> DatasetRegistry:
+        return DatasetRegistry(self.data_dir)
+
+    def save_dataset(self, items: List[Dict[str, Any]], tag: str = 'jobs') -> str:
+        """登记职位数据集并设为当前生效的数据集，内容相同的数据只保存一份
+
+        写入前统一解析薪资，补充 salary_low/salary_high/salary_monthly/salary_status
+        """
+        registry = self.registry()
+        entry, _ = registry.register_rows(items, source=tag, tag=tag)
+        path = registry.path_of(entry)
+        self.warm_dataset(path)
+        return path
+
+    def _list_legacy_files(self) -> List[str]:
+        files: Dict[str, str] = {}
+        for name in os.listdir(self.data_dir):
+            if not name.startswith('jobs_'):
+                continue
+            path = os.path.join(self.data_dir, name)
+            stem, ext = os.path.splitext(name)
+            if ext == COLUMNAR_SUFFIX and HAS_NUMPY and is_columnar_path(path):
+                files[stem] = path  # 同名时优先列式目录
+            elif ext in ('.json', JSONL_SUFFIX):
+                files.setdefault(stem, path)
+        files = list(files.values())
+
+        # 优先选择jobs_50000_文件，然后jobs_5000_文件，最后其他文件
+        jobs_50000_files = [f for f in files if 'jobs_50000_' in f]
+        jobs_5000_files = [f for f in files if 'jobs_5000_' in f and 'jobs_50000_' not in f]
+        other_files = [f for f in files if 'jobs_5000_' not in f and 'jobs_50000_' not in f]
+
+        # 先返回jobs_50000_文件（按时间倒序），然后jobs_5000_文件，最后其他文件
+        return sorted(jobs_50000_files, reverse=True) + sorted(jobs_5000_files, reverse=True) + sorted(other_files, reverse=True)
+
+    def list_dataset_files(self) -> List[str]:
+        """数据集路径，注册表中的 active 数据集在前；注册表为空时回退到旧的按文件名选择"""
+        paths = self.registry().dataset_paths()
+        return paths or self._list_legacy_files()
+
+    def read_dataset(self, path: str, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """读取单个数据集文件，columns 指定时只读取这些列
+
+        旧数据集没有薪资标准化字段时，读取 salary 列现场补算
+        """
+        wants_salary = bool(columns) and any(c in SALARY_FIELDS for c in columns)
+        if is_columnar_path(path):
+            dataset = ColumnarDataset(path)
+            read_columns = columns
+            missing_salary = wants_salary and not all(c in dataset.columns for c in SALARY_FIELDS)
+            if missing_salary:
+                read_columns = [c for c in columns if c not in SALARY_FIELDS] + ['salary']
+            rows = dataset.records(read_columns)
+        else:
+            if path.endswith(JSONL_SUFFIX):
+                rows = list(iter_jsonl(path))
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    rows = json.load(f)
+            missing_salary = wants_salary and bool(rows) and 'salary_status' not in rows[0]
+        if missing_salary:
+            normalize_records(rows)
+        if columns:
+            rows = [{c: r.get(c, '') for c in columns} for r in rows]
+        return rows
+
+    def dataset_version(self, path: str) -> str:
+        """数据集版本标识，用于缓存分析结果
+
+        注册表中的数据集内容不可变，直接使用内容摘要；旧文件使用文件名 + 修改时间
+        """
+        digest = self.registry().digest_of(path)
+        if digest:
+            return digest
+        marker = os.path.join(path, 'meta.json') if is_columnar_path(path) else path
+        return f"{os.path.basename(path)}:{os.path.getmtime(marker)}"
+
+    def summary_version(self, path: str) -> str:
+        """预聚合结构与分析结果使用的版本：数据集版本加上去重策略，策略变化后重新建立"""
+        policy = f'dedup-{DEDUP_FORMAT_VERSION}' if NEAR_DUPLICATE_DEDUPE else 'dedup-off'
+        return f'{self.dataset_version(path)}:{policy}'
+
+    def datasets_version(self, limit_files: int = 1) -> str:
+        """最新若干个数据集的联合版本，任一数据集变化、新增数据集或去重策略变化时随之变化"""
+        return '|'.join(self.summary_version(p) for p in self.list_dataset_files()[:limit_files])
+
+    def load_latest_jobs(self, limit_files: int = 1, columns: Optional[List[str]] = None,
+                         dedupe: bool = NEAR_DUPLICATE_DEDUPE) -> List[Dict[str, Any]]:
+        """读取最新的数据集；dedupe 时同一职位的近似重复发布（包括跨文件）只保留一条"""
+        jobs: List[Dict[str, Any]] = []
+        loaded: List[str] = []
+        for p in self.list_dataset_files()[:limit_files]:
+            try:
+                jobs.extend(self.read_dataset(p, columns))
+                loaded.append(p)
+            except Exception as e:
+                logger.warning(f"⚠️ 数据集读取失败 {p}: {str(e)}")
+                continue
+        if dedupe and jobs:
+            try:
+                mask = self.unique_mask(loaded, jobs if columns is None else None)
+                jobs = [job for job, keep in zip(jobs, mask) if keep]
+            except Exception as e:
+                logger.warning(f"⚠️ 近似重复过滤失败: {str(e)}")
+        return jobs
+
+    # ---- 近似重复 ----
+
+    def near_duplicate_index(self) -> NearDuplicateIndex:
+        """数据目录下持久化的近似重复索引，进程内共享"""
+        root = os.path.join(self.data_dir, 'dedup')
+        with self._dedup_lock:
+            if self._dedup_index is None or self._dedup_index.root != root:
+                self._dedup_index = NearDuplicateIndex(root)
+            return self._dedup_index
+
+    def dataset_mapping(self, index: NearDuplicateIndex, path: str):
+        """数据集 行号 -> 近似重复记录编号；首次遇到的数据集读取比较字段并增量加入索引"""
+        version = self.dataset_version(path)
+        mapping = index.dataset_mapping(version)
+        if mapping is None:
+            mapping = index.add_dataset(version, self.read_dataset(path, DEDUP_FIELDS))
+        return mapping
+
+    def unique_mask(self, paths: List[str], rows: Optional[List[Dict[str, Any]]] = None) -> List[bool]:
+        """按近似重复簇去重的保留掩码，每个簇只保留最先出现的一行"""
+        if not HAS_DEDUP:
+            if rows is None:
+                rows = [r for p in paths for r in self.read_dataset(p, DEDUP_FIELDS)]
+            return exact_unique_mask(rows)
+        index = self.near_duplicate_index()
+        return index.unique_mask_for([self.dataset_mapping(index, p) for p in paths]).tolist()
+
+    def base_mask(self, path: str, purpose: str) -> Optional[List[bool]]:
+        """建立预聚合结构时使用的去重掩码，去重关闭或不可用时返回 None（不去重）"""
+        if not NEAR_DUPLICATE_DEDUPE:
+            return None
+        try:
+            return self.unique_mask([path])
+        except Exception as e:
+            logger.warning(f"⚠️ 近似重复掩码不可用（{purpose}）: {str(e)}")
+            return None
+
+    # ---- 预聚合结构 ----
+
+    def merged_sketches(self, limit_files: int = 1) -> Optional[DatasetSketches]:
+        """最新若干个数据集的薪资分位数 / 公司去重摘要合并结果"""
+        return self.sketches.merged(limit_files)
+
+    def merged_cube(self, limit_files: int = 1) -> Optional[DistributionCube]:
+        """最新若干个数据集的职位分布立方体合并结果"""
+        return self.cubes.merged(limit_files)
+
+    def facet_index(self, path: str) -> FacetIndex:
+        """数据集的分面索引，近似重复的职位只计一次"""
+        def build() -> FacetIndex:
+            base_mask = self.base_mask(path, 'search')
+            if is_columnar_path(path):
+                return FacetIndex.from_columnar(ColumnarDataset(path), base_mask)
+            return FacetIndex.from_rows(self.read_dataset(path), base_mask)
+        return self._facet_cache.get(self.summary_version(path), build)
+
+    def warm_dataset(self, path: str):
+        """数据集登记后在后台建立近似重复映射、统计摘要与分布立方体，首次查询不必等待"""
+        if not HAS_SKETCHES:
+            return
+
+        def run():
+            for summaries in (self.sketches, self.cubes):
+                try:
+                    summaries.dataset(path)
+                except Exception as e:
+                    logger.warning(f"⚠️ {summaries.name} 建立失败 {path}: {str(e)}")
+        threading.Thread(target=run, name='dataset-warmup', daemon=True).start()
+
+    # ---- 统计 ----
+
+    def compute_salary_analysis(self, datasets: int = 1) -> Dict[str, Any]:
+        """城市薪资：均值与 p25/p50/p90，datasets 指定合并最新的几个数据集
+
+        统计摘要不可用时逐行统计；摘要读取失败时抛出异常，由调用方决定是否逐行统计
+        """
+        if not HAS_SKETCHES:
+            return self.compute_salary_from_rows(datasets)
+        sketches = self.merged_sketches(datasets)
+        if sketches is None:
+            return {'total_avg': 0, 'city_avg': {}}
+        overall = sketches.overall()
+        cities = {city: stats for city, stats in sketches.summary('city').items() if stats['salary_count']}
+        return {
+            'total_avg': overall['avg_salary'] or 0,
+            'city_avg': {city: stats['avg_salary'] for city, stats in cities.items()},
+            'percentiles': {name: overall[name] for name in QUANTILES},
+            'city_percentiles': {city: {name: stats[name] for name in QUANTILES} for city, stats in cities.items()},
+            'distinct_companies': overall['distinct_companies'],
+            'datasets': datasets
+        }
+
+    def compute_salary_from_rows(self, datasets: int = 1) -> Dict[str, Any]:
+        """逐行统计城市薪资均值（不含分位数）"""
+        jobs = self.load_latest_jobs(datasets, columns=['location', 'salary_monthly', 'salary_status'])
+        if not jobs:
+            return {'total_avg': 0, 'city_avg': {}}
+        city_sum: Dict[str, float] = {}
+        city_cnt: Dict[str, int] = {}
+        for j in jobs:
+            city = (j.get('location') or '').strip() or '未知'
+            if not is_valid_salary(j):
+                continue
+            val = j['salary_monthly']
+            city_sum[city] = city_sum.get(city, 0.0) + val
+            city_cnt[city] = city_cnt.get(city, 0) + 1
+        city_avg = {k: round(city_sum[k] / max(city_cnt[k], 1), 2) for k in city_sum}
+        total_avg = round(sum(city_sum.values()) / max(sum(city_cnt.values()), 1), 2)
+        return {'total_avg': total_avg, 'city_avg': city_avg}
+
+    def compute_skill_analysis(self) -> Dict[str, Any]:
+        """最新数据集的技能词频，读取或统计失败时抛出异常"""
+        latest = self.list_dataset_files()[:1]
+        if not latest:
+            return {'skill_counts': {}}
+        # 技能词表 + Aho-Corasick 自动机，对标题、技能、要求、描述单次扫描；结果按数据集版本缓存
+        path = latest[0]
+        counts = get_skill_extractor().count_cached(
+            self.dataset_version(path),
+            lambda: self.read_dataset(path, list(SKILL_FIELDS))
+        )
+        return {'skill_counts': counts}
+
+
+# 全局职位数据集服务实例
+job_dataset_service = JobDatasetService()
@@ -5,10 +5,29 @@
 处理工作机会相关的业务逻辑，包括工作机会查询、申请、管理等
 """
 
+import time
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from decimal import Decimal
 
+from sqlalchemy import and_, or_
+
+# 职位列表总数缓存：按筛选条件签名缓存 COUNT 结果，避免每次翻页都全表计数
+JOB_COUNT_CACHE_TTL = 60
+_job_count_cache: Dict[Tuple[str, str, str], Tuple[float, int]] = {}
+_job_count_cache_lock = threading.Lock()
+
+# 游标中 crawl_time 为空的记录使用的占位符
+_NULL_CURSOR_TIME = '-'
+
+
+def invalidate_job_count_cache():
+    """职位数据批量变化后清空总数缓存"""
+    with _job_count_cache_lock:
+        _job_count_cache.clear()
+
+
 class JobService:
     """工作机会管理服务"""
     
@@ -26,42 +45,42 @@ class JobService:
         self.application_model = ContractApplication.get_model(db)
     
     def get_available_jobs(self, page: int = 1, per_page: int = 10, 
-                         location: str = '', job_type: str = '') -> Dict[str, Any]:
-        """获取可申请的工作机会列表"""
+                         location: str = '', job_type: str = '',
+                         match: str = 'contains', cursor: Optional[str] = None) -> Dict[str, Any]:
+        """获取可申请的工作机会列表
+        
+        Args:
+            match: 筛选方式，contains 为模糊匹配（兼容旧行为），
+                   exact 为城市 / 归一化工作类型的精确匹配，可以走索引
+            cursor: 上一页返回的 next_cursor；提供时按 (crawl_time, id) 键集分页并忽略 page
+        """
         try:
             if not self.db:
                 return {"success": False, "message": "数据库连接未初始化"}
+            if match not in ('contains', 'exact'):
+                return {"success": False, "message": f"不支持的筛选方式: {match}"}
             
-            # 构建查询
-            query = self.job_model.query.filter(
-                self.job_model.job_name.isnot(None),
-                self.job_model.job_name != ''
-            )
-            
-            # 根据位置筛选
-            if location:
-                query = query.filter(self.job_model.city.contains(location))
+            filters = self._listing_filters(location, job_type, match)
+            total = self._cached_total(filters, (match, location, job_type))
             
-            # 根据工作类型筛选
-            if job_type:
-                query = query.filter(self.job_model.job_name.contains(job_type))
-            
-            # 分页查询
-            total = query.count()
-            jobs = query.order_by(self.job_model.crawl_time.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            # 多取一条判断是否还有下一页，避免 paginate 再做一次 COUNT
+            if cursor:
+                jobs = self._keyset_page(filters, cursor, per_page + 1)
+            else:
+                jobs = self._offset_page(filters, (max(page, 1) - 1) * per_page, per_page + 1)
+            has_more = len(jobs) > per_page
+            jobs = jobs[:per_page]
             
             # 转换为前端需要的格式
             job_list = []
-            for job in jobs.items:
+            for job in jobs:
                 job_dict = {
                     'id': job.id,
                     'title': job.job_name or '未知职位',
                     'description': f"公司：{job.company or '未知公司'}",
                     'location': job.city or '未知地点',
                     'salary': self._format_salary(job.salary_low, job.salary_high),
-                    'job_type': self._determine_job_type(job.job_name),
+                    'job_type': job.job_type or self._determine_job_type(job.job_name),
                     'schedule': '工作时间面议',
                     'requirements': job.experience or '经验不限',
                     'benefits': '福利待遇面议',
@@ -77,12 +96,103 @@ class JobService:
                 "data": job_list,
                 "total": total,
                 "page": page,
-                "per_page": per_page
+                "per_page": per_page,
+                "has_more": has_more,
+                "next_cursor": self._encode_cursor(jobs[-1]) if has_more and jobs else None
             }
             
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
         except Exception as e:
             return {"success": False, "message": f"获取工作机会失败: {str(e)}"}
     
+    def _listing_filters(self, location: str, job_type: str, match: str) -> List[Any]:
+        """构建职位列表的筛选条件"""
+        model = self.job_model
+        filters = [model.job_name.isnot(None), model.job_name != '']
+        if match == 'exact':
+            if location:
+                filters.append(model.city == location)
+            if job_type:
+                filters.append(model.job_type == job_type)
+        else:
+            if location:
+                filters.append(model.city.contains(location))
+            if job_type:
+                filters.append(model.job_name.contains(job_type))
+        return filters
+    
+    def _cached_total(self, filters: List[Any], signature: Tuple[str, str, str]) -> int:
+        """按筛选条件签名返回缓存的总数，过期后重新计数"""
+        now = time.monotonic()
+        with _job_count_cache_lock:
+            cached = _job_count_cache.get(signature)
+        if cached and now - cached[0] < JOB_COUNT_CACHE_TTL:
+            return cached[1]
+        total = self.job_model.query.filter(*filters).count()
+        with _job_count_cache_lock:
+            _job_count_cache[signature] = (now, total)
+        return total
+    
+    def _listing_order(self) -> Tuple[Any, ...]:
+        """有爬取时间的记录的排序：crawl_time 倒序，再按 id 倒序
+        
+        只用列本身排序，MySQL 可以直接按 idx_job_data_crawl_time_id / idx_job_data_city_crawl_time
+        等索引的顺序读取，不需要 filesort；crawl_time 为空的记录不参与这个排序，
+        由 _null_time_rows 单独按 id 倒序取出，排在最后
+        """
+        model = self.job_model
+        return model.crawl_time.desc(), model.id.desc()
+    
+    def _dated_rows(self, filters: List[Any]):
+        model = self.job_model
+        return model.query.filter(*filters, model.crawl_time.isnot(None)).order_by(*self._listing_order())
+    
+    def _null_time_rows(self, filters: List[Any]):
+        model = self.job_model
+        return model.query.filter(*filters, model.crawl_time.is_(None)).order_by(model.id.desc())
+    
+    def _offset_page(self, filters: List[Any], offset: int, limit: int) -> List[Any]:
+        """按页码分页：先取有时间的记录，不足一页时再接着取时间为空的记录"""
+        rows = self._dated_rows(filters).offset(offset).limit(limit).all()
+        if len(rows) < limit:
+            # 本页没有取到有时间的记录时，需要知道它们的条数才能算出空时间记录的偏移
+            null_offset = 0 if rows else max(offset - self._dated_rows(filters).order_by(None).count(), 0)
+            rows.extend(self._null_time_rows(filters).offset(null_offset).limit(limit - len(rows)).all())
+        return rows
+    
+    def _keyset_page(self, filters: List[Any], cursor: str, limit: int) -> List[Any]:
+        """从游标位置继续取 limit 条，顺序与 _offset_page 相同"""
+        model = self.job_model
+        crawl_time, last_id = self._decode_cursor(cursor)
+        null_rows = self._null_time_rows(filters)
+        if crawl_time is None:
+            return null_rows.filter(model.id < last_id).limit(limit).all()
+        
+        rows = (self._dated_rows(filters)
+                .filter(or_(model.crawl_time < crawl_time,
+                            and_(model.crawl_time == crawl_time, model.id < last_id)))
+                .limit(limit)
+                .all())
+        if len(rows) < limit:
+            rows.extend(null_rows.limit(limit - len(rows)).all())
+        return rows
+    
+    @staticmethod
+    def _encode_cursor(job) -> str:
+        crawl_time = job.crawl_time.isoformat() if job.crawl_time else _NULL_CURSOR_TIME
+        return f"{crawl_time}|{job.id}"
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+        try:
+            crawl_time, last_id = cursor.rsplit('|', 1)
+            if crawl_time == _NULL_CURSOR_TIME:
+                return None, int(last_id)
+            return datetime.fromisoformat(crawl_time), int(last_id)
+        except ValueError:
+            raise ValueError(f"无效的分页游标: {cursor}")
+    
     def get_job_detail(self, job_id: int) -> Dict[str, Any]:
         """获取工作机会详情"""
         try:
@@ -246,15 +356,5 @@ class JobService:
     
     def _determine_job_type(self, job_name: Optional[str]) -> str:
         """根据职位名称确定工作类型"""
-        if not job_name:
-            return "未知"
-        
-        job_name_lower = job_name.lower()
-        if any(keyword in job_name_lower for keyword in ['兼职', 'part-time', '临时']):
-            return "兼职"
-        elif any(keyword in job_name_lower for keyword in ['全职', 'full-time', '长期']):
-            return "全职"
-        elif any(keyword in job_name_lower for keyword in ['灵活', 'flexible', '自由']):
-            return "灵活"
-        else:
-            return "全职"
+        from models.business import normalize_job_type
+        return normalize_job_type(job_name) or "未知"
@@ -0,0 +1,209 @@
+"""
+护工资源管理系统 - 平台统计快照服务
+====================================
+
+管理端统计信息（护工、用户、预约、职位数量，平均评分与时薪，数据质量分数，
+最后爬取时间）用一条聚合查询一次取回，结果作为快照缓存：
+- 快照未超过 TTL 时直接返回
+- 超过 TTL 但未超过最大陈旧时间时先返回旧快照，同时在后台刷新
+- 更旧或没有快照时同步计算，并发请求只计算一次
+- 可选：大表使用表元数据中的近似行数，避免 COUNT(*) 全表扫描
+- 数据质量分数读取数据质量服务的计数器
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+from config.settings import (
+    STATISTICS_CACHE_TTL, STATISTICS_MAX_STALE,
+    STATISTICS_APPROXIMATE_COUNTS, STATISTICS_APPROXIMATE_MIN_ROWS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StatisticsService:
+    """平台统计快照服务"""
+
+    def __init__(self, db=None, ttl: int = STATISTICS_CACHE_TTL, max_stale: int = STATISTICS_MAX_STALE,
+                 approximate_counts: bool = STATISTICS_APPROXIMATE_COUNTS,
+                 approximate_min_rows: int = STATISTICS_APPROXIMATE_MIN_ROWS):
+        self.db = db
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self.approximate_counts = approximate_counts
+        self.approximate_min_rows = approximate_min_rows
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._taken_at = 0.0
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._refreshing = False
+
+    def set_db(self, db):
+        """设置数据库连接"""
+        self.db = db
+
+    def _get_db(self):
+        if self.db is None:
+            from extensions import db
+            return db
+        return self.db
+
+    # ---- 快照 ----
+
+    def snapshot(self, app=None, force: bool = False) -> Dict[str, Any]:
+        """返回统计快照，附带 snapshot_age（秒）与 stale 标记
+
+        Args:
+            app: Flask 应用，后台刷新时使用；默认取当前应用
+            force: 忽略缓存，立即重新计算
+        """
+        with self._lock:
+            snapshot, taken_at = self._snapshot, self._taken_at
+        age = time.monotonic() - taken_at
+        if snapshot is not None and not force:
+            if age < self.ttl:
+                return self._present(snapshot, age, stale=False)
+            if age < self.max_stale:
+                self._refresh_in_background(app)
+                return self._present(snapshot, age, stale=True)
+        return self._present(self.refresh(since=None if force else taken_at), 0.0, stale=False)
+
+    def refresh(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """重新计算快照；since 之后已经有其它线程刷新过时直接复用"""
+        with self._compute_lock:
+            with self._lock:
+                if since is not None and self._snapshot is not None and self._taken_at > since:
+                    return self._snapshot
+            snapshot = self.compute()
+            with self._lock:
+                self._snapshot = snapshot
+                self._taken_at = time.monotonic()
+            return snapshot
+
+    def invalidate(self):
+        """清空快照，下次请求同步重新计算"""
+        with self._lock:
+            self._snapshot = None
+            self._taken_at = 0.0
+
+    def _present(self, snapshot: Dict[str, Any], age: float, stale: bool) -> Dict[str, Any]:
+        return dict(snapshot, snapshot_age=round(age, 1), stale=stale)
+
+    def _refresh_in_background(self, app=None):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        if app is None:
+            from flask import current_app
+            app = current_app._get_current_object()
+
+        def run():
+            try:
+                with app.app_context():
+                    self.refresh()
+            except Exception as e:
+                logger.error(f"❌ 统计快照后台刷新失败: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+        threading.Thread(target=run, name='statistics-refresh', daemon=True).start()
+
+    # ---- 计算 ----
+
+    def compute(self) -> Dict[str, Any]:
+        """一次往返取回全部统计"""
+        from sqlalchemy import select, func, literal
+        from models import User, Caregiver, Appointment, JobData
+
+        db = self._get_db()
+        CaregiverModel = Caregiver.get_model(db)
+        UserModel = User.get_model(db)
+        AppointmentModel = Appointment.get_model(db)
+        JobDataModel = JobData.get_model(db)
+
+        # 护工表本身要做 AVG 扫描，计数总是精确值；其余表可以使用近似行数
+        approximate = self._approximate_row_counts(
+            [UserModel.__tablename__, AppointmentModel.__tablename__, JobDataModel.__tablename__]
+        )
+
+        def row_count(model):
+            if model.__tablename__ in approximate:
+                return literal(approximate[model.__tablename__])
+            return select(func.count()).select_from(model).scalar_subquery()
+
+        stmt = select(
+            func.count().label('total_caregivers'),
+            func.avg(CaregiverModel.rating).label('avg_rating'),
+            func.avg(CaregiverModel.hourly_rate).label('avg_hourly_rate'),
+            row_count(UserModel).label('total_users'),
+            row_count(AppointmentModel).label('total_appointments'),
+            row_count(JobDataModel).label('total_jobs_crawled'),
+            select(func.max(JobDataModel.crawl_time)).scalar_subquery().label('last_crawl_time')
+        ).select_from(CaregiverModel)
+
+        started = time.monotonic()
+        row = db.session.execute(stmt).one()
+        total_caregivers = int(row.total_caregivers or 0)
+        last_crawl_time = row.last_crawl_time
+        if isinstance(last_crawl_time, str):  # SQLite 的标量子查询不带类型信息
+            last_crawl_time = datetime.fromisoformat(last_crawl_time)
+
+        snapshot = {
+            'total_caregivers': total_caregivers,
+            'total_users': int(row.total_users or 0),
+            'total_appointments': int(row.total_appointments or 0),
+            'total_jobs_crawled': int(row.total_jobs_crawled or 0),
+            'avg_rating': round(float(row.avg_rating or 0), 2),
+            'avg_hourly_rate': round(float(row.avg_hourly_rate or 0), 2),
+            'data_quality_score': round(self._data_quality_score(), 2),
+            'last_crawl_time': last_crawl_time.isoformat() if last_crawl_time else None,
+            'approximate_counts': sorted(approximate),
+            'generated_at': datetime.now().isoformat(),
+            'query_time': round(time.monotonic() - started, 4)
+        }
+        logger.info(f"📊 统计快照已刷新，查询耗时 {snapshot['query_time']} 秒")
+        return snapshot
+
+    def _data_quality_score(self) -> float:
+        """数据质量分数读取增量维护的计数器，不再扫描护工表"""
+        try:
+            from services.data_quality_service import data_quality_service
+            if data_quality_service.counter_model is None:
+                data_quality_service.set_db(self._get_db())
+            return data_quality_service.overall_score()
+        except Exception as e:
+            logger.warning(f"⚠️ 读取数据质量分数失败: {str(e)}")
+            return 0.0
+
+    def _approximate_row_counts(self, tables: List[str]) -> Dict[str, int]:
+        """表元数据中的近似行数，只返回超过阈值的表；不支持的数据库返回空"""
+        if not self.approximate_counts:
+            return {}
+        db = self._get_db()
+        dialect = db.engine.dialect.name
+        if dialect == 'mysql':
+            sql = ("SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :tables")
+        elif dialect == 'postgresql':
+            sql = "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relname IN :tables"
+        else:
+            return {}
+        try:
+            from sqlalchemy import bindparam
+            rows = db.session.execute(
+                db.text(sql).bindparams(bindparam('tables', expanding=True)), {'tables': tables}
+            ).all()
+        except Exception as e:
+            logger.warning(f"⚠️ 读取近似行数失败，使用精确计数: {str(e)}")
+            return {}
+        return {name: int(count) for name, count in rows
+                if count is not None and int(count) >= self.approximate_min_rows}
+
+
+# 全局统计快照服务实例
+statistics_service = StatisticsService()
@@ -0,0 +1,45 @@
+"""
+测试共用的 Flask 应用与数据库
+====================================
+
+模型类在第一次 get_model 时绑定到传入的 db 并被缓存，各测试模块必须共用同一个
+SQLAlchemy 实例，这里在第一次调用时创建应用、注册全部模型并建表（临时 SQLite 文件）。
+"""
+
+import os
+import sys
+import atexit
+import tempfile
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACK_DIR)
+sys.path.insert(0, os.path.dirname(BACK_DIR))
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+import extensions
+
+_app = None
+
+
+def get_test_app():
+    """返回 (app, db)，同一进程内只创建一次"""
+    global _app
+    if _app is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        atexit.register(tmp_dir.cleanup)
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp_dir.name, 'test.db')
+        db = SQLAlchemy(app)
+        extensions.db = db
+
+        from models import User, Caregiver, Appointment, JobData
+        from models.caregiver_hire_info import CaregiverHireInfo
+
+        with app.app_context():
+            for model in (User, Caregiver, Appointment, JobData, CaregiverHireInfo):
+                model.get_model(db)
+            db.create_all()
+        _app = app, db
+    return _app
@@ -0,0 +1,99 @@
+"""
+数据质量服务测试
+====================================
+
+增量计数器（ORM 写入事件）与全表重建的结果必须一致，
+包括提交后属性已过期的对象再被修改、删除的情况；读取报告不重建计数器、不写历史。
+"""
+
+import unittest
+from itertools import count
+
+from support import get_test_app
+
+
+class DataQualityCounterTest(unittest.TestCase):
+
+    # 手机号唯一，各测试共用一个序号
+    _phone_seq = count()
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app, cls.db = get_test_app()
+
+        from models import Caregiver
+        from services.data_quality_service import DataQualityService
+
+        with cls.app.app_context():
+            cls.Caregiver = Caregiver.get_model(cls.db)
+            cls.service = DataQualityService()
+            cls.service.set_db(cls.db)
+
+    def setUp(self):
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.context.pop()
+
+    def _add_caregivers(self, prefix: str, rows: int):
+        for i in range(rows):
+            seq = next(self._phone_seq)
+            self.db.session.add(self.Caregiver(
+                name=f'{prefix}{i}', phone=f'1380000{seq:04d}' if i % 2 else f'bad{seq}', password_hash='x',
+                rating=2 + i % 4, hourly_rate=(20 + i * 3) if i % 3 else None, age=30 if i % 4 else 100,
+                email='a@b' if i % 2 else ' '
+            ))
+        self.db.session.commit()
+
+    def _assert_counters_match_rebuild(self):
+        incremental = self.service.report(with_history=False)['tables']['caregiver']
+        rebuilt = self.service.rebuild(['caregiver'], record_history=False)['tables']['caregiver']
+        self.assertEqual(incremental['rows'], rebuilt['rows'])
+        self.assertEqual(incremental['columns'], rebuilt['columns'])
+
+    def test_updates_after_commit_match_rebuild(self):
+        self._add_caregivers('update', 8)
+        self.service.rebuild(['caregiver'], record_history=False)
+
+        caregivers = self.Caregiver.query.filter(self.Caregiver.name.like('update%')).all()
+        self.db.session.commit()  # 提交后属性全部过期，旧值不在 history 中
+        caregivers[0].phone = '13811112222'
+        caregivers[1].phone = 'invalid'
+        caregivers[2].age = None
+        caregivers[3].email = 'x@y'
+        self.db.session.commit()
+
+        caregivers[0].age = 25
+        caregivers[1].hourly_rate = None
+        self.db.session.commit()
+        self._assert_counters_match_rebuild()
+
+    def test_inserts_and_deletes_match_rebuild(self):
+        self._add_caregivers('insert', 6)
+        self.service.rebuild(['caregiver'], record_history=False)
+
+        self._add_caregivers('extra', 4)
+        for caregiver in self.Caregiver.query.filter(self.Caregiver.name.like('insert%')).limit(2):
+            self.db.session.delete(caregiver)
+        self.db.session.commit()
+        self._assert_counters_match_rebuild()
+
+    def test_report_does_not_rebuild_or_write_history(self):
+        self.service.rebuild(['caregiver'], record_history=False)
+        Counter, History = self.service.counter_model, self.service.history_model
+        Counter.query.filter_by(table_name='appointment').delete()
+        self.db.session.commit()
+        history_rows = History.query.count()
+
+        report = self.service.report(history_days=1)
+        self.assertIn('appointment', report['uninitialized_tables'])
+        self.assertNotIn('appointment', report['tables'])
+        self.assertIn('caregiver', report['tables'])
+        self.assertEqual(Counter.query.filter_by(table_name='appointment').count(), 0)
+        self.assertEqual(History.query.count(), history_rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+职位列表分页测试
+====================================
+
+列表按 crawl_time、id 倒序，爬取时间为空的记录排在最后；
+页码分页与游标分页的结果一致，且排序只用列本身，可以直接按索引顺序读取。
+"""
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import mysql
+
+from support import get_test_app
+
+
+class JobListingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app, cls.db = get_test_app()
+
+        from models import JobData
+        from services.job_service import JobService, invalidate_job_count_cache
+
+        with cls.app.app_context():
+            cls.Job = JobData.get_model(cls.db)
+            cls.service = JobService(cls.db)
+            cls.service.set_db(cls.db)
+            cls.Job.query.delete()
+            base = datetime(2025, 1, 1)
+            for i in range(1, 31):
+                cls.db.session.add(cls.Job(
+                    id=i, job_name='养老护理员', company=f'养老院{i}', city='北京' if i % 2 else '上海',
+                    crawl_time=None if i % 4 == 0 else base + timedelta(days=i % 5)
+                ))
+            cls.db.session.commit()
+        invalidate_job_count_cache()
+
+    def setUp(self):
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.context.pop()
+
+    def _expected_ids(self, city=None):
+        jobs = [job for job in self.Job.query.all() if city is None or job.city == city]
+        dated = sorted((job for job in jobs if job.crawl_time), key=lambda job: (job.crawl_time, job.id), reverse=True)
+        undated = sorted((job.id for job in jobs if not job.crawl_time), reverse=True)
+        return [job.id for job in dated] + undated
+
+    def test_offset_and_cursor_pages_follow_listing_order(self):
+        for location, match in (('', 'contains'), ('北京', 'exact')):
+            expected = self._expected_ids(location or None)
+
+            offset_ids, page = [], 1
+            while True:
+                result = self.service.get_available_jobs(page=page, per_page=4, location=location, match=match)
+                offset_ids += [job['id'] for job in result['data']]
+                if not result['has_more']:
+                    break
+                page += 1
+
+            cursor_ids, cursor = [], None
+            while True:
+                result = self.service.get_available_jobs(per_page=4, location=location, match=match, cursor=cursor)
+                cursor_ids += [job['id'] for job in result['data']]
+                cursor = result['next_cursor']
+                if not cursor:
+                    break
+
+            self.assertEqual(offset_ids, expected)
+            self.assertEqual(cursor_ids, expected)
+
+    def test_order_by_uses_columns_only(self):
+        filters = self.service._listing_filters('北京', '', 'exact')
+        sql = str(self.service._dated_rows(filters).statement.compile(dialect=mysql.dialect()))
+        self.assertIn('ORDER BY job_data.crawl_time DESC, job_data.id DESC', sql)
+        self.assertNotIn('IS NULL', sql.split('ORDER BY', 1)[1])
+
+    def test_listing_order_reads_index_without_sorting(self):
+        for location in ('', '北京'):
+            filters = self.service._listing_filters(location, '', 'exact')
+            statement = self.service._dated_rows(filters).limit(5).statement
+            compiled = statement.compile(dialect=self.db.engine.dialect, compile_kwargs={'literal_binds': True})
+            plan = ' '.join(str(row[-1]) for row in
+                            self.db.session.execute(self.db.text(f'EXPLAIN QUERY PLAN {compiled}')))
+            self.assertIn('USING INDEX idx_job_data_', plan)
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,28 @@
 ====================================
 
 实现动态数据分析，每次导入新数据时自动触发分析
+
+提供结果存储（get/put 接口，如 AnalysisResultService）时，分析结果按输入文件的版本保存，
+所有工作进程读取同一份结果，输入文件变化后旧结果不再返回；未提供时写入本地 JSON 文件。
+
+各项分析组成一个有向无环图（ANALYSIS_NODES）：每个节点声明读取的输入与依赖的节点，
+节点指纹由输入文件指纹与依赖节点的指纹组成。每次触发只重新计算指纹变化的节点，
+只加载这些节点需要的输入，其余节点复用缓存结果；运行报告（run_report）列出每个节点
+是重新计算还是复用，以及原因。
+
+需要重新计算的节点在进程池中并行执行（StageRunner）：输入数据以 Arrow 文件放在共享内存中，
+每个节点有独立的超时，声明了依赖的节点等依赖完成后再开始；完整运行的耗时接近最慢的节点。
+
+护工分群（cluster_analysis）使用增量的 MiniBatchKMeans（见 segmentation.py），分群结果按护工保存，
+可通过 caregiver_segment 查询。
 """
 
 import os
+import copy
 import json
+import hashlib
 import logging
+from functools import partial
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
@@ -20,11 +37,10 @@ except ImportError:
     HAS_PANDAS = False
 
 try:
-    from sklearn.cluster import KMeans
     from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
     from sklearn.model_selection import train_test_split
     from sklearn.metrics import mean_squared_error, accuracy_score
-    from sklearn.preprocessing import StandardScaler, LabelEncoder
+    from sklearn.preprocessing import StandardScaler
     import joblib
     HAS_SKLEARN = True
 except ImportError:
@@ -52,18 +68,195 @@ except ImportError:
     }
     HAS_CONFIG = True
 
+try:
+    from bigdata.processing.categorical_encoder import CategoricalEncoder, CATEGORICAL_DTYPES
+    HAS_CATEGORICAL_ENCODER = True
+except ImportError:
+    HAS_CATEGORICAL_ENCODER = False
+
+try:
+    from bigdata.processing.frame_loader import FrameLoader, memory_usage
+    HAS_FRAME_LOADER = True
+except ImportError:
+    HAS_FRAME_LOADER = False
+
+try:
+    from bigdata.processing.event_log import EventLog
+    HAS_EVENT_LOG = True
+except ImportError:
+    HAS_EVENT_LOG = False
+
+try:
+    from bigdata.analysis.model_registry import ModelRegistry, RegisteredModels
+    HAS_MODEL_REGISTRY = True
+except ImportError:
+    HAS_MODEL_REGISTRY = False
+
+try:
+    from bigdata.analysis.segmentation import CaregiverSegmenter, SegmentAssignments, MODE_ASSIGN
+    HAS_SEGMENTATION = True
+except ImportError:
+    HAS_SEGMENTATION = False
+
+try:
+    from bigdata.processing.binning import bin_counts, CAREGIVER_SALARY_BANDS, RATING_BANDS
+    HAS_BINNING = True
+except ImportError:
+    HAS_BINNING = False
+
+try:
+    from bigdata.processing.salary_normalizer import normalize_salaries, SALARY_OK
+    HAS_SALARY_NORMALIZER = True
+except ImportError:
+    HAS_SALARY_NORMALIZER = False
+
+try:
+    from bigdata.analysis.stage_runner import StageRunner, Stage, HAS_PYARROW, STATUS_OK
+    HAS_STAGE_RUNNER = HAS_PYARROW
+except ImportError:
+    HAS_STAGE_RUNNER = False
+
 logger = logging.getLogger(__name__)
 
+# 并行执行配置：进程数（1 为在当前进程中依次执行）、每个节点的默认超时（秒）、进程启动方式
+ANALYSIS_WORKERS = int(ML_CONFIG.get('ANALYSIS_WORKERS', os.cpu_count() or 1))
+ANALYSIS_STAGE_TIMEOUT = float(ML_CONFIG.get('ANALYSIS_STAGE_TIMEOUT', 300))
+ANALYSIS_MP_CONTEXT = ML_CONFIG.get('ANALYSIS_MP_CONTEXT')
+
+# 结果存储中的分析类型
+DYNAMIC_ANALYSIS_TYPE = 'dynamic_analysis'
+DYNAMIC_NODE_TYPE = 'dynamic_node'
+
+# 分群中心漂移超过该值（标准差）时完整重新训练
+SEGMENT_DRIFT_THRESHOLD = float(ML_CONFIG.get('SEGMENT_DRIFT_THRESHOLD', 0.5))
+
+# 分类特征词表文件（与模型保存在同一目录）
+ENCODER_VOCABULARY_FILE = 'categorical_vocabularies.json'
+
+# 模型注册表目录（模型目录下）、每个模型保留的版本数
+MODEL_REGISTRY_DIR = 'registry'
+MODEL_KEEP_VERSIONS = int(ML_CONFIG.get('MODEL_KEEP_VERSIONS', 5))
+# 标准化器在注册表中的名称前缀
+SCALER_PREFIX = 'scaler_'
+# 注册表之前按固定文件名保存的模型，首次启动时导入注册表
+LEGACY_MODEL_FILES = {
+    'success_prediction': 'success_prediction_model.pkl',
+    'segmentation': 'segmentation_model.pkl',
+    'demand_prediction': 'demand_prediction_model.pkl',
+    SCALER_PREFIX + 'main': 'main.pkl'
+}
+
+# 分析结果历史与导入日志（追加写 JSONL，按大小轮转）
+ANALYSIS_LOG_NAME = 'analysis_results'
+IMPORT_LOG_NAME = 'import_log'
+ANALYSIS_LOG_MAX_BYTES = int(ML_CONFIG.get('ANALYSIS_LOG_MAX_BYTES', 16 * 1024 * 1024))
+
+# 非文件输入：需求预测按月滚动，月份变化时重新计算
+MONTH_INPUT = 'month'
+
+
+class AnalysisNode:
+    """分析图中的一个节点
+
+    Args:
+        name: 节点名，也是结果中的键
+        method: DynamicAnalyzer 上的分析方法名，参数为加载好的输入数据
+        inputs: 读取的输入（load_latest_data 中的数据名，或 MONTH_INPUT）
+        after: 依赖的节点，依赖节点重新计算后本节点也重新计算
+        trains_model: 是否训练模型，只有训练过模型时才保存模型文件
+        version: 计算逻辑版本，修改分析方法后提高以使缓存失效
+        columns: 列清单，输入 -> 分析用到的列；未列出的输入读取全部列
+    """
+
+    __slots__ = ('name', 'method', 'inputs', 'after', 'trains_model', 'version', 'columns')
+
+    def __init__(self, name: str, method: str, inputs: List[str], after: Optional[List[str]] = None,
+                 trains_model: bool = False, version: int = 1, columns: Optional[Dict[str, List[str]]] = None):
+        self.name = name
+        self.method = method
+        self.inputs = inputs
+        self.after = after or []
+        self.trains_model = trains_model
+        self.version = version
+        self.columns = columns or {}
+
+
+RAW_CSV_INPUTS = ['raw_caregiver_jobs_5000', 'raw_caregiver_jobs_50000']
+
+# 护工特征列
+CAREGIVER_FEATURE_COLUMNS = ['age_clean', 'hourly_rate_clean', 'rating_clean']
+
+# 按拓扑顺序排列
+ANALYSIS_NODES = [
+    AnalysisNode('caregiver_distribution', 'analyze_caregiver_distribution', ['caregivers'],
+                 columns={'caregivers': ['city', 'hourly_rate_clean', 'rating_clean']}),
+    AnalysisNode('success_prediction', 'predict_success_rate', ['caregivers'], trains_model=True,
+                 columns={'caregivers': CAREGIVER_FEATURE_COLUMNS}),
+    AnalysisNode('cluster_analysis', 'cluster_analysis', ['caregivers'], trains_model=True, version=2,
+                 columns={'caregivers': ['id'] + CAREGIVER_FEATURE_COLUMNS}),
+    AnalysisNode('market_trends', 'analyze_market_trends', ['crawled'] + RAW_CSV_INPUTS,
+                 columns={'crawled': ['city', 'salary_avg_clean'], **{name: ['salary'] for name in RAW_CSV_INPUTS}}),
+    AnalysisNode('demand_forecast', 'predict_demand', [MONTH_INPUT]),
+]
+
+
+def manifest_columns(nodes: List[AnalysisNode], name: str) -> Optional[List[str]]:
+    """读取输入 name 的节点用到的列的并集；任一节点未声明该输入的列时返回 None（读取全部列）"""
+    columns = []
+    for node in nodes:
+        if name not in node.inputs:
+            continue
+        if name not in node.columns:
+            return None
+        columns.extend(column for column in node.columns[name] if column not in columns)
+    return columns
+
+
+def _run_analysis_node(analyzer: 'DynamicAnalyzer', method: str, trains_model: bool,
+                       data: Dict[str, Any]) -> Dict[str, Any]:
+    """工作进程中执行一个分析节点；训练模型的节点同时返回训练后的模型，由主进程合并"""
+    result = getattr(analyzer, method)(data)
+    state = analyzer._model_state() if trains_model else None
+    return {'result': result, 'state': state}
+
+
+def _changed_models(models) -> Dict[str, Any]:
+    """注册表模型集合中新训练的模型；注册表不可用时模型集合是普通字典"""
+    return models.changed() if HAS_MODEL_REGISTRY and isinstance(models, RegisteredModels) else dict(models)
+
+
 class DynamicAnalyzer:
-    """动态数据分析器"""
+    """动态数据分析器
     
-    def __init__(self):
+    Args:
+        result_store: 可选的分析结果存储，需要提供 get(type, params, version) 与 put(type, params, version, result)
+        workers: 并行执行分析节点的进程数，1 时在当前进程中依次执行
+        stage_timeouts: 按节点覆盖超时（秒），未指定的节点使用 ANALYSIS_STAGE_TIMEOUT
+    """
+    
+    def __init__(self, result_store=None, workers: int = ANALYSIS_WORKERS,
+                 stage_timeouts: Optional[Dict[str, float]] = None):
         self.models = {}
         self.scalers = {}
-        self.encoders = {}
+        self.model_registry = None
+        # 本次训练的模型元数据（特征、指标、样本数），注册模型时写入
+        self.training_metadata: Dict[str, Dict[str, Any]] = {}
+        self.encoders = CategoricalEncoder() if HAS_CATEGORICAL_ENCODER else None
         self.analysis_cache = {}
+        self.analysis_cache_version = None
         self.last_analysis_time = None
         self.data_version = 0
+        self.result_store = result_store
+        self.node_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self.workers = workers
+        self.stage_timeouts = stage_timeouts or {}
+        self.stage_runner = None
+        self.segment_assignments = None
+        self.frame_loader = None
+        self.analysis_log = None
+        self.import_log = None
+        # 最近一次加载的各输入：行数、列数、内存占用、来源
+        self.last_load_report: Dict[str, Dict[str, Any]] = {}
         
         # 检查依赖
         self.has_pandas = HAS_PANDAS
@@ -82,6 +275,14 @@ class DynamicAnalyzer:
         if self.has_sklearn:
             self._load_models()
     
+    def __getstate__(self):
+        # 发往工作进程时不带结果存储（数据库连接）与缓存
+        state = self.__dict__.copy()
+        for key in ('result_store', 'node_cache', 'analysis_cache', 'stage_runner', 'segment_assignments',
+                    'analysis_log', 'import_log'):
+            state[key] = None
+        return state
+    
     def _create_directories(self):
         """创建必要的目录"""
         directories = [
@@ -95,88 +296,152 @@ class DynamicAnalyzer:
             os.makedirs(directory, exist_ok=True)
     
     def _load_models(self):
-        """加载已保存的模型"""
+        """打开模型注册表；模型在第一次使用时才加载发布的版本"""
         try:
             model_dir = os.path.join(DATA_PATHS['MODELS'], 'dynamic')
             
-            # 加载成功率预测模型
-            success_model_path = os.path.join(model_dir, 'success_prediction_model.pkl')
-            if os.path.exists(success_model_path):
-                self.models['success_prediction'] = joblib.load(success_model_path)
-                logger.info("✅ 成功率预测模型加载成功")
-            
-            # 加载聚类模型
-            cluster_model_path = os.path.join(model_dir, 'cluster_model.pkl')
-            if os.path.exists(cluster_model_path):
-                self.models['clustering'] = joblib.load(cluster_model_path)
-                logger.info("✅ 聚类模型加载成功")
-            
-            # 加载需求预测模型
-            demand_model_path = os.path.join(model_dir, 'demand_prediction_model.pkl')
-            if os.path.exists(demand_model_path):
-                self.models['demand_prediction'] = joblib.load(demand_model_path)
-                logger.info("✅ 需求预测模型加载成功")
-            
-            # 加载标准化器
-            scaler_path = os.path.join(model_dir, 'scaler.pkl')
-            if os.path.exists(scaler_path):
-                self.scalers['main'] = joblib.load(scaler_path)
-                logger.info("✅ 标准化器加载成功")
+            if HAS_MODEL_REGISTRY:
+                self.model_registry = ModelRegistry(os.path.join(model_dir, MODEL_REGISTRY_DIR))
+                self.models = RegisteredModels(self.model_registry)
+                self.scalers = RegisteredModels(self.model_registry, prefix=SCALER_PREFIX)
+                self._import_legacy_models(model_dir)
+                logger.info(f"✅ 模型注册表已打开，已发布模型: {self.model_registry.names() or '无'}")
+            
+            # 加载分类特征词表
+            if HAS_CATEGORICAL_ENCODER:
+                self.encoders = CategoricalEncoder.load(os.path.join(model_dir, ENCODER_VOCABULARY_FILE))
             
         except Exception as e:
             logger.error(f"❌ 模型加载失败: {str(e)}")
     
-    def _save_models(self):
-        """保存模型"""
+    def _import_legacy_models(self, model_dir: str):
+        """把按固定文件名保存的旧模型导入注册表并发布（注册表中已有该模型时跳过）"""
+        for name, filename in LEGACY_MODEL_FILES.items():
+            path = os.path.join(model_dir, filename)
+            if not os.path.exists(path) or self.model_registry.promoted_version(name) is not None:
+                continue
+            try:
+                self.model_registry.register_and_promote(name, joblib.load(path), {'source': f'legacy:{filename}'})
+            except Exception as e:
+                logger.warning(f"⚠️ 旧模型导入失败 {filename}: {str(e)}")
+    
+    def _record_training(self, name: str, inputs: List[str], features: List[str],
+                         metrics: Dict[str, Any], rows: int):
+        """记录模型本次训练的元数据，注册模型版本时写入"""
+        self.training_metadata[name] = {
+            'inputs': inputs,
+            'features': list(features),
+            'metrics': metrics,
+            'training_rows': int(rows),
+            'trained_at': datetime.now().isoformat()
+        }
+    
+    def _save_models(self, fingerprints: Optional[Dict[str, str]] = None):
+        """注册本次训练的模型并发布；内容未变化的模型沿用已有版本"""
         try:
             model_dir = os.path.join(DATA_PATHS['MODELS'], 'dynamic')
-            
-            for model_name, model in self.models.items():
-                model_path = os.path.join(model_dir, f'{model_name}_model.pkl')
-                joblib.dump(model, model_path)
-            
-            for scaler_name, scaler in self.scalers.items():
-                scaler_path = os.path.join(model_dir, f'{scaler_name}.pkl')
-                joblib.dump(scaler, scaler_path)
+            fingerprints = fingerprints or {}
+            
+            if self.model_registry is not None:
+                changed = self.models.changed()
+                changed.update({SCALER_PREFIX + name: scaler for name, scaler in self.scalers.changed().items()})
+                for name, model in changed.items():
+                    metadata = dict(self.training_metadata.get(name, {}))
+                    metadata['data_fingerprint'] = {key: fingerprints.get(key) for key in metadata.get('inputs', [])}
+                    version = self.model_registry.register_and_promote(name, model, metadata)
+                    self.model_registry.prune(name, keep=MODEL_KEEP_VERSIONS)
+                    logger.info(f"📊 模型 {name} 当前版本: {version}")
+                self.models.mark_saved()
+                self.scalers.mark_saved()
+                self.training_metadata = {}
+            
+            if self.encoders is not None:
+                self.encoders.save(os.path.join(model_dir, ENCODER_VOCABULARY_FILE))
             
             logger.info("✅ 模型保存成功")
             
         except Exception as e:
             logger.error(f"❌ 模型保存失败: {str(e)}")
     
-    def load_latest_data(self) -> Dict[str, Any]:
-        """加载最新的数据"""
+    def list_models(self) -> Dict[str, Any]:
+        """各模型发布的版本与全部版本的元数据"""
+        if self.model_registry is None:
+            return {}
+        return {name: {'promoted': self.model_registry.promoted_version(name),
+                       'versions': self.model_registry.versions(name)}
+                for name in self.model_registry.names()}
+    
+    def promote_model(self, name: str, version: str) -> Dict[str, Any]:
+        """发布模型的指定版本（如回退到旧版本），各进程下次使用该模型时读取新版本"""
+        if self.model_registry is None:
+            raise ValueError('模型注册表不可用')
+        return self.model_registry.promote(name, version)
+    
+    def _input_files(self) -> List[tuple]:
+        """分析输入文件：(数据名, 路径, 格式)，只返回存在的文件"""
+        files = [
+            ('caregivers', os.path.join(DATA_PATHS['PROCESSED_DATA'], 'caregiver_features.parquet'), 'parquet'),
+            ('crawled', os.path.join(DATA_PATHS['PROCESSED_DATA'], 'crawled_data_clean.parquet'), 'parquet'),
+        ]
+        for csv_file in ['caregiver_jobs_5000.csv', 'caregiver_jobs_50000.csv']:
+            csv_path = os.path.join(os.path.dirname(DATA_PATHS['RAW_DATA']), csv_file)
+            files.append((f'raw_{csv_file.replace(".csv", "")}', csv_path, 'csv'))
+        return [(name, path, kind) for name, path, kind in files if os.path.exists(path)]
+    
+    def input_fingerprints(self) -> Dict[str, str]:
+        """各输入的指纹：文件按大小与修改时间，月份输入为当前月份；不存在的文件不出现"""
+        fingerprints = {}
+        for name, path, _ in self._input_files():
+            stat = os.stat(path)
+            fingerprints[name] = hashlib.sha1(f'{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8')).hexdigest()
+        fingerprints[MONTH_INPUT] = datetime.now().strftime('%Y-%m')
+        return fingerprints
+    
+    def input_version(self) -> str:
+        """全部输入的版本，任一输入变化时随之变化"""
+        fingerprints = self.input_fingerprints()
+        digest = hashlib.sha1()
+        for name in sorted(fingerprints):
+            digest.update(f'{name}:{fingerprints[name]};'.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def load_latest_data(self, names: Optional[List[str]] = None,
+                         nodes: Optional[List[AnalysisNode]] = None) -> Dict[str, Any]:
+        """加载最新的数据
+        
+        Args:
+            names: 只加载这些输入，None 表示全部
+            nodes: 只读取这些节点列清单中的列（CSV 缓存保存全部节点用到的列），None 表示读取全部列
+        """
         try:
             data = {}
+            self.last_load_report = {}
             
             if not self.has_pandas:
                 logger.warning("⚠️ pandas未安装，无法加载数据")
                 return {}
             
-            # 加载护工数据
-            caregiver_file = os.path.join(DATA_PATHS['PROCESSED_DATA'], 'caregiver_features.parquet')
-            if os.path.exists(caregiver_file):
-                data['caregivers'] = pd.read_parquet(caregiver_file)
-                logger.info(f"✅ 护工数据加载成功: {len(data['caregivers'])} 条记录")
-            
-            # 加载爬虫数据
-            crawled_file = os.path.join(DATA_PATHS['PROCESSED_DATA'], 'crawled_data_clean.parquet')
-            if os.path.exists(crawled_file):
-                data['crawled'] = pd.read_parquet(crawled_file)
-                logger.info(f"✅ 爬虫数据加载成功: {len(data['crawled'])} 条记录")
-            
-            # 加载原始CSV数据
-            csv_files = [
-                'caregiver_jobs_5000.csv',
-                'caregiver_jobs_50000.csv'
-            ]
-            
-            for csv_file in csv_files:
-                csv_path = os.path.join(os.path.dirname(DATA_PATHS['RAW_DATA']), csv_file)
-                if os.path.exists(csv_path):
-                    df = pd.read_csv(csv_path)
-                    data[f'raw_{csv_file.replace(".csv", "")}'] = df
-                    logger.info(f"✅ 原始数据加载成功: {csv_file} - {len(df)} 条记录")
+            for name, path, kind in self._input_files():
+                if names is not None and name not in names:
+                    continue
+                if HAS_FRAME_LOADER:
+                    if self.frame_loader is None:
+                        self.frame_loader = FrameLoader(os.path.join(DATA_PATHS['PROCESSED_DATA'], 'frame_cache'))
+                    columns = manifest_columns(nodes, name) if nodes is not None else None
+                    data[name], source = self.frame_loader.load(
+                        name, path, kind, columns=columns,
+                        cache_columns=manifest_columns(ANALYSIS_NODES, name) if nodes is not None else None)
+                    self.last_load_report[name] = {
+                        'rows': len(data[name]),
+                        'columns': len(data[name].columns),
+                        'memory_bytes': memory_usage(data[name]),
+                        'source': source
+                    }
+                elif kind == 'parquet':
+                    data[name] = pd.read_parquet(path)
+                else:
+                    data[name] = pd.read_csv(path)
+                logger.info(f"✅ 数据加载成功: {os.path.basename(path)} - {len(data[name])} 条记录")
             
             return data
             
@@ -194,25 +459,9 @@ class DynamicAnalyzer:
             numeric_columns = features_df.select_dtypes(include=[np.number]).columns
             features_df[numeric_columns] = features_df[numeric_columns].fillna(0)
             
-            # 处理分类变量
-            categorical_columns = features_df.select_dtypes(include=['object']).columns
-            for col in categorical_columns:
-                if col not in self.encoders:
-                    self.encoders[col] = LabelEncoder()
-                    features_df[col] = self.encoders[col].fit_transform(features_df[col].astype(str))
-                else:
-                    # 处理新出现的类别
-                    unique_values = set(features_df[col].astype(str).unique())
-                    known_values = set(self.encoders[col].classes_)
-                    new_values = unique_values - known_values
-                    
-                    if new_values:
-                        # 添加新类别
-                        all_values = list(known_values) + list(new_values)
-                        self.encoders[col].classes_ = np.array(all_values)
-                        features_df[col] = self.encoders[col].transform(features_df[col].astype(str))
-                    else:
-                        features_df[col] = self.encoders[col].transform(features_df[col].astype(str))
+            # 处理分类变量：按持久化的词表整列编码，新类别追加新编码，已有类别的编码不变
+            categorical_columns = list(features_df.select_dtypes(include=CATEGORICAL_DTYPES).columns)
+            features_df = self.encoders.fit_transform(features_df, categorical_columns)
             
             return features_df
             
@@ -235,29 +484,14 @@ class DynamicAnalyzer:
             # 地域分布
             location_dist = df['city'].value_counts().to_dict() if 'city' in df.columns else {}
             
-            # 薪资分布
-            if 'hourly_rate_clean' in df.columns:
-                salary_ranges = {
-                    '2000-3000': len(df[(df['hourly_rate_clean'] >= 2000) & (df['hourly_rate_clean'] < 3000)]),
-                    '3000-5000': len(df[(df['hourly_rate_clean'] >= 3000) & (df['hourly_rate_clean'] < 5000)]),
-                    '5000-8000': len(df[(df['hourly_rate_clean'] >= 5000) & (df['hourly_rate_clean'] < 8000)]),
-                    '8000-12000': len(df[(df['hourly_rate_clean'] >= 8000) & (df['hourly_rate_clean'] < 12000)]),
-                    '12000+': len(df[df['hourly_rate_clean'] >= 12000])
-                }
-            else:
-                salary_ranges = {}
+            # 薪资、评分分布：每列扫描一遍，按区间定义计数
+            salary_ranges = {}
+            if HAS_BINNING and 'hourly_rate_clean' in df.columns:
+                salary_ranges = bin_counts(df['hourly_rate_clean'], [CAREGIVER_SALARY_BANDS])['salary_distribution']
             
-            # 评分分布
-            if 'rating_clean' in df.columns:
-                rating_dist = {
-                    '5.0': len(df[df['rating_clean'] == 5.0]),
-                    '4.0-4.9': len(df[(df['rating_clean'] >= 4.0) & (df['rating_clean'] < 5.0)]),
-                    '3.0-3.9': len(df[(df['rating_clean'] >= 3.0) & (df['rating_clean'] < 4.0)]),
-                    '2.0-2.9': len(df[(df['rating_clean'] >= 2.0) & (df['rating_clean'] < 3.0)]),
-                    '1.0-1.9': len(df[(df['rating_clean'] >= 1.0) & (df['rating_clean'] < 2.0)])
-                }
-            else:
-                rating_dist = {}
+            rating_dist = {}
+            if HAS_BINNING and 'rating_clean' in df.columns:
+                rating_dist = bin_counts(df['rating_clean'], [RATING_BANDS])['rating_distribution']
             
             result = {
                 'location_distribution': location_dist,
@@ -309,6 +543,7 @@ class DynamicAnalyzer:
             if 'main' not in self.scalers:
                 self.scalers['main'] = StandardScaler()
                 X_train_scaled = self.scalers['main'].fit_transform(X_train)
+                self._record_training(SCALER_PREFIX + 'main', ['caregivers'], available_features, {}, len(X_train))
             else:
                 X_train_scaled = self.scalers['main'].transform(X_train)
             
@@ -318,11 +553,16 @@ class DynamicAnalyzer:
             if 'success_prediction' not in self.models:
                 self.models['success_prediction'] = RandomForestClassifier(n_estimators=100, random_state=42)
             
-            self.models['success_prediction'].fit(X_train_scaled, y_train)
+            model = self.models['success_prediction']
+            model.fit(X_train_scaled, y_train)
+            # 重新赋值，记为本次训练的模型（从注册表加载的模型原地训练不会被记录）
+            self.models['success_prediction'] = model
             
             # 预测
-            y_pred = self.models['success_prediction'].predict(X_test_scaled)
+            y_pred = model.predict(X_test_scaled)
             accuracy = accuracy_score(y_test, y_pred)
+            self._record_training('success_prediction', ['caregivers'], available_features,
+                                  {'accuracy': float(accuracy)}, len(X_train))
             
             # 获取特征重要性
             feature_importance = dict(zip(available_features, self.models['success_prediction'].feature_importances_))
@@ -344,7 +584,7 @@ class DynamicAnalyzer:
     def cluster_analysis(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """聚类分析"""
         try:
-            if not self.has_sklearn:
+            if not self.has_sklearn or not HAS_SEGMENTATION:
                 logger.warning("⚠️ scikit-learn未安装，跳过聚类分析")
                 return {}
             
@@ -361,40 +601,40 @@ class DynamicAnalyzer:
                 logger.warning("可用特征不足，跳过聚类分析")
                 return {}
             
-            X = df[available_features].fillna(0)
-            
-            # 标准化特征
-            if 'main' not in self.scalers:
-                self.scalers['main'] = StandardScaler()
-                X_scaled = self.scalers['main'].fit_transform(X)
-            else:
-                X_scaled = self.scalers['main'].transform(X)
-            
-            # 聚类
-            if 'clustering' not in self.models:
-                self.models['clustering'] = KMeans(n_clusters=5, random_state=42)
-            
-            clusters = self.models['clustering'].fit_predict(X_scaled)
-            df['cluster'] = clusters
-            
-            # 分析聚类结果
-            cluster_stats = []
-            for i in range(5):
-                cluster_data = df[df['cluster'] == i]
-                if len(cluster_data) > 0:
-                    stats = {
-                        'cluster_id': i,
-                        'count': len(cluster_data),
-                        'avg_age': cluster_data['age_clean'].mean() if 'age_clean' in cluster_data.columns else 0,
-                        'avg_hourly_rate': cluster_data['hourly_rate_clean'].mean() if 'hourly_rate_clean' in cluster_data.columns else 0,
-                        'avg_rating': cluster_data['rating_clean'].mean() if 'rating_clean' in cluster_data.columns else 0
-                    }
-                    cluster_stats.append(stats)
-            
+            # 增量分群：已有模型时只用新护工 partial_fit，中心漂移超过阈值才完整重新训练
+            segmenter = self.models.get('segmentation')
+            if not isinstance(segmenter, CaregiverSegmenter) or segmenter.features != available_features:
+                segmenter = CaregiverSegmenter(drift_threshold=SEGMENT_DRIFT_THRESHOLD, features=available_features)
+                self.models['segmentation'] = segmenter
+            
+            ids = df['id'].to_numpy() if 'id' in df.columns else df.index.to_numpy()
+            known_ids = self._segment_store().ids() if segmenter.fitted else None
+            new_mask = None if known_ids is None else ~np.isin(ids, known_ids)
+            training = segmenter.update(df, new_mask)
+            if training['mode'] != MODE_ASSIGN:
+                self.models['segmentation'] = segmenter
+                self._record_training('segmentation', ['caregivers'], available_features,
+                                      {'drift': training['drift'], 'mode': training['mode'],
+                                       'model_version': segmenter.model_version}, training['trained_rows'])
+            
+            # 分配分群并保存，供按护工查询
+            segments = segmenter.assign(df)
+            assigned_at = datetime.now().isoformat()
+            self._segment_store().save(ids, segments, {'model_version': segmenter.model_version,
+                                                      'assigned_at': assigned_at})
+            
+            cluster_stats = segmenter.profiles(df, segments)
             result = {
                 'clusters': cluster_stats,
                 'total_clusters': len(cluster_stats),
-                'analysis_time': datetime.now().isoformat()
+                'segmentation': {
+                    **training,
+                    'drift_threshold': segmenter.drift_threshold,
+                    'model_version': segmenter.model_version,
+                    'incremental_updates': segmenter.updates,
+                    'assigned': int(len(segments))
+                },
+                'analysis_time': assigned_at
             }
             
             logger.info("✅ 聚类分析完成")
@@ -428,14 +668,19 @@ class DynamicAnalyzer:
                 if key.startswith('raw_'):
                     # 分析薪资趋势
                     if 'salary' in df.columns:
-                        # 提取薪资数值
-                        df['salary_numeric'] = df['salary'].str.extract(r'(\d+)').astype(float)
+                        # 提取月薪数值（与入库时的薪资标准化规则一致）
+                        if HAS_SALARY_NORMALIZER:
+                            parsed = normalize_salaries(df['salary'])
+                            salary_numeric = pd.Series(parsed['salary_monthly'], index=df.index).where(
+                                parsed['salary_status'] == SALARY_OK)
+                        else:
+                            salary_numeric = df['salary'].str.extract(r'(\d+)')[0].astype(float)
                         salary_trend = {
                             'data_source': key,
-                            'avg_salary': df['salary_numeric'].mean(),
+                            'avg_salary': salary_numeric.mean(),
                             'job_count': len(df),
-                            'min_salary': df['salary_numeric'].min(),
-                            'max_salary': df['salary_numeric'].max()
+                            'min_salary': salary_numeric.min(),
+                            'max_salary': salary_numeric.max()
                         }
                         trends_data.append(salary_trend)
             
@@ -484,8 +729,13 @@ class DynamicAnalyzer:
             logger.error(f"❌ 需求预测失败: {str(e)}")
             return {}
     
-    def run_dynamic_analysis(self, trigger_source: str = "manual") -> Dict[str, Any]:
-        """运行动态分析"""
+    def run_dynamic_analysis(self, trigger_source: str = "manual", force: bool = False) -> Dict[str, Any]:
+        """运行动态分析：只重新计算输入或依赖发生变化的节点
+        
+        Args:
+            trigger_source: 触发来源
+            force: 忽略缓存，重新计算全部节点
+        """
         try:
             logger.info(f"🚀 开始动态分析 (触发源: {trigger_source})")
             
@@ -494,65 +744,304 @@ class DynamicAnalyzer:
                 logger.warning("⚠️ pandas未安装，返回模拟分析结果")
                 return self._get_mock_analysis_results(trigger_source)
             
-            # 加载最新数据
-            data = self.load_latest_data()
-            
-            if not data:
+            # 先记录输入指纹，分析期间输入变化时结果归到旧版本下，下次触发再更新
+            fingerprints = self.input_fingerprints()
+            input_version = self.input_version()
+            data_inputs = [name for name in fingerprints if name != MONTH_INPUT]
+            if not data_inputs:
                 logger.warning("没有可用的数据进行分析，返回模拟结果")
                 return self._get_mock_analysis_results(trigger_source)
             
-            # 运行各种分析
+            # 规划：计算节点指纹，找出需要重新计算的节点
+            started = datetime.now()
+            node_fingerprints: Dict[str, str] = {}
+            plan = []
+            for node in ANALYSIS_NODES:
+                node_fingerprints[node.name] = self._node_fingerprint(node, fingerprints, node_fingerprints)
+                entry = None if force else self._cached_node(node, node_fingerprints[node.name])
+                stale_deps = [dep for dep, _, reason in plan if reason and dep in node.after]
+                reason = 'forced' if force else self._stale_reason(node, entry, fingerprints, stale_deps)
+                plan.append((node.name, entry, reason))
+            
+            # 只加载需要重新计算的节点读取的输入，且只读取它们列清单中的列
+            stale = [node for node, (_, _, reason) in zip(ANALYSIS_NODES, plan) if reason]
+            needed = sorted({name for node in stale for name in node.inputs if name in data_inputs})
+            data = self.load_latest_data(needed, nodes=stale) if needed else {}
+            
             analysis_results = {
                 'trigger_source': trigger_source,
                 'data_version': self.data_version + 1,
                 'analysis_timestamp': datetime.now().isoformat(),
-                'data_sources': list(data.keys()),
-                'data_counts': {key: len(df) for key, df in data.items()}
+                'data_sources': data_inputs,
+                'data_counts': {}
+            }
+            outcomes = self._execute_nodes(stale, data)
+            report = []
+            trained = False
+            for node, (name, entry, reason) in zip(ANALYSIS_NODES, plan):
+                outcome = outcomes.get(name, {})
+                if reason:
+                    entry = {
+                        'fingerprint': node_fingerprints[name],
+                        'inputs': {key: fingerprints.get(key) for key in node.inputs},
+                        'counts': {key: len(df) for key, df in data.items() if key in node.inputs},
+                        'result': outcome.get('result') or {}
+                    }
+                    # 失败（空结果）不缓存，下次触发重试
+                    if entry['result']:
+                        self._store_node(node, entry)
+                        trained = trained or node.trains_model
+                    if entry['result']:
+                        status = 'ran'
+                    elif outcome.get('status') in ('timeout', 'skipped'):
+                        status = outcome['status']
+                    else:
+                        status = 'failed'
+                else:
+                    status = 'reused'
+                item = {
+                    'node': name,
+                    'status': status,
+                    'reason': reason or 'inputs unchanged',
+                    'inputs': node.inputs,
+                    'elapsed': outcome.get('elapsed', 0)
+                }
+                if outcome.get('error'):
+                    item['error'] = outcome['error']
+                report.append(item)
+                analysis_results['data_counts'].update(entry.get('counts', {}))
+                if entry.get('result'):
+                    analysis_results[name] = entry['result']
+            
+            analysis_results['run_report'] = {
+                'ran': [item['node'] for item in report if item['status'] == 'ran'],
+                'failed': [item['node'] for item in report if item['status'] not in ('ran', 'reused')],
+                'reused': [item['node'] for item in report if item['status'] == 'reused'],
+                'loaded_inputs': needed,
+                'input_memory': {name: item['memory_bytes'] for name, item in self.last_load_report.items()},
+                'parallel': self._use_stage_runner(stale),
+                'nodes': report,
+                'elapsed': round((datetime.now() - started).total_seconds(), 3)
             }
-            
-            # 护工分布分析
-            distribution_result = self.analyze_caregiver_distribution(data)
-            if distribution_result:
-                analysis_results['caregiver_distribution'] = distribution_result
-            
-            # 成功率预测
-            success_result = self.predict_success_rate(data)
-            if success_result:
-                analysis_results['success_prediction'] = success_result
-            
-            # 聚类分析
-            cluster_result = self.cluster_analysis(data)
-            if cluster_result:
-                analysis_results['cluster_analysis'] = cluster_result
-            
-            # 市场趋势分析
-            trends_result = self.analyze_market_trends(data)
-            if trends_result:
-                analysis_results['market_trends'] = trends_result
-            
-            # 需求预测
-            demand_result = self.predict_demand(data)
-            if demand_result:
-                analysis_results['demand_forecast'] = demand_result
             
             # 保存分析结果
+            analysis_results['input_version'] = input_version
             self._save_analysis_results(analysis_results)
             
-            # 保存模型
-            self._save_models()
+            # 只有重新训练过模型时才保存模型
+            if trained:
+                self._save_models(fingerprints)
+            self._save_node_cache()
             
             # 更新缓存
             self.analysis_cache = analysis_results
+            self.analysis_cache_version = input_version
             self.last_analysis_time = datetime.now()
             self.data_version += 1
             
-            logger.info("✅ 动态分析完成")
+            logger.info(f"✅ 动态分析完成，重新计算: {analysis_results['run_report']['ran'] or '无'}")
             return analysis_results
             
         except Exception as e:
             logger.error(f"❌ 动态分析失败: {str(e)}")
             return {}
     
+    # ---- 护工分群查询 ----
+    
+    def _segment_store(self) -> 'SegmentAssignments':
+        if self.segment_assignments is None:
+            self.segment_assignments = SegmentAssignments(
+                os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic', 'segment_assignments.npz'))
+        return self.segment_assignments
+    
+    def caregiver_segment(self, caregiver_id, features: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """护工所属分群
+        
+        先查最近一次分群保存的结果；没有记录（如新注册的护工）且提供了特征时，
+        用当前模型直接分配，不训练。都不可用时返回 None。
+        
+        Args:
+            caregiver_id: 护工编号
+            features: 护工特征，如 {'age_clean': 35, 'hourly_rate_clean': 60, 'rating_clean': 4.5}
+        """
+        if not HAS_SEGMENTATION:
+            return None
+        stored = self._segment_store().lookup(caregiver_id)
+        if stored is not None:
+            return {'caregiver_id': caregiver_id, 'source': 'stored', **stored}
+        segmenter = self.models.get('segmentation')
+        if features is None or not isinstance(segmenter, CaregiverSegmenter) or not segmenter.fitted:
+            return None
+        segment = int(segmenter.assign(pd.DataFrame([features], columns=segmenter.features))[0])
+        return {'caregiver_id': caregiver_id, 'source': 'assigned', 'segment': segment,
+                'model_version': segmenter.model_version, 'assigned_at': datetime.now().isoformat()}
+    
+    # ---- 节点执行 ----
+    
+    def _use_stage_runner(self, nodes: List[AnalysisNode]) -> bool:
+        return HAS_STAGE_RUNNER and self.workers > 1 and len(nodes) > 1
+    
+    def _execute_nodes(self, nodes: List[AnalysisNode], data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """执行节点，返回 {节点名: {'status', 'result', 'elapsed', 'error'}}；进程池不可用时依次执行"""
+        if self._use_stage_runner(nodes):
+            try:
+                return self._execute_parallel(nodes, data)
+            except Exception as e:
+                logger.warning(f"⚠️ 并行分析失败，改为依次执行: {str(e)}")
+        outcomes = {}
+        for node in nodes:
+            started = datetime.now()
+            result = getattr(self, node.method)({key: df for key, df in data.items() if key in node.inputs})
+            outcomes[node.name] = {
+                'status': 'ok',
+                'result': result,
+                'elapsed': round((datetime.now() - started).total_seconds(), 3),
+                'error': None
+            }
+        return outcomes
+    
+    def _execute_parallel(self, nodes: List[AnalysisNode], data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """在进程池中执行节点，训练模型的节点返回的模型合并回当前分析器"""
+        if self.stage_runner is None:
+            self.stage_runner = StageRunner(max_workers=self.workers, timeout=ANALYSIS_STAGE_TIMEOUT,
+                                            context=ANALYSIS_MP_CONTEXT, preload=[__name__])
+        names = {node.name for node in nodes}
+        stages = []
+        for node in nodes:
+            after = [dep for dep in node.after if dep in names]
+            stages.append(Stage(
+                node.name, _run_analysis_node,
+                args=(self._stage_copy(), node.method, node.trains_model),
+                inputs=node.inputs,
+                after=after,
+                timeout=self.stage_timeouts.get(node.name),
+                # 依赖节点训练的模型（如标准化器）先合并，再把分析器发给本节点
+                prepare=partial(self._prepare_stage, node) if after else None
+            ))
+        outcomes = self.stage_runner.run(stages, data)
+        for outcome in outcomes.values():
+            if outcome['status'] == STATUS_OK:
+                value = outcome['result']
+                self._apply_model_state(value['state'])
+                outcome['result'] = value['result']
+        return outcomes
+    
+    def _prepare_stage(self, node: AnalysisNode, dependencies: Dict[str, Any]) -> tuple:
+        for value in dependencies.values():
+            self._apply_model_state(value['state'])
+        return self._stage_copy(), node.method, node.trains_model
+    
+    def _stage_copy(self) -> 'DynamicAnalyzer':
+        """发往工作进程的副本：模型字典单独复制，序列化期间主进程合并模型不受影响"""
+        clone = copy.copy(self)
+        clone.models = self.models.copy()
+        clone.scalers = self.scalers.copy()
+        clone.training_metadata = dict(self.training_metadata)
+        clone.encoders = self.encoders.copy() if self.encoders is not None else None
+        return clone
+    
+    def _model_state(self) -> Dict[str, Dict[str, Any]]:
+        # 只带回本节点训练的模型，注册表中未变化的模型不再序列化
+        return {'models': _changed_models(self.models), 'scalers': _changed_models(self.scalers),
+                'encoders': self.encoders, 'training': self.training_metadata}
+    
+    def _apply_model_state(self, state: Optional[Dict[str, Dict[str, Any]]]):
+        if not state:
+            return
+        self.models.update(state['models'])
+        self.scalers.update(state['scalers'])
+        self.training_metadata.update(state.get('training') or {})
+        if self.encoders is not None and state['encoders'] is not None:
+            self.encoders.update(state['encoders'])
+    
+    # ---- 分析图缓存 ----
+    
+    def _node_fingerprint(self, node: AnalysisNode, fingerprints: Dict[str, str],
+                          node_fingerprints: Dict[str, str]) -> str:
+        """节点指纹：节点名、计算版本、各输入指纹与依赖节点指纹"""
+        payload = {
+            'node': node.name,
+            'version': node.version,
+            'inputs': {name: fingerprints.get(name) for name in node.inputs},
+            'after': {name: node_fingerprints[name] for name in node.after}
+        }
+        return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def _stale_reason(self, node: AnalysisNode, entry: Optional[Dict[str, Any]], fingerprints: Dict[str, str],
+                      stale_deps: List[str]) -> Optional[str]:
+        """节点需要重新计算的原因；可以复用缓存时返回 None"""
+        if stale_deps:
+            return f"dependency re-ran: {', '.join(stale_deps)}"
+        if entry is not None:
+            return None
+        previous = self._previous_node(node)
+        if previous is None:
+            return 'no cached result'
+        changed = [name for name in node.inputs if previous.get('inputs', {}).get(name) != fingerprints.get(name)]
+        if changed:
+            return f"input changed: {', '.join(changed)}"
+        return 'analysis version changed'
+    
+    def _load_node_cache(self) -> Dict[str, Dict[str, Any]]:
+        """本地节点缓存（没有结果存储时使用），首次使用时从文件读取"""
+        if self.node_cache is None:
+            self.node_cache = {}
+            if self.result_store is None:
+                path = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic', 'node_cache.json')
+                try:
+                    if os.path.exists(path):
+                        with open(path, 'r', encoding='utf-8') as f:
+                            self.node_cache = json.load(f)
+                except Exception as e:
+                    logger.warning(f"⚠️ 节点缓存读取失败: {str(e)}")
+        return self.node_cache
+    
+    def _cached_node(self, node: AnalysisNode, fingerprint: str) -> Optional[Dict[str, Any]]:
+        entry = self._load_node_cache().get(node.name)
+        if entry and entry.get('fingerprint') == fingerprint:
+            return entry
+        if self.result_store is not None:
+            try:
+                entry = self.result_store.get(DYNAMIC_NODE_TYPE, {'node': node.name}, fingerprint)
+                if entry:
+                    self.node_cache[node.name] = entry
+                    return entry
+            except Exception as e:
+                logger.warning(f"⚠️ 读取节点缓存失败 {node.name}: {str(e)}")
+        return None
+    
+    def _previous_node(self, node: AnalysisNode) -> Optional[Dict[str, Any]]:
+        """节点最近一次的缓存（不论指纹），用于说明重新计算的原因"""
+        entry = self._load_node_cache().get(node.name)
+        if entry is None and self.result_store is not None and hasattr(self.result_store, 'latest'):
+            try:
+                latest = self.result_store.latest(DYNAMIC_NODE_TYPE, {'node': node.name})
+                entry = latest['result'] if latest else None
+            except Exception as e:
+                logger.warning(f"⚠️ 读取节点历史失败 {node.name}: {str(e)}")
+        return entry
+    
+    def _store_node(self, node: AnalysisNode, entry: Dict[str, Any]):
+        self._load_node_cache()[node.name] = entry
+        if self.result_store is not None:
+            try:
+                self.result_store.put(DYNAMIC_NODE_TYPE, {'node': node.name}, entry['fingerprint'], entry)
+            except Exception as e:
+                logger.warning(f"⚠️ 保存节点缓存失败 {node.name}: {str(e)}")
+    
+    def _save_node_cache(self):
+        """没有结果存储时把节点缓存写入文件，重启后仍可复用"""
+        if self.result_store is not None or self.node_cache is None:
+            return
+        try:
+            path = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic', 'node_cache.json')
+            tmp_path = f'{path}.tmp-{os.getpid()}'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.node_cache, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ 节点缓存保存失败: {str(e)}")
+    
     def _get_mock_analysis_results(self, trigger_source: str) -> Dict[str, Any]:
         """获取模拟分析结果（当依赖不可用时）"""
         try:
@@ -635,8 +1124,9 @@ class DynamicAnalyzer:
                 }
             }
             
-            # 更新缓存
+            # 更新缓存（模拟结果不对应任何输入版本，不写入结果存储）
             self.analysis_cache = mock_results
+            self.analysis_cache_version = None
             self.last_analysis_time = datetime.now()
             self.data_version += 1
             
@@ -648,8 +1138,26 @@ class DynamicAnalyzer:
             return {}
     
     def _save_analysis_results(self, results: Dict[str, Any]):
-        """保存分析结果"""
+        """保存分析结果
+
+        有结果存储时按输入版本写入存储，同时总是追加到分析结果日志（分析历史）；
+        没有日志模块且存储不可用时写入本地 JSON 文件
+        """
+        stored = False
+        if self.result_store is not None:
+            try:
+                self.result_store.put(DYNAMIC_ANALYSIS_TYPE, {}, results['input_version'], results)
+                stored = True
+            except Exception as e:
+                logger.error(f"❌ 分析结果写入存储失败，改为写入文件: {str(e)}")
         try:
+            if HAS_EVENT_LOG:
+                self._event_log(ANALYSIS_LOG_NAME).append(results)
+                logger.info(f"✅ 分析结果已追加到日志: {ANALYSIS_LOG_NAME}")
+                return
+            if stored:
+                return
+            
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f'dynamic_analysis_{timestamp}.json'
             filepath = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic', filename)
@@ -667,15 +1175,53 @@ class DynamicAnalyzer:
         except Exception as e:
             logger.error(f"❌ 分析结果保存失败: {str(e)}")
     
+    def _event_log(self, name: str) -> 'EventLog':
+        """分析结果日志或导入日志；导入日志第一次打开时迁移旧的 import_log.json"""
+        directory = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic')
+        if name == ANALYSIS_LOG_NAME:
+            if self.analysis_log is None:
+                self.analysis_log = EventLog(directory, ANALYSIS_LOG_NAME, max_bytes=ANALYSIS_LOG_MAX_BYTES,
+                                             source_key='trigger_source', timestamp_key='analysis_timestamp')
+            return self.analysis_log
+        if self.import_log is None:
+            self.import_log = EventLog(directory, IMPORT_LOG_NAME)
+            self.import_log.migrate_json_array(os.path.join(directory, 'import_log.json'))
+        return self.import_log
+    
+    def analysis_history(self, limit: int = 10, trigger_source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """最近的分析结果（新的在前），trigger_source 指定时只返回该触发来源的结果"""
+        if not HAS_EVENT_LOG:
+            return []
+        return self._event_log(ANALYSIS_LOG_NAME).latest(limit, source=trigger_source)
+    
     def get_latest_analysis(self) -> Dict[str, Any]:
-        """获取最新分析结果"""
+        """获取最新分析结果
+        
+        有结果存储时只返回与当前输入版本一致的结果，输入文件变化后返回空结果
+        """
+        if self.result_store is not None:
+            try:
+                version = self.input_version()
+                if self.analysis_cache and self.analysis_cache_version == version:
+                    return self.analysis_cache
+                results = self.result_store.get(DYNAMIC_ANALYSIS_TYPE, {}, version)
+                if results:
+                    self.analysis_cache = results
+                    self.analysis_cache_version = version
+                return results or {}
+            except Exception as e:
+                logger.error(f"❌ 从存储读取分析结果失败，改为读取文件: {str(e)}")
         try:
             if self.analysis_cache and self.last_analysis_time:
                 # 检查缓存是否过期（1小时）
                 if datetime.now() - self.last_analysis_time < timedelta(hours=1):
                     return self.analysis_cache
             
-            # 从文件加载最新结果
+            # 从日志加载最新结果，日志为空时读取旧的 latest_analysis.json
+            latest = self.analysis_history(1)
+            if latest:
+                self.analysis_cache = latest[0]
+                return latest[0]
             latest_filepath = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic', 'latest_analysis.json')
             if os.path.exists(latest_filepath):
                 with open(latest_filepath, 'r', encoding='utf-8') as f:
@@ -706,18 +1252,9 @@ class DynamicAnalyzer:
                 'analysis_results_available': bool(results)
             }
             
-            # 保存导入日志
-            log_filepath = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic', 'import_log.json')
-            if os.path.exists(log_filepath):
-                with open(log_filepath, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            else:
-                logs = []
-            
-            logs.append(import_log)
-            
-            with open(log_filepath, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
+            # 追加到导入日志
+            if HAS_EVENT_LOG:
+                self._event_log(IMPORT_LOG_NAME).append(import_log)
             
             logger.info("✅ 数据导入分析触发完成")
             return results
@@ -0,0 +1,288 @@
+"""
+护工资源管理系统 - 模型注册表
+====================================
+
+按名称管理模型的各个版本：
+- 每个版本是一个不可变目录 <名称>/<版本>/，版本号为模型文件内容的 SHA-256 前 16 位，
+  内容相同的模型只保存一次；目录中有模型文件 model.joblib 与元数据 meta.json
+  （训练数据指纹、评估指标、特征列表、样本数等）
+- 发布（promote）把 <名称>/promoted.json 原子替换为新版本号，读取方不加锁，
+  总是读到完整的旧版本或新版本
+- 加载是惰性的：第一次使用某个模型时才读取；模型文件不压缩，numpy 数组以 mmap_mode='c'
+  内存映射，多个 Gunicorn 工作进程共享同一份页缓存，写入时才复制（增量训练不受影响）
+- 发布的版本变化后，下次读取时自动加载新版本
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from collections.abc import MutableMapping
+from typing import Dict, List, Any, Optional, Iterator
+
+try:
+    import joblib
+    HAS_JOBLIB = True
+except ImportError:
+    HAS_JOBLIB = False
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = 'model.joblib'
+META_FILE = 'meta.json'
+PROMOTED_FILE = 'promoted.json'
+DEFAULT_KEEP_VERSIONS = 5
+# 其它模型集合使用的名称前缀，不带前缀的集合遍历时排除它们
+RESERVED_PREFIXES = ('scaler_',)
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    """写入临时文件后原子替换"""
+    tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """模型注册表
+
+    Args:
+        root: 注册表目录
+        mmap_mode: 加载时的内存映射方式，None 时完整读入内存
+    """
+
+    def __init__(self, root: str, mmap_mode: Optional[str] = 'c'):
+        self.root = root
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        # (名称, 版本) -> 模型；版本不可变，缓存不会过期
+        self._loaded: Dict[tuple, Any] = {}
+        # 名称 -> (promoted.json 的 mtime, 版本)
+        self._promoted: Dict[str, tuple] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, name: str, version: Optional[str] = None) -> str:
+        return os.path.join(self.root, name) if version is None else os.path.join(self.root, name, version)
+
+    # ---- 写入 ----
+
+    def register(self, name: str, model: Any, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """保存一个新版本（不发布），返回版本号；内容相同的版本已存在时直接返回它"""
+        os.makedirs(self._dir(name), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self._dir(name))
+        try:
+            model_path = os.path.join(staging, MODEL_FILE)
+            joblib.dump(model, model_path)
+            sha256 = _file_sha256(model_path)
+            version = sha256[:16]
+            meta = {
+                'name': name,
+                'version': version,
+                'sha256': sha256,
+                'size': os.path.getsize(model_path),
+                'created_at': datetime.now().isoformat(),
+                **(metadata or {})
+            }
+            _write_json(os.path.join(staging, META_FILE), meta)
+            target = self._dir(name, version)
+            if os.path.isdir(target):
+                return version
+            try:
+                os.rename(staging, target)
+                staging = None
+            except OSError:
+                # 其它进程同时保存了同样内容的版本
+                if not os.path.isdir(target):
+                    raise
+            logger.info(f"✅ 模型已注册: {name}@{version} ({meta['size']} 字节)")
+            return version
+        finally:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def promote(self, name: str, version: str) -> Dict[str, Any]:
+        """发布版本：原子替换 promoted.json"""
+        if not os.path.exists(os.path.join(self._dir(name, version), MODEL_FILE)):
+            raise ValueError(f'模型版本不存在: {name}@{version}')
+        previous = self.promoted_version(name)
+        pointer = {'version': version, 'previous': previous, 'promoted_at': datetime.now().isoformat()}
+        _write_json(os.path.join(self._dir(name), PROMOTED_FILE), pointer)
+        logger.info(f"✅ 模型已发布: {name}@{version}（之前 {previous or '无'}）")
+        return pointer
+
+    def register_and_promote(self, name: str, model: Any, metadata: Optional[Dict[str, Any]] = None) -> str:
+        version = self.register(name, model, metadata)
+        if self.promoted_version(name) != version:
+            self.promote(name, version)
+        return version
+
+    def rollback(self, name: str) -> Optional[str]:
+        """发布上一个版本，没有上一个版本时返回 None"""
+        pointer = self._read_pointer(name)
+        previous = pointer.get('previous') if pointer else None
+        if not previous:
+            return None
+        self.promote(name, previous)
+        return previous
+
+    def prune(self, name: str, keep: int = DEFAULT_KEEP_VERSIONS) -> List[str]:
+        """删除较旧的版本，发布的版本与它的上一个版本始终保留"""
+        pointer = self._read_pointer(name) or {}
+        protected = {pointer.get('version'), pointer.get('previous')}
+        versions = self.versions(name)
+        removed = []
+        for meta in versions[keep:]:
+            if meta['version'] not in protected:
+                shutil.rmtree(self._dir(name, meta['version']), ignore_errors=True)
+                removed.append(meta['version'])
+        return removed
+
+    # ---- 读取 ----
+
+    def _read_pointer(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._dir(name), PROMOTED_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def promoted_version(self, name: str) -> Optional[str]:
+        """当前发布的版本；promoted.json 未变化时不重新读取"""
+        path = os.path.join(self._dir(name), PROMOTED_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._promoted.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        pointer = self._read_pointer(name)
+        version = pointer.get('version') if pointer else None
+        self._promoted[name] = (mtime, version)
+        return version
+
+    def load(self, name: str, version: Optional[str] = None) -> Any:
+        """加载模型（默认发布的版本），没有时抛出 KeyError"""
+        version = version or self.promoted_version(name)
+        if version is None:
+            raise KeyError(name)
+        key = (name, version)
+        model = self._loaded.get(key)
+        if model is None:
+            with self._lock:
+                model = self._loaded.get(key)
+                if model is None:
+                    model = joblib.load(os.path.join(self._dir(name, version), MODEL_FILE), mmap_mode=self.mmap_mode)
+                    # 只保留每个名称的当前版本
+                    for old in [k for k in self._loaded if k[0] == name]:
+                        del self._loaded[old]
+                    self._loaded[key] = model
+                    logger.info(f"✅ 模型已加载: {name}@{version}")
+        return model
+
+    def metadata(self, name: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        version = version or self.promoted_version(name)
+        if version is None:
+            return None
+        try:
+            with open(os.path.join(self._dir(name, version), META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def names(self) -> List[str]:
+        """有发布版本的模型名称"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, name, PROMOTED_FILE)))
+
+    def versions(self, name: str) -> List[Dict[str, Any]]:
+        """全部版本的元数据，新的在前"""
+        directory = self._dir(name)
+        if not os.path.isdir(directory):
+            return []
+        metas = [self.metadata(name, entry) for entry in os.listdir(directory) if not entry.startswith('.')
+                 and os.path.isdir(os.path.join(directory, entry))]
+        return sorted((meta for meta in metas if meta), key=lambda meta: meta['created_at'], reverse=True)
+
+    def __getstate__(self):
+        # 发往工作进程时不带已加载的模型与锁，工作进程按需内存映射
+        return {'root': self.root, 'mmap_mode': self.mmap_mode}
+
+    def __setstate__(self, state):
+        self.__init__(state['root'], state['mmap_mode'])
+
+
+class RegisteredModels(MutableMapping):
+    """以字典方式访问注册表中发布的模型
+
+    读取时惰性加载发布的版本；赋值的模型只保存在当前对象中，记为已修改，
+    由调用方注册并发布（changed() / mark_saved()）。
+
+    Args:
+        registry: 模型注册表
+        prefix: 注册表中的名称前缀（如标准化器用 'scaler_'）
+    """
+
+    def __init__(self, registry: ModelRegistry, prefix: str = ''):
+        self.registry = registry
+        self.prefix = prefix
+        self._local: Dict[str, Any] = {}
+
+    def _name(self, key: str) -> str:
+        return f'{self.prefix}{key}'
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._local:
+            return self._local[key]
+        return self.registry.load(self._name(key))
+
+    def __setitem__(self, key: str, value: Any):
+        self._local[key] = value
+
+    def __delitem__(self, key: str):
+        del self._local[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._local or self.registry.promoted_version(self._name(key)) is not None
+
+    def _keys(self) -> List[str]:
+        keys = [name[len(self.prefix):] for name in self.registry.names() if name.startswith(self.prefix)]
+        if not self.prefix:
+            # 没有前缀时排除带前缀的其它集合（如 scaler_*）
+            keys = [key for key in keys if not any(key.startswith(p) for p in RESERVED_PREFIXES)]
+        return list(dict.fromkeys(list(self._local) + keys))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def copy(self) -> 'RegisteredModels':
+        clone = RegisteredModels(self.registry, self.prefix)
+        clone._local = dict(self._local)
+        return clone
+
+    def changed(self) -> Dict[str, Any]:
+        """本对象中新训练（赋值）的模型"""
+        return dict(self._local)
+
+    def mark_saved(self):
+        """已注册并发布后，改为从注册表读取"""
+        self._local.clear()
+
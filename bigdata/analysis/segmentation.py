@@ -0,0 +1,228 @@
+"""
+护工资源管理系统 - 护工分群
+====================================
+
+基于 MiniBatchKMeans 的增量护工分群：
+- 首次运行时完整训练；之后只用新出现的护工做 partial_fit，从保存的模型继续训练
+- 漂移：各分群中心相对上次完整训练时的移动距离（标准化后的特征空间，单位为标准差），
+  超过阈值时才完整重新训练；重新训练后按中心距离匹配旧的分群编号，同一类护工的编号保持不变
+- 已有模型时可以直接为新护工分配分群，不需要训练
+- 分群结果（护工编号 -> 分群）保存为排序后的数组文件，按编号二分查找
+"""
+
+import os
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_FEATURES = ['age_clean', 'hourly_rate_clean', 'rating_clean']
+DEFAULT_SEGMENTS = 5
+DEFAULT_DRIFT_THRESHOLD = 0.5
+DEFAULT_BATCH_SIZE = 1024
+
+MODE_FULL = 'full'
+MODE_INCREMENTAL = 'incremental'
+MODE_ASSIGN = 'assign_only'
+
+
+def _match_segments(previous: 'np.ndarray', current: 'np.ndarray') -> 'np.ndarray':
+    """current 的每个中心对应的旧编号（按中心距离一一匹配）"""
+    cost = np.linalg.norm(current[:, None, :] - previous[None, :, :], axis=-1)
+    if HAS_SCIPY:
+        rows, cols = linear_sum_assignment(cost)
+        mapping = np.empty(len(current), dtype=np.int64)
+        mapping[rows] = cols
+        return mapping
+    # 没有 scipy 时按距离从小到大贪心匹配
+    mapping = np.full(len(current), -1, dtype=np.int64)
+    used = set()
+    for flat in np.argsort(cost, axis=None):
+        row, col = divmod(int(flat), cost.shape[1])
+        if mapping[row] < 0 and col not in used:
+            mapping[row] = col
+            used.add(col)
+    return mapping
+
+
+class CaregiverSegmenter:
+    """增量护工分群模型
+
+    Args:
+        n_segments: 分群数
+        drift_threshold: 中心漂移超过该值（标准差）时完整重新训练
+        batch_size: partial_fit 的批大小
+        features: 使用的特征列
+    """
+
+    def __init__(self, n_segments: int = DEFAULT_SEGMENTS, drift_threshold: float = DEFAULT_DRIFT_THRESHOLD,
+                 batch_size: int = DEFAULT_BATCH_SIZE, features: Optional[List[str]] = None):
+        self.n_segments = n_segments
+        self.drift_threshold = drift_threshold
+        self.batch_size = batch_size
+        self.features = list(features or SEGMENT_FEATURES)
+        self.scaler = None
+        self.model = None
+        # 上次完整训练后的中心，用于计算漂移
+        self.reference_centers = None
+        self.model_version = 0
+        self.updates = 0
+        self.trained_at: Optional[str] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.model is not None
+
+    def _matrix(self, df) -> 'np.ndarray':
+        return df[self.features].fillna(0).to_numpy(dtype=np.float64)
+
+    def drift(self) -> float:
+        """各中心相对上次完整训练时的最大移动距离"""
+        if self.reference_centers is None:
+            return 0.0
+        return float(np.linalg.norm(self.model.cluster_centers_ - self.reference_centers, axis=1).max())
+
+    def fit(self, df) -> Dict[str, Any]:
+        """完整训练；已有模型时重新训练后沿用旧的分群编号"""
+        X = self._matrix(df)
+        previous = None
+        if self.fitted:
+            previous = self.scaler.inverse_transform(self.model.cluster_centers_)
+        self.scaler = StandardScaler().fit(X)
+        self.model = MiniBatchKMeans(n_clusters=self.n_segments, batch_size=self.batch_size,
+                                     n_init=3, random_state=42).fit(self.scaler.transform(X))
+        if previous is not None:
+            current = self.scaler.inverse_transform(self.model.cluster_centers_)
+            order = np.argsort(_match_segments(previous, current))
+            self.model.cluster_centers_ = self.model.cluster_centers_[order]
+            # partial_fit 按各中心累计的样本数更新中心，计数随中心一起调整顺序
+            if hasattr(self.model, '_counts'):
+                self.model._counts = self.model._counts[order]
+        self.reference_centers = self.model.cluster_centers_.copy()
+        self.model_version += 1
+        self.updates = 0
+        self.trained_at = datetime.now().isoformat()
+        return {'mode': MODE_FULL, 'trained_rows': len(X), 'drift': 0.0}
+
+    def update(self, df, new_mask: Optional['np.ndarray'] = None) -> Dict[str, Any]:
+        """增量更新：只用 new_mask 选中的（新）护工做 partial_fit，漂移超过阈值时完整重新训练
+
+        Args:
+            df: 全部护工
+            new_mask: 新护工的布尔掩码，None 表示全部
+        """
+        if len(df) < self.n_segments:
+            raise ValueError(f'护工数量不足 {self.n_segments} 个，无法分群')
+        if not self.fitted:
+            return self.fit(df)
+        X_new = self._matrix(df if new_mask is None else df[new_mask])
+        if len(X_new) == 0:
+            return {'mode': MODE_ASSIGN, 'trained_rows': 0, 'drift': round(self.drift(), 4)}
+        X_new = self.scaler.transform(X_new)
+        for start in range(0, len(X_new), self.batch_size):
+            self.model.partial_fit(X_new[start:start + self.batch_size])
+        self.updates += 1
+        drift = self.drift()
+        if drift > self.drift_threshold:
+            logger.info(f"📊 分群中心漂移 {drift:.3f} 超过阈值 {self.drift_threshold}，完整重新训练")
+            outcome = self.fit(df)
+            outcome['drift'] = round(drift, 4)
+            return outcome
+        return {'mode': MODE_INCREMENTAL, 'trained_rows': len(X_new), 'drift': round(drift, 4)}
+
+    def assign(self, df) -> 'np.ndarray':
+        """为护工分配分群（不训练）"""
+        return self.model.predict(self.scaler.transform(self._matrix(df))).astype(np.int16)
+
+    def profiles(self, df, segments: 'np.ndarray') -> List[Dict[str, Any]]:
+        """各分群的人数与特征均值"""
+        counts = np.bincount(segments, minlength=self.n_segments)
+        means = {}
+        for feature in self.features:
+            if feature in df.columns:
+                values = df[feature].fillna(0).to_numpy(dtype=np.float64)
+                means[feature] = np.bincount(segments, weights=values, minlength=self.n_segments) / np.maximum(counts, 1)
+            else:
+                means[feature] = np.zeros(self.n_segments)
+        return [{
+            'cluster_id': i,
+            'count': int(counts[i]),
+            'avg_age': float(means['age_clean'][i]) if 'age_clean' in means else 0,
+            'avg_hourly_rate': float(means['hourly_rate_clean'][i]) if 'hourly_rate_clean' in means else 0,
+            'avg_rating': float(means['rating_clean'][i]) if 'rating_clean' in means else 0
+        } for i in range(self.n_segments) if counts[i] > 0]
+
+
+class SegmentAssignments:
+    """护工编号 -> 分群，按编号排序保存在 .npz 文件中；文件更新后自动重新读取"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime = None
+        self._ids = None
+        self._segments = None
+        self._meta: Dict[str, Any] = {}
+
+    def save(self, ids, segments, meta: Dict[str, Any]):
+        ids = np.asarray(ids)
+        if ids.dtype.kind not in 'iu':
+            ids = ids.astype(str)
+        order = np.argsort(ids, kind='stable')
+        tmp_path = f'{self.path}.tmp-{os.getpid()}.npz'
+        np.savez(tmp_path, ids=ids[order], segments=np.asarray(segments, dtype=np.int16)[order],
+                 model_version=meta.get('model_version', 0), assigned_at=meta.get('assigned_at', ''))
+        os.replace(tmp_path, self.path)
+
+    def _refresh(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime != self._mtime:
+            with np.load(self.path, allow_pickle=False) as data:
+                self._ids = data['ids']
+                self._segments = data['segments']
+                self._meta = {'model_version': int(data['model_version']), 'assigned_at': str(data['assigned_at'])}
+            self._mtime = mtime
+        return True
+
+    def ids(self) -> Optional['np.ndarray']:
+        return self._ids if self._refresh() else None
+
+    def lookup(self, caregiver_id) -> Optional[Dict[str, Any]]:
+        """查找护工的分群，不存在时返回 None"""
+        if not self._refresh() or len(self._ids) == 0:
+            return None
+        key = caregiver_id
+        if self._ids.dtype.kind in 'iu':
+            try:
+                key = int(caregiver_id)
+            except (TypeError, ValueError):
+                return None
+        else:
+            key = str(caregiver_id)
+        position = int(np.searchsorted(self._ids, key))
+        if position >= len(self._ids) or self._ids[position] != key:
+            return None
+        return {'segment': int(self._segments[position]), **self._meta}
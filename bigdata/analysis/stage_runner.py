@@ -0,0 +1,237 @@
+"""
+护工资源管理系统 - 分析阶段并行执行器
+====================================
+
+在进程池中并行执行相互独立的分析阶段：
+- 输入 DataFrame 写成 Arrow IPC 文件放在共享内存目录（/dev/shm）中，工作进程按内存映射读取，
+  不再为每个阶段序列化一份数据副本
+- 阶段可以声明依赖，依赖完成后才开始执行
+- 每个阶段有独立的超时，超时或失败不影响其它阶段；存在超时阶段时结束后终止进程池，下次执行时重建
+- 进程池在多次执行之间复用，工作进程只在启动时导入一次依赖（以及入口模块）
+- 全部阶段同时开始时，总耗时接近最慢的一个阶段
+"""
+
+import os
+import time
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+import multiprocessing
+from typing import Dict, List, Any, Optional, Callable
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+SHARED_MEMORY_DIR = '/dev/shm'
+
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_TIMEOUT = 'timeout'
+STATUS_SKIPPED = 'skipped'
+
+
+class SharedFrames:
+    """以 Arrow IPC 文件共享的一组 DataFrame，用作上下文管理器，退出时删除文件"""
+
+    def __init__(self, frames: Dict[str, Any]):
+        base = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+        self.directory = tempfile.mkdtemp(prefix='analysis-frames-', dir=base)
+        self.paths: Dict[str, str] = {}
+        for name, df in frames.items():
+            path = os.path.join(self.directory, f'{name}.arrow')
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            self.paths[name] = path
+
+    def __enter__(self) -> 'SharedFrames':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def load_shared_frames(paths: Dict[str, str]) -> Dict[str, Any]:
+    """按内存映射读取共享的 DataFrame（工作进程中调用）"""
+    frames = {}
+    for name, path in paths.items():
+        with pa.memory_map(path, 'r') as source:
+            frames[name] = pa.ipc.open_file(source).read_all().to_pandas()
+    return frames
+
+
+class Stage:
+    """一个分析阶段
+
+    Args:
+        name: 阶段名
+        func: 可序列化（模块级）的函数，调用方式为 func(*args, frames)
+        args: 传给 func 的参数
+        inputs: 需要的共享 DataFrame 名称
+        after: 依赖的阶段名，只有依赖成功后才执行，依赖失败则跳过
+        timeout: 超时（秒），None 时使用执行器的默认值
+        prepare: 依赖完成后、提交前调用，可根据依赖结果更新 args；参数为 {阶段名: 结果}
+    """
+
+    __slots__ = ('name', 'func', 'args', 'inputs', 'after', 'timeout', 'prepare')
+
+    def __init__(self, name: str, func: Callable, args: tuple = (), inputs: Optional[List[str]] = None,
+                 after: Optional[List[str]] = None, timeout: Optional[float] = None,
+                 prepare: Optional[Callable[[Dict[str, Any]], tuple]] = None):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.inputs = inputs or []
+        self.after = after or []
+        self.timeout = timeout
+        self.prepare = prepare
+
+
+def _run_stage(func: Callable, args: tuple, paths: Dict[str, str]):
+    """工作进程入口：映射共享数据后执行阶段"""
+    started = time.monotonic()
+    frames = load_shared_frames(paths)
+    result = func(*args, frames)
+    return result, round(time.monotonic() - started, 3)
+
+
+def default_context() -> str:
+    """forkserver 只在服务进程中导入一次依赖，比 spawn 启动快，且不会复制父进程的线程与连接"""
+    methods = multiprocessing.get_all_start_methods()
+    return 'forkserver' if 'forkserver' in methods else 'spawn'
+
+
+class StageRunner:
+    """进程池分析阶段执行器
+
+    Args:
+        max_workers: 进程数，默认为 CPU 数
+        timeout: 每个阶段的默认超时（秒）
+        context: 进程启动方式（forkserver / spawn / fork），默认 default_context()
+        preload: forkserver 服务进程预先导入的模块
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = 300, context: Optional[str] = None,
+                 preload: Optional[List[str]] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.context = multiprocessing.get_context(context or default_context())
+        if preload and self.context.get_start_method() == 'forkserver':
+            self.context.set_forkserver_preload(preload)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = self.context.Pool(processes=self.max_workers)
+        return self._pool
+
+    def close(self, terminate: bool = False):
+        """关闭进程池；terminate 时不等待正在执行的阶段"""
+        if self._pool is None:
+            return
+        if terminate:
+            self._pool.terminate()
+        else:
+            self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    def run(self, stages: List[Stage], frames: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """执行全部阶段
+
+        Returns:
+            {阶段名: {'status', 'result', 'elapsed', 'error'}}，status 为 ok / failed / timeout / skipped
+        """
+        if not HAS_PYARROW:
+            raise RuntimeError('pyarrow 未安装，无法共享分析数据')
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        if not stages:
+            return outcomes
+        done: 'queue.Queue' = queue.Queue()
+        started = time.monotonic()
+
+        # 同一时间只执行一批阶段，避免超时终止进程池时影响其它调用方
+        with self._lock, SharedFrames({name: df for name, df in frames.items()
+                                       if any(name in stage.inputs for stage in stages)}) as shared:
+            pool = self._get_pool()
+            terminate = False
+            try:
+                pending = {stage.name: stage for stage in stages}
+                running: Dict[str, float] = {}
+
+                def submit_ready():
+                    # 跳过的阶段可能让其它阶段变为可执行，重复扫描直到没有变化
+                    changed = True
+                    while changed:
+                        changed = False
+                        for name, stage in list(pending.items()):
+                            if any(dep in pending or dep in running for dep in stage.after):
+                                continue
+                            del pending[name]
+                            changed = True
+                            submit(name, stage)
+
+                def submit(name: str, stage: Stage):
+                    failed_deps = [dep for dep in stage.after
+                                   if dep in outcomes and outcomes[dep]['status'] != STATUS_OK]
+                    if failed_deps:
+                        outcomes[name] = {'status': STATUS_SKIPPED, 'result': None, 'elapsed': 0,
+                                          'error': f"依赖未完成: {', '.join(failed_deps)}"}
+                        return
+                    args = stage.args
+                    if stage.prepare is not None:
+                        args = stage.prepare({dep: outcomes[dep]['result'] for dep in stage.after
+                                              if dep in outcomes})
+                    paths = {key: shared.paths[key] for key in stage.inputs if key in shared.paths}
+                    timeout = self.timeout if stage.timeout is None else stage.timeout
+                    running[name] = time.monotonic() + timeout
+                    pool.apply_async(_run_stage, (stage.func, args, paths),
+                                     callback=lambda value, name=name: done.put((name, value, None)),
+                                     error_callback=lambda error, name=name: done.put((name, None, error)))
+
+                submit_ready()
+                while running:
+                    wait = max(0.0, min(running.values()) - time.monotonic())
+                    try:
+                        name, value, error = done.get(timeout=wait)
+                    except queue.Empty:
+                        now = time.monotonic()
+                        for name in [n for n, deadline in running.items() if deadline <= now]:
+                            del running[name]
+                            terminate = True
+                            outcomes[name] = {'status': STATUS_TIMEOUT, 'result': None, 'elapsed': None,
+                                              'error': '执行超时'}
+                            logger.warning(f"⚠️ 分析阶段超时: {name}")
+                        submit_ready()
+                        continue
+                    if name not in running:
+                        # 已按超时处理
+                        continue
+                    del running[name]
+                    if error is not None:
+                        outcomes[name] = {'status': STATUS_FAILED, 'result': None, 'elapsed': None,
+                                          'error': str(error)}
+                        logger.warning(f"⚠️ 分析阶段失败: {name}: {str(error)}")
+                    else:
+                        result, elapsed = value
+                        outcomes[name] = {'status': STATUS_OK, 'result': result, 'elapsed': elapsed, 'error': None}
+                    submit_ready()
+            finally:
+                if terminate:
+                    # 超时的阶段仍占用工作进程，终止进程池，下次执行时重建
+                    self.close(terminate=True)
+
+        logger.info(f"✅ 分析阶段执行完成: {len(stages)} 个阶段，耗时 {round(time.monotonic() - started, 3)} 秒")
+        return outcomes
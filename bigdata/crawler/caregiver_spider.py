@@ -14,6 +14,7 @@ from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 import pymongo
 from bigdata_config import MONGODB_CONFIG, CRAWLER_CONFIG
+from bigdata.crawler.listing_extractor import get_listing_extractor
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -67,48 +68,33 @@ class CaregiverSpider(scrapy.Spider):
     
     def parse_zhaopin(self, response):
         """解析智联招聘页面"""
-        job_items = response.css('.joblist-box .joblist-box-item')
-        
-        for job in job_items:
-            try:
-                job_data = {
-                    'source': '智联招聘',
-                    'title': job.css('.job-name a::text').get(),
-                    'company': job.css('.company-name a::text').get(),
-                    'salary': job.css('.job-salary::text').get(),
-                    'location': job.css('.job-area::text').get(),
-                    'experience': job.css('.job-require span:nth-child(1)::text').get(),
-                    'education': job.css('.job-require span:nth-child(2)::text').get(),
-                    'job_type': job.css('.job-require span:nth-child(3)::text').get(),
-                    'publish_time': job.css('.job-time::text').get(),
-                    'job_url': job.css('.job-name a::attr(href)').get(),
-                    'crawl_time': datetime.now().isoformat(),
-                    'crawl_url': response.url
-                }
-                
-                # 清理数据
-                job_data = self.clean_job_data(job_data)
-                
-                if job_data['title'] and '护工' in job_data['title']:
-                    yield job_data
-                    
-            except Exception as e:
-                logger.error(f"解析智联招聘职位失败: {str(e)}")
+        yield from self._parse_listing('zhaopin', '智联招聘', response)
     
     def parse_51job(self, response):
         """解析前程无忧页面"""
-        job_items = response.css('.el .t1')
+        yield from self._parse_listing('51job', '前程无忧', response)
+    
+    def _parse_listing(self, site, source_name, response):
+        """按 listing_sites.json 中的站点定义抽取列表页，每个职位节点只遍历一次"""
+        try:
+            jobs = get_listing_extractor().extract(site, response.text)
+        except Exception as e:
+            logger.error(f"解析{source_name}页面失败: {str(e)}")
+            return
         
-        for job in job_items:
+        for job in jobs:
             try:
                 job_data = {
-                    'source': '前程无忧',
-                    'title': job.css('.t1 a::text').get(),
-                    'company': job.css('.t2 a::text').get(),
-                    'location': job.css('.t3::text').get(),
-                    'salary': job.css('.t4::text').get(),
-                    'publish_time': job.css('.t5::text').get(),
-                    'job_url': job.css('.t1 a::attr(href)').get(),
+                    'source': source_name,
+                    'title': job.get('title'),
+                    'company': job.get('company'),
+                    'salary': job.get('salary'),
+                    'location': job.get('location'),
+                    'experience': job.get('experience'),
+                    'education': job.get('education'),
+                    'job_type': job.get('job_type'),
+                    'publish_time': job.get('publish_time'),
+                    'job_url': response.urljoin(job['job_url']) if job.get('job_url') else None,
                     'crawl_time': datetime.now().isoformat(),
                     'crawl_url': response.url
                 }
@@ -120,7 +106,7 @@ class CaregiverSpider(scrapy.Spider):
                     yield job_data
                     
             except Exception as e:
-                logger.error(f"解析前程无忧职位失败: {str(e)}")
+                logger.error(f"解析{source_name}职位失败: {str(e)}")
     
     def clean_job_data(self, job_data):
         """清理和标准化职位数据"""
@@ -0,0 +1,252 @@
+"""
+护工资源管理系统 - 并发抓取引擎
+====================================
+
+基于有界线程池的页面抓取：
+- 全局并发上限 + 每个站点的并发上限与最小请求间隔（礼貌抓取）
+- requests.Session 复用连接
+- 失败、429、5xx 按指数退避重试，支持 Retry-After（秒数或 HTTP 日期），等待时间不超过 max_retry_after
+- 页面一到就在工作线程内解析，结果按完成顺序产出
+"""
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# 服务器要求的 Retry-After 最多等待这么久（秒），避免异常站点长时间占住工作线程
+DEFAULT_MAX_RETRY_AFTER = 60.0
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """解析 Retry-After：秒数或 HTTP 日期，返回需要等待的秒数，无法解析时返回 None"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HostLimiter:
+    """单个站点的并发与请求间隔限制"""
+
+    def __init__(self, concurrency: int, min_interval: float, jitter: float):
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+        self.min_interval = min_interval
+        self.jitter = jitter
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        # 预约下一个可用的发送时间点，保证同一站点的请求之间至少间隔 min_interval
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.min_interval + random.uniform(0, self.jitter)
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+class FetchResult:
+    """单个页面的抓取结果"""
+
+    __slots__ = ('url', 'status_code', 'attempts', 'elapsed', 'error', 'data')
+
+    def __init__(self, url: str):
+        self.url = url
+        self.status_code: Optional[int] = None
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.error: Optional[str] = None
+        self.data: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FetchEngine:
+    """并发抓取引擎"""
+
+    def __init__(self, max_workers: int = 8, per_host_concurrency: int = 2,
+                 min_interval: float = 0.8, jitter: float = 0.4,
+                 max_retries: int = 2, backoff: float = 1.0, timeout: float = 12,
+                 headers_factory: Optional[Callable[[], Dict[str, str]]] = None,
+                 max_retry_after: float = DEFAULT_MAX_RETRY_AFTER):
+        self.max_workers = max_workers
+        self.per_host_concurrency = per_host_concurrency
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers_factory = headers_factory
+        self.max_retry_after = max_retry_after
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(4, per_host_concurrency),
+                              pool_maxsize=max(max_workers, per_host_concurrency))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
+    def _limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        with self._limiters_lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = HostLimiter(self.per_host_concurrency, self.min_interval, self.jitter)
+                self._limiters[host] = limiter
+            return limiter
+
+    def _retry_delay(self, attempt: int, resp: Optional[requests.Response]) -> float:
+        if resp is not None:
+            retry_after = parse_retry_after(resp.headers.get('Retry-After', ''))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def fetch(self, url: str) -> Tuple[FetchResult, Optional[str]]:
+        """抓取单个页面，返回 (结果, 页面文本)"""
+        result = FetchResult(url)
+        limiter = self._limiter(url)
+        started = time.monotonic()
+        text = None
+        for attempt in range(self.max_retries + 1):
+            result.attempts = attempt + 1
+            resp = None
+            try:
+                with limiter:
+                    headers = self.headers_factory() if self.headers_factory else None
+                    resp = self.session.get(url, headers=headers, timeout=self.timeout)
+                result.status_code = resp.status_code
+                if resp.status_code == 200 and resp.text:
+                    text = resp.text
+                    result.error = None
+                    break
+                result.error = f'HTTP {resp.status_code}'
+                if resp.status_code not in RETRY_STATUS:
+                    break
+            except requests.RequestException as e:
+                result.error = str(e)
+            if attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, resp))
+        result.elapsed = time.monotonic() - started
+        if result.error:
+            logger.warning(f"⚠️ 抓取失败 {url}: {result.error}（尝试 {result.attempts} 次）")
+        return result, text
+
+    def _fetch_and_parse(self, url: str, parse: Callable[[str, str], Any]) -> FetchResult:
+        result, text = self.fetch(url)
+        if text is not None:
+            try:
+                result.data = parse(text, url)
+            except Exception as e:
+                result.error = f'解析失败: {e}'
+        return result
+
+    def crawl(self, tasks: Iterable[Tuple[str, Callable[[str, str], Any]]]) -> Iterator[FetchResult]:
+        """并发抓取并解析，按完成顺序产出结果
+
+        Args:
+            tasks: (url, parse) 序列，parse(html, url) 在工作线程中执行
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='fetch') as pool:
+            futures = [pool.submit(self._fetch_and_parse, url, parse) for url, parse in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class CrawlTaskRegistry:
+    """后台抓取任务的状态表（内存中，保留最近若干个任务）"""
+
+    def __init__(self, limit: int = 50):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.limit = limit
+
+    def create(self, task_id: str, params: Dict[str, Any], total_pages: int) -> Dict[str, Any]:
+        task = {
+            'task_id': task_id,
+            'status': 'running',
+            'params': params,
+            'pages_total': total_pages,
+            'pages_done': 0,
+            'pages_failed': 0,
+            'items': 0,
+            'per_source': {},
+            'errors': [],
+            'started_at': time.time(),
+            'finished_at': None,
+            'result': None
+        }
+        with self._lock:
+            self._tasks[task_id] = task
+            while len(self._tasks) > self.limit:
+                self._tasks.pop(next(iter(self._tasks)))
+        return task
+
+    def update(self, task_id: str, **changes):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                task.update(changes)
+
+    def record_page(self, task_id: str, source: str, result: FetchResult, item_count: int):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            task['pages_done'] += 1
+            if result.ok:
+                task['items'] += item_count
+                task['per_source'][source] = task['per_source'].get(source, 0) + item_count
+            else:
+                task['pages_failed'] += 1
+                if len(task['errors']) < 20:
+                    task['errors'].append({'url': result.url, 'error': result.error})
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            return dict(task, per_source=dict(task['per_source']), errors=list(task['errors']))
@@ -0,0 +1,259 @@
+"""
+护工资源管理系统 - 职位列表页抽取
+====================================
+
+按站点定义（listing_sites.json）从列表页抽取职位字段：
+- 列表项选择器编译为 lxml XPath，一次定位全部列表项
+- 每个列表项只遍历一遍子节点，同时为所有字段匹配选择器
+- 选择器支持 CSS 子集：标签、.class、#id、:nth-child(n)、后代组合，末尾可加 ::attr(name)
+
+新增站点只需在 listing_sites.json 中添加定义。lxml 不可用时回退到 BeautifulSoup，
+使用同一份选择器。
+"""
+
+import os
+import re
+import json
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+# 安全导入可选依赖
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'listing_sites.json')
+
+_COMPOUND_PATTERN = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:[.#][\w-]+|:nth-child\(\d+\))*)$')
+_PART_PATTERN = re.compile(r'([.#])([\w-]+)|:nth-child\((\d+)\)')
+_ATTR_PATTERN = re.compile(r'::attr\(([\w-]+)\)$')
+_EMPTY: frozenset = frozenset()
+
+
+class _Compound:
+    """单个复合选择器，如 span.d.at 或 li:nth-child(2)"""
+
+    __slots__ = ('tag', 'classes', 'id', 'nth')
+
+    def __init__(self, text: str):
+        m = _COMPOUND_PATTERN.match(text)
+        if not m:
+            raise ValueError(f'不支持的选择器: {text}')
+        tag = m.group('tag')
+        self.tag = None if tag in (None, '*') else tag.lower()
+        classes, self.id, self.nth = [], None, None
+        for kind, name, nth in _PART_PATTERN.findall(m.group('rest')):
+            if nth:
+                self.nth = int(nth)
+            elif kind == '.':
+                classes.append(name)
+            else:
+                self.id = name
+        self.classes = frozenset(classes)
+
+    def matches(self, el, class_set=None) -> bool:
+        if self.tag is not None and el.tag != self.tag:
+            return False
+        if self.classes:
+            if class_set is None:
+                value = el.get('class')
+                class_set = value.split() if value else _EMPTY
+            if not self.classes.issubset(class_set):
+                return False
+        if self.id is not None and el.get('id') != self.id:
+            return False
+        if self.nth is not None:
+            position = 1 + sum(1 for s in el.itersiblings(preceding=True) if isinstance(s.tag, str))
+            if position != self.nth:
+                return False
+        return True
+
+    def to_xpath(self) -> str:
+        parts = [self.tag or '*']
+        for name in sorted(self.classes):
+            parts.append(f"[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]")
+        if self.id is not None:
+            parts.append(f"[@id='{self.id}']")
+        if self.nth is not None:
+            parts.append(f"[count(preceding-sibling::*)={self.nth - 1}]")
+        return ''.join(parts)
+
+
+class _Selector:
+    """后代组合的选择器，可带 ::attr(name)"""
+
+    __slots__ = ('css', 'compounds', 'attr')
+
+    def __init__(self, text: str):
+        text = text.strip()
+        m = _ATTR_PATTERN.search(text)
+        self.attr = m.group(1) if m else None
+        self.css = text[:m.start()].strip() if m else text
+        self.compounds = [_Compound(part) for part in self.css.split()]
+
+    def matches(self, el, class_set) -> bool:
+        if not self.compounds[-1].matches(el, class_set):
+            return False
+        # 其余部分按后代关系向上贪心匹配祖先节点
+        remaining = len(self.compounds) - 2
+        if remaining < 0:
+            return True
+        for ancestor in el.iterancestors():
+            if self.compounds[remaining].matches(ancestor):
+                remaining -= 1
+                if remaining < 0:
+                    return True
+        return False
+
+    def to_xpath(self) -> str:
+        return '//' + '//'.join(c.to_xpath() for c in self.compounds)
+
+    def value(self, el) -> str:
+        if self.attr:
+            return (el.get(self.attr) or '').strip()
+        return ''.join(s.strip() for s in el.itertext())
+
+
+class SiteDefinition:
+    """单个站点的抽取规则"""
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.source = spec.get('source', name)
+        self.row_css: List[str] = list(spec['rows'])
+        self.fields: List[Tuple[str, List[_Selector]]] = [
+            (field, [_Selector(s) for s in selectors]) for field, selectors in spec['fields'].items()
+        ]
+        self.field_names = [field for field, _ in self.fields]
+        self.required = list(spec.get('required', []))
+        self.row_xpaths = [etree.XPath(_Selector(css).to_xpath()) for css in self.row_css] if HAS_LXML else []
+        self._build_dispatch()
+
+    def _build_dispatch(self):
+        """按选择器末端的标签或类名建立索引，遍历时每个节点只检查可能命中的选择器"""
+        self._by_tag: Dict[str, List[Tuple[int, int, _Selector]]] = {}
+        self._by_class: Dict[str, List[Tuple[int, int, _Selector]]] = {}
+        self._wildcard: List[Tuple[int, int, _Selector]] = []
+        for field_index, (_, selectors) in enumerate(self.fields):
+            for alt_index, selector in enumerate(selectors):
+                last = selector.compounds[-1]
+                entry = (field_index, alt_index, selector)
+                if last.tag is not None:
+                    self._by_tag.setdefault(last.tag, []).append(entry)
+                elif last.classes:
+                    self._by_class.setdefault(min(last.classes), []).append(entry)
+                else:
+                    self._wildcard.append(entry)
+
+    def _extract_node(self, row) -> Dict[str, str]:
+        """单次遍历列表项的子节点，为每个字段取优先级最高、文档顺序最靠前的匹配"""
+        by_tag, by_class, wildcard = self._by_tag, self._by_class, self._wildcard
+        field_count = len(self.fields)
+        best_alt = [len(selectors) for _, selectors in self.fields]
+        best_el: List[Any] = [None] * field_count
+        settled = 0
+        for el in row.iterdescendants():
+            tag = el.tag
+            if not isinstance(tag, str):
+                continue
+            value = el.get('class')
+            class_set = value.split() if value else _EMPTY
+            candidates = by_tag.get(tag, ())
+            if class_set and by_class:
+                candidates = list(candidates)
+                for name in class_set:
+                    candidates.extend(by_class.get(name, ()))
+            if wildcard:
+                candidates = list(candidates) + wildcard
+            for field_index, alt_index, selector in candidates:
+                if alt_index < best_alt[field_index] and selector.matches(el, class_set):
+                    best_alt[field_index] = alt_index
+                    best_el[field_index] = el
+                    if alt_index == 0:
+                        settled += 1
+            if settled == field_count:
+                break
+        return {
+            name: (selectors[best_alt[i]].value(best_el[i]) if best_el[i] is not None else '')
+            for i, (name, selectors) in enumerate(self.fields)
+        }
+
+    def extract_lxml(self, document) -> List[Dict[str, str]]:
+        rows = []
+        for xpath in self.row_xpaths:
+            rows = xpath(document)
+            if rows:
+                break
+        return [self._extract_node(row) for row in rows]
+
+    def extract_bs4(self, html: str) -> List[Dict[str, str]]:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        rows = []
+        for css in self.row_css:
+            rows = soup.select(css)
+            if rows:
+                break
+        items = []
+        for row in rows:
+            item = {}
+            for name, selectors in self.fields:
+                item[name] = ''
+                for selector in selectors:
+                    el = row.select_one(selector.css)
+                    if el is not None:
+                        item[name] = (el.get(selector.attr) or '').strip() if selector.attr else el.get_text(strip=True)
+                        break
+            items.append(item)
+        return items
+
+
+def _parse_html(html: str):
+    try:
+        return etree.fromstring(html, etree.HTMLParser())
+    except ValueError:
+        # 含编码声明的字符串需要以字节形式解析
+        return etree.fromstring(html.encode('utf-8'), etree.HTMLParser(encoding='utf-8'))
+
+
+class ListingExtractor:
+    """按站点定义抽取列表页中的职位"""
+
+    def __init__(self, sites_path: str = DEFAULT_SITES_PATH):
+        with open(sites_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        self.version = str(config.get('version', ''))
+        self.sites: Dict[str, SiteDefinition] = {
+            name: SiteDefinition(name, spec) for name, spec in config.get('sites', {}).items()
+        }
+
+    def extract(self, site: str, html: str) -> List[Dict[str, str]]:
+        """抽取页面中的职位，缺少必填字段的列表项会被丢弃"""
+        definition = self.sites[site]
+        if not html:
+            return []
+        if HAS_LXML:
+            items = definition.extract_lxml(_parse_html(html))
+        else:
+            items = definition.extract_bs4(html)
+        result = []
+        for item in items:
+            if all(item.get(field) for field in definition.required):
+                item['source'] = definition.source
+                result.append(item)
+        return result
+
+
+_default_extractor: Optional[ListingExtractor] = None
+
+
+def get_listing_extractor() -> ListingExtractor:
+    """获取使用默认站点定义的共享抽取器"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = ListingExtractor()
+    return _default_extractor
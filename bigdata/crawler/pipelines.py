@@ -8,7 +8,9 @@
 import logging
 import pymongo
 from itemadapter import ItemAdapter
+from scrapy.exceptions import DropItem
 from bigdata_config import MONGODB_CONFIG
+from bigdata.processing.near_duplicates import HAS_NUMPY, NearDuplicateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -148,10 +150,11 @@ class DataValidationPipeline:
         return item
 
 class DuplicatesPipeline:
-    """去重管道"""
+    """去重管道：同一次运行中职位名称、公司、城市、描述近似的职位只保留第一条"""
     
     def __init__(self):
         self.seen = set()
+        self.index = NearDuplicateIndex() if HAS_NUMPY else None
     
     def process_item(self, item, spider):
         """去重处理"""
@@ -162,6 +165,11 @@ class DuplicatesPipeline:
         
         if identifier in self.seen:
             raise DropItem(f"重复数据: {identifier}")
-        else:
-            self.seen.add(identifier)
-            return item
+        self.seen.add(identifier)
+        
+        if self.index is not None:
+            before = len(self.index)
+            record = int(self.index.add_rows([adapter.asdict()])[0])
+            if record >= 0 and (record < before or self.index.find(record) != record):
+                raise DropItem(f"近似重复数据: {identifier}")
+        return item
@@ -0,0 +1,141 @@
+"""
+护工资源管理系统 - 分箱统计
+====================================
+
+区间（分箱）定义与计数，各处的薪资区间、评分区间只在这里声明一次：
+- BinSpec 描述一组区间：边界、标签，以及最低 / 最高区间是否开放
+- BinSpec.codes 把一列数值映射为区间编号（searchsorted），供分面索引、分布立方体使用
+- bin_counts 对同一列按任意多组区间计数：所有区间组的边界合并去重，只统计"小于每个边界的数量"，
+  每个区间的数量由两端边界的计数相减得到，不再为每个区间生成布尔掩码与临时 DataFrame。
+  边界不多时每个边界一次向量化比较（比逐元素二分查找快得多），边界很多时改为一次 searchsorted + bincount
+"""
+
+import logging
+from typing import Dict, List, Any, Optional
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+# 合并后的边界超过该数量时改用 searchsorted + bincount（单次比较约为 searchsorted 的 1/50）
+SEARCHSORTED_MIN_POINTS = 48
+
+
+class BinSpec:
+    """一组区间
+
+    区间为左闭右开 [edges[i], edges[i+1])；open_lower 时在最前面增加 (-inf, edges[0])，
+    open_upper 时在最后增加 [edges[-1], +inf)；closed_upper 时最后一个区间包含右端点，
+    边界重复（如 [5, 5]）表示只包含这一个值的区间。NaN 与正负无穷不属于任何区间。
+
+    Args:
+        name: 区间组名称
+        edges: 递增的边界
+        labels: 各区间的标签，按区间从低到高排列
+        descending: 输出计数时按区间从高到低排列
+    """
+
+    __slots__ = ('name', 'edges', 'labels', 'open_lower', 'open_upper', 'closed_upper', 'descending')
+
+    def __init__(self, name: str, edges: List[float], labels: List[str], open_lower: bool = False,
+                 open_upper: bool = False, closed_upper: bool = False, descending: bool = False):
+        expected = len(edges) - 1 + open_lower + open_upper
+        if len(labels) != expected:
+            raise ValueError(f'区间 {name} 需要 {expected} 个标签，实际 {len(labels)} 个')
+        if open_upper and closed_upper:
+            raise ValueError(f'区间 {name} 不能同时开放并包含右端点')
+        self.name = name
+        self.edges = [float(edge) for edge in edges]
+        self.labels = list(labels)
+        self.open_lower = open_lower
+        self.open_upper = open_upper
+        self.closed_upper = closed_upper
+        self.descending = descending
+
+    def codes(self, values) -> 'np.ndarray':
+        """数值 -> 区间编号（0 起，按区间从低到高）；不属于任何区间（含 NaN）的编号为 len(labels)"""
+        values = np.asarray(values, dtype=np.float64)
+        edges = np.asarray(self.edges, dtype=np.float64)
+        codes = np.searchsorted(edges, values, side='right') - (0 if self.open_lower else 1)
+        if self.closed_upper:
+            codes = np.where(values == edges[-1], len(self.labels) - 1, codes)
+        outside = (codes < 0) | (codes >= len(self.labels)) | ~np.isfinite(values)
+        return np.where(outside, len(self.labels), codes).astype(np.int32)
+
+    def label(self, value: Optional[float]) -> Optional[str]:
+        """单个数值所属区间的标签，不属于任何区间时返回 None"""
+        if value is None:
+            return None
+        code = int(self.codes([value])[0])
+        return self.labels[code] if code < len(self.labels) else None
+
+    def _bounds(self) -> List[tuple]:
+        """各区间的 (下界, 上界)，上界不含；包含右端点时上界取它的下一个浮点数"""
+        edges = self.edges
+        bounds = [(edges[i], edges[i + 1]) for i in range(len(edges) - 1)]
+        if self.closed_upper and bounds:
+            bounds[-1] = (bounds[-1][0], float(np.nextafter(edges[-1], np.inf)))
+        if self.open_lower:
+            bounds.insert(0, (float(np.nextafter(-np.inf, 0)), edges[0]))
+        if self.open_upper:
+            bounds.append((edges[-1], np.inf))
+        return bounds
+
+    def as_dict(self, counts: List[int]) -> Dict[str, int]:
+        pairs = list(zip(self.labels, (int(count) for count in counts)))
+        return dict(reversed(pairs) if self.descending else pairs)
+
+
+def bin_counts(values, specs: List[BinSpec]) -> Dict[str, Dict[str, int]]:
+    """按多组区间对同一列计数，各组共用边界的计数
+
+    Returns:
+        {区间组名称: {标签: 数量}}
+    """
+    values = np.asarray(values, dtype=np.float64)
+    bounds = {spec.name: spec._bounds() for spec in specs}
+    # 所有边界合并；开放区间以 ±inf 为界（不含无穷本身），NaN 不小于任何边界，不计入任何区间
+    points = np.unique(np.array([point for spec_bounds in bounds.values() for pair in spec_bounds for point in pair],
+                                dtype=np.float64))
+    if len(points) < SEARCHSORTED_MIN_POINTS:
+        below = [np.count_nonzero(values < point) for point in points]
+    else:
+        # 每个值落在第一个大于它的边界之前；below[i] = 小于 points[i] 的数量
+        buckets = np.bincount(np.searchsorted(points, values, side='right'), minlength=len(points) + 1)
+        below = np.cumsum(buckets)[:len(points)].tolist()
+    below_at = dict(zip(points.tolist(), below))
+    counts = {}
+    for spec in specs:
+        counts[spec.name] = spec.as_dict([below_at[upper] - below_at[lower] for lower, upper in bounds[spec.name]])
+    return counts
+
+
+def bin_counts_loop(values, spec: BinSpec) -> Dict[str, int]:
+    """逐区间用布尔掩码计数（每个区间两次比较），只用于基准测试对照"""
+    values = np.asarray(values, dtype=np.float64)
+    return spec.as_dict([np.count_nonzero((values >= lower) & (values < upper)) for lower, upper in spec._bounds()])
+
+
+# ==================== 区间定义 ====================
+
+# 职位月薪区间（元）：分面索引、分布立方体与护工分布接口共用
+SALARY_BANDS = BinSpec('salary_band', [3000, 5000, 8000, 12000],
+                       ['3000以下', '3000-5000', '5000-8000', '8000-12000', '12000以上'],
+                       open_lower=True, open_upper=True)
+SALARY_BAND_UNKNOWN = '面议/未知'
+# 护工分布接口沿用的薪资区间名称，与 SALARY_BANDS 一一对应
+DISTRIBUTION_SALARY_LABELS = ['2000-3000', '3000-5000', '5000-8000', '8000-12000', '12000+']
+
+# 护工薪资区间（动态分析的护工分布）
+CAREGIVER_SALARY_BANDS = BinSpec('salary_distribution', [2000, 3000, 5000, 8000, 12000],
+                                 DISTRIBUTION_SALARY_LABELS, open_upper=True)
+
+# 护工评分区间，5.0 单独一档，输出按评分从高到低
+RATING_BANDS = BinSpec('rating_distribution', [1, 2, 3, 4, 5, 5],
+                       ['1.0-1.9', '2.0-2.9', '3.0-3.9', '4.0-4.9', '5.0'],
+                       closed_upper=True, descending=True)
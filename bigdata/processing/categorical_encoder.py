@@ -0,0 +1,148 @@
+"""
+护工资源管理系统 - 分类特征编码
+====================================
+
+把分类列编码为整数，供本地分析与模型训练使用（对应 Spark 流水线中的 StringIndexer）：
+- 每列一个只追加的词表，已有取值的编码永远不变，新取值按首次出现的顺序追加到末尾
+- 整列一次编码：先 factorize 得到列内的不同取值，再对这些取值做一次哈希查找，最后按下标取回
+- 缺失值编码为 MISSING_VALUE（空字符串）对应的类别
+- 词表保存为 JSON，与模型一起持久化；重新加载后编码保持一致
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Any, Optional, Iterable
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+logger = logging.getLogger(__name__)
+
+MISSING_VALUE = ''
+UNKNOWN_CODE = -1
+CATEGORICAL_DTYPES = ['object', 'string', 'category']
+
+
+class CategoricalEncoder:
+    """只追加词表的分类编码器
+
+    Args:
+        vocabularies: 已有词表 {列名: [取值, ...]}，取值在列表中的下标即编码
+    """
+
+    def __init__(self, vocabularies: Optional[Dict[str, List[str]]] = None):
+        self.vocabularies: Dict[str, List[str]] = {}
+        self._indexes: Dict[str, 'pd.Index'] = {}
+        for column, values in (vocabularies or {}).items():
+            self.vocabularies[column] = []
+            self._append(column, values)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.vocabularies
+
+    def __getstate__(self):
+        # 索引（含哈希表）不序列化，使用时按词表重建
+        return {'vocabularies': self.vocabularies}
+
+    def __setstate__(self, state):
+        self.vocabularies = state['vocabularies']
+        self._indexes = {}
+
+    def copy(self) -> 'CategoricalEncoder':
+        return CategoricalEncoder({column: list(values) for column, values in self.vocabularies.items()})
+
+    def _index(self, column: str) -> 'pd.Index':
+        index = self._indexes.get(column)
+        if index is None:
+            index = self._indexes[column] = pd.Index(self.vocabularies.get(column, []), dtype=object)
+        return index
+
+    def _append(self, column: str, values: Iterable[str]):
+        vocabulary = self.vocabularies.setdefault(column, [])
+        known = set(vocabulary)
+        added = []
+        for value in values:
+            if value not in known:
+                known.add(value)
+                added.append(value)
+        if added:
+            vocabulary.extend(added)
+            self._indexes.pop(column, None)
+
+    def encode(self, column: str, values: Any, extend: bool = True) -> 'np.ndarray':
+        """编码一列
+
+        Args:
+            column: 列名（词表名）
+            values: Series 或序列
+            extend: 为 True 时新取值追加到词表；为 False 时新取值编码为 UNKNOWN_CODE
+        """
+        local_codes, uniques = pd.factorize(pd.Series(values, copy=False), use_na_sentinel=True)
+        labels = pd.Index(uniques, dtype=object).astype(str)
+        # 末尾补一个位置给缺失值（factorize 的编码 -1 取到最后一个元素）
+        labels = labels.append(pd.Index([MISSING_VALUE], dtype=object))
+        mapped = self._index(column).get_indexer(labels)
+        unseen = mapped < 0
+        # 没有缺失值时不为它新增类别
+        unseen[-1] &= bool((local_codes < 0).any())
+        if extend and unseen.any():
+            self._append(column, pd.unique(labels[unseen]))
+            mapped[unseen] = self._index(column).get_indexer(labels[unseen])
+        return mapped.astype(np.int32)[local_codes]
+
+    def decode(self, column: str, codes: Any) -> 'np.ndarray':
+        """编码 -> 取值，UNKNOWN_CODE 解码为 None"""
+        vocabulary = np.array(self.vocabularies.get(column, []) + [None], dtype=object)
+        codes = np.asarray(codes, dtype=np.int64)
+        return vocabulary[np.where(codes < 0, len(vocabulary) - 1, codes)]
+
+    def fit_transform(self, df: 'pd.DataFrame', columns: Optional[List[str]] = None) -> 'pd.DataFrame':
+        """编码 DataFrame 的分类列（默认全部 object / 字符串 / category 列），扩充词表"""
+        return self.transform(df, columns, extend=True)
+
+    def transform(self, df: 'pd.DataFrame', columns: Optional[List[str]] = None,
+                  extend: bool = False) -> 'pd.DataFrame':
+        """编码 DataFrame 的分类列，返回新的 DataFrame；extend 为 False 时新取值编码为 UNKNOWN_CODE"""
+        if columns is None:
+            columns = list(df.select_dtypes(include=CATEGORICAL_DTYPES).columns)
+        encoded = df.copy()
+        for column in columns:
+            encoded[column] = self.encode(column, df[column], extend=extend)
+        return encoded
+
+    def update(self, other: 'CategoricalEncoder'):
+        """合并另一个编码器（如工作进程中扩充过的副本）的词表，已有编码不变"""
+        for column, values in other.vocabularies.items():
+            current = self.vocabularies.get(column, [])
+            if values[:len(current)] != current:
+                logger.warning(f"⚠️ 词表分叉，新取值追加到末尾: {column}")
+            self._append(column, values)
+
+    # ---- 持久化 ----
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'vocabularies': self.vocabularies}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CategoricalEncoder':
+        return cls(data.get('vocabularies') or {})
+
+    def save(self, path: str):
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CategoricalEncoder':
+        """读取词表，文件不存在时返回空编码器"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,404 @@
+"""
+护工资源管理系统 - 职位数据列式存储
+====================================
+
+将 data/raw 下的职位数据集保存为列式目录（*.cols），读取时按列内存映射，
+只有被访问的列才会从磁盘载入。
+
+目录结构：
+- meta.json: 行数、列定义（列名 -> 存储类型/文件前缀）
+- 字典编码列: <stem>.codes.bin (int32) + <stem>.dict.offsets.bin (int64) + <stem>.dict.data.bin (UTF-8)
+- 普通文本列: <stem>.offsets.bin (int64) + <stem>.data.bin (UTF-8)
+- 数值列: <stem>.values.bin (float64)
+"""
+
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from bigdata.processing.salary_normalizer import SALARY_FIELDS, normalize_records
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = 'caregiver-columnar'
+FORMAT_VERSION = 1
+COLUMNAR_SUFFIX = '.cols'
+
+# 职位数据的标准列，低基数列使用字典编码，长文本列按原样存储
+JOB_COLUMNS = [
+    'title', 'company', 'location', 'salary', 'source', 'crawl_time',
+    'skills', 'benefits', 'education', 'experience', 'job_type',
+    'description', 'requirements',
+    'salary_low', 'salary_high', 'salary_monthly', 'salary_status'
+]
+DICT_COLUMNS = {
+    'title', 'company', 'location', 'salary', 'source',
+    'education', 'experience', 'job_type'
+}
+NUMERIC_COLUMNS = {'salary_low', 'salary_high', 'salary_monthly', 'salary_status'}
+
+CODE_DTYPE = '<i4'
+OFFSET_DTYPE = '<i8'
+VALUE_DTYPE = '<f8'
+
+
+def is_columnar_path(path: str) -> bool:
+    """判断路径是否为列式数据集目录"""
+    return path.endswith(COLUMNAR_SUFFIX) and os.path.isfile(os.path.join(path, 'meta.json'))
+
+
+def _to_text(value: Any) -> str:
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else str(value)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class ColumnarWriter:
+    """列式数据集写入器
+
+    支持分批 append，写入过程中只在内存中保留字典编码列的字典，
+    其余数据直接追加到磁盘文件。close() 时原子性地把临时目录改名为目标目录。
+    """
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None,
+                 dict_columns: Optional[Iterable[str]] = None,
+                 numeric_columns: Optional[Iterable[str]] = None):
+        if not HAS_NUMPY:
+            raise RuntimeError('numpy未安装，无法写入列式数据')
+        self.path = path
+        self.columns = list(columns or JOB_COLUMNS)
+        self.dict_columns = set(DICT_COLUMNS if dict_columns is None else dict_columns)
+        self.numeric_columns = set(NUMERIC_COLUMNS if numeric_columns is None else numeric_columns)
+        self.num_rows = 0
+        self._tmp_path = f'{path}.tmp-{os.getpid()}'
+        if os.path.exists(self._tmp_path):
+            shutil.rmtree(self._tmp_path)
+        os.makedirs(self._tmp_path)
+
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._dicts: Dict[str, Dict[str, int]] = {}
+        self._offsets: Dict[str, int] = {}
+        for i, name in enumerate(self.columns):
+            self._add_column(name, f'c{i}')
+        self._closed = False
+
+    def _add_column(self, name: str, stem: str):
+        if name in self.numeric_columns:
+            kind = 'numeric'
+        elif name in self.dict_columns:
+            kind = 'dict'
+        else:
+            kind = 'plain'
+        self._specs[name] = {'kind': kind, 'stem': stem}
+        base = os.path.join(self._tmp_path, stem)
+        if kind == 'numeric':
+            self._files[name] = {'values': open(f'{base}.values.bin', 'wb')}
+        elif kind == 'dict':
+            self._files[name] = {'codes': open(f'{base}.codes.bin', 'wb')}
+            self._dicts[name] = {}
+        else:
+            files = {'offsets': open(f'{base}.offsets.bin', 'wb'), 'data': open(f'{base}.data.bin', 'wb')}
+            np.zeros(1, dtype=OFFSET_DTYPE).tofile(files['offsets'])
+            self._files[name] = files
+            self._offsets[name] = 0
+
+    def append(self, rows: List[Dict[str, Any]]):
+        """追加一批行"""
+        if self._closed:
+            raise RuntimeError('写入器已关闭')
+        if not rows:
+            return
+        for name in self.columns:
+            spec = self._specs[name]
+            files = self._files[name]
+            if spec['kind'] == 'numeric':
+                values = np.fromiter((_to_float(r.get(name)) for r in rows), dtype=VALUE_DTYPE, count=len(rows))
+                values.tofile(files['values'])
+            elif spec['kind'] == 'dict':
+                mapping = self._dicts[name]
+                codes = np.empty(len(rows), dtype=CODE_DTYPE)
+                for i, r in enumerate(rows):
+                    text = _to_text(r.get(name))
+                    code = mapping.get(text)
+                    if code is None:
+                        code = len(mapping)
+                        mapping[text] = code
+                    codes[i] = code
+                codes.tofile(files['codes'])
+            else:
+                encoded = [_to_text(r.get(name)).encode('utf-8') for r in rows]
+                lengths = np.fromiter((len(b) for b in encoded), dtype=OFFSET_DTYPE, count=len(encoded))
+                ends = np.cumsum(lengths) + self._offsets[name]
+                files['data'].write(b''.join(encoded))
+                ends.tofile(files['offsets'])
+                self._offsets[name] = int(ends[-1])
+        self.num_rows += len(rows)
+
+    def close(self, extra_meta: Optional[Dict[str, Any]] = None) -> str:
+        """写入字典与元数据并发布数据集目录"""
+        if self._closed:
+            return self.path
+        for name, files in self._files.items():
+            for fh in files.values():
+                fh.close()
+        for name, mapping in self._dicts.items():
+            base = os.path.join(self._tmp_path, self._specs[name]['stem'])
+            encoded = [text.encode('utf-8') for text in mapping]  # dict保持插入顺序，即编码顺序
+            offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_DTYPE)
+            if encoded:
+                offsets[1:] = np.cumsum([len(b) for b in encoded])
+            offsets.tofile(f'{base}.dict.offsets.bin')
+            with open(f'{base}.dict.data.bin', 'wb') as f:
+                f.write(b''.join(encoded))
+
+        meta = {
+            'format': FORMAT_NAME,
+            'version': FORMAT_VERSION,
+            'num_rows': self.num_rows,
+            'columns': self._specs,
+            'column_order': self.columns,
+            'created_at': datetime.now().isoformat()
+        }
+        if extra_meta:
+            meta.update(extra_meta)
+        with open(os.path.join(self._tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.replace(self._tmp_path, self.path)
+        self._closed = True
+        return self.path
+
+    def abort(self):
+        """放弃写入并清理临时目录"""
+        for files in self._files.values():
+            for fh in files.values():
+                fh.close()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class ColumnarDataset:
+    """列式数据集读取器
+
+    所有列文件都通过 numpy.memmap 打开，只有访问到的列才会产生磁盘读取。
+    """
+
+    def __init__(self, path: str):
+        if not HAS_NUMPY:
+            raise RuntimeError('numpy未安装，无法读取列式数据')
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != FORMAT_NAME:
+            raise ValueError(f'不支持的数据格式: {self.meta.get("format")}')
+        self.num_rows = int(self.meta['num_rows'])
+        self.columns: List[str] = self.meta.get('column_order') or list(self.meta['columns'])
+        self._dict_cache: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def _spec(self, name: str) -> Dict[str, Any]:
+        try:
+            return self.meta['columns'][name]
+        except KeyError:
+            raise KeyError(f'列不存在: {name}')
+
+    def _map(self, filename: str, dtype: str, count: int):
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, filename), dtype=dtype, mode='r', shape=(count,))
+
+    def _read_bytes(self, filename: str) -> bytes:
+        full = os.path.join(self.path, filename)
+        if os.path.getsize(full) == 0:
+            return b''
+        return np.memmap(full, dtype='u1', mode='r').tobytes()
+
+    def kind(self, name: str) -> str:
+        return self._spec(name)['kind']
+
+    def codes(self, name: str):
+        """字典编码列的编码数组（内存映射）"""
+        spec = self._spec(name)
+        if spec['kind'] != 'dict':
+            raise ValueError(f'列 {name} 不是字典编码列')
+        return self._map(f"{spec['stem']}.codes.bin", CODE_DTYPE, self.num_rows)
+
+    def dictionary(self, name: str) -> List[str]:
+        """字典编码列的字符串表"""
+        if name not in self._dict_cache:
+            spec = self._spec(name)
+            if spec['kind'] != 'dict':
+                raise ValueError(f'列 {name} 不是字典编码列')
+            stem = spec['stem']
+            offsets_file = os.path.join(self.path, f'{stem}.dict.offsets.bin')
+            count = os.path.getsize(offsets_file) // np.dtype(OFFSET_DTYPE).itemsize
+            offsets = self._map(f'{stem}.dict.offsets.bin', OFFSET_DTYPE, count)
+            data = self._read_bytes(f'{stem}.dict.data.bin')
+            self._dict_cache[name] = [
+                data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count - 1)
+            ]
+        return self._dict_cache[name]
+
+    def values(self, name: str):
+        """数值列（内存映射 float64 数组）"""
+        spec = self._spec(name)
+        if spec['kind'] != 'numeric':
+            raise ValueError(f'列 {name} 不是数值列')
+        return self._map(f"{spec['stem']}.values.bin", VALUE_DTYPE, self.num_rows)
+
+    def column(self, name: str) -> List[Any]:
+        """读取单列为 Python 列表"""
+        spec = self._spec(name)
+        if spec['kind'] == 'numeric':
+            return [None if v != v else v for v in self.values(name).tolist()]
+        if spec['kind'] == 'dict':
+            table = np.asarray(self.dictionary(name), dtype=object)
+            return table[np.asarray(self.codes(name))].tolist()
+        stem = spec['stem']
+        offsets = self._map(f'{stem}.offsets.bin', OFFSET_DTYPE, self.num_rows + 1)
+        data = self._read_bytes(f'{stem}.data.bin')
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self.num_rows)]
+
+    def prefixes(self, name: str, width: int):
+        """每行的前 width 个字节（不足补 0），返回定长字节串数组，用于按前缀分组"""
+        spec = self._spec(name)
+        if spec['kind'] == 'dict':
+            table = np.array([v.encode('utf-8')[:width] for v in self.dictionary(name)], dtype=f'S{width}')
+            return table[np.asarray(self.codes(name))] if table.size else np.zeros(self.num_rows, dtype=f'S{width}')
+        if spec['kind'] != 'plain':
+            raise ValueError(f'列 {name} 不是字符串列')
+        stem = spec['stem']
+        offsets = np.asarray(self._map(f'{stem}.offsets.bin', OFFSET_DTYPE, self.num_rows + 1), dtype=np.int64)
+        out = np.zeros((self.num_rows, width), dtype=np.uint8)
+        if self.num_rows and offsets[-1]:
+            data = self._map(f'{stem}.data.bin', 'u1', int(offsets[-1]))
+            positions = offsets[:-1, None] + np.arange(width)
+            inside = positions < offsets[1:, None]
+            out[inside] = data[positions[inside]]
+        return out.view(f'S{width}').reshape(-1)
+
+    def records(self, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """按行返回字典列表，只读取指定的列"""
+        names = [c for c in (columns or self.columns) if c in self.meta['columns']]
+        data = {name: self.column(name) for name in names}
+        return [{name: data[name][i] for name in names} for i in range(self.num_rows)]
+
+    def take(self, indices, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """按行号读取少量记录，只访问这些行涉及的数据"""
+        indices = np.asarray(indices, dtype=np.int64)
+        names = [c for c in (columns or self.columns) if c in self.meta['columns']]
+        data: Dict[str, List[Any]] = {}
+        for name in names:
+            spec = self._spec(name)
+            if spec['kind'] == 'numeric':
+                data[name] = [None if v != v else v for v in self.values(name)[indices].tolist()]
+            elif spec['kind'] == 'dict':
+                table = self.dictionary(name)
+                data[name] = [table[c] for c in self.codes(name)[indices].tolist()]
+            else:
+                stem = spec['stem']
+                offsets = self._map(f'{stem}.offsets.bin', OFFSET_DTYPE, self.num_rows + 1)
+                values = self._map(f'{stem}.data.bin', 'u1', int(offsets[-1]) if self.num_rows else 0)
+                data[name] = [bytes(values[offsets[i]:offsets[i + 1]]).decode('utf-8') for i in indices.tolist()]
+        return [{name: data[name][k] for name in names} for k in range(len(indices))]
+
+
+def write_records(rows: List[Dict[str, Any]], path: str, columns: Optional[List[str]] = None,
+                  chunk_size: int = 10000, extra_meta: Optional[Dict[str, Any]] = None) -> str:
+    """一次性把行列表写为列式数据集"""
+    if columns is None:
+        columns = list(JOB_COLUMNS)
+        for r in rows:
+            for key in r:
+                if key not in columns:
+                    columns.append(key)
+    writer = ColumnarWriter(path, columns)
+    try:
+        for start in range(0, len(rows), chunk_size):
+            writer.append(rows[start:start + chunk_size])
+        return writer.close(extra_meta)
+    except Exception:
+        writer.abort()
+        raise
+
+
+def convert_json_file(json_path: str, out_path: Optional[str] = None, overwrite: bool = False) -> Optional[str]:
+    """将 jobs_*.json 文件转换为同名的列式数据集"""
+    if out_path is None:
+        out_path = os.path.splitext(json_path)[0] + COLUMNAR_SUFFIX
+    if os.path.exists(out_path) and not overwrite:
+        logger.info(f"已存在，跳过: {out_path}")
+        return None
+    with open(json_path, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    if not isinstance(rows, list):
+        raise ValueError(f'JSON结构不正确: {json_path}')
+    if rows and not all(field in rows[0] for field in SALARY_FIELDS):
+        normalize_records(rows)
+    return write_records(rows, out_path, extra_meta={'source_file': os.path.basename(json_path)})
+
+
+def main():
+    """一次性转换 data/raw 下已有的 jobs_*.json"""
+    parser = argparse.ArgumentParser(description='将职位数据JSON转换为列式存储')
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), 'data', 'raw'), help='数据目录')
+    parser.add_argument('--overwrite', action='store_true', help='覆盖已存在的列式目录')
+    parser.add_argument('--remove-json', action='store_true', help='转换成功后删除原JSON文件')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    converted = 0
+    for name in sorted(os.listdir(args.data_dir)):
+        if not (name.startswith('jobs_') and name.endswith('.json')):
+            continue
+        json_path = os.path.join(args.data_dir, name)
+        try:
+            out = convert_json_file(json_path, overwrite=args.overwrite)
+            if out:
+                converted += 1
+                logger.info(f"✅ 转换完成: {name} -> {os.path.basename(out)}")
+            if args.remove_json and os.path.exists(os.path.splitext(json_path)[0] + COLUMNAR_SUFFIX):
+                os.remove(json_path)
+        except Exception as e:
+            logger.error(f"❌ 转换失败: {name}: {str(e)}")
+    print(f"共转换 {converted} 个文件")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
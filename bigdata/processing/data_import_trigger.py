@@ -13,6 +13,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import pandas as pd
 from bigdata_config import DATA_PATHS
+from bigdata.processing.event_log import EventLog
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +22,10 @@ class DataImportTrigger:
     
     def __init__(self, api_base_url: str = "http://localhost:8000"):
         self.api_base_url = api_base_url
-        self.import_log_file = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic', 'import_log.json')
-        
-        # 创建必要的目录
-        os.makedirs(os.path.dirname(self.import_log_file), exist_ok=True)
+        log_dir = os.path.join(DATA_PATHS['ANALYSIS_RESULTS'], 'dynamic')
+        # 导入日志：追加写 JSONL，与动态分析器共用；旧的 import_log.json 首次使用时迁移
+        self.import_log = EventLog(log_dir, 'import_log')
+        self.import_log.migrate_json_array(os.path.join(log_dir, 'import_log.json'))
     
     def trigger_analysis(self, source: str, data_count: int, data_type: str = "csv") -> bool:
         """触发动态分析"""
@@ -174,34 +175,25 @@ class DataImportTrigger:
                 'status': 'success'
             }
             
-            # 读取现有日志
-            if os.path.exists(self.import_log_file):
-                with open(self.import_log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            else:
-                logs = []
-            
-            # 添加新日志
-            logs.append(log_entry)
-            
-            # 保存日志
-            with open(self.import_log_file, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
+            self.import_log.append(log_entry)
             
             logger.info(f"✅ 导入日志记录成功: {source}")
             
         except Exception as e:
             logger.error(f"❌ 导入日志记录失败: {str(e)}")
     
-    def get_import_history(self) -> list:
-        """获取导入历史"""
+    def get_import_history(self, limit: Optional[int] = None, source: Optional[str] = None) -> list:
+        """获取导入历史（按时间顺序）
+        
+        Args:
+            limit: 只返回最近的条数，None 表示全部保留的记录
+            source: 只返回该来源的记录
+        """
         try:
-            if os.path.exists(self.import_log_file):
-                with open(self.import_log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-                return logs
-            else:
-                return []
+            if limit is not None:
+                return list(reversed(self.import_log.latest(limit, source=source)))
+            return [entry for entry in self.import_log.iter_entries()
+                    if source is None or entry.get('source') == source]
                 
         except Exception as e:
             logger.error(f"❌ 获取导入历史失败: {str(e)}")
@@ -0,0 +1,416 @@
+"""
+护工资源管理系统 - 职位数据集注册表
+====================================
+
+按内容寻址保存职位数据集，相同内容只存一份：
+- blobs/<sha256>.cols（或 .jsonl）: 数据集内容，文件名即内容摘要
+- registry.json: 清单（行数、列、来源、创建时间）以及当前生效的数据集 active
+
+文件导入按原始字节计算摘要，爬取结果按标准化后的行计算摘要。
+分析接口只读取 active 数据集；未被清单引用的 blob 由 gc 命令清理。
+清单的读改写与 gc 在文件锁 registry.lock 内进行，多个进程同时导入也不会丢失登记；
+gc 只清理超过一定时间未修改的临时文件，不会删除正在进行的导入。
+"""
+
+import os
+import sys
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import argparse
+import time
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, BinaryIO
+
+from bigdata.processing.file_lock import FileLock
+from bigdata.processing.columnar_store import (
+    HAS_NUMPY, COLUMNAR_SUFFIX, ColumnarDataset, is_columnar_path, write_records
+)
+from bigdata.processing.salary_normalizer import SALARY_FIELDS, normalize_records
+from bigdata.processing.streaming_import import (
+    JSONL_SUFFIX, StreamingImporter, JsonlWriter, iter_jsonl
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'registry.json'
+LOCK_NAME = 'registry.lock'
+BLOB_DIR_NAME = 'blobs'
+INCOMING_PREFIX = '.incoming-'
+HASH_BLOCK_SIZE = 1024 * 1024
+# 临时文件超过该时间（秒）未修改才视为中断导入的残留
+DEFAULT_TEMP_MAX_AGE = 24 * 3600
+
+_lock = threading.Lock()
+
+
+def hash_file(path: str) -> str:
+    """计算文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_rows(rows: List[Dict[str, Any]]) -> str:
+    """按行计算数据集摘要（键排序后的JSON，每行一条）"""
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(json.dumps(row, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _hash_columnar_dir(path: str) -> str:
+    """列式目录的摘要：除 meta.json 外所有列文件内容"""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        if name == 'meta.json':
+            continue
+        digest.update(name.encode('utf-8'))
+        digest.update(hash_file(os.path.join(path, name)).encode('ascii'))
+    return digest.hexdigest()
+
+
+class DatasetRegistry:
+    """内容寻址的数据集注册表"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, BLOB_DIR_NAME)
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.lock_path = os.path.join(root, LOCK_NAME)
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    # ---- 清单读写 ----
+
+    def _locked(self) -> FileLock:
+        """清单读改写与 gc 的锁（线程锁 + 跨进程文件锁）"""
+        return FileLock(self.lock_path, _lock)
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.manifest_path):
+            return {'active': None, 'datasets': {}}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self, manifest: Dict[str, Any]):
+        tmp_path = f'{self.manifest_path}.tmp-{os.getpid()}-{threading.get_ident()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """全部数据集，按创建时间倒序"""
+        datasets = self._load()['datasets']
+        return sorted(datasets.values(), key=lambda e: e['created_at'], reverse=True)
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        return self._load()['datasets'].get(digest)
+
+    def active(self) -> Optional[Dict[str, Any]]:
+        """当前生效的数据集"""
+        manifest = self._load()
+        digest = manifest.get('active')
+        return manifest['datasets'].get(digest) if digest else None
+
+    def path_of(self, entry: Dict[str, Any]) -> str:
+        return os.path.join(self.blob_dir, entry['file'])
+
+    def dataset_paths(self) -> List[str]:
+        """数据集路径，active 在前，其余按创建时间倒序"""
+        manifest = self._load()
+        active = manifest.get('active')
+        entries = sorted(manifest['datasets'].values(), key=lambda e: e['created_at'], reverse=True)
+        entries.sort(key=lambda e: e['digest'] != active)
+        return [self.path_of(e) for e in entries]
+
+    def digest_of(self, path: str) -> Optional[str]:
+        """路径对应的摘要，不在注册表中时返回 None"""
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.blob_dir):
+            return None
+        digest = os.path.splitext(os.path.basename(path))[0]
+        return digest if self.get(digest) else None
+
+    def activate(self, digest: str) -> Dict[str, Any]:
+        with self._locked():
+            manifest = self._load()
+            if digest not in manifest['datasets']:
+                raise KeyError(f'数据集不存在: {digest}')
+            manifest['active'] = digest
+            self._save(manifest)
+            return manifest['datasets'][digest]
+
+    def remove(self, digest: str):
+        """从清单中移除数据集（blob 由 gc 清理），不能移除 active 数据集"""
+        with self._locked():
+            manifest = self._load()
+            if manifest.get('active') == digest:
+                raise ValueError('不能移除当前生效的数据集')
+            manifest['datasets'].pop(digest, None)
+            self._save(manifest)
+
+    # ---- 写入 ----
+
+    def _commit(self, digest: str, tmp_path: str, ext: str, rows: int, schema: List[str],
+                source: str, tag: str, activate: bool, extra: Optional[Dict[str, Any]] = None
+                ) -> Tuple[Dict[str, Any], bool]:
+        """把临时写入的数据集发布为 blob 并登记，内容已存在时丢弃临时文件"""
+        with self._locked():
+            manifest = self._load()
+            entry = manifest['datasets'].get(digest)
+            created = entry is None
+            if created:
+                final_path = os.path.join(self.blob_dir, digest + ext)
+                if os.path.exists(final_path):  # 清单丢失但 blob 还在
+                    _remove_path(tmp_path)
+                else:
+                    os.replace(tmp_path, final_path)
+                entry = {
+                    'digest': digest,
+                    'file': digest + ext,
+                    'rows': rows,
+                    'schema': schema,
+                    'source': source,
+                    'tag': tag,
+                    'created_at': datetime.now().isoformat()
+                }
+                if extra:
+                    entry.update(extra)
+                manifest['datasets'][digest] = entry
+            else:
+                _remove_path(tmp_path)
+            if activate:
+                manifest['active'] = digest
+            self._save(manifest)
+        if created:
+            logger.info(f"✅ 新数据集 {digest[:12]} rows={rows} source={source}")
+        else:
+            logger.info(f"📊 数据集内容已存在 {digest[:12]}，复用")
+        return entry, created
+
+    def _incoming_base(self) -> str:
+        return os.path.join(self.blob_dir, f'{INCOMING_PREFIX}{uuid.uuid4().hex}')
+
+    def _write_incoming(self, rows: List[Dict[str, Any]], tag: str) -> Tuple[str, str]:
+        """把内存中的行写为临时数据集，返回 (路径, 扩展名)"""
+        base = self._incoming_base()
+        if HAS_NUMPY:
+            return write_records(rows, base + COLUMNAR_SUFFIX, extra_meta={'tag': tag}), COLUMNAR_SUFFIX
+        writer = JsonlWriter(base + JSONL_SUFFIX)
+        writer.append(rows)
+        return writer.close(), JSONL_SUFFIX
+
+    def ingest_stream(self, stream: BinaryIO, filename: str, source: str, tag: str,
+                      default_source: str = 'import', activate: bool = True,
+                      progress_callback=None) -> Tuple[Optional[Dict[str, Any]], bool, Dict[str, Any]]:
+        """流式导入上传文件，边读边计算原始字节摘要
+
+        Returns:
+            (清单条目, 是否新内容, 导入统计)，没有有效数据时条目为 None
+        """
+        hasher = hashlib.sha256()
+        importer = StreamingImporter(self._incoming_base(), default_source=default_source,
+                                     progress_callback=progress_callback)
+        path = importer.import_stream(stream, filename, hasher)
+        if not path:
+            return None, False, importer.stats
+        ext = COLUMNAR_SUFFIX if path.endswith(COLUMNAR_SUFFIX) else JSONL_SUFFIX
+        entry, created = self._commit(
+            hasher.hexdigest(), path, ext, importer.stats['rows_written'], _schema_of(path),
+            source, tag, activate, {'source_file': os.path.basename(filename)}
+        )
+        return entry, created, importer.stats
+
+    def ingest_file(self, file_path: str, source: str, tag: str, default_source: str = 'import',
+                    activate: bool = True) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """导入本地文件，内容已登记时直接复用，不再解析"""
+        digest = hash_file(file_path)
+        entry = self.get(digest)
+        if entry and os.path.exists(self.path_of(entry)):
+            if activate:
+                self.activate(digest)
+            logger.info(f"📊 数据集内容已存在 {digest[:12]}，复用")
+            return entry, False
+        with open(file_path, 'rb') as f:
+            entry, created, _ = self.ingest_stream(f, os.path.basename(file_path), source, tag,
+                                                   default_source, activate)
+        return entry, created
+
+    def register_rows(self, rows: List[Dict[str, Any]], source: str, tag: str,
+                      activate: bool = True, extra: Optional[Dict[str, Any]] = None
+                      ) -> Tuple[Dict[str, Any], bool]:
+        """登记内存中的行（爬取结果等），写入前统一解析薪资"""
+        if rows and not all(field in rows[0] for field in SALARY_FIELDS):
+            normalize_records(rows)
+        digest = hash_rows(rows)
+        entry = self.get(digest)
+        if entry and os.path.exists(self.path_of(entry)):
+            if activate:
+                self.activate(digest)
+            return entry, False
+        path, ext = self._write_incoming(rows, tag)
+        return self._commit(digest, path, ext, len(rows), _schema_of(path), source, tag, activate, extra)
+
+    def register_legacy(self, data_dir: Optional[str] = None, remove_files: bool = False) -> List[Dict[str, Any]]:
+        """登记 data/raw 下按时间戳命名的旧数据集文件，内容相同的只保留一份
+
+        最新的 jobs_50000 / jobs_5000 文件对应的数据集设为 active（保持原来的选择顺序）
+        """
+        data_dir = data_dir or self.root
+        names = sorted(n for n in os.listdir(data_dir) if n.startswith('jobs_'))
+        registered: List[Dict[str, Any]] = []
+        digests: Dict[str, str] = {}
+        for name in names:
+            path = os.path.join(data_dir, name)
+            tag = name.rsplit('_', 2)[0]
+            try:
+                if is_columnar_path(path):
+                    digest = _hash_columnar_dir(path)
+                    rows = ColumnarDataset(path).records()
+                elif name.endswith('.json'):
+                    digest = hash_file(path)
+                    with open(path, 'r', encoding='utf-8') as f:
+                        rows = json.load(f)
+                elif name.endswith(JSONL_SUFFIX):
+                    digest = hash_file(path)
+                    rows = list(iter_jsonl(path))
+                else:
+                    continue
+                entry = self.get(digest)
+                if entry is None:
+                    if rows and not all(field in rows[0] for field in SALARY_FIELDS):
+                        normalize_records(rows)
+                    tmp, ext = self._write_incoming(rows, tag)
+                    entry, _ = self._commit(digest, tmp, ext, len(rows), _schema_of(tmp), 'legacy', tag,
+                                            False, {'source_file': name})
+                registered.append(entry)
+                digests[name] = entry['digest']
+                if remove_files:
+                    _remove_path(path)
+                logger.info(f"✅ 已登记 {name} -> {entry['digest'][:12]}")
+            except Exception as e:
+                logger.error(f"❌ 登记失败: {name}: {str(e)}")
+
+        if digests and not self._load().get('active'):
+            done = [n for n in names if n in digests]
+            preferred = [n for n in done if 'jobs_50000_' in n] or [n for n in done if 'jobs_5000_' in n] or done
+            self.activate(digests[preferred[-1]])
+        return registered
+
+    # ---- 清理 ----
+
+    def gc(self, dry_run: bool = False, temp_max_age: float = DEFAULT_TEMP_MAX_AGE) -> List[str]:
+        """删除未被清单引用的 blob 以及中断导入留下的临时文件
+
+        临时文件（.incoming-*、*.tmp-*）超过 temp_max_age 秒未修改才删除，
+        正在进行的导入（可能在其它进程中）不受影响
+        """
+        with self._locked():
+            referenced = {e['file'] for e in self._load()['datasets'].values()}
+            cutoff = time.time() - temp_max_age
+            removed = []
+            for name in sorted(os.listdir(self.blob_dir)):
+                if name in referenced:
+                    continue
+                path = os.path.join(self.blob_dir, name)
+                try:
+                    if _is_temp_name(name) and _last_modified(path) > cutoff:
+                        continue
+                except FileNotFoundError:  # 导入刚好完成并改名
+                    continue
+                removed.append(name)
+                if not dry_run:
+                    _remove_path(path)
+        return removed
+
+
+def _schema_of(path: str) -> List[str]:
+    if is_columnar_path(path):
+        return ColumnarDataset(path).columns
+    for row in iter_jsonl(path):
+        return list(row)
+    return []
+
+
+def _is_temp_name(name: str) -> bool:
+    return name.startswith(INCOMING_PREFIX) or '.tmp-' in name
+
+
+def _last_modified(path: str) -> float:
+    """最近修改时间，目录取其中最新的文件"""
+    latest = os.path.getmtime(path)
+    if os.path.isdir(path):
+        for directory, _, files in os.walk(path):
+            for name in files:
+                try:
+                    latest = max(latest, os.path.getmtime(os.path.join(directory, name)))
+                except OSError:
+                    pass
+    return latest
+
+
+def _remove_path(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def main():
+    """注册表管理命令"""
+    parser = argparse.ArgumentParser(description='职位数据集注册表')
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), 'data', 'raw'), help='数据目录')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='列出数据集')
+    p_activate = sub.add_parser('activate', help='设置生效的数据集')
+    p_activate.add_argument('digest')
+    p_remove = sub.add_parser('remove', help='从清单中移除数据集')
+    p_remove.add_argument('digest')
+    p_legacy = sub.add_parser('register-legacy', help='登记旧的 jobs_* 文件')
+    p_legacy.add_argument('--remove-files', action='store_true', help='登记成功后删除原文件')
+    p_gc = sub.add_parser('gc', help='清理未被引用的 blob')
+    p_gc.add_argument('--dry-run', action='store_true', help='只列出将被删除的文件')
+    p_gc.add_argument('--temp-max-age', type=float, default=DEFAULT_TEMP_MAX_AGE,
+                      help='临时文件超过该秒数未修改才删除')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    registry = DatasetRegistry(args.data_dir)
+
+    if args.command == 'list':
+        active = (registry.active() or {}).get('digest')
+        for e in registry.list():
+            flag = '*' if e['digest'] == active else ' '
+            print(f"{flag} {e['digest'][:12]}  rows={e['rows']:<8} tag={e.get('tag', '')}  "
+                  f"source={e.get('source', '')}  created={e['created_at']}")
+    elif args.command == 'activate':
+        registry.activate(_resolve(registry, args.digest))
+    elif args.command == 'remove':
+        registry.remove(_resolve(registry, args.digest))
+    elif args.command == 'register-legacy':
+        entries = registry.register_legacy(remove_files=args.remove_files)
+        print(f"共登记 {len(entries)} 个文件，去重后 {len({e['digest'] for e in entries})} 个数据集")
+    elif args.command == 'gc':
+        removed = registry.gc(dry_run=args.dry_run, temp_max_age=args.temp_max_age)
+        print(f"{'将删除' if args.dry_run else '已删除'} {len(removed)} 个未引用的 blob")
+        for name in removed:
+            print(f"  {name}")
+    return 0
+
+
+def _resolve(registry: DatasetRegistry, prefix: str) -> str:
+    """按摘要前缀查找数据集"""
+    matches = [e['digest'] for e in registry.list() if e['digest'].startswith(prefix)]
+    if len(matches) != 1:
+        raise SystemExit(f'摘要前缀 {prefix} 匹配到 {len(matches)} 个数据集')
+    return matches[0]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+护工资源管理系统 - 职位分布多维立方体
+====================================
+
+按 (城市, 薪资区间, 职位类型, 公司类型, 来源, 发布月份) 六个维度预先聚合职位数：
+- 只保存非空单元格：每个单元格一行维度编码 + 职位数，数据集通常只有几千个单元格
+- 分布、交叉表与下钻（如"上海 养老院 的薪资区间"）都在单元格上筛选后分组求和，不再扫描职位
+- 职位类型按标题关键词、公司类型按公司名关键词分类，列式数据集只对字典分类一次
+- 立方体可以合并：数据集追加或新增时只为新数据建立立方体，再与已有结果合并
+
+数据集导入后建立一次并保存在数据目录下（cubes/<版本摘要>.npz）。
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from bigdata.processing.facet_index import (
+    UNKNOWN, SALARY_BAND_LABELS, SALARY_BAND_UNKNOWN, facet_label, salary_bands
+)
+from bigdata.processing.sketches import MONTH_PREFIX_BYTES, month_label
+
+logger = logging.getLogger(__name__)
+
+CUBE_FORMAT_VERSION = 1
+CUBE_DIMENSIONS = ['city', 'salary_band', 'job_type', 'company_type', 'source', 'publish_month']
+CUBE_COLUMNS = ['location', 'title', 'company', 'source', 'crawl_time', 'salary_monthly', 'salary_status']
+
+# 维度 -> 原始列（薪资区间由月薪与解析状态计算）
+_TEXT_DIMENSIONS = {'city': 'location', 'job_type': 'title', 'company_type': 'company',
+                    'source': 'source', 'publish_month': 'crawl_time'}
+_DIMENSION_INDEX = {name: i for i, name in enumerate(CUBE_DIMENSIONS)}
+
+OTHER = '其他'
+# 按顺序匹配，先命中者为准
+JOB_CATEGORIES = [('护工', '护工'), ('护理员', '护理员'), ('康复', '康复护理'), ('医疗', '医疗护理'), ('养老', '养老护理')]
+COMPANY_CATEGORIES = [(('养老',), '养老院'), (('医疗', '医院'), '医疗机构'), (('康复',), '康复中心'), (('家政',), '家政服务')]
+JOB_CATEGORY_LABELS = [label for _, label in JOB_CATEGORIES] + [OTHER]
+COMPANY_CATEGORY_LABELS = [label for _, label in COMPANY_CATEGORIES] + [OTHER]
+
+
+def job_category(title: Any) -> str:
+    """职位标题 -> 职位类型"""
+    text = str(title or '').lower()
+    for keyword, label in JOB_CATEGORIES:
+        if keyword in text:
+            return label
+    return OTHER
+
+
+def company_category(company: Any) -> str:
+    """公司名 -> 公司类型"""
+    text = str(company or '')
+    for keywords, label in COMPANY_CATEGORIES:
+        if any(keyword in text for keyword in keywords):
+            return label
+    return OTHER
+
+
+def dimension_label(dimension: str, value: Any) -> str:
+    """原始值在某个维度上的标签"""
+    if dimension == 'job_type':
+        return job_category(value)
+    if dimension == 'company_type':
+        return company_category(value)
+    if dimension == 'publish_month':
+        return month_label(value)
+    return facet_label(dimension, value)
+
+
+def _aggregate(cells, counts, sizes: List[int]) -> Tuple['np.ndarray', 'np.ndarray']:
+    """合并编码相同的单元格并求和"""
+    if not len(cells):
+        return np.zeros((0, len(sizes)), dtype=np.int32), np.zeros(0, dtype=np.int64)
+    shape = tuple(max(size, 1) for size in sizes)
+    space = np.prod(shape, dtype=np.float64)
+    if space <= max(4 * len(cells), 1 << 16):
+        # 组合数不大时直接按键计数，不排序
+        keys = np.ravel_multi_index(tuple(np.asarray(cells, dtype=np.int64).T), shape)
+        totals = np.bincount(keys, weights=counts, minlength=int(space))
+        present = np.flatnonzero(totals)
+        return (np.stack(np.unravel_index(present, shape), axis=1).astype(np.int32),
+                np.rint(totals[present]).astype(np.int64))
+    if space < 2 ** 62:
+        keys = np.ravel_multi_index(tuple(np.asarray(cells, dtype=np.int64).T), shape)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        cells = np.stack(np.unravel_index(unique, shape), axis=1)
+    else:
+        cells, inverse = np.unique(cells, axis=0, return_inverse=True)
+    totals = np.bincount(inverse.reshape(-1), weights=counts, minlength=len(cells))
+    return cells.astype(np.int32), np.rint(totals).astype(np.int64)
+
+
+class DistributionCube:
+    """职位分布立方体
+
+    Args:
+        labels: 维度 -> 编码对应的标签
+        cells: (单元格数, 维度数) 的编码矩阵，列顺序同 CUBE_DIMENSIONS
+        counts: 每个单元格的职位数
+    """
+
+    def __init__(self, labels: Optional[Dict[str, List[str]]] = None, cells=None, counts=None):
+        if not HAS_NUMPY:
+            raise RuntimeError('numpy未安装，无法建立分布立方体')
+        labels = labels or {}
+        self.labels: Dict[str, List[str]] = {d: list(labels.get(d, [])) for d in CUBE_DIMENSIONS}
+        self.lookup: Dict[str, Dict[str, int]] = {
+            d: {label: i for i, label in enumerate(values)} for d, values in self.labels.items()
+        }
+        self.cells = np.zeros((0, len(CUBE_DIMENSIONS)), dtype=np.int32) if cells is None else cells
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else counts
+        self.total = int(self.counts.sum())
+        self._postings: Dict[str, Tuple['np.ndarray', 'np.ndarray']] = {}
+
+    @classmethod
+    def build(cls, dimension_codes: Dict[str, Tuple[Any, List[str]]], num_rows: int,
+              base_mask=None) -> 'DistributionCube':
+        """按各维度的行编码聚合
+
+        Args:
+            dimension_codes: 维度 -> (每行编码, 编码对应的标签)
+            base_mask: 参与统计的行（如近似重复去重后保留的行）
+        """
+        keep = np.ones(num_rows, dtype=bool) if base_mask is None else np.asarray(base_mask, dtype=bool)
+        labels = {d: dimension_codes[d][1] for d in CUBE_DIMENSIONS}
+        cells = np.stack([np.asarray(dimension_codes[d][0], dtype=np.int64)[keep] for d in CUBE_DIMENSIONS], axis=1)
+        cells, counts = _aggregate(cells, np.ones(len(cells), dtype=np.int64),
+                                   [len(labels[d]) for d in CUBE_DIMENSIONS])
+        return cls(labels, cells, counts)
+
+    @classmethod
+    def from_columnar(cls, dataset, base_mask=None) -> 'DistributionCube':
+        """从列式数据集建立，字典编码列只对字典分类"""
+        columns = dataset.meta['columns']
+        dimension_codes = {}
+        for dimension, column in _TEXT_DIMENSIONS.items():
+            if column in columns and dataset.kind(column) == 'dict':
+                dimension_codes[dimension] = _merge_labels(
+                    np.asarray(dataset.codes(column)),
+                    [dimension_label(dimension, v) for v in dataset.dictionary(column)]
+                )
+            elif column in columns and dimension == 'publish_month':
+                # 月份只看前几个字节，按前缀去重后再解析，不逐行解码
+                prefixes, codes = np.unique(dataset.prefixes(column, MONTH_PREFIX_BYTES), return_inverse=True)
+                labels = [month_label(p.decode('utf-8', 'ignore')) for p in prefixes.tolist()]
+                dimension_codes[dimension] = _merge_labels(codes.reshape(-1), labels)
+            elif column in columns:
+                dimension_codes[dimension] = _encode(dimension, dataset.column(column))
+            else:
+                dimension_codes[dimension] = (np.zeros(dataset.num_rows, dtype=np.int32),
+                                              [dimension_label(dimension, None)])
+        if 'salary_monthly' in columns and 'salary_status' in columns:
+            bands = salary_bands(dataset.values('salary_monthly'), dataset.values('salary_status'))
+        else:
+            bands = np.full(dataset.num_rows, len(SALARY_BAND_LABELS), dtype=np.int32)
+        dimension_codes['salary_band'] = (bands, SALARY_BAND_LABELS + [SALARY_BAND_UNKNOWN])
+        return cls.build(dimension_codes, dataset.num_rows, base_mask)
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], base_mask=None) -> 'DistributionCube':
+        """从记录列表建立（JSON / JSONL 数据集，或追加的新职位）"""
+        dimension_codes = {dimension: _encode(dimension, [r.get(column) for r in rows])
+                           for dimension, column in _TEXT_DIMENSIONS.items()}
+        monthly = [r.get('salary_monthly') if r.get('salary_monthly') is not None else np.nan for r in rows]
+        status = [r.get('salary_status') if r.get('salary_status') is not None else -1 for r in rows]
+        dimension_codes['salary_band'] = (salary_bands(monthly, status), SALARY_BAND_LABELS + [SALARY_BAND_UNKNOWN])
+        return cls.build(dimension_codes, len(rows), base_mask)
+
+    # ---- 合并 ----
+
+    def merge(self, other: 'DistributionCube') -> 'DistributionCube':
+        """合并两个立方体，标签按取值对齐"""
+        labels = {d: list(self.labels[d]) for d in CUBE_DIMENSIONS}
+        remapped = other.cells.copy()
+        for j, dimension in enumerate(CUBE_DIMENSIONS):
+            lookup = dict(self.lookup[dimension])
+            remap = []
+            for label in other.labels[dimension]:
+                if label not in lookup:
+                    lookup[label] = len(labels[dimension])
+                    labels[dimension].append(label)
+                remap.append(lookup[label])
+            if len(remapped):
+                remapped[:, j] = np.asarray(remap, dtype=np.int32)[other.cells[:, j]]
+        cells, counts = _aggregate(np.concatenate([self.cells, remapped]),
+                                   np.concatenate([self.counts, other.counts]),
+                                   [len(labels[d]) for d in CUBE_DIMENSIONS])
+        return DistributionCube(labels, cells, counts)
+
+    # ---- 查询 ----
+
+    def _posting(self, dimension: str) -> Tuple['np.ndarray', 'np.ndarray']:
+        """某个维度的倒排表：按编码排序的单元格行号与每个编码的起止位置，首次使用时建立"""
+        posting = self._postings.get(dimension)
+        if posting is None:
+            column = self.cells[:, _DIMENSION_INDEX[dimension]]
+            order = np.argsort(column, kind='stable')
+            bounds = np.searchsorted(column[order], np.arange(len(self.labels[dimension]) + 1))
+            posting = self._postings[dimension] = (order, bounds)
+        return posting
+
+    def _select(self, filters: Dict[str, List[str]]) -> Optional['np.ndarray']:
+        """命中筛选条件的单元格行号；从最窄的条件出发，其余条件只在已命中的单元格上检查"""
+        if not filters:
+            return None
+        codes = {d: [self.lookup[d][v] for v in values if v in self.lookup[d]] for d, values in filters.items()}
+        sizes = {}
+        for dimension, dimension_codes in codes.items():
+            order, bounds = self._posting(dimension)
+            sizes[dimension] = sum(int(bounds[c + 1] - bounds[c]) for c in dimension_codes)
+        narrowest = min(sizes, key=sizes.get)
+        order, bounds = self._posting(narrowest)
+        rows = np.concatenate([order[bounds[c]:bounds[c + 1]] for c in codes[narrowest]] or [np.zeros(0, dtype=np.int64)])
+        for dimension, dimension_codes in codes.items():
+            if dimension != narrowest and rows.size:
+                rows = rows[np.isin(self.cells[rows, _DIMENSION_INDEX[dimension]], dimension_codes)]
+        return rows
+
+    def query(self, group_by: List[str], filters: Optional[Dict[str, List[str]]] = None,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+        """筛选后按若干维度分组计数
+
+        Args:
+            group_by: 分组维度，为空时只返回命中总数
+            filters: 维度 -> 取值列表；同一维度内取 OR，不同维度之间取 AND
+            limit: 只返回计数最多的前若干组
+
+        Returns:
+            total 为命中职位数，cells 为 [{维度: 取值, ..., 'count': 职位数}]，按计数倒序
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        unknown = [d for d in list(group_by) + list(filters) if d not in _DIMENSION_INDEX]
+        if unknown:
+            raise ValueError(f"未知维度: {', '.join(unknown)}")
+        rows = self._select(filters)
+        cells = self.cells if rows is None else self.cells[rows]
+        counts = self.counts if rows is None else self.counts[rows]
+        result: Dict[str, Any] = {'total': int(counts.sum()), 'cells': []}
+        if not group_by:
+            return result
+        groups, sums = _aggregate(cells[:, [_DIMENSION_INDEX[d] for d in group_by]], counts,
+                                  [len(self.labels[d]) for d in group_by])
+        order = np.argsort(-sums, kind='stable')[:limit]
+        for code_row, count in zip(groups[order].tolist(), sums[order].tolist()):
+            cell = {d: self.labels[d][code] for d, code in zip(group_by, code_row)}
+            cell['count'] = count
+            result['cells'].append(cell)
+        return result
+
+    def distribution(self, dimension: str, filters: Optional[Dict[str, List[str]]] = None) -> Dict[str, int]:
+        """单个维度的分布，按计数倒序"""
+        return {cell[dimension]: cell['count'] for cell in self.query([dimension], filters)['cells']}
+
+    # ---- 持久化 ----
+
+    def save(self, path: str):
+        """原子写入 .npz 文件"""
+        meta = {'version': CUBE_FORMAT_VERSION, 'dimensions': CUBE_DIMENSIONS, 'labels': self.labels}
+        tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}.npz'
+        np.savez(tmp_path, meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                 cells=self.cells, counts=self.counts)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'DistributionCube':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != CUBE_FORMAT_VERSION or meta.get('dimensions') != CUBE_DIMENSIONS:
+                raise ValueError(f"不支持的立方体格式: {meta.get('version')}")
+            return cls(meta['labels'], data['cells'].astype(np.int32), data['counts'].astype(np.int64))
+
+
+def _encode(dimension: str, values: List[Any]) -> Tuple['np.ndarray', List[str]]:
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter((lookup.setdefault(dimension_label(dimension, v), len(lookup)) for v in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(lookup) or [dimension_label(dimension, None)]
+
+
+def _merge_labels(codes, labels: List[str]) -> Tuple['np.ndarray', List[str]]:
+    """合并标签相同的字典编码"""
+    merged: Dict[str, int] = {}
+    remap = np.array([merged.setdefault(label, len(merged)) for label in labels], dtype=np.int32)
+    if not len(labels):
+        return np.zeros(len(codes), dtype=np.int32), [UNKNOWN]
+    return remap[codes], list(merged)
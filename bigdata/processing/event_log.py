@@ -0,0 +1,300 @@
+"""
+护工资源管理系统 - 追加写事件日志
+====================================
+
+导入日志、分析结果历史等只追加的记录保存为 JSONL，每条记录一行：
+- 追加时只写一行（O_APPEND），不再读出整个文件再重写
+- 当前段超过大小上限时轮转：压缩为 <名称>.<段号>.jsonl.gz，只保留最近的若干段
+- 小索引 <名称>.index.json 记录最近 N 条、每个来源最近 N 条记录的位置（段号, 偏移），
+  "最近 N 条"、"按来源查询"只读取这些行；超出索引范围时从新到旧扫描各段
+- 多进程安全：追加、轮转与索引更新在文件锁（fcntl.flock）内进行；索引原子替换，读取不加锁
+"""
+
+import os
+import json
+import gzip
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Iterator
+
+from bigdata.processing.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_KEEP_SEGMENTS = 20
+# 索引中保留的最近记录数（全部来源、每个来源各自）
+INDEX_RECENT = 100
+INDEX_VERSION = 1
+
+
+class EventLog:
+    """只追加的 JSONL 日志，按大小轮转并压缩旧段
+
+    Args:
+        directory: 日志目录
+        name: 日志名，文件为 <name>.jsonl
+        max_bytes: 当前段超过该大小后轮转
+        keep_segments: 保留的压缩段数
+        source_key: 记录中表示来源的字段
+        timestamp_key: 记录中表示时间的字段
+    """
+
+    def __init__(self, directory: str, name: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 keep_segments: int = DEFAULT_KEEP_SEGMENTS, source_key: str = 'source',
+                 timestamp_key: str = 'timestamp'):
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self.keep_segments = keep_segments
+        self.source_key = source_key
+        self.timestamp_key = timestamp_key
+        self.path = os.path.join(directory, f'{name}.jsonl')
+        self.index_path = os.path.join(directory, f'{name}.index.json')
+        self.lock_path = os.path.join(directory, f'{name}.lock')
+        self._thread_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f'{self.name}.{seq:06d}.jsonl.gz')
+
+    # ---- 锁与索引 ----
+
+    def _locked(self):
+        return FileLock(self.lock_path, self._thread_lock)
+
+    def _empty_index(self) -> Dict[str, Any]:
+        return {'version': INDEX_VERSION, 'active_seq': 0, 'count': 0, 'segments': {}, 'recent': [], 'sources': {}}
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION:
+                return index
+        except (FileNotFoundError, ValueError):
+            pass
+        return None
+
+    def _write_index(self, index: Dict[str, Any]):
+        tmp_path = f'{self.index_path}.tmp-{os.getpid()}-{threading.get_ident()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _index_entry(self, index: Dict[str, Any], entry: Dict[str, Any], seq: int, offset: int):
+        pointer = [seq, offset]
+        index['count'] += 1
+        index['recent'] = (index['recent'] + [pointer])[-INDEX_RECENT:]
+        source = entry.get(self.source_key)
+        if source is not None:
+            stats = index['sources'].setdefault(str(source), {'count': 0, 'last_timestamp': None, 'recent': []})
+            stats['count'] += 1
+            stats['last_timestamp'] = entry.get(self.timestamp_key)
+            stats['recent'] = (stats['recent'] + [pointer])[-INDEX_RECENT:]
+
+    def rebuild_index(self) -> Dict[str, Any]:
+        """扫描全部保留的段重建索引（索引丢失或损坏时）"""
+        with self._locked():
+            return self._rebuild_index()
+
+    def _rebuild_index(self) -> Dict[str, Any]:
+        index = self._empty_index()
+        segments = self._rotated_segments()
+        index['active_seq'] = segments[-1] + 1 if segments else 0
+        for seq in segments + [index['active_seq']]:
+            count = 0
+            for offset, entry in self._iter_segment(seq):
+                self._index_entry(index, entry, seq, offset)
+                count += 1
+            if seq != index['active_seq']:
+                index['segments'][str(seq)] = {'count': count}
+        self._write_index(index)
+        return index
+
+    # ---- 写入 ----
+
+    def append(self, entry: Dict[str, Any]):
+        """追加一条记录"""
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        with self._locked():
+            index = self._read_index() or self._rebuild_index()
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                offset = os.fstat(fd).st_size
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            self._index_entry(index, entry, index['active_seq'], offset)
+            if offset + len(line) >= self.max_bytes:
+                self._rotate(index)
+            self._write_index(index)
+
+    def _rotate(self, index: Dict[str, Any]):
+        """压缩当前段并开始新段；先写压缩段再清空当前段，读取方总能在其中之一找到记录"""
+        seq = index['active_seq']
+        segment_path = self._segment_path(seq)
+        tmp_path = f'{segment_path}.tmp-{os.getpid()}'
+        count = 0
+        with open(self.path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            for line in src:
+                dst.write(line)
+                count += 1
+        os.replace(tmp_path, segment_path)
+        os.replace(self._new_active_file(), self.path)
+        index['segments'][str(seq)] = {'count': count}
+        index['active_seq'] = seq + 1
+
+        # 只保留最近的 keep_segments 段，索引中指向已删除段的位置一并移除
+        for old in self._rotated_segments()[:-self.keep_segments or None]:
+            os.remove(self._segment_path(old))
+            index['segments'].pop(str(old), None)
+        kept = {int(seq) for seq in index['segments']} | {index['active_seq']}
+        index['recent'] = [pointer for pointer in index['recent'] if pointer[0] in kept]
+        for stats in index['sources'].values():
+            stats['recent'] = [pointer for pointer in stats['recent'] if pointer[0] in kept]
+        logger.info(f"📊 日志 {self.name} 已轮转: 第 {seq} 段 {count} 条记录")
+
+    def _new_active_file(self) -> str:
+        tmp_path = f'{self.path}.tmp-{os.getpid()}'
+        open(tmp_path, 'wb').close()
+        return tmp_path
+
+    def migrate_json_array(self, legacy_path: str) -> int:
+        """把旧的 JSON 数组日志文件追加到本日志，完成后改名为 <文件>.migrated，返回迁移的条数"""
+        if not os.path.exists(legacy_path):
+            return 0
+        with self._locked():
+            if not os.path.exists(legacy_path):
+                return 0
+            try:
+                with open(legacy_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except ValueError as e:
+                logger.warning(f"⚠️ 旧日志无法解析，跳过迁移 {legacy_path}: {str(e)}")
+                return 0
+            os.replace(legacy_path, f'{legacy_path}.migrated')
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict):
+                self.append(entry)
+        logger.info(f"✅ 旧日志已迁移: {os.path.basename(legacy_path)} - {len(entries)} 条记录")
+        return len(entries)
+
+    # ---- 读取 ----
+
+    def _rotated_segments(self) -> List[int]:
+        prefix, suffix = f'{self.name}.', '.jsonl.gz'
+        segments = []
+        for entry in os.listdir(self.directory):
+            if entry.startswith(prefix) and entry.endswith(suffix):
+                seq = entry[len(prefix):-len(suffix)]
+                if seq.isdigit():
+                    segments.append(int(seq))
+        return sorted(segments)
+
+    def _read_segment(self, seq: int) -> Optional[bytes]:
+        """读取段内容：已压缩的段优先（当前段可能刚被轮转），否则读取当前段"""
+        try:
+            with gzip.open(self._segment_path(seq), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        index = self._read_index()
+        if index is not None and index['active_seq'] != seq:
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = None
+        # 读取期间当前段被轮转时改读压缩段
+        if os.path.exists(self._segment_path(seq)):
+            with gzip.open(self._segment_path(seq), 'rb') as f:
+                return f.read()
+        return content
+
+    def _iter_segment(self, seq: int) -> Iterator[tuple]:
+        content = self._read_segment(seq) or b''
+        offset = 0
+        for line in content.splitlines(keepends=True):
+            if line.strip():
+                try:
+                    yield offset, json.loads(line)
+                except ValueError:
+                    logger.warning(f"⚠️ 日志 {self.name} 第 {seq} 段偏移 {offset} 处记录损坏，已跳过")
+            offset += len(line)
+
+    def _read_active_line(self, seq: int, offset: int) -> Optional[bytes]:
+        """从当前段定位到偏移读取一行；该段已被轮转时返回 None，由调用方改读压缩段"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                line = f.readline()
+        except FileNotFoundError:
+            line = None
+        # 读取期间当前段被轮转时改读压缩段
+        if os.path.exists(self._segment_path(seq)):
+            return None
+        return line or None
+
+    def _read_pointers(self, pointers: List[list]) -> List[Dict[str, Any]]:
+        """按 (段号, 偏移) 读取记录：当前段按偏移只读一行，压缩段整段解压且同一段只读取一次"""
+        index = self._read_index()
+        active_seq = index['active_seq'] if index else None
+        contents: Dict[int, Optional[bytes]] = {}
+        entries = []
+        for seq, offset in pointers:
+            line = self._read_active_line(seq, offset) if seq == active_seq else None
+            if line is None:
+                if seq not in contents:
+                    contents[seq] = self._read_segment(seq)
+                content = contents[seq]
+                if content is None or offset >= len(content):
+                    continue
+                end = content.find(b'\n', offset)
+                line = content[offset:end if end >= 0 else None]
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def iter_entries(self, reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """逐条读取保留的全部记录，reverse 时从新到旧"""
+        index = self._read_index()
+        active = index['active_seq'] if index else (self._rotated_segments() or [-1])[-1] + 1
+        segments = self._rotated_segments() + [active]
+        for seq in (reversed(segments) if reverse else segments):
+            entries = [entry for _, entry in self._iter_segment(seq)]
+            yield from (reversed(entries) if reverse else entries)
+
+    def latest(self, n: int = 1, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """最近 n 条记录（新的在前），source 指定时只返回该来源的记录"""
+        index = self._read_index()
+        if index is not None:
+            if source is None:
+                pointers, total = index['recent'], index['count']
+            else:
+                stats = index['sources'].get(str(source), {})
+                pointers, total = stats.get('recent', []), stats.get('count', 0)
+            # 索引中的位置足够（或已包含该来源的全部记录）时直接按位置读取
+            if n <= len(pointers) or len(pointers) >= total:
+                return list(reversed(self._read_pointers(pointers[-n:])))
+        # 超出索引范围：从新到旧扫描
+        entries = []
+        for entry in self.iter_entries(reverse=True):
+            if source is None or str(entry.get(self.source_key)) == str(source):
+                entries.append(entry)
+                if len(entries) >= n:
+                    break
+        return entries
+
+    def sources(self) -> Dict[str, Dict[str, Any]]:
+        """各来源的记录数与最近一条记录的时间"""
+        index = self._read_index() or self.rebuild_index()
+        return {source: {'count': stats['count'], 'last_timestamp': stats['last_timestamp']}
+                for source, stats in index['sources'].items()}
+
+    def __len__(self) -> int:
+        index = self._read_index()
+        return index['count'] if index else 0
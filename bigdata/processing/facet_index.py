@@ -0,0 +1,213 @@
+"""
+护工资源管理系统 - 职位分面索引
+====================================
+
+在内存中为当前数据集建立分面位图索引，用于多条件筛选与分面计数：
+- 每个分面取值一个位图（按 64 位字压缩存放，每行 1 bit）
+- 同一分面内多个取值取 OR，不同分面之间取 AND
+- 分面计数时，某个分面的计数不受它自身的选择影响（多选分面的常见约定）
+- 列式数据集直接使用字典编码与数值列构建，不逐行解析
+
+分面：城市、工作类型、学历、经验、薪资区间、来源。
+"""
+
+import re
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from bigdata.processing.salary_normalizer import SALARY_OK
+from bigdata.processing.binning import SALARY_BANDS, SALARY_BAND_UNKNOWN
+
+logger = logging.getLogger(__name__)
+
+FACETS = ['city', 'job_type', 'education', 'experience', 'salary_band', 'source']
+UNKNOWN = '未知'
+
+# 薪资区间（月薪，元），左闭右开，定义见 binning.SALARY_BANDS
+SALARY_BAND_EDGES = SALARY_BANDS.edges
+SALARY_BAND_LABELS = SALARY_BANDS.labels
+
+# 原始列 -> 分面
+_TEXT_FACETS = {'city': 'location', 'job_type': 'job_type', 'education': 'education',
+                'experience': 'experience', 'source': 'source'}
+_CITY_SEPARATOR = re.compile(r'[-·・/\s]')
+
+if HAS_NUMPY:
+    _POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def facet_label(facet: str, value: Any) -> str:
+    """分面取值的标签，城市只取第一段（"北京-朝阳" -> "北京"）"""
+    text = str(value or '').strip()
+    if facet == 'city':
+        text = _CITY_SEPARATOR.split(text, 1)[0]
+    return text or UNKNOWN
+
+
+def salary_bands(monthly, status) -> 'np.ndarray':
+    """月薪 -> 薪资区间编号，无效薪资为最后一个编号"""
+    bands = SALARY_BANDS.codes(monthly)
+    bands[np.asarray(status, dtype=np.float64) != SALARY_OK] = len(SALARY_BAND_LABELS)
+    return bands
+
+
+def _popcount(words) -> 'np.ndarray':
+    """按最后一维统计置位数"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT8[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class _Facet:
+    """单个分面：取值表 + (取值数, 字数) 的位图矩阵"""
+
+    __slots__ = ('name', 'labels', 'lookup', 'bitmaps')
+
+    def __init__(self, name: str, codes, labels: List[str], num_rows: int):
+        # 合并标签相同的编码（如 "北京-朝阳" 与 "北京" 都归为 "北京"）
+        merged: Dict[str, int] = {}
+        remap = np.array([merged.setdefault(label, len(merged)) for label in labels], dtype=np.int32)
+        codes = remap[np.asarray(codes)] if len(labels) else np.zeros(num_rows, dtype=np.int32)
+        self.name = name
+        self.labels = list(merged)
+        self.lookup = merged
+        rows = np.arange(num_rows, dtype=np.int64)
+        self.bitmaps = np.zeros((len(self.labels), (num_rows + 63) // 64), dtype=np.uint64)
+        np.bitwise_or.at(self.bitmaps, (codes, rows >> 6), np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+
+    def select(self, values: List[str]) -> Optional['np.ndarray']:
+        """多个取值的 OR；取值都不存在时返回全 0 位图"""
+        codes = [self.lookup[v] for v in values if v in self.lookup]
+        if not codes:
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint64)
+        return np.bitwise_or.reduce(self.bitmaps[codes], axis=0)
+
+    def counts(self, mask) -> Dict[str, int]:
+        counts = _popcount(self.bitmaps & mask[None, :]) if mask is not None else _popcount(self.bitmaps)
+        return {label: int(c) for label, c in zip(self.labels, counts.tolist()) if c}
+
+
+class FacetIndex:
+    """分面位图索引
+
+    Args:
+        facet_codes: 分面名 -> (每行编码数组, 编码对应的标签)
+        num_rows: 行数
+        base_mask: 可选的基础行掩码（如近似重复去重后保留的行），所有查询都在其上进行
+    """
+
+    def __init__(self, facet_codes: Dict[str, Tuple[Any, List[str]]], num_rows: int, base_mask=None):
+        if not HAS_NUMPY:
+            raise RuntimeError('numpy未安装，无法建立分面索引')
+        self.num_rows = num_rows
+        self.dataset = None
+        self.records: Optional[List[Dict[str, Any]]] = None
+        self.facets: Dict[str, _Facet] = {
+            name: _Facet(name, codes, labels, num_rows) for name, (codes, labels) in facet_codes.items()
+        }
+        words = (num_rows + 63) // 64
+        bits = np.zeros(words * 64, dtype=bool)
+        bits[:num_rows] = True if base_mask is None else np.asarray(base_mask, dtype=bool)
+        self.base = np.packbits(bits, bitorder='little').view(np.uint64)
+        self.total = int(_popcount(self.base))
+
+    @classmethod
+    def from_columnar(cls, dataset, base_mask=None) -> 'FacetIndex':
+        """从列式数据集构建，直接使用字典编码"""
+        facet_codes = {}
+        for facet, column in _TEXT_FACETS.items():
+            if column in dataset.meta['columns'] and dataset.kind(column) == 'dict':
+                labels = [facet_label(facet, v) for v in dataset.dictionary(column)]
+                facet_codes[facet] = (np.asarray(dataset.codes(column)), labels)
+            elif column in dataset.meta['columns']:
+                facet_codes[facet] = _factorize(facet, dataset.column(column))
+            else:
+                facet_codes[facet] = (np.zeros(dataset.num_rows, dtype=np.int32), [UNKNOWN])
+        if 'salary_monthly' in dataset.meta['columns'] and 'salary_status' in dataset.meta['columns']:
+            bands = salary_bands(dataset.values('salary_monthly'), dataset.values('salary_status'))
+        else:
+            bands = np.full(dataset.num_rows, len(SALARY_BAND_LABELS), dtype=np.int32)
+        facet_codes['salary_band'] = (bands, SALARY_BAND_LABELS + [SALARY_BAND_UNKNOWN])
+        index = cls(facet_codes, dataset.num_rows, base_mask)
+        index.dataset = dataset
+        return index
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], base_mask=None) -> 'FacetIndex':
+        """从记录列表构建（JSON / JSONL 数据集）"""
+        facet_codes = {facet: _factorize(facet, [r.get(column) for r in rows])
+                       for facet, column in _TEXT_FACETS.items()}
+        monthly = [r.get('salary_monthly') if r.get('salary_monthly') is not None else np.nan for r in rows]
+        status = [r.get('salary_status') if r.get('salary_status') is not None else -1 for r in rows]
+        facet_codes['salary_band'] = (salary_bands(monthly, status), SALARY_BAND_LABELS + [SALARY_BAND_UNKNOWN])
+        index = cls(facet_codes, len(rows), base_mask)
+        index.records = rows
+        return index
+
+    def fetch(self, rows, columns: List[str]) -> List[Dict[str, Any]]:
+        """读取命中行的指定字段"""
+        if self.dataset is not None:
+            return self.dataset.take(rows, columns)
+        records = self.records or []
+        return [{c: records[i].get(c, '') for c in columns} for i in rows.tolist()]
+
+    def _filter_mask(self, filters: Dict[str, List[str]], exclude: Optional[str] = None):
+        mask = self.base
+        for name, values in filters.items():
+            if name == exclude or not values or name not in self.facets:
+                continue
+            mask = mask & self.facets[name].select(values)
+        return mask
+
+    def search(self, filters: Dict[str, List[str]], offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """筛选并返回命中总数、当前页行号与全部分面计数
+
+        Args:
+            filters: 分面名 -> 取值列表；同一分面内取 OR，不同分面之间取 AND
+        """
+        filters = {k: v for k, v in filters.items() if v and k in self.facets}
+        mask = self._filter_mask(filters)
+        bits = np.unpackbits(mask.view(np.uint8), bitorder='little')[:self.num_rows]
+        hits = np.flatnonzero(bits)
+        facets = {}
+        for name, facet in self.facets.items():
+            # 已选择的分面按去掉自身条件后的结果计数，便于继续多选
+            facet_mask = self._filter_mask(filters, exclude=name) if name in filters else mask
+            facets[name] = facet.counts(facet_mask)
+        return {
+            'total': int(hits.size),
+            'rows': hits[offset:offset + limit],
+            'facets': facets
+        }
+
+
+def _factorize(facet: str, values: List[Any]) -> Tuple['np.ndarray', List[str]]:
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter((lookup.setdefault(facet_label(facet, v), len(lookup)) for v in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(lookup)
+
+
+class FacetIndexCache:
+    """按数据集版本缓存分面索引，只保留当前版本"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._index: Optional[FacetIndex] = None
+
+    def get(self, version: str, build) -> FacetIndex:
+        with self._lock:
+            if self._version != version or self._index is None:
+                self._index = build()
+                self._version = version
+                logger.info(f"✅ 分面索引已建立: {self._index.num_rows} 行，版本 {version[:16]}")
+            return self._index
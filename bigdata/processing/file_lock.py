@@ -0,0 +1,55 @@
+"""
+护工资源管理系统 - 跨进程文件锁
+====================================
+
+进程内线程锁 + 跨进程文件锁（fcntl.flock），多个 Gunicorn 工作进程或命令行脚本
+同时读改写同一份文件（数据集清单、事件日志与索引等）时使用。
+没有 fcntl（Windows）时只有线程锁。
+"""
+
+import os
+import threading
+
+# 安全导入可选依赖
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+class FileLock:
+    """进程内线程锁 + 跨进程文件锁，用作 with 语句的上下文管理器
+
+    Args:
+        path: 锁文件路径（不存在时创建）
+        thread_lock: 同一进程内共用的线程锁
+    """
+
+    def __init__(self, path: str, thread_lock: threading.Lock):
+        self.path = path
+        self.thread_lock = thread_lock
+        self._fd = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if HAS_FCNTL:
+            try:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except Exception:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self.thread_lock.release()
+                raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+                os.close(self._fd)
+                self._fd = None
+        finally:
+            self.thread_lock.release()
@@ -0,0 +1,154 @@
+"""
+护工资源管理系统 - 按列加载分析数据
+====================================
+
+动态分析只用到输入文件中的少数几列，这里按列清单读取：
+- 只读取清单中的列；低基数文本列（城市、来源、学历、工作类型等）转为 category，
+  整数列向下转换为最小的整数类型，浮点列在转换为 float32 不丢失精度时才转换
+- CSV 第一次读取时转换为 Parquet 缓存，缓存按源文件内容的 sha256 与缓存列清单命名，
+  源文件内容不变时之后只从缓存按列读取；内容变化后旧缓存被替换
+- Parquet 输入直接按列读取
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Any, Optional
+
+# 安全导入可选依赖
+try:
+    import pandas as pd
+    import numpy as np
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from bigdata.processing.dataset_registry import hash_file
+
+logger = logging.getLogger(__name__)
+
+# 转为 category 的低基数文本列
+LOW_CARDINALITY_COLUMNS = ('city', 'source', 'education', 'experience', 'job_type', 'status', 'title')
+# 缓存格式版本，修改转换规则后提高以使旧缓存失效
+CACHE_FORMAT_VERSION = 1
+CSV_ENCODING = 'utf-8-sig'
+
+SOURCE_PARQUET = 'parquet'
+SOURCE_CACHE = 'cache'
+SOURCE_CONVERTED = 'converted'
+SOURCE_CSV = 'csv'
+
+
+def optimize_dtypes(df: 'pd.DataFrame', category_columns=LOW_CARDINALITY_COLUMNS) -> 'pd.DataFrame':
+    """低基数文本列转为 category，数值列向下转换（原地修改并返回 df）"""
+    for column in df.columns:
+        series = df[column]
+        if column in category_columns:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = series.astype('category')
+        elif pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            values = series.to_numpy(dtype=np.float64)
+            narrowed = values.astype(np.float32)
+            # 只在数值完全不变时转换，避免分析结果因精度变化而不同
+            if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+                df[column] = pd.Series(narrowed, index=series.index, name=column)
+    return df
+
+
+def memory_usage(df: 'pd.DataFrame') -> int:
+    """DataFrame 占用的内存（字节，含文本内容）"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _columns_key(columns: Optional[List[str]]) -> str:
+    payload = json.dumps({'version': CACHE_FORMAT_VERSION, 'columns': sorted(columns) if columns is not None else None})
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:8]
+
+
+class FrameLoader:
+    """按列清单读取分析输入，CSV 转换结果缓存为 Parquet
+
+    Args:
+        cache_dir: Parquet 缓存目录
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        # 路径 -> (大小, 修改时间, sha256)，文件未变化时不重复计算摘要
+        self._hashes: Dict[str, tuple] = {}
+
+    def _file_hash(self, path: str) -> str:
+        stat = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        digest = hash_file(path)
+        self._hashes[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def load(self, name: str, path: str, kind: str, columns: Optional[List[str]] = None,
+             cache_columns: Optional[List[str]] = None) -> tuple:
+        """读取一个输入
+
+        Args:
+            name: 数据名（缓存文件名前缀）
+            path: 文件路径
+            kind: 'parquet' 或 'csv'
+            columns: 需要的列，None 表示全部
+            cache_columns: CSV 缓存中保存的列（应包含 columns），None 表示全部
+
+        Returns:
+            (DataFrame, 来源)；来源为 parquet / cache / converted / csv
+        """
+        if kind == 'parquet':
+            if columns is not None and HAS_PYARROW:
+                present = set(pq.read_schema(path).names)
+                columns = [column for column in columns if column in present]
+            return optimize_dtypes(pd.read_parquet(path, columns=columns)), SOURCE_PARQUET
+
+        if not HAS_PYARROW:
+            return self._read_csv(path, columns), SOURCE_CSV
+
+        # 需要全部列时缓存也保存全部列
+        cache_columns = None if columns is None or cache_columns is None else sorted(set(cache_columns) | set(columns))
+        cache_path = os.path.join(self.cache_dir,
+                                  f'{name}-{self._file_hash(path)[:16]}-{_columns_key(cache_columns)}.parquet')
+        if os.path.exists(cache_path):
+            source = SOURCE_CACHE
+        else:
+            self._convert(name, path, cache_path, cache_columns)
+            source = SOURCE_CONVERTED
+        if columns is not None:
+            present = set(pq.read_schema(cache_path).names)
+            columns = [column for column in columns if column in present]
+        return pd.read_parquet(cache_path, columns=columns), source
+
+    def _read_csv(self, path: str, columns: Optional[List[str]]) -> 'pd.DataFrame':
+        usecols = None if columns is None else (lambda column: column in columns)
+        return optimize_dtypes(pd.read_csv(path, usecols=usecols, encoding=CSV_ENCODING))
+
+    def _convert(self, name: str, path: str, cache_path: str, columns: Optional[List[str]]):
+        """CSV 转为 Parquet 缓存（写入临时文件后原子替换），并删除该输入源文件变化前的缓存"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        df = self._read_csv(path, columns)
+        tmp_path = f'{cache_path}.tmp-{os.getpid()}'
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+        # 同一源文件内容按不同列清单的缓存保留，源文件内容变化前的缓存删除
+        current = os.path.basename(cache_path).rsplit('-', 1)[0]
+        for entry in os.listdir(self.cache_dir):
+            if entry.startswith(f'{name}-') and entry.endswith('.parquet') and \
+                    entry.rsplit('-', 1)[0] != current:
+                os.remove(os.path.join(self.cache_dir, entry))
+        logger.info(f"✅ 已转换为 Parquet 缓存: {os.path.basename(path)} -> {os.path.basename(cache_path)}")
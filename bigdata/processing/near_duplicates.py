@@ -0,0 +1,471 @@
+"""
+护工资源管理系统 - 职位近似重复检测
+====================================
+
+同一职位会在 51job、智联、Boss 等站点以略有差异的文字重复发布。这里用 MinHash + LSH
+把职位名称、公司、城市、描述相近的记录聚为一簇，维护 记录 -> 规范记录 的映射：
+- 文本规范化后按字符三元组切片，切片哈希与 MinHash 签名用 numpy 按块批量计算
+- 签名分段，任一段完全相同的记录成为候选；候选所在簇的规范记录（最早加入的记录）
+  必须与新记录城市相同、公司名称相近、职位名称相近，且签名估计的 Jaccard 相似度达到阈值
+- 公司名称去掉城市名与“有限公司”“服务中心”等后缀后比较，同一家公司在不同站点的不同写法
+  仍可合并；名称中的编号必须一致
+- 新记录只与规范记录比较，最多并入一个已有簇，簇之间不会经由中间记录连锁合并
+- 索引增量更新并持久化，已处理过的数据集直接复用行映射
+
+numpy 不可用时退化为按规范化文本的精确去重。
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = 'caregiver-near-duplicates'
+FORMAT_VERSION = 3
+
+DEDUP_FIELDS = ['title', 'company', 'location', 'city', 'description']
+
+NUM_PERM = 64
+BANDS = 16
+SIMILARITY_THRESHOLD = 0.7
+# 职位名称字符二元组的 Jaccard 相似度下限
+TITLE_THRESHOLD = 0.5
+# 公司名称（去掉后缀后）字符二元组的 Jaccard 相似度下限
+COMPANY_THRESHOLD = 0.6
+# 比较公司名称前去掉的后缀，长的在前
+COMPANY_SUFFIXES = ('股份有限公司', '有限责任公司', '有限公司', '分公司', '公司', '集团',
+                    '服务中心', '中心', '服务', '机构')
+SHINGLE_SIZE = 3
+HASH_SEED = 20240601
+
+# 单块切片数上限，控制 (切片数 x NUM_PERM) 中间矩阵的内存
+BLOCK_SHINGLES = 50000
+
+_STRIP_PATTERN = re.compile(r'[\W_]+')
+_CITY_SEPARATOR = re.compile(r'[-·・/\s]')
+_DIGITS_PATTERN = re.compile(r'\d+')
+_MIX_1 = 0x9E3779B97F4A7C15
+_MIX_2 = 0xC2B2AE3D27D4EB4F
+
+
+def normalize_text(row: Dict[str, Any]) -> str:
+    """把参与比较的字段拼成规范化文本，全部为空时返回空串"""
+    location = str(row.get('location') or row.get('city') or '').strip()
+    parts = [
+        row.get('title'),
+        row.get('company'),
+        _CITY_SEPARATOR.split(location, 1)[0],
+        row.get('description'),
+    ]
+    texts = []
+    for part in parts:
+        text = unicodedata.normalize('NFKC', str(part or '')).lower()
+        texts.append(_STRIP_PATTERN.sub('', text))
+    if not texts[0]:
+        return ''
+    return '|'.join(texts)
+
+
+def _text_key(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def company_key(company: str, city: str = '') -> str:
+    """规范化公司名称的比较键：去掉城市名与常见后缀，名称中的编号单独放在 # 之后"""
+    if city:
+        company = company.replace(city, '')
+    digits = '.'.join(_DIGITS_PATTERN.findall(company))
+    name = _DIGITS_PATTERN.sub('', company)
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in COMPANY_SUFFIXES:
+            if name.endswith(suffix) and len(name) > len(suffix):
+                name, stripped = name[:-len(suffix)], True
+                break
+    return f'{name}#{digits}' if name or digits else ''
+
+
+def company_similarity(a: str, b: str) -> float:
+    """两个公司比较键的相似度：编号不同为 0，否则为名称的字符二元组 Jaccard 相似度"""
+    if a == b:
+        return 1.0
+    name_a, _, digits_a = a.partition('#')
+    name_b, _, digits_b = b.partition('#')
+    if digits_a != digits_b:
+        return 0.0
+    return title_similarity(name_a, name_b)
+
+
+def _split_text(text: str) -> tuple:
+    """规范化文本拆回 (职位名称, 公司比较键, 城市键)；公司或城市为空时城市键为 0，不与任何记录合并"""
+    parts = (text.split('|', 3) + ['', '', ''])[:3]
+    title, company, city = parts
+    key = company_key(company, city) if company else ''
+    return title, key, _text_key(city) if key and city else 0
+
+
+def _bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+def title_similarity(a: str, b: str) -> float:
+    """规范化职位名称的字符二元组 Jaccard 相似度"""
+    if a == b:
+        return 1.0
+    x, y = _bigrams(a), _bigrams(b)
+    return len(x & y) / len(x | y)
+
+
+class MinHasher:
+    """字符三元组 MinHash，同一组参数对同一文本总是得到相同签名"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = HASH_SEED):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # multiply-shift 哈希族：h(x) = (a * x + b) >> 32，a 取奇数
+        self._a = (rng.randint(0, 2 ** 62, size=num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.randint(0, 2 ** 62, size=num_perm, dtype=np.uint64)
+
+    def _block_signatures(self, texts: List[str]) -> 'np.ndarray':
+        # 整块文本一次编码为码点数组，以 \0 分隔
+        padded = [t.ljust(SHINGLE_SIZE, '\x01') for t in texts]
+        codes = np.frombuffer('\0'.join(padded).encode('utf-32-le'), dtype='<u4').astype(np.uint64)
+        windows = codes[:-2] * np.uint64(_MIX_1) + codes[1:-1] * np.uint64(_MIX_2) + codes[2:]
+
+        lengths = np.fromiter((len(t) for t in padded), dtype=np.int64, count=len(padded))
+        text_starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        counts = lengths - (SHINGLE_SIZE - 1)
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        positions = np.repeat(text_starts - offsets, counts) + np.arange(int(counts.sum()))
+
+        # (NUM_PERM, 切片数) 布局让按行分段取最小值时内存连续
+        hashed = (self._a[:, None] * windows[positions][None, :] + self._b[:, None]) >> np.uint64(32)
+        return np.minimum.reduceat(hashed, offsets, axis=1).T.astype(np.uint32)
+
+    def signatures(self, texts: List[str]) -> 'np.ndarray':
+        """批量计算签名，texts 中不能有空串"""
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(texts):
+            end, shingles = start, 0
+            while end < len(texts) and (end == start or shingles + len(texts[end]) <= BLOCK_SHINGLES):
+                shingles += max(len(texts[end]), SHINGLE_SIZE)
+                end += 1
+            result[start:end] = self._block_signatures(texts[start:end])
+            start = end
+        return result
+
+
+class NearDuplicateIndex:
+    """近似重复索引：记录签名、LSH 分桶与 记录 -> 规范记录 的指针
+
+    root 为 None 时只在内存中使用（如爬虫单次运行内的去重）。
+    """
+
+    def __init__(self, root: Optional[str] = None, num_perm: int = NUM_PERM,
+                 bands: int = BANDS, threshold: float = SIMILARITY_THRESHOLD):
+        if not HAS_NUMPY:
+            raise RuntimeError('numpy未安装，无法使用近似重复检测')
+        if num_perm % bands:
+            raise ValueError('签名长度必须能被分段数整除')
+        self.root = root
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        self._min_agree = int(np.ceil(threshold * num_perm))
+        self._hasher = MinHasher(num_perm)
+        self._lock = threading.RLock()
+
+        self._count = 0
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._parent: List[int] = []
+        self._keys: List[int] = []
+        # 每条记录的职位名称、公司比较键与城市键，只与同城、公司与职位名称相近的规范记录合并
+        self._titles: List[str] = []
+        self._companies: List[str] = []
+        self._cities: List[int] = []
+        self._key_index: Dict[int, int] = {}
+        self._buckets: List[Dict[int, int]] = [{} for _ in range(bands)]
+        self._parent_array = None
+        self.datasets: Dict[str, Dict[str, Any]] = {}
+
+        if root and os.path.exists(os.path.join(root, 'meta.json')):
+            self._load()
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ---------- 持久化 ----------
+
+    def _mapping_path(self, version: str) -> str:
+        name = hashlib.sha1(version.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, 'mappings', f'{name}.npy')
+
+    def _load(self):
+        with open(os.path.join(self.root, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') != FORMAT_NAME or meta.get('version') != FORMAT_VERSION \
+                or meta.get('num_perm') != self.num_perm \
+                or meta.get('bands') != self.bands or meta.get('seed') != HASH_SEED:
+            logger.warning(f"⚠️ 近似重复索引参数不一致，忽略已有索引: {self.root}")
+            return
+        signatures = np.load(os.path.join(self.root, 'signatures.npy'))
+        keys = np.load(os.path.join(self.root, 'keys.npy'))
+        parent = np.load(os.path.join(self.root, 'parent.npy'))
+        titles = np.load(os.path.join(self.root, 'titles.npy'))
+        companies = np.load(os.path.join(self.root, 'companies.npy'))
+        cities = np.load(os.path.join(self.root, 'cities.npy'))
+        self.datasets = meta.get('datasets', {})
+        self._count = len(signatures)
+        self._signatures = np.array(signatures, dtype=np.uint32)
+        self._parent = parent.tolist()
+        self._keys = keys.tolist()
+        self._titles = titles.tolist()
+        self._companies = companies.tolist()
+        self._cities = cities.tolist()
+        self._key_index = {k: i for i, k in enumerate(self._keys)}
+        band_keys = self._band_keys(self._signatures[:self._count])
+        for i, row in enumerate(band_keys.tolist()):
+            for b, key in enumerate(row):
+                self._buckets[b].setdefault(key, i)
+        logger.info(f"✅ 已加载近似重复索引: {self._count} 条记录")
+
+    def _save_array(self, name: str, array):
+        path = os.path.join(self.root, name)
+        tmp = path + '.tmp.npy'
+        np.save(tmp, array)
+        os.replace(tmp, path)
+
+    def save(self):
+        """原子写入索引文件"""
+        if not self.root:
+            return
+        with self._lock:
+            os.makedirs(os.path.join(self.root, 'mappings'), exist_ok=True)
+            self._save_array('signatures.npy', self._signatures[:self._count])
+            self._save_array('keys.npy', np.array(self._keys, dtype=np.uint64))
+            self._save_array('parent.npy', np.array(self._parent, dtype=np.int64))
+            self._save_array('titles.npy', np.array(self._titles, dtype=str))
+            self._save_array('companies.npy', np.array(self._companies, dtype=str))
+            self._save_array('cities.npy', np.array(self._cities, dtype=np.uint64))
+            meta = {
+                'format': FORMAT_NAME,
+                'version': FORMAT_VERSION,
+                'num_perm': self.num_perm,
+                'bands': self.bands,
+                'threshold': self.threshold,
+                'title_threshold': TITLE_THRESHOLD,
+                'company_threshold': COMPANY_THRESHOLD,
+                'seed': HASH_SEED,
+                'records': self._count,
+                'datasets': self.datasets,
+                'updated_at': datetime.now().isoformat()
+            }
+            tmp = os.path.join(self.root, 'meta.json.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, os.path.join(self.root, 'meta.json'))
+
+    # ---------- 规范记录 ----------
+
+    def _find(self, i: int) -> int:
+        parent = self._parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def find(self, index: int) -> int:
+        """单条记录的规范记录编号"""
+        with self._lock:
+            return self._find(index)
+
+    def canonical(self, indices) -> 'np.ndarray':
+        """批量返回记录的规范记录编号，-1（无有效文本）原样返回"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if self._parent_array is None:
+            self._parent_array = np.array(self._parent, dtype=np.int64)
+        parent = self._parent_array
+        valid = indices >= 0
+        roots = indices.copy()
+        current = roots[valid]
+        # 指针跳跃直到全部到达根
+        while current.size:
+            nxt = parent[current]
+            if np.array_equal(nxt, current):
+                break
+            current = nxt
+        roots[valid] = current
+        return roots
+
+    # ---------- 增量添加 ----------
+
+    def _band_keys(self, signatures) -> 'np.ndarray':
+        shaped = signatures.reshape(len(signatures), self.bands, self.rows_per_band).astype(np.uint64)
+        keys = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+        for r in range(self.rows_per_band):
+            keys = keys * np.uint64(_MIX_1) + shaped[:, :, r]
+        return keys
+
+    def _append_signatures(self, signatures):
+        needed = self._count + len(signatures)
+        if needed > len(self._signatures):
+            capacity = max(needed, len(self._signatures) * 2)
+            grown = np.empty((capacity, self.num_perm), dtype=np.uint32)
+            grown[:self._count] = self._signatures[:self._count]
+            self._signatures = grown
+        self._signatures[self._count:needed] = signatures
+
+    def add_texts(self, texts: List[str]) -> 'np.ndarray':
+        """加入规范化文本，返回每条文本的记录编号（空文本为 -1）
+
+        完全相同的文本复用已有记录；新记录只与 LSH 候选所在簇的规范记录比较，
+        城市相同、公司与职位名称相近且签名相似度达到阈值时并入该簇（多个簇满足时取最相似的）
+        """
+        with self._lock:
+            result = np.full(len(texts), -1, dtype=np.int64)
+            new_texts: List[str] = []
+            new_keys: List[int] = []
+            pending: Dict[int, List[int]] = {}
+            for pos, text in enumerate(texts):
+                if not text:
+                    continue
+                key = _text_key(text)
+                index = self._key_index.get(key)
+                if index is not None:
+                    result[pos] = index
+                elif key in pending:
+                    pending[key].append(pos)
+                else:
+                    pending[key] = [pos]
+                    new_texts.append(text)
+                    new_keys.append(key)
+            if not new_texts:
+                return result
+
+            signatures = self._hasher.signatures(new_texts)
+            band_keys = self._band_keys(signatures).tolist()
+            start = self._count
+            self._append_signatures(signatures)
+            stored = self._signatures
+            for offset, (key, row_keys) in enumerate(zip(new_keys, band_keys)):
+                index = start + offset
+                title, company, city = _split_text(new_texts[offset])
+                self._parent.append(index)
+                self._keys.append(key)
+                self._titles.append(title)
+                self._companies.append(company)
+                self._cities.append(city)
+                self._key_index[key] = index
+                for pos in pending[key]:
+                    result[pos] = index
+                candidates = set()
+                for bucket, band_key in zip(self._buckets, row_keys):
+                    first = bucket.setdefault(band_key, index)
+                    if first != index:
+                        candidates.add(first)
+                if not candidates or not city:
+                    continue
+                roots = [root for root in {self._find(c) for c in candidates}
+                         if self._cities[root] == city
+                         and company_similarity(company, self._companies[root]) >= COMPANY_THRESHOLD
+                         and title_similarity(title, self._titles[root]) >= TITLE_THRESHOLD]
+                if not roots:
+                    continue
+                agree = np.count_nonzero(stored[roots] == stored[index], axis=1).tolist()
+                matches, root = max(zip(agree, roots), key=lambda pair: (pair[0], -pair[1]))
+                if matches >= self._min_agree:
+                    self._parent[index] = root
+            self._count = start + len(new_texts)
+            self._parent_array = None
+            return result
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]) -> 'np.ndarray':
+        return self.add_texts([normalize_text(r) for r in rows])
+
+    # ---------- 数据集 ----------
+
+    def dataset_mapping(self, version: str) -> Optional['np.ndarray']:
+        """已处理过的数据集返回 行号 -> 记录编号 映射"""
+        if version not in self.datasets:
+            return None
+        if not self.root:
+            return self.datasets[version].get('_mapping')
+        path = self._mapping_path(version)
+        return np.load(path) if os.path.exists(path) else None
+
+    def add_dataset(self, version: str, rows: List[Dict[str, Any]]) -> 'np.ndarray':
+        """把数据集的全部行加入索引并保存映射，同一版本只处理一次"""
+        with self._lock:
+            mapping = self.dataset_mapping(version)
+            if mapping is not None:
+                return mapping
+            mapping = self.add_rows(rows)
+            unique = int(np.count_nonzero(unique_mask(self.canonical(mapping))))
+            self.datasets[version] = {'rows': len(rows), 'unique': unique,
+                                      'added_at': datetime.now().isoformat()}
+            if self.root:
+                os.makedirs(os.path.join(self.root, 'mappings'), exist_ok=True)
+                np.save(self._mapping_path(version), mapping)
+                self.save()
+            else:
+                self.datasets[version]['_mapping'] = mapping
+            logger.info(f"📊 近似重复检测: 数据集 {version[:16]} 共 {len(rows)} 行，去重后 {unique} 条")
+            return mapping
+
+    def unique_mask_for(self, mappings: List['np.ndarray']) -> 'np.ndarray':
+        """多个数据集拼接后的保留掩码，跨数据集的重复只保留最先出现的一行"""
+        if not mappings:
+            return np.zeros(0, dtype=bool)
+        return unique_mask(self.canonical(np.concatenate(mappings)))
+
+    def stats(self) -> Dict[str, Any]:
+        canonical = self.canonical(np.arange(self._count))
+        clusters = int(np.count_nonzero(canonical == np.arange(self._count)))
+        return {
+            'records': self._count,
+            'clusters': clusters,
+            'duplicates': self._count - clusters,
+            'threshold': self.threshold,
+            'datasets': {k: {f: v for f, v in info.items() if not f.startswith('_')}
+                         for k, info in self.datasets.items()}
+        }
+
+
+def unique_mask(canonical) -> 'np.ndarray':
+    """每个簇只保留第一次出现的行；没有有效文本的行（-1）全部保留"""
+    canonical = np.asarray(canonical, dtype=np.int64)
+    mask = canonical < 0
+    _, first = np.unique(canonical, return_index=True)
+    mask[first] = True
+    return mask
+
+
+def exact_unique_mask(rows: List[Dict[str, Any]]) -> List[bool]:
+    """numpy 不可用时的退化方案：按规范化文本精确去重"""
+    seen = set()
+    mask = []
+    for row in rows:
+        text = normalize_text(row)
+        keep = not text or text not in seen
+        seen.add(text)
+        mask.append(keep)
+    return mask
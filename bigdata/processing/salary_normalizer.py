@@ -0,0 +1,196 @@
+"""
+护工资源管理系统 - 薪资标准化
+====================================
+
+在数据入库时一次性解析薪资文本，统一折算为月薪（元/月）：
+- 单位: k / K / 千 / 万 / w
+- 周期: /月（默认）、/天、/小时、/周、年薪；只看紧挨着数字的单位（"元/月"、"/年"、"年薪" 等），
+  其余文字中的 年、日、小时（如 "周末双休"、"年龄50岁以下"、"工作日8小时"）不影响折算，
+  明确写了月的按月薪计算
+- 区间: 6000-8000、6k-8k、1.5-2万、8千-1万 等
+
+每条记录写入 salary_low、salary_high、salary_monthly 与解析状态 salary_status。
+批量解析先对薪资文本去重，只对不同的写法做一次正则匹配，再按编码回填。
+"""
+
+import re
+import math
+import logging
+from typing import Dict, List, Any, Iterable, Tuple
+
+# 安全导入可选依赖
+try:
+    import pandas as pd
+    import numpy as np
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+logger = logging.getLogger(__name__)
+
+# 解析状态
+SALARY_OK = 0
+SALARY_EMPTY = 1
+SALARY_NEGOTIABLE = 2
+SALARY_UNPARSED = 3
+SALARY_OUT_OF_RANGE = 4
+
+SALARY_STATUS_LABELS = {
+    SALARY_OK: '正常',
+    SALARY_EMPTY: '为空',
+    SALARY_NEGOTIABLE: '面议',
+    SALARY_UNPARSED: '无法解析',
+    SALARY_OUT_OF_RANGE: '超出合理范围'
+}
+
+SALARY_FIELDS = ['salary_low', 'salary_high', 'salary_monthly', 'salary_status']
+
+# 折算参数：按每月26个工作日、每天8小时计算
+DAYS_PER_MONTH = 26
+HOURS_PER_DAY = 8
+WEEKS_PER_MONTH = 52 / 12
+
+MONTHLY_MIN = 100
+MONTHLY_MAX = 500000
+
+UNIT_MULTIPLIERS = {'k': 1000, 'K': 1000, '千': 1000, '万': 10000, 'w': 10000, 'W': 10000}
+
+SALARY_PATTERN = re.compile(
+    r'(?P<low>\d+(?:\.\d+)?)(?P<low_unit>[kK千万wW])?'
+    r'(?:(?:-|~|～|—|－|至|到)(?P<high>\d+(?:\.\d+)?)(?P<high_unit>[kK千万wW])?)?'
+)
+# 薪资数字连同紧挨着它的周期单位：前缀 "年薪"、"月薪" 等，后缀 "元/月"、"/天"、"元每小时" 等
+PERIODIC_SALARY_PATTERN = re.compile(
+    r'(?:(?P<prefix>[月年日时周])薪[:：]?)?'
+    + SALARY_PATTERN.pattern
+    + r'(?:元|块)?(?:/|每)?(?P<suffix>月|年|小时|时|天|日|周|h|H)?'
+)
+PERIOD_FACTORS = {
+    '月': 1.0,
+    '年': 1 / 12,
+    '小时': HOURS_PER_DAY * DAYS_PER_MONTH,
+    '时': HOURS_PER_DAY * DAYS_PER_MONTH,
+    'h': HOURS_PER_DAY * DAYS_PER_MONTH,
+    'H': HOURS_PER_DAY * DAYS_PER_MONTH,
+    '天': DAYS_PER_MONTH,
+    '日': DAYS_PER_MONTH,
+    '周': WEEKS_PER_MONTH,
+}
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _period_factor(prefix: str, suffix: str) -> float:
+    """按数字前后的周期单位折算为月薪的系数，明确写了月时按月，没有单位时默认为月"""
+    if '月' in (prefix, suffix):
+        return 1.0
+    return PERIOD_FACTORS.get(suffix or prefix or '月', 1.0)
+
+
+def parse_salary(text: Any) -> Tuple[float, float, float, int]:
+    """解析单条薪资文本
+
+    Returns:
+        (salary_low, salary_high, salary_monthly, salary_status)，无法解析时数值为 nan
+    """
+    nan = float('nan')
+    if text is None:
+        return nan, nan, nan, SALARY_EMPTY
+    s = _WHITESPACE.sub('', str(text))
+    if not s:
+        return nan, nan, nan, SALARY_EMPTY
+    m = PERIODIC_SALARY_PATTERN.search(s)
+    if not m:
+        status = SALARY_NEGOTIABLE if '面议' in s else SALARY_UNPARSED
+        return nan, nan, nan, status
+
+    low = float(m.group('low'))
+    high = float(m.group('high')) if m.group('high') else nan
+    low_unit = UNIT_MULTIPLIERS.get(m.group('low_unit') or '')
+    high_unit = UNIT_MULTIPLIERS.get(m.group('high_unit') or '')
+    # "1.5-2万" 这种只在末尾写单位的区间，前半段沿用后半段的单位
+    if low_unit is None and high_unit is not None and low < high:
+        low_unit = high_unit
+    low *= low_unit or 1
+    high = low if math.isnan(high) else high * (high_unit or 1)
+
+    factor = _period_factor(m.group('prefix'), m.group('suffix'))
+    low, high = round(low * factor, 2), round(high * factor, 2)
+    monthly = round((low + high) / 2, 2)
+    if not (MONTHLY_MIN <= monthly <= MONTHLY_MAX):
+        return low, high, monthly, SALARY_OUT_OF_RANGE
+    return low, high, monthly, SALARY_OK
+
+
+def normalize_salaries(values: Iterable[Any]) -> Dict[str, Any]:
+    """批量解析薪资文本
+
+    Returns:
+        {'salary_low': ndarray, 'salary_high': ndarray, 'salary_monthly': ndarray, 'salary_status': ndarray}
+        pandas不可用时返回同名的 Python 列表
+    """
+    if not HAS_PANDAS:
+        parsed = [parse_salary(v) for v in values]
+        return {name: [p[i] for p in parsed] for i, name in enumerate(SALARY_FIELDS)}
+
+    series = pd.Series(list(values) if not isinstance(values, pd.Series) else values, dtype=object)
+    codes, uniques = pd.factorize(series.fillna('').astype(str).str.replace(_WHITESPACE, '', regex=True))
+    texts = pd.Series(uniques, dtype=object)
+
+    ext = texts.str.extract(PERIODIC_SALARY_PATTERN)
+    low = pd.to_numeric(ext['low'], errors='coerce').to_numpy(dtype=float)
+    high = pd.to_numeric(ext['high'], errors='coerce').to_numpy(dtype=float)
+    low_unit = ext['low_unit'].map(UNIT_MULTIPLIERS).to_numpy(dtype=float)
+    high_unit = ext['high_unit'].map(UNIT_MULTIPLIERS).to_numpy(dtype=float)
+
+    inherit = np.isnan(low_unit) & ~np.isnan(high_unit) & (low < high)
+    low_unit = np.where(inherit, high_unit, low_unit)
+    low = low * np.nan_to_num(low_unit, nan=1.0)
+    high = np.where(np.isnan(high), low, high * np.nan_to_num(high_unit, nan=1.0))
+
+    prefix = ext['prefix'].map(PERIOD_FACTORS)
+    suffix = ext['suffix'].map(PERIOD_FACTORS)
+    monthly_unit = ((ext['prefix'] == '月') | (ext['suffix'] == '月')).to_numpy(dtype=bool)
+    factor = np.where(monthly_unit, 1.0, suffix.fillna(prefix).fillna(1.0).to_numpy(dtype=float))
+    low = np.round(low * factor, 2)
+    high = np.round(high * factor, 2)
+    monthly = np.round((low + high) / 2, 2)
+
+    status = np.full(len(texts), SALARY_OK, dtype=np.int8)
+    status[(monthly < MONTHLY_MIN) | (monthly > MONTHLY_MAX)] = SALARY_OUT_OF_RANGE
+    unmatched = np.isnan(monthly)
+    status[unmatched] = SALARY_UNPARSED
+    status[unmatched & texts.str.contains('面议').to_numpy(dtype=bool)] = SALARY_NEGOTIABLE
+    status[(texts == '').to_numpy(dtype=bool)] = SALARY_EMPTY
+
+    return {
+        'salary_low': low[codes],
+        'salary_high': high[codes],
+        'salary_monthly': monthly[codes],
+        'salary_status': status[codes]
+    }
+
+
+def normalize_records(rows: List[Dict[str, Any]], field: str = 'salary') -> List[Dict[str, Any]]:
+    """为每条记录就地补充 salary_low / salary_high / salary_monthly / salary_status"""
+    if not rows:
+        return rows
+    result = normalize_salaries(r.get(field) for r in rows)
+    columns = [result[name] for name in SALARY_FIELDS]
+    if HAS_PANDAS:
+        columns = [c.tolist() for c in columns]
+    for i, row in enumerate(rows):
+        row['salary_low'] = _none_if_nan(columns[0][i])
+        row['salary_high'] = _none_if_nan(columns[1][i])
+        row['salary_monthly'] = _none_if_nan(columns[2][i])
+        row['salary_status'] = int(columns[3][i])
+    return rows
+
+
+def _none_if_nan(value: float):
+    return None if value != value else value
+
+
+def is_valid_salary(row: Dict[str, Any]) -> bool:
+    """记录的薪资是否已成功解析"""
+    status = row.get('salary_status')
+    return status is not None and status == SALARY_OK
@@ -0,0 +1,434 @@
+"""
+护工资源管理系统 - 薪资分位数与公司去重计数摘要
+====================================
+
+按维度（城市、工作类型、来源、月份）为数据集建立可合并的概要统计：
+- 薪资：t-digest，质心按 k1 尺度函数分桶，尾部分位数更精确，用于 p25/p50/p90 与均值
+- 公司：HyperLogLog（2^12 个寄存器，误差约 1.6%），用于去重公司数
+- 两种摘要都可以合并：t-digest 合并质心后重新压缩，HyperLogLog 寄存器取最大值
+
+数据集导入后建立一次并保存在数据目录下（sketches/<版本摘要>.npz），
+查询时只读取摘要，多个数据集的结果直接合并，不再扫描原始行。
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+# 安全导入可选依赖
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from bigdata.processing.salary_normalizer import SALARY_OK
+from bigdata.processing.facet_index import UNKNOWN, facet_label
+
+logger = logging.getLogger(__name__)
+
+TDIGEST_COMPRESSION = 200
+HLL_PRECISION = 12
+QUANTILES = {'p25': 0.25, 'p50': 0.5, 'p90': 0.9}
+SKETCH_FORMAT_VERSION = 1
+
+# 维度 -> 原始列
+SKETCH_DIMENSIONS = {'city': 'location', 'job_type': 'job_type', 'source': 'source', 'month': 'crawl_time'}
+ALL_DIMENSION = 'all'
+ALL_VALUE = '全部'
+
+_MONTH_PATTERN = re.compile(r'^(\d{4})[-/.年](\d{1,2})')
+MONTH_PREFIX_BYTES = 10  # "2025-08-23" / "2025年08月"
+
+
+def month_label(value: Any) -> str:
+    """日期文本 -> "YYYY-MM"，无法解析时为未知"""
+    match = _MONTH_PATTERN.match(str(value or '').strip())
+    return f'{match.group(1)}-{int(match.group(2)):02d}' if match else UNKNOWN
+
+
+def _label(dimension: str, value: Any) -> str:
+    if dimension == 'month':
+        return month_label(value)
+    return facet_label(dimension, value)
+
+
+def hash_strings(values: List[Any]) -> 'np.ndarray':
+    """字符串 -> 64 位哈希"""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(v).encode('utf-8'), digest_size=8).digest(), 'little') for v in values),
+        dtype=np.uint64, count=len(values)
+    )
+
+
+class TDigest:
+    """可合并的 t-digest（合并式实现）"""
+
+    __slots__ = ('means', 'weights', 'min', 'max', 'compression')
+
+    def __init__(self, means=None, weights=None, min_value: float = float('nan'),
+                 max_value: float = float('nan'), compression: int = TDIGEST_COMPRESSION):
+        self.means = np.asarray(means if means is not None else [], dtype=np.float64)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=np.float64)
+        self.min = float(min_value)
+        self.max = float(max_value)
+        self.compression = compression
+
+    @classmethod
+    def from_values(cls, values, compression: int = TDIGEST_COMPRESSION) -> 'TDigest':
+        return cls.from_sorted(np.sort(np.asarray(values, dtype=np.float64)), compression)
+
+    @classmethod
+    def from_sorted(cls, values, compression: int = TDIGEST_COMPRESSION) -> 'TDigest':
+        """从已升序排列的数值建立"""
+        if not values.size:
+            return cls(compression=compression)
+        means, weights = _compress(values, np.ones(values.size), compression)
+        return cls(means, weights, values[0], values[-1], compression)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    @property
+    def total(self) -> float:
+        return float((self.means * self.weights).sum())
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        if not other.weights.size:
+            return self
+        if not self.weights.size:
+            return other
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = _compress(means[order], weights[order], self.compression)
+        return TDigest(means, weights, min(self.min, other.min), max(self.max, other.max), self.compression)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.weights.size:
+            return None
+        cumulative = np.cumsum(self.weights)
+        centers = cumulative - self.weights / 2
+        xs = np.concatenate([[0.0], centers, [cumulative[-1]]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * cumulative[-1], xs, ys))
+
+
+def _compress(means, weights, compression: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """已按均值排序的质心重新分桶：k1(q) = δ/2π·asin(2q-1) 的每个整数区间合并为一个质心"""
+    cumulative = np.cumsum(weights)
+    q = (cumulative - weights / 2) / cumulative[-1]
+    buckets = np.floor(compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1.0, 1.0)))
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    merged_weights = np.add.reduceat(weights, starts)
+    merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+    return merged_means, merged_weights
+
+
+class HyperLogLog:
+    """HyperLogLog 基数估计"""
+
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, registers=None, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = (np.zeros(1 << precision, dtype=np.uint8) if registers is None
+                          else np.asarray(registers, dtype=np.uint8))
+
+    def add_hashes(self, hashes):
+        index, rank = hll_positions(hashes, self.precision)
+        self.registers = np.maximum(self.registers, max_registers(self.registers.size, index, rank))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        return HyperLogLog(np.maximum(self.registers, other.registers), self.precision)
+
+    def count(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # 小基数时用线性计数
+        return int(round(estimate))
+
+
+def hll_positions(hashes, precision: int = HLL_PRECISION) -> Tuple['np.ndarray', 'np.ndarray']:
+    """哈希 -> (寄存器编号, 前导零个数 + 1)"""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    rest_bits = 64 - precision
+    index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+    # 只看剩余位的高 32 位，float64 可以精确表示，frexp 的指数即位长
+    high = ((hashes & np.uint64((1 << rest_bits) - 1)) >> np.uint64(rest_bits - 32)).astype(np.float64)
+    rank = 33 - np.frexp(high)[1]
+    return index, rank.astype(np.uint8)
+
+
+def max_registers(size: int, index, rank) -> 'np.ndarray':
+    """每个寄存器取最大的 rank；排序代替 np.maximum.at（旧版 numpy 中 ufunc.at 很慢）"""
+    registers = np.zeros(size, dtype=np.uint8)
+    combined = np.unique(np.asarray(index, dtype=np.int64) * 64 + rank)
+    keys = combined >> 6
+    last = np.concatenate([keys[1:] != keys[:-1], [True]]) if combined.size else np.zeros(0, dtype=bool)
+    registers[keys[last]] = (combined[last] & 63).astype(np.uint8)
+    return registers
+
+
+class SketchGroup:
+    """一个维度取值的摘要：行数、薪资 t-digest、公司 HyperLogLog"""
+
+    __slots__ = ('rows', 'salary', 'companies')
+
+    def __init__(self, rows: int, salary: TDigest, companies: HyperLogLog):
+        self.rows = rows
+        self.salary = salary
+        self.companies = companies
+
+    def merge(self, other: 'SketchGroup') -> 'SketchGroup':
+        return SketchGroup(self.rows + other.rows, self.salary.merge(other.salary),
+                           self.companies.merge(other.companies))
+
+    def summary(self) -> Dict[str, Any]:
+        count = self.salary.count
+        result = {
+            'jobs': self.rows,
+            'salary_count': int(count),
+            'avg_salary': round(self.salary.total / count, 2) if count else None,
+            'distinct_companies': self.companies.count()
+        }
+        for name, q in QUANTILES.items():
+            value = self.salary.quantile(q)
+            result[name] = round(value, 2) if value is not None else None
+        return result
+
+
+class DatasetSketches:
+    """按维度分组的摘要集合，键为 (维度, 取值)"""
+
+    def __init__(self, groups: Optional[Dict[Tuple[str, str], SketchGroup]] = None):
+        if not HAS_NUMPY:
+            raise RuntimeError('numpy未安装，无法建立统计摘要')
+        self.groups: Dict[Tuple[str, str], SketchGroup] = groups or {}
+
+    @classmethod
+    def build(cls, dimension_codes: Dict[str, Tuple[Any, List[str]]], monthly, status,
+              company_hashes, has_company, base_mask=None) -> 'DatasetSketches':
+        """按维度编码一次性建立全部分组
+
+        Args:
+            dimension_codes: 维度 -> (每行编码, 编码对应的标签)
+            monthly / status: 月薪与薪资解析状态
+            company_hashes / has_company: 公司名哈希与是否有公司名
+            base_mask: 参与统计的行（如近似重复去重后保留的行）
+        """
+        monthly = np.asarray(monthly, dtype=np.float64)
+        num_rows = monthly.size
+        keep = np.ones(num_rows, dtype=bool) if base_mask is None else np.asarray(base_mask, dtype=bool)
+        valid_salary = keep & (np.asarray(status, dtype=np.float64) == SALARY_OK) & ~np.isnan(monthly)
+        valid_company = keep & np.asarray(has_company, dtype=bool)
+        reg_index, reg_rank = hll_positions(np.asarray(company_hashes, dtype=np.uint64)[valid_company])
+        registers_per_group = 1 << HLL_PRECISION
+
+        salary_rows = np.flatnonzero(valid_salary)
+        salary_rows = salary_rows[np.argsort(monthly[salary_rows], kind='stable')]
+        sorted_salary = monthly[salary_rows]
+
+        dimension_codes = dict(dimension_codes)
+        dimension_codes[ALL_DIMENSION] = (np.zeros(num_rows, dtype=np.int32), [ALL_VALUE])
+        groups: Dict[Tuple[str, str], SketchGroup] = {}
+        for dimension, (codes, labels) in dimension_codes.items():
+            codes = np.asarray(codes, dtype=np.int64)
+            size = len(labels)
+            rows = np.bincount(codes[keep], minlength=size)
+
+            # 薪资已整体排好序，按编码稳定排序后每组内仍然有序
+            salary_codes = codes[salary_rows]
+            order = np.argsort(salary_codes, kind='stable')
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(salary_codes, minlength=size))])
+            salary_values = sorted_salary[order]
+
+            registers = max_registers(size * registers_per_group,
+                                      codes[valid_company] * registers_per_group + reg_index,
+                                      reg_rank).reshape(size, registers_per_group)
+
+            for code, label in enumerate(labels):
+                if not rows[code]:
+                    continue
+                digest = TDigest.from_sorted(salary_values[bounds[code]:bounds[code + 1]])
+                groups[(dimension, label)] = SketchGroup(int(rows[code]), digest, HyperLogLog(registers[code]))
+        return cls(groups)
+
+    @classmethod
+    def from_columnar(cls, dataset, base_mask=None) -> 'DatasetSketches':
+        """从列式数据集建立，字典编码列只对字典做标签与哈希"""
+        columns = dataset.meta['columns']
+        dimension_codes = {}
+        for dimension, column in SKETCH_DIMENSIONS.items():
+            if column in columns and dataset.kind(column) == 'dict':
+                dimension_codes[dimension] = _merge_labels(
+                    np.asarray(dataset.codes(column)), [_label(dimension, v) for v in dataset.dictionary(column)]
+                )
+            elif column in columns and dimension == 'month':
+                # 月份只看前几个字节，按前缀去重后再解析，不逐行解码
+                prefixes, codes = np.unique(dataset.prefixes(column, MONTH_PREFIX_BYTES), return_inverse=True)
+                labels = [_label(dimension, p.decode('utf-8', 'ignore')) for p in prefixes.tolist()]
+                dimension_codes[dimension] = _merge_labels(codes.reshape(-1), labels)
+            elif column in columns:
+                dimension_codes[dimension] = _encode(dimension, dataset.column(column))
+            else:
+                dimension_codes[dimension] = (np.zeros(dataset.num_rows, dtype=np.int32), [UNKNOWN])
+        if 'company' in columns and dataset.kind('company') == 'dict':
+            table = [str(v).strip() for v in dataset.dictionary('company')]
+            codes = np.asarray(dataset.codes('company'))
+            company_hashes = hash_strings(table)[codes] if table else np.zeros(dataset.num_rows, dtype=np.uint64)
+            has_company = np.array([bool(v) for v in table], dtype=bool)[codes] if table else codes.astype(bool)
+        else:
+            companies = [str(v or '').strip() for v in dataset.column('company')] if 'company' in columns else []
+            company_hashes, has_company = _company_hashes(companies, dataset.num_rows)
+        if 'salary_monthly' in columns and 'salary_status' in columns:
+            monthly, status = dataset.values('salary_monthly'), dataset.values('salary_status')
+        else:
+            monthly, status = np.full(dataset.num_rows, np.nan), np.full(dataset.num_rows, -1.0)
+        return cls.build(dimension_codes, monthly, status, company_hashes, has_company, base_mask)
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], base_mask=None) -> 'DatasetSketches':
+        """从记录列表建立（JSON / JSONL 数据集）"""
+        dimension_codes = {dimension: _encode(dimension, [r.get(column) for r in rows])
+                           for dimension, column in SKETCH_DIMENSIONS.items()}
+        monthly = [r.get('salary_monthly') if r.get('salary_monthly') is not None else np.nan for r in rows]
+        status = [r.get('salary_status') if r.get('salary_status') is not None else -1 for r in rows]
+        company_hashes, has_company = _company_hashes([str(r.get('company') or '').strip() for r in rows], len(rows))
+        return cls.build(dimension_codes, monthly, status, company_hashes, has_company, base_mask)
+
+    def merge(self, other: 'DatasetSketches') -> 'DatasetSketches':
+        groups = dict(self.groups)
+        for key, group in other.groups.items():
+            groups[key] = groups[key].merge(group) if key in groups else group
+        return DatasetSketches(groups)
+
+    def summary(self, dimension: str) -> Dict[str, Dict[str, Any]]:
+        """某个维度各取值的统计，按职位数倒序"""
+        items = [(value, group) for (dim, value), group in self.groups.items() if dim == dimension]
+        items.sort(key=lambda item: item[1].rows, reverse=True)
+        return {value: group.summary() for value, group in items}
+
+    def overall(self) -> Dict[str, Any]:
+        group = self.groups.get((ALL_DIMENSION, ALL_VALUE))
+        if group is None:
+            return SketchGroup(0, TDigest(), HyperLogLog()).summary()
+        return group.summary()
+
+    # ---- 持久化 ----
+
+    def save(self, path: str):
+        """原子写入 .npz 文件"""
+        keys = list(self.groups)
+        groups = [self.groups[k] for k in keys]
+        meta = {
+            'version': SKETCH_FORMAT_VERSION,
+            'keys': [list(k) for k in keys],
+            'rows': [g.rows for g in groups],
+            'compression': TDIGEST_COMPRESSION,
+            'precision': HLL_PRECISION
+        }
+        sizes = [g.salary.means.size for g in groups]
+        tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}.npz'
+        np.savez(
+            tmp_path,
+            meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            offsets=np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+            means=np.concatenate([g.salary.means for g in groups] or [np.empty(0)]),
+            weights=np.concatenate([g.salary.weights for g in groups] or [np.empty(0)]),
+            bounds=np.array([[g.salary.min, g.salary.max] for g in groups], dtype=np.float64).reshape(-1, 2),
+            registers=np.array([g.companies.registers for g in groups], dtype=np.uint8).reshape(
+                -1, 1 << HLL_PRECISION)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'DatasetSketches':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != SKETCH_FORMAT_VERSION:
+                raise ValueError(f"不支持的摘要格式: {meta.get('version')}")
+            offsets, means, weights = data['offsets'], data['means'], data['weights']
+            bounds, registers = data['bounds'], data['registers']
+            groups = {}
+            for i, (key, rows) in enumerate(zip(meta['keys'], meta['rows'])):
+                start, end = offsets[i], offsets[i + 1]
+                digest = TDigest(means[start:end], weights[start:end], bounds[i, 0], bounds[i, 1],
+                                 meta['compression'])
+                groups[tuple(key)] = SketchGroup(rows, digest, HyperLogLog(registers[i], meta['precision']))
+        return cls(groups)
+
+
+def _encode(dimension: str, values: List[Any]) -> Tuple['np.ndarray', List[str]]:
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter((lookup.setdefault(_label(dimension, v), len(lookup)) for v in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(lookup)
+
+
+def _merge_labels(codes, labels: List[str]) -> Tuple['np.ndarray', List[str]]:
+    """合并标签相同的字典编码"""
+    merged: Dict[str, int] = {}
+    remap = np.array([merged.setdefault(label, len(merged)) for label in labels], dtype=np.int32)
+    return (remap[codes] if len(labels) else np.zeros(len(codes), dtype=np.int32)), list(merged)
+
+
+def _company_hashes(companies: List[str], num_rows: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    if not companies:
+        return np.zeros(num_rows, dtype=np.uint64), np.zeros(num_rows, dtype=bool)
+    return hash_strings(companies), np.array([bool(c) for c in companies], dtype=bool)
+
+
+class SketchStore:
+    """数据目录下按数据集版本保存的摘要文件，带进程内缓存
+
+    Args:
+        root: 保存目录
+        factory: 摘要类型，需要提供 save(path) 与类方法 load(path)
+    """
+
+    def __init__(self, root: str, cache_size: int = 8, factory: type = DatasetSketches):
+        self.root = root
+        self.cache_size = cache_size
+        self.factory = factory
+        self._cache: Dict[str, DatasetSketches] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, version: str) -> str:
+        return os.path.join(self.root, hashlib.sha1(version.encode('utf-8')).hexdigest() + '.npz')
+
+    def get(self, version: str):
+        with self._lock:
+            if version in self._cache:
+                return self._cache[version]
+        path = self.path_for(version)
+        if not os.path.exists(path):
+            return None
+        try:
+            sketches = self.factory.load(path)
+        except Exception as e:
+            logger.warning(f"⚠️ 摘要文件无法读取，将重新建立: {path}: {str(e)}")
+            return None
+        self._remember(version, sketches)
+        return sketches
+
+    def put(self, version: str, sketches):
+        sketches.save(self.path_for(version))
+        self._remember(version, sketches)
+        logger.info(f"✅ {self.factory.__name__} 已保存: 版本 {version[:16]}")
+
+    def _remember(self, version: str, sketches):
+        with self._lock:
+            self._cache.pop(version, None)
+            self._cache[version] = sketches
+            while len(self._cache) > self.cache_size:
+                self._cache.pop(next(iter(self._cache)))
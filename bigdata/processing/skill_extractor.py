@@ -0,0 +1,154 @@
+"""
+护工资源管理系统 - 技能关键词抽取
+====================================
+
+基于 Aho-Corasick 多模式自动机，一次扫描即可找出文本中出现的全部技能词。
+扫描耗时只与文本长度相关，与词表大小基本无关。
+
+技能词表见同目录下的 skill_taxonomy.json，每个技能可配置多个同义词。
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+DEFAULT_FIELDS = ('title', 'skills', 'requirements', 'description')
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self.patterns: List[str] = []
+
+        outputs: List[Set[int]] = [set()]
+        for pattern in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(len(self.patterns))
+            self.patterns.append(pattern)
+
+        # 广度优先构建失败指针，并把失败链上的输出合并到当前状态
+        # 根节点的子节点失败指针指向根节点（初始值即为0）
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                outputs[nxt] |= outputs[self._fail[nxt]]
+        self._output = [tuple(sorted(o)) for o in outputs]
+
+    def find_ids(self, text: str) -> Set[int]:
+        """返回文本中出现过的模式编号集合"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class SkillExtractor:
+    """技能抽取器：词表 -> 自动机 -> 按文档统计技能出现次数"""
+
+    def __init__(self, taxonomy_path: str = DEFAULT_TAXONOMY_PATH):
+        with open(taxonomy_path, 'r', encoding='utf-8') as f:
+            taxonomy = json.load(f)
+        self.version = str(taxonomy.get('version', ''))
+        self.skills: List[str] = []
+        self.categories: Dict[str, str] = {}
+
+        pattern_skills: Dict[str, Set[int]] = {}
+        for entry in taxonomy.get('skills', []):
+            name = entry['name']
+            skill_id = len(self.skills)
+            self.skills.append(name)
+            self.categories[name] = entry.get('category', '')
+            for term in [name] + list(entry.get('synonyms', [])):
+                pattern_skills.setdefault(term.lower(), set()).add(skill_id)
+
+        self.automaton = AhoCorasick(pattern_skills.keys())
+        self._pattern_skills = [tuple(pattern_skills[p]) for p in self.automaton.patterns]
+        self._cache: 'OrderedDict[Tuple[str, Tuple[str, ...]], Dict[str, int]]' = OrderedDict()
+        self._cache_size = 8
+        self._lock = threading.Lock()
+
+    def extract(self, text: str) -> Set[str]:
+        """抽取单段文本中出现的技能名称"""
+        skill_ids: Set[int] = set()
+        for pattern_id in self.automaton.find_ids(text.lower()):
+            skill_ids.update(self._pattern_skills[pattern_id])
+        return {self.skills[i] for i in skill_ids}
+
+    def count_documents(self, docs: Iterable[Dict[str, Any]],
+                        fields: Iterable[str] = DEFAULT_FIELDS) -> Dict[str, int]:
+        """统计包含每个技能的文档数，每篇文档的多个字段只扫描一遍"""
+        fields = tuple(fields)
+        counts = [0] * len(self.skills)
+        pattern_skills = self._pattern_skills
+        for doc in docs:
+            text = '\n'.join(str(doc.get(f) or '') for f in fields).lower()
+            skill_ids: Set[int] = set()
+            for pattern_id in self.automaton.find_ids(text):
+                skill_ids.update(pattern_skills[pattern_id])
+            for i in skill_ids:
+                counts[i] += 1
+        return {name: counts[i] for i, name in enumerate(self.skills)}
+
+    def count_cached(self, dataset_version: str, load_docs,
+                     fields: Iterable[str] = DEFAULT_FIELDS) -> Dict[str, int]:
+        """按数据集版本缓存统计结果
+
+        Args:
+            dataset_version: 数据集版本标识，版本不变时直接返回缓存
+            load_docs: 无参函数，缓存未命中时调用以加载文档
+        """
+        key = (f'{dataset_version}@{self.version}', tuple(fields))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return dict(self._cache[key])
+        counts = self.count_documents(load_docs(), fields)
+        with self._lock:
+            self._cache[key] = counts
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return dict(counts)
+
+
+_default_extractor: Optional[SkillExtractor] = None
+
+
+def get_skill_extractor() -> SkillExtractor:
+    """获取使用默认词表的共享抽取器"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = SkillExtractor()
+    return _default_extractor
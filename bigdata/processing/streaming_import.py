@@ -0,0 +1,323 @@
+"""
+护工资源管理系统 - 职位数据流式导入
+====================================
+
+上传文件按块读取、逐行标准化并分批写入数据集，内存占用与文件大小无关：
+- JSON: 增量解析顶层数组（或 {"items": [...]} / {"data": [...]} 中的数组）
+- CSV: 按行解码
+
+写入目标为列式目录（numpy可用时）或追加写的 JSONL 文件。
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import codecs
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional, Callable, BinaryIO
+
+from bigdata.processing.columnar_store import (
+    HAS_NUMPY, COLUMNAR_SUFFIX, ColumnarWriter, ColumnarDataset, JOB_COLUMNS, is_columnar_path
+)
+from bigdata.processing.salary_normalizer import normalize_records
+
+logger = logging.getLogger(__name__)
+
+JSONL_SUFFIX = '.jsonl'
+READ_BLOCK_SIZE = 64 * 1024
+DEFAULT_CHUNK_ROWS = 5000
+
+# 字段别名：标准字段 -> 可能出现的列名
+FIELD_ALIASES = {
+    'title': ['title', '职位', '职位名称'],
+    'company': ['company', '公司', '公司名称'],
+    'location': ['location', 'city', '城市', '地点'],
+    'salary': ['salary', '薪资', '薪酬'],
+    'skills': ['skills', '技能'],
+    'benefits': ['benefits', '福利'],
+    'education': ['education', '学历'],
+    'experience': ['experience', '经验'],
+    'job_type': ['job_type', '工作类型'],
+    'description': ['description', '描述', '职位描述'],
+    'requirements': ['requirements', '要求', '任职要求'],
+}
+
+
+def normalize_job_row(raw: Dict[str, Any], default_source: str = 'import') -> Dict[str, Any]:
+    """把一行原始数据映射为标准职位字段"""
+    row: Dict[str, Any] = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = ''
+        for alias in aliases:
+            if raw.get(alias):
+                value = raw[alias]
+                break
+        row[field] = str(value).strip() if value is not None else ''
+    row['source'] = raw.get('source') or default_source
+    row['crawl_time'] = raw.get('crawl_time') or raw.get('publish_date') or datetime.now().isoformat()
+    return row
+
+
+class _CountingReader(io.RawIOBase):
+    """统计已读取字节数的只读包装，可同时计算内容摘要"""
+
+    def __init__(self, stream: BinaryIO, hasher=None):
+        self._stream = stream
+        self._hasher = hasher
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self.bytes_read += n
+        if self._hasher is not None:
+            self._hasher.update(data)
+        return n
+
+
+_ARRAY_KEY = re.compile(r'"(?:items|data)"\s*:\s*\[')
+
+
+def iter_json_array(stream: BinaryIO, block_size: int = READ_BLOCK_SIZE) -> Iterator[Any]:
+    """增量解析JSON数组，逐个产出数组元素"""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='ignore')
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        block = stream.read(block_size)
+        if not block:
+            eof = True
+            buf = buf[pos:] + text_decoder.decode(b'', final=True)
+        else:
+            buf = buf[pos:] + text_decoder.decode(block)
+        pos = 0
+        return True
+
+    def skip_ws() -> bool:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf):
+                return True
+            if not fill():
+                return False
+
+    # 定位数组起点
+    if not skip_ws():
+        return
+    if buf[pos] == '{':
+        while True:
+            m = _ARRAY_KEY.search(buf, pos)
+            if m:
+                pos = m.end()
+                break
+            if not fill():
+                raise ValueError('JSON结构不正确，应为数组或含 items/data 的对象')
+    elif buf[pos] == '[':
+        pos += 1
+    else:
+        raise ValueError('JSON结构不正确，应为数组或含 items/data 的对象')
+
+    while True:
+        if not skip_ws():
+            raise ValueError('JSON数组未闭合')
+        if buf[pos] == ']':
+            return
+        if buf[pos] == ',':
+            pos += 1
+            continue
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # 元素后面必须已经读到分隔符，避免数字等被截断
+                if end < len(buf) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            if not fill():
+                value, end = decoder.raw_decode(buf, pos)
+                break
+        pos = end
+        yield value
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """按行解码CSV，逐行产出字典"""
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding='utf-8-sig', errors='ignore', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach()
+
+
+class JsonlWriter:
+    """追加写的 JSONL 数据集写入器（numpy不可用时使用）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.num_rows = 0
+        self._tmp_path = f'{path}.tmp-{os.getpid()}'
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+
+    def append(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            self._file.write(json.dumps(row, ensure_ascii=False))
+            self._file.write('\n')
+        self._file.flush()
+        self.num_rows += len(rows)
+
+    def close(self, extra_meta: Optional[Dict[str, Any]] = None) -> str:
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def open_dataset_writer(base_path: str):
+    """按环境选择写入器，base_path 不含扩展名"""
+    if HAS_NUMPY:
+        return ColumnarWriter(base_path + COLUMNAR_SUFFIX, JOB_COLUMNS)
+    return JsonlWriter(base_path + JSONL_SUFFIX)
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """逐行读取 JSONL 数据集"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_dataset_rows(path: str, default_source: str = 'import') -> Iterator[Dict[str, Any]]:
+    """逐行读取任意格式的职位数据集（列式目录、JSONL、JSON、CSV），内存占用与行数无关
+
+    JSON / CSV 原始文件的行按 normalize_job_row 映射为标准字段
+    """
+    if is_columnar_path(path):
+        # 按固定行数分片读取，不把整列展开为 Python 列表
+        dataset = ColumnarDataset(path)
+        for start in range(0, dataset.num_rows, DEFAULT_CHUNK_ROWS):
+            yield from dataset.take(range(start, min(start + DEFAULT_CHUNK_ROWS, dataset.num_rows)))
+        return
+    if path.endswith(JSONL_SUFFIX):
+        yield from iter_jsonl(path)
+        return
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in ('.json', '.csv'):
+        raise ValueError(f'不支持的文件类型: {ext}')
+    with open(path, 'rb') as f:
+        rows = iter_json_array(f) if ext == '.json' else iter_csv_rows(f)
+        for raw in rows:
+            if isinstance(raw, dict):
+                yield normalize_job_row(raw, default_source)
+
+
+class StreamingImporter:
+    """流式导入：读取 -> 逐行标准化 -> 分批写入"""
+
+    def __init__(self, base_path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 default_source: str = 'import',
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.base_path = base_path
+        self.chunk_rows = chunk_rows
+        self.default_source = default_source
+        self.progress_callback = progress_callback
+        self.stats: Dict[str, Any] = {
+            'rows_read': 0,
+            'rows_written': 0,
+            'rows_skipped': 0,
+            'row_errors': 0,
+            'bytes_read': 0,
+            'errors': []
+        }
+
+    def _report(self, reader: Optional[_CountingReader]):
+        if reader is not None:
+            self.stats['bytes_read'] = reader.bytes_read
+        if self.progress_callback:
+            self.progress_callback(dict(self.stats))
+
+    def _record_error(self, index: int, error: Exception):
+        self.stats['row_errors'] += 1
+        if len(self.stats['errors']) < 20:  # 只保留前20条错误明细
+            self.stats['errors'].append({'row': index, 'error': str(error)})
+
+    def run(self, rows: Iterator[Any], reader: Optional[_CountingReader] = None) -> Optional[str]:
+        """消费行迭代器并写入数据集，没有有效数据时返回 None"""
+        writer = open_dataset_writer(self.base_path)
+        chunk: List[Dict[str, Any]] = []
+        try:
+            for index, raw in enumerate(rows, start=1):
+                self.stats['rows_read'] += 1
+                try:
+                    if not isinstance(raw, dict):
+                        raise ValueError('行数据不是对象')
+                    row = normalize_job_row(raw, self.default_source)
+                except Exception as e:
+                    self._record_error(index, e)
+                    continue
+                if not row['title']:
+                    self.stats['rows_skipped'] += 1
+                    continue
+                chunk.append(row)
+                if len(chunk) >= self.chunk_rows:
+                    self._flush(writer, chunk)
+                    chunk = []
+                    self._report(reader)
+            if chunk:
+                self._flush(writer, chunk)
+            self._report(reader)
+        except Exception:
+            writer.abort()
+            raise
+        if self.stats['rows_written'] == 0:
+            writer.abort()
+            return None
+        return writer.close({'tag': os.path.basename(self.base_path).rsplit('_', 2)[0]})
+
+    def _flush(self, writer, chunk: List[Dict[str, Any]]):
+        normalize_records(chunk)
+        writer.append(chunk)
+        self.stats['rows_written'] += len(chunk)
+
+    def import_stream(self, stream: BinaryIO, filename: str, hasher=None) -> Optional[str]:
+        """根据文件扩展名选择解析方式并导入
+
+        Args:
+            hasher: 可选的 hashlib 对象，读取过程中同步计算原始内容摘要
+        """
+        reader = _CountingReader(stream, hasher)
+        name = filename.lower()
+        if name.endswith('.json'):
+            rows = iter_json_array(reader)
+        elif name.endswith('.csv'):
+            rows = iter_csv_rows(reader)
+        else:
+            raise ValueError('仅支持JSON或CSV文件')
+        path = self.run(rows, reader)
+        if hasher is not None:
+            # JSON数组之后可能还有内容，读完以保证摘要覆盖整个文件
+            while reader.read(READ_BLOCK_SIZE):
+                pass
+        return path
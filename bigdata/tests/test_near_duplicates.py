@@ -0,0 +1,69 @@
+"""
+职位近似重复检测测试
+====================================
+
+同一职位在不同站点以不同公司写法重复发布时并入同一簇；
+编号不同的公司、不同城市的职位不合并；生成的 5000 条数据集去重后条数不变。
+"""
+
+import os
+import sys
+import csv
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from bigdata.processing.near_duplicates import (
+    HAS_NUMPY, DEDUP_FIELDS, NearDuplicateIndex, company_key, company_similarity, unique_mask
+)
+
+JOB = {
+    'title': '养老护理员',
+    'company': '安心养老服务中心',
+    'city': '北京',
+    'description': '负责老人日常起居照料、协助进食与翻身，定时测量血压，做好护理记录，要求有爱心、耐心和责任心。',
+}
+DATASET_5000 = os.path.join(ROOT, 'caregiver_jobs_5000.csv')
+
+
+class CompanyKeyTest(unittest.TestCase):
+
+    def test_suffixes_and_city_are_ignored(self):
+        self.assertEqual(company_key('北京安心养老服务有限公司', '北京'), company_key('安心养老服务中心'))
+        self.assertEqual(company_key('安心养老有限责任公司'), '安心养老#')
+
+    def test_numbered_companies_differ(self):
+        self.assertEqual(company_similarity(company_key('养老院487'), company_key('养老院481')), 0.0)
+        self.assertEqual(company_similarity(company_key('养老院487'), company_key('养老院487有限公司')), 1.0)
+
+
+@unittest.skipUnless(HAS_NUMPY, 'numpy未安装')
+class NearDuplicateIndexTest(unittest.TestCase):
+
+    def _same_cluster(self, first, second) -> bool:
+        index = NearDuplicateIndex()
+        records = index.add_rows([first, second])
+        roots = index.canonical(records)
+        return roots[0] == roots[1]
+
+    def test_cross_site_repost_with_varied_company_merges(self):
+        for company in ('北京安心养老服务有限公司', '安心养老（北京）', '安心养老服务有限责任公司'):
+            with self.subTest(company=company):
+                self.assertTrue(self._same_cluster(JOB, dict(JOB, company=company, source='智联招聘')))
+
+    def test_different_company_or_city_does_not_merge(self):
+        self.assertFalse(self._same_cluster(JOB, dict(JOB, company='康乐护理站')))
+        self.assertFalse(self._same_cluster(JOB, dict(JOB, city='上海')))
+
+    @unittest.skipUnless(os.path.exists(DATASET_5000), '缺少 caregiver_jobs_5000.csv')
+    def test_generated_dataset_keeps_all_rows(self):
+        with open(DATASET_5000, 'r', encoding='utf-8-sig') as f:
+            rows = [{field: row.get(field, '') for field in DEDUP_FIELDS} for row in csv.DictReader(f)]
+        index = NearDuplicateIndex()
+        mask = unique_mask(index.canonical(index.add_rows(rows)))
+        self.assertEqual(int(mask.sum()), len(rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
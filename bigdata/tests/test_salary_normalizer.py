@@ -0,0 +1,72 @@
+"""
+薪资标准化测试
+====================================
+
+各类薪资写法的解析结果；逐行解析（parse_salary）与批量解析（normalize_salaries）必须一致。
+"""
+
+import os
+import sys
+import math
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bigdata.processing.salary_normalizer import (
+    parse_salary, normalize_salaries, SALARY_FIELDS,
+    SALARY_OK, SALARY_EMPTY, SALARY_NEGOTIABLE, SALARY_UNPARSED
+)
+
+NAN = float('nan')
+
+# (原始写法, salary_low, salary_high, salary_monthly, salary_status)
+GOLDEN_CASES = [
+    ('6000-8000元/月', 6000.0, 8000.0, 7000.0, SALARY_OK),
+    ('6k-8k/月', 6000.0, 8000.0, 7000.0, SALARY_OK),
+    ('6.5k-8.5k/月', 6500.0, 8500.0, 7500.0, SALARY_OK),
+    ('6000元/月', 6000.0, 6000.0, 6000.0, SALARY_OK),
+    ('6 000 - 8 000 元/月', 6000.0, 8000.0, 7000.0, SALARY_OK),
+    ('1.5-2万/月', 15000.0, 20000.0, 17500.0, SALARY_OK),
+    ('8千-1万', 8000.0, 10000.0, 9000.0, SALARY_OK),
+    ('500-1万', 500.0, 10000.0, 5250.0, SALARY_OK),
+    ('180-220/天', 4680.0, 5720.0, 5200.0, SALARY_OK),
+    ('200元/日', 5200.0, 5200.0, 5200.0, SALARY_OK),
+    ('50元/小时', 10400.0, 10400.0, 10400.0, SALARY_OK),
+    ('10-15万/年', 8333.33, 12500.0, 10416.67, SALARY_OK),
+    ('年薪12万', 10000.0, 10000.0, 10000.0, SALARY_OK),
+    ('1-1.5万·13薪', 10000.0, 15000.0, 12500.0, SALARY_OK),
+    ('面议', NAN, NAN, NAN, SALARY_NEGOTIABLE),
+    ('', NAN, NAN, NAN, SALARY_EMPTY),
+    (None, NAN, NAN, NAN, SALARY_EMPTY),
+    ('待遇优厚', NAN, NAN, NAN, SALARY_UNPARSED),
+    # 周期只看紧挨着数字的单位，其余文字中的 周 / 年 / 小时 不影响折算
+    ('月薪6000，周末双休', 6000.0, 6000.0, 6000.0, SALARY_OK),
+    ('6000-8000元/月(年龄50岁以下)', 6000.0, 8000.0, 7000.0, SALARY_OK),
+    ('5000元/月，包吃住，工作日8小时', 5000.0, 5000.0, 5000.0, SALARY_OK),
+    ('月薪：8000', 8000.0, 8000.0, 8000.0, SALARY_OK),
+    ('40元每小时', 8320.0, 8320.0, 8320.0, SALARY_OK),
+    ('3000/周', 13000.0, 13000.0, 13000.0, SALARY_OK),
+]
+
+
+class SalaryNormalizerTest(unittest.TestCase):
+
+    def assertSalary(self, got, expected, text):
+        for g, e in zip(got, expected):
+            if isinstance(e, float) and math.isnan(e):
+                self.assertTrue(math.isnan(g), f'{text!r}: {got}')
+            else:
+                self.assertAlmostEqual(float(g), float(e), places=2, msg=f'{text!r}: {got}')
+
+    def test_parse_salary(self):
+        for text, *expected in GOLDEN_CASES:
+            self.assertSalary(parse_salary(text), expected, text)
+
+    def test_normalize_salaries_matches_parse_salary(self):
+        batch = normalize_salaries([case[0] for case in GOLDEN_CASES])
+        for i, (text, *expected) in enumerate(GOLDEN_CASES):
+            self.assertSalary(tuple(batch[name][i] for name in SALARY_FIELDS), expected, text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,7 +67,18 @@ CRAWLER_CONFIG = {
         'https://www.51job.com',
         'https://www.liepin.com',
         'https://www.bosszhipin.com'
-    ]
+    ],
+    # 内置职位爬取接口（/api/job/crawl/start）使用的并发抓取参数
+    'CRAWLER_MAX_WORKERS': int(os.getenv('CRAWLER_MAX_WORKERS', '8')),
+    'CRAWLER_PER_HOST_CONCURRENCY': int(os.getenv('CRAWLER_PER_HOST_CONCURRENCY', '2')),
+    'CRAWLER_MIN_INTERVAL': float(os.getenv('CRAWLER_MIN_INTERVAL', '0.8')),
+    'CRAWLER_MAX_RETRIES': int(os.getenv('CRAWLER_MAX_RETRIES', '2')),
+    'CRAWLER_TIMEOUT': float(os.getenv('CRAWLER_TIMEOUT', '12')),
+    # 站点根地址，可指向本地桩服务器（scripts/crawl_stub_server.py）进行测试
+    'CRAWLER_SITE_BASE_URLS': {
+        '51job': os.getenv('CRAWLER_51JOB_BASE_URL', 'https://search.51job.com'),
+        'zhaopin': os.getenv('CRAWLER_ZHAOPIN_BASE_URL', 'https://sou.zhaopin.com')
+    }
 }
 
 # 机器学习配置
@@ -79,7 +90,17 @@ ML_CONFIG = {
         'age', 'experience_years', 'hourly_rate', 'rating',
         'service_type', 'location', 'gender'
     ],
-    'TARGET_COLUMN': 'success_rate'
+    'TARGET_COLUMN': 'success_rate',
+    # 动态分析节点的并行执行：进程数（1 为依次执行）、每个节点的超时（秒）、进程启动方式（默认 forkserver）
+    'ANALYSIS_WORKERS': int(os.getenv('ANALYSIS_WORKERS', str(os.cpu_count() or 1))),
+    'ANALYSIS_STAGE_TIMEOUT': float(os.getenv('ANALYSIS_STAGE_TIMEOUT', '300')),
+    'ANALYSIS_MP_CONTEXT': os.getenv('ANALYSIS_MP_CONTEXT') or None,
+    # 护工分群中心漂移超过该值（标准差）时完整重新训练，否则只用新护工增量训练
+    'SEGMENT_DRIFT_THRESHOLD': float(os.getenv('SEGMENT_DRIFT_THRESHOLD', '0.5')),
+    # 模型注册表中每个模型保留的版本数（发布的版本与上一个版本始终保留）
+    'MODEL_KEEP_VERSIONS': int(os.getenv('MODEL_KEEP_VERSIONS', '5')),
+    # 分析结果日志单个段的大小上限（字节），超过后压缩并开始新段
+    'ANALYSIS_LOG_MAX_BYTES': int(os.getenv('ANALYSIS_LOG_MAX_BYTES', str(16 * 1024 * 1024)))
 }
 
 # 数据可视化配置
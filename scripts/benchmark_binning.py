@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+分箱统计基准测试脚本
+先校验边界计数与逐区间过滤的结果一致，再比较护工薪资、评分分布在100万条数据上的耗时：
+- 原 analyze_caregiver_distribution 的写法：每个区间一个布尔掩码并生成临时 DataFrame
+- 逐区间 count_nonzero（不生成 DataFrame，但每个区间仍做两次比较与一次与运算）
+- bin_counts：合并边界后每个边界一次比较，区间数量由相邻边界的计数相减得到
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from bigdata.processing.binning import (
+    bin_counts, bin_counts_loop, SALARY_BANDS, CAREGIVER_SALARY_BANDS, RATING_BANDS
+)
+
+
+def legacy_distribution(df: pd.DataFrame) -> dict:
+    """原 dynamic_analyzer.analyze_caregiver_distribution 中的区间统计方式，作为对照"""
+    salary_ranges = {
+        '2000-3000': len(df[(df['hourly_rate_clean'] >= 2000) & (df['hourly_rate_clean'] < 3000)]),
+        '3000-5000': len(df[(df['hourly_rate_clean'] >= 3000) & (df['hourly_rate_clean'] < 5000)]),
+        '5000-8000': len(df[(df['hourly_rate_clean'] >= 5000) & (df['hourly_rate_clean'] < 8000)]),
+        '8000-12000': len(df[(df['hourly_rate_clean'] >= 8000) & (df['hourly_rate_clean'] < 12000)]),
+        '12000+': len(df[df['hourly_rate_clean'] >= 12000])
+    }
+    rating_dist = {
+        '5.0': len(df[df['rating_clean'] == 5.0]),
+        '4.0-4.9': len(df[(df['rating_clean'] >= 4.0) & (df['rating_clean'] < 5.0)]),
+        '3.0-3.9': len(df[(df['rating_clean'] >= 3.0) & (df['rating_clean'] < 4.0)]),
+        '2.0-2.9': len(df[(df['rating_clean'] >= 2.0) & (df['rating_clean'] < 3.0)]),
+        '1.0-1.9': len(df[(df['rating_clean'] >= 1.0) & (df['rating_clean'] < 2.0)])
+    }
+    return {'salary_distribution': salary_ranges, 'rating_distribution': rating_dist}
+
+
+def loop_distribution(df: pd.DataFrame) -> dict:
+    return {
+        'salary_distribution': bin_counts_loop(df['hourly_rate_clean'], CAREGIVER_SALARY_BANDS),
+        'rating_distribution': bin_counts_loop(df['rating_clean'], RATING_BANDS)
+    }
+
+
+def boundary_distribution(df: pd.DataFrame) -> dict:
+    return {
+        'salary_distribution': bin_counts(df['hourly_rate_clean'], [CAREGIVER_SALARY_BANDS])['salary_distribution'],
+        'rating_distribution': bin_counts(df['rating_clean'], [RATING_BANDS])['rating_distribution']
+    }
+
+
+def generate_caregivers(n: int, seed: int = 42) -> pd.DataFrame:
+    """薪资含缺失值与区间边界上的值，评分按 0.1 取整（含 5.0）"""
+    rng = np.random.default_rng(seed)
+    salary = rng.choice([1500, 2000, 3000, 5000, 8000, 12000, 20000], n) * rng.uniform(0.8, 1.2, n)
+    salary[rng.random(n) < 0.05] = np.nan
+    salary[rng.random(n) < 0.05] = 3000
+    rating = np.round(rng.uniform(0.5, 5.0, n), 1)
+    return pd.DataFrame({'hourly_rate_clean': salary, 'rating_clean': rating})
+
+
+def timed(func, df: pd.DataFrame, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分箱统计基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='测试数据条数')
+    parser.add_argument('--repeat', type=int, default=5, help='每种方式重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    df = generate_caregivers(args.rows)
+    expected = legacy_distribution(df)
+    for name, func in (('逐区间计数', loop_distribution), ('边界计数', boundary_distribution)):
+        got = func(df)
+        if got != expected or [list(d) for d in got.values()] != [list(d) for d in expected.values()]:
+            print(f"❌ {name}结果与原写法不一致: {got} != {expected}")
+            return 1
+    print(f"✅ 结果一致，测试数据: {len(df)} 条")
+
+    legacy_seconds = timed(legacy_distribution, df, args.repeat)
+    loop_seconds = timed(loop_distribution, df, args.repeat)
+    boundary_seconds = timed(boundary_distribution, df, args.repeat)
+    print(f"原写法（掩码 + 临时 DataFrame）: {legacy_seconds * 1000:.1f}ms")
+    print(f"逐区间计数:                     {loop_seconds * 1000:.1f}ms")
+    print(f"边界计数:                       {boundary_seconds * 1000:.1f}ms")
+    print(f"加速比: {legacy_seconds / boundary_seconds:.1f}x（相对原写法），"
+          f"{loop_seconds / boundary_seconds:.1f}x（相对逐区间计数）")
+
+    # 同一列按多组区间计数：共用的边界只比较一次
+    salary = df['hourly_rate_clean']
+    specs = [SALARY_BANDS, CAREGIVER_SALARY_BANDS]
+    start = time.perf_counter()
+    for spec in specs:
+        bin_counts_loop(salary, spec)
+    multi_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    bin_counts(salary, specs)
+    multi_boundary = time.perf_counter() - start
+    print(f"两组薪资区间: 逐区间 {multi_loop * 1000:.1f}ms，边界计数 {multi_boundary * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
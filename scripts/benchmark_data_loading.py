@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+分析数据加载基准测试脚本
+比较 5 万条职位 CSV 的三种读取方式的峰值内存、DataFrame 内存与耗时：
+- 原 load_latest_data 的写法：pd.read_csv 读取全部列，文本为 Python 字符串
+- FrameLoader 首次读取：按全部分析节点的列清单读取、转换类型并写入 Parquet 缓存
+- FrameLoader 缓存命中：从 Parquet 缓存按列读取
+每种方式在单独的子进程中运行，峰值内存为子进程最大常驻内存减去导入后的基线。
+没有指定 CSV 时用 caregiver_jobs_5000.csv 重复生成 5 万条数据。
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+
+# 添加项目路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+import pandas as pd
+
+INPUT_NAME = 'raw_caregiver_jobs_50000'
+MODES = ['legacy', 'convert', 'cached']
+MODE_NAMES = {
+    'legacy': '原写法（全部列，默认类型）',
+    'convert': '按列读取 + 转换缓存',
+    'cached': '按列读取（缓存命中）'
+}
+
+
+def _peak_mb() -> float:
+    # Linux 上 ru_maxrss 的单位为 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode: str, csv_path: str, cache_dir: str) -> dict:
+    """在当前（子）进程中读取一次，返回峰值内存等指标"""
+    from bigdata.analysis.dynamic_analyzer import ANALYSIS_NODES, manifest_columns
+    from bigdata.processing.frame_loader import FrameLoader, memory_usage
+
+    baseline = _peak_mb()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        df = pd.read_csv(csv_path)
+    else:
+        columns = manifest_columns(ANALYSIS_NODES, INPUT_NAME)
+        df, _ = FrameLoader(cache_dir).load(INPUT_NAME, csv_path, 'csv', columns=columns, cache_columns=columns)
+    elapsed = time.perf_counter() - start
+    return {
+        'peak_mb': round(_peak_mb() - baseline, 1),
+        'frame_mb': round(memory_usage(df) / 1024 / 1024, 1),
+        'columns': len(df.columns),
+        'rows': len(df),
+        'seconds': round(elapsed, 3)
+    }
+
+
+def generate_csv(path: str, rows: int):
+    """用 5000 条样例数据重复生成指定条数的 CSV"""
+    sample = pd.read_csv(os.path.join(PROJECT_ROOT, 'caregiver_jobs_5000.csv'), encoding='utf-8-sig')
+    repeats = -(-rows // len(sample))
+    df = pd.concat([sample] * repeats, ignore_index=True).iloc[:rows]
+    df['id'] = range(1, len(df) + 1)
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分析数据加载基准测试')
+    parser.add_argument('--csv', help='职位 CSV（默认用样例数据生成）')
+    parser.add_argument('--rows', type=int, default=50_000, help='生成的数据条数')
+    parser.add_argument('--measure', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--cache-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.csv, args.cache_dir)))
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix='benchmark_loading_')
+    try:
+        csv_path = args.csv
+        if not csv_path:
+            csv_path = os.path.join(workdir, 'caregiver_jobs_50000.csv')
+            generate_csv(csv_path, args.rows)
+        cache_dir = os.path.join(workdir, 'frame_cache')
+        print(f"测试文件: {csv_path} ({os.path.getsize(csv_path) / 1024 / 1024:.1f}MB)")
+
+        results = {}
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--measure', mode, '--csv', csv_path,
+                 '--cache-dir', cache_dir],
+                capture_output=True, text=True, check=True
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+        for mode in MODES:
+            r = results[mode]
+            print(f"{MODE_NAMES[mode]}: 峰值内存 +{r['peak_mb']}MB，DataFrame {r['frame_mb']}MB，"
+                  f"{r['columns']} 列 {r['rows']} 行，{r['seconds'] * 1000:.0f}ms")
+        legacy, cached = results['legacy'], results['cached']
+        print(f"峰值内存: {legacy['peak_mb']}MB -> {cached['peak_mb']}MB，"
+              f"DataFrame: {legacy['frame_mb']}MB -> {cached['frame_mb']}MB")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
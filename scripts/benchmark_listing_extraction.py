@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+列表页抽取基准测试脚本
+先校验新抽取器与原 BeautifulSoup 解析在样本页面上的结果一致，再比较两者每秒处理的页面数
+
+样本页面目录中的文件按 <站点>_<页码>.html 命名，可用
+    python scripts/crawl_stub_server.py --save-dir <目录>
+生成，也可以放入真实保存的列表页。未指定目录时在内存中生成样本。
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+
+from bigdata.crawler.listing_extractor import ListingExtractor, HAS_LXML
+from crawl_stub_server import SITES, render_listing_page
+
+FIELDS = ('title', 'company', 'location', 'salary')
+
+
+def legacy_parse_51job(html: str) -> list:
+    """原 api/job.py 中 _crawl_51job 的解析方式，作为对照"""
+    soup = BeautifulSoup(html, 'html.parser')
+    selectors = ['div.j_joblist div.e', 'div#joblist div.joblist div.joblist-item', 'table#resultList .el']
+    rows = []
+    for sel in selectors:
+        rows = soup.select(sel)
+        if rows:
+            break
+    items = []
+    for row in rows:
+        title = row.select_one('a')
+        comp = row.select_one('a.cname') or row.select_one('.t2 a')
+        area = row.select_one('span.d.at') or row.select_one('.t3')
+        sal = row.select_one('span.sal') or row.select_one('.t4')
+        t = (title.get_text(strip=True) if title else '')
+        if t:
+            items.append({
+                'title': t,
+                'company': comp.get_text(strip=True) if comp else '',
+                'location': area.get_text(strip=True) if area else '',
+                'salary': sal.get_text(strip=True) if sal else ''
+            })
+    return items
+
+
+def legacy_parse_zhaopin(html: str) -> list:
+    """原 api/job.py 中 _crawl_zhaopin 的解析方式，作为对照"""
+    soup = BeautifulSoup(html, 'html.parser')
+    selectors = ['.joblist-box .joblist-box__item', '.joblist .joblist-item', '.positionlist .positionlist__item']
+    rows = []
+    for sel in selectors:
+        rows = soup.select(sel)
+        if rows:
+            break
+    items = []
+    for row in rows:
+        t_el = row.select_one('.joblist-box__title a') or row.select_one('.job-title a') or row.select_one('a')
+        c_el = row.select_one('.joblist-box__cname a') or row.select_one('.company-name a')
+        a_el = row.select_one('.joblist-box__city') or row.select_one('.job-area')
+        s_el = row.select_one('.joblist-box__salary') or row.select_one('.job-salary')
+        t = t_el.get_text(strip=True) if t_el else ''
+        if t:
+            items.append({
+                'title': t,
+                'company': c_el.get_text(strip=True) if c_el else '',
+                'location': a_el.get_text(strip=True) if a_el else '',
+                'salary': s_el.get_text(strip=True) if s_el else ''
+            })
+    return items
+
+
+LEGACY_PARSERS = {'51job': legacy_parse_51job, 'zhaopin': legacy_parse_zhaopin}
+
+
+def load_corpus(pages_dir: str, pages: int) -> list:
+    """返回 [(站点, html)]"""
+    corpus = []
+    if pages_dir:
+        for name in sorted(os.listdir(pages_dir)):
+            site = name.split('_', 1)[0]
+            if site in LEGACY_PARSERS and name.endswith('.html'):
+                with open(os.path.join(pages_dir, name), 'r', encoding='utf-8', errors='ignore') as f:
+                    corpus.append((site, f.read()))
+    else:
+        for site in SITES:
+            corpus.extend((site, render_listing_page(site, page)) for page in range(1, pages + 1))
+    return corpus
+
+
+def check_consistency(extractor: ListingExtractor, corpus: list) -> bool:
+    """新抽取器的结果必须与原解析逐条一致"""
+    ok = True
+    for index, (site, html) in enumerate(corpus):
+        expected = LEGACY_PARSERS[site](html)
+        got = [{f: item[f] for f in FIELDS} for item in extractor.extract(site, html)]
+        if got != expected:
+            print(f"❌ 第 {index} 个页面（{site}）结果不一致: 期望 {len(expected)} 条，实际 {len(got)} 条")
+            ok = False
+    print(f"{'✅' if ok else '❌'} 一致性校验 {len(corpus)} 个页面")
+    return ok
+
+
+def measure(func, corpus: list, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for site, html in corpus:
+            func(site, html)
+    return len(corpus) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表页抽取基准测试')
+    parser.add_argument('--pages-dir', help='样本页面目录（<站点>_<页码>.html）')
+    parser.add_argument('--pages', type=int, default=50, help='未指定目录时每个站点生成的页数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.pages_dir, args.pages)
+    if not corpus:
+        print("❌ 没有样本页面")
+        return 1
+    print(f"📊 样本页面: {len(corpus)} 个，lxml {'可用' if HAS_LXML else '不可用（回退到 BeautifulSoup）'}")
+
+    extractor = ListingExtractor()
+    if not check_consistency(extractor, corpus):
+        return 1
+
+    legacy_rate = measure(lambda site, html: LEGACY_PARSERS[site](html), corpus, args.repeat)
+    new_rate = measure(extractor.extract, corpus, args.repeat)
+    print(f"BeautifulSoup 解析: {legacy_rate:,.1f} 页/秒")
+    print(f"站点定义抽取:      {new_rate:,.1f} 页/秒")
+    print(f"加速比: {new_rate / legacy_rate:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
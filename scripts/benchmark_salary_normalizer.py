@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+薪资标准化基准测试脚本
+比较逐行正则解析与批量解析在100万条数据上的吞吐量
+（各类薪资写法的解析结果由 bigdata/tests/test_salary_normalizer.py 校验）
+"""
+
+import sys
+import os
+import re
+import time
+import random
+import argparse
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bigdata.processing.salary_normalizer import normalize_salaries
+
+
+def legacy_parse(s: str) -> float:
+    """原 api/job.py 中的逐行解析方式，作为对照"""
+    if not s:
+        return 0.0
+    s = s.replace(' ', '')
+    m = re.findall(r"(\d+\.?\d*)", s)
+    if not m:
+        return 0.0
+    nums = list(map(float, m))
+    base = sum(nums) / len(nums)
+    if 'k' in s.lower():
+        base *= 1000
+    if '千' in s:
+        base *= 1000
+    if '万' in s:
+        base *= 10000
+    if '年' in s:
+        base = base / 12.0
+    return float(round(base, 2))
+
+
+def generate_salaries(n: int, seed: int = 42) -> list:
+    """按生成数据集中常见的写法构造 n 条薪资文本"""
+    rng = random.Random(seed)
+    templates = [
+        lambda: f'{rng.randrange(3, 12) * 1000}-{rng.randrange(12, 20) * 1000}元/月',
+        lambda: f'{rng.randrange(3, 9)}k-{rng.randrange(9, 15)}k/月',
+        lambda: f'{rng.randrange(150, 250)}-{rng.randrange(250, 350)}/天',
+        lambda: f'{rng.randrange(6, 12)}-{rng.randrange(12, 20)}万/年',
+        lambda: f'{rng.randrange(30, 80)}元/小时',
+        lambda: '面议',
+    ]
+    return [rng.choice(templates)() for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='薪资标准化基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='测试数据条数')
+    args = parser.parse_args()
+
+    values = generate_salaries(args.rows)
+    print(f"📊 测试数据: {len(values)} 条，不同写法 {len(set(values))} 种")
+
+    start = time.perf_counter()
+    for v in values:
+        legacy_parse(v)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    normalize_salaries(values)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"逐行正则解析: {legacy_seconds:.2f}s ({len(values) / legacy_seconds:,.0f} 条/秒)")
+    print(f"批量标准化:   {batch_seconds:.2f}s ({len(values) / batch_seconds:,.0f} 条/秒)")
+    print(f"加速比: {legacy_seconds / batch_seconds:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+职位列表页桩服务器
+在本地模拟 51job / 智联招聘的列表页，用于测试并发爬取接口，不访问真实站点
+
+用法:
+    python scripts/crawl_stub_server.py --port 8765 --latency 0.2 --fail-rate 0.1
+    export CRAWLER_51JOB_BASE_URL=http://127.0.0.1:8765/51job
+    export CRAWLER_ZHAOPIN_BASE_URL=http://127.0.0.1:8765/zhaopin
+
+--pages-dir 指定录制好的页面目录时，按 <站点>_<页码>.html 返回文件内容，
+否则按页码生成固定内容的页面。--save-dir 可把生成的页面保存下来作为样本。
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import threading
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+SITES = ('51job', 'zhaopin')
+ROWS_PER_PAGE = 50
+
+_TITLES = ['护工', '医院陪护', '居家护理员', '老年护理员', '养老院护理员', '母婴护理', '康复护理师', '住家保姆']
+_COMPANIES = ['安心养老服务中心', '康复护理机构', '颐养家政', '善护养老', '仁爱医院', '福寿康', '爱照护', '幸福家政']
+_CITIES = ['北京', '上海', '广州', '深圳', '杭州', '成都', '武汉', '南京']
+_SALARIES = ['6000-8000元/月', '6k-8k/月', '180-220/天', '1-1.5万/月', '50元/小时', '面议', '10-15万/年']
+
+
+def generate_rows(site: str, page: int, count: int = ROWS_PER_PAGE):
+    """按站点和页码生成固定的职位行，同样的参数结果相同"""
+    rng = random.Random(f'{site}-{page}')
+    return [{
+        'title': f'{rng.choice(_TITLES)}（{site}-{page}-{i}）',
+        'company': rng.choice(_COMPANIES),
+        'location': rng.choice(_CITIES),
+        'salary': rng.choice(_SALARIES),
+    } for i in range(count)]
+
+
+def render_listing_page(site: str, page: int, count: int = ROWS_PER_PAGE) -> str:
+    """生成与真实列表页结构一致的HTML（含页头、筛选栏等无关内容）"""
+    rows = generate_rows(site, page, count)
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>护工招聘</title>',
+             '<script>var pageConfig = {};</script></head><body>',
+             '<div class="header"><ul class="nav">',
+             ''.join(f'<li><a href="/c{i}">分类{i}</a></li>' for i in range(30)),
+             '</ul></div><div class="filter">',
+             ''.join(f'<span class="opt"><a href="?f={i}">筛选{i}</a></span>' for i in range(40)),
+             '</div>']
+    if site == '51job':
+        parts.append('<div class="j_joblist">')
+        for r in rows:
+            parts.append(
+                '<div class="e"><p class="t"><a class="jname" href="/job/1.html">{title}</a></p>'
+                '<p class="info"><span class="sal">{salary}</span><span class="d at">{location}</span>'
+                '<span class="d">1年经验</span></p><p class="tags"><span>五险一金</span><span>包吃住</span></p>'
+                '<div class="er"><a class="cname" href="/co/1.html">{company}</a><p class="dc">民营</p></div></div>'
+                .format(**{k: escape(v) for k, v in r.items()})
+            )
+    else:
+        parts.append('<div class="joblist-box">')
+        for r in rows:
+            parts.append(
+                '<div class="joblist-box__item"><div class="joblist-box__jobinfo">'
+                '<span class="joblist-box__title"><a href="/jobs/1.htm">{title}</a></span>'
+                '<p class="joblist-box__salary">{salary}</p>'
+                '<ul class="joblist-box__job-demand"><li class="joblist-box__city">{location}</li><li>经验不限</li></ul></div>'
+                '<div class="joblist-box__cname"><a href="/companydetail/1.htm">{company}</a></div>'
+                '<div class="joblist-box__welfare"><span>带薪年假</span><span>节日福利</span></div></div>'
+                .format(**{k: escape(v) for k, v in r.items()})
+            )
+    parts.append('</div><div class="footer">' + '<p>页脚</p>' * 20 + '</div></body></html>')
+    return ''.join(parts)
+
+
+def _page_number(site: str, path: str, query: str) -> int:
+    if site == '51job':
+        m = re.search(r',(\d+)\.html$', path)
+        return int(m.group(1)) if m else 1
+    return int(parse_qs(query).get('p', ['1'])[0])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    pages_dir = None
+    latency = 0.0
+    fail_rate = 0.0
+    _rng = random.Random(0)
+    _rng_lock = threading.Lock()
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        site = parts.path.strip('/').split('/', 1)[0]
+        if site not in SITES:
+            self.send_error(404)
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        with self._rng_lock:
+            failed = self._rng.random() < self.fail_rate
+        if failed:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        page = _page_number(site, parts.path, parts.query)
+        if self.pages_dir:
+            file_path = os.path.join(self.pages_dir, f'{site}_{page}.html')
+            if not os.path.exists(file_path):
+                self.send_error(404)
+                return
+            with open(file_path, 'rb') as f:
+                body = f.read()
+        else:
+            body = render_listing_page(site, page).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def save_pages(save_dir: str, pages: int):
+    os.makedirs(save_dir, exist_ok=True)
+    for site in SITES:
+        for page in range(1, pages + 1):
+            with open(os.path.join(save_dir, f'{site}_{page}.html'), 'w', encoding='utf-8') as f:
+                f.write(render_listing_page(site, page))
+    print(f"✅ 已保存 {pages * len(SITES)} 个页面到 {save_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='职位列表页桩服务器')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages-dir', help='录制页面目录（<站点>_<页码>.html）')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='随机返回503的比例')
+    parser.add_argument('--save-dir', help='只把生成的页面保存到该目录后退出')
+    parser.add_argument('--save-pages', type=int, default=20, help='--save-dir 时每个站点保存的页数')
+    args = parser.parse_args()
+
+    if args.save_dir:
+        save_pages(args.save_dir, args.save_pages)
+        return 0
+
+    StubHandler.pages_dir = args.pages_dir
+    StubHandler.latency = args.latency
+    StubHandler.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    base = f'http://{args.host}:{args.port}'
+    print(f"📊 桩服务器已启动: {base}")
+    print(f"   CRAWLER_51JOB_BASE_URL={base}/51job")
+    print(f"   CRAWLER_ZHAOPIN_BASE_URL={base}/zhaopin")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())